@@ -0,0 +1,106 @@
+"""
+Compare convert.py's PDF text backends on synthetic PayPal invoices.
+
+Invoices come from paypal_corpus.generate_paypal_corpus. For every installed backend the
+report gives mean/p50/p95 extraction latency, the speedup over the default
+(PyPDF2, or the first available backend when it is not installed) and whether
+parse_invoice_data() output matches the baseline for every document.
+
+From backend/:
+    python benchmarks/bench_convert_backends.py
+    python benchmarks/bench_convert_backends.py --documents 50 --iterations 5 --output backends.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).parent
+REPO_DIR = BENCH_DIR.parent.parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(REPO_DIR))
+
+import convert  # noqa: E402
+from paypal_corpus import generate_paypal_corpus  # noqa: E402
+
+
+def parse_quietly(text: str) -> Dict[str, Any]:
+    """parse_invoice_data() without its progress output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return convert.parse_invoice_data(text)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_benchmarks(backends: List[str], documents: int = 20, iterations: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """
+    Time each backend over the same corpus and check parse parity.
+
+    Args:
+        backends: Backend names (uninstalled ones are reported as skipped)
+        documents: Invoices generated
+        iterations: Passes over the corpus per backend
+        seed: Corpus random seed
+
+    Returns:
+        JSON-serializable results
+    """
+    installed = convert.available_backends()
+    runnable = [name for name in backends if name in installed]
+    baseline = convert.DEFAULT_BACKEND if convert.DEFAULT_BACKEND in runnable else (runnable or [None])[0]
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="paypal-bench-") as tmp:
+        paths = generate_paypal_corpus(Path(tmp), documents, seed)
+        parsed: Dict[str, List[Dict[str, Any]]] = {}
+        for name in backends:
+            if name not in runnable:
+                results[name] = {"skipped": f"{convert.TEXT_BACKENDS[name][0]} not installed"}
+                continue
+            convert.extract_text_from_pdf(paths[0], name)  # warm-up (imports, font caches)
+            samples = []
+            for _ in range(iterations):
+                for path in paths:
+                    start = time.perf_counter()
+                    convert.extract_text_from_pdf(path, name)
+                    samples.append(time.perf_counter() - start)
+            parsed[name] = [parse_quietly(convert.extract_text_from_pdf(path, name)) for path in paths]
+            results[name] = {
+                "calls": len(samples),
+                "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+                "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+                "p95_ms": round(_percentile(samples, 95) * 1000, 3),
+            }
+        for name in parsed:
+            results[name]["speedup_vs_" + baseline] = round(results[baseline]["mean_ms"] / results[name]["mean_ms"], 2)
+            results[name]["parse_matches_" + baseline] = parsed[name] == parsed[baseline]
+    return {"documents": documents, "iterations": iterations, "baseline": baseline, "results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark convert.py text extraction backends")
+    parser.add_argument("--backends", nargs="+", default=list(convert.TEXT_BACKENDS), choices=convert.TEXT_BACKENDS)
+    parser.add_argument("--documents", type=int, default=20, help="Invoices generated")
+    parser.add_argument("--iterations", type=int, default=3, help="Passes over the corpus per backend")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.backends, args.documents, args.iterations, args.seed)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
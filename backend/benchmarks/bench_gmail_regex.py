@@ -0,0 +1,147 @@
+"""
+Microbenchmark for forwarded-sender extraction in GmailClient.
+
+Builds a synthetic corpus of forwarded PO emails (long quoted threads, HTML
+alternatives, forwarded headers at varying depth) and compares the current
+scanner against the previous implementation, which decoded every text/plain part
+in full and ran re.findall for each pattern over the whole body.
+
+Usage (from backend/):
+    python benchmarks/bench_gmail_regex.py [--emails 500] [--repeat 5]
+"""
+
+import argparse
+import base64
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from beanscounter.integrations.gmail_client import (  # noqa: E402
+    GmailClient, _FORWARDED_SENDER_PATTERNS, _PAREN_EMAIL_RE, _SNIPPET_FROM_RE
+)
+
+_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL
+_SYSTEM_MARKERS = ['noreply', 'no-reply', 'donotreply', 'system@', 'sent-via']
+
+_FORWARD_TEMPLATES = [
+    "---------- Forwarded message ---------\nFrom: {name} <{email}>\nDate: Mon, Nov 3, 2025\nSubject: PO {po}\n",
+    "On Tue, Nov 18, 2025 at 11:52 AM {name} ({email}) <system@sent-via.netsuite.com> wrote:\n",
+    "On Wed, Nov 26, 2025 at 11:26 AM {name} <{email}> wrote:\n",
+    "-----Original Message-----\nFrom: {name} <{email}>\nSent: Friday\n",
+    "Hi team,\n\nSent by: {email}\n",
+]
+
+_FILLER = ("Please find the attached purchase order for next week's delivery. "
+           "Let us know if any items are out of stock or need to be substituted.\n")
+
+
+def _encode(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode()
+
+
+def build_corpus(count: int, seed: int = 7) -> list:
+    """Build synthetic forwarded emails with bodies of varying size."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        forward = rng.choice(_FORWARD_TEMPLATES).format(
+            name=f"Buyer {i}", email=f"buyer{i}@customer{i % 40}.com", po=1000 + i
+        )
+        # Forwarding note, forwarded header, then a long quoted thread
+        quoted = "".join(f"> {_FILLER}" for _ in range(rng.randint(20, 400)))
+        body = f"FYI\n\n{forward}\n{_FILLER * rng.randint(1, 5)}\n{quoted}"
+        html = f"<html><body><p>{body}</p>{'<div>' + _FILLER + '</div>' * 200}</body></html>"
+        corpus.append({
+            "snippet": body[:200],
+            "payload": {
+                "headers": [{"name": "From", "value": "Orders <orders@indianbento.com>"}],
+                "mimeType": "multipart/mixed",
+                "parts": [
+                    {"mimeType": "multipart/alternative", "parts": [
+                        {"mimeType": "text/plain", "body": {"data": _encode(body)}},
+                        {"mimeType": "text/html", "body": {"data": _encode(html)}},
+                    ]},
+                    {"mimeType": "application/pdf", "filename": f"PO-{1000 + i}.pdf",
+                     "body": {"attachmentId": f"att-{i}"}},
+                ],
+            },
+        })
+    return corpus
+
+
+def _legacy_body_text(email_data: dict) -> str:
+    def extract(part):
+        text = ""
+        if part.get("mimeType", "") == "text/plain" and part.get("body", {}).get("data"):
+            text = base64.urlsafe_b64decode(part["body"]["data"]).decode('utf-8', errors='ignore')
+        for nested in part.get("parts", []):
+            text += extract(nested)
+        return text
+    return extract(email_data.get("payload", {})) or email_data.get("snippet", "")
+
+
+def legacy_extract_original_sender(client: GmailClient, email_data: dict):
+    """Previous body scan: full decode and re.findall per pattern."""
+    header_dict = client._get_header_dict(email_data)
+    forwarding_domain = client._get_forwarding_domain(header_dict)
+    extracted = client._extract_sender_from_header_dict(header_dict, forwarding_domain)
+    if extracted:
+        return extracted
+
+    def allowed(address):
+        if forwarding_domain:
+            return forwarding_domain not in address.lower()
+        return "indianbento.com" not in address.lower()
+
+    body_text = _legacy_body_text(email_data)
+    if body_text:
+        for _, pattern in _FORWARDED_SENDER_PATTERNS:
+            for extracted in re.findall(pattern.pattern, body_text, _FLAGS):
+                if allowed(extracted):
+                    return extracted
+        for extracted in re.findall(_PAREN_EMAIL_RE.pattern, body_text[:2000], re.IGNORECASE):
+            if allowed(extracted) and not any(m in extracted.lower() for m in _SYSTEM_MARKERS):
+                return extracted
+    snippet = email_data.get("snippet", "")
+    matches = re.findall(_SNIPPET_FROM_RE.pattern, snippet, re.IGNORECASE) if snippet else []
+    if matches and allowed(matches[0]):
+        return matches[0]
+    return None
+
+
+def _time(fn, corpus, repeat):
+    best = float("inf")
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(email) for email in corpus]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark forwarded-sender extraction")
+    parser.add_argument("--emails", type=int, default=500, help="Number of synthetic emails")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    client = GmailClient(client_id="bench", client_secret="bench")
+    corpus = build_corpus(args.emails)
+
+    legacy_time, legacy_results = _time(lambda e: legacy_extract_original_sender(client, e), corpus, args.repeat)
+    current_time, current_results = _time(client.extract_original_sender, corpus, args.repeat)
+
+    mismatches = sum(1 for a, b in zip(legacy_results, current_results) if a != b)
+    print(f"emails:   {len(corpus)}")
+    print(f"legacy:   {legacy_time * 1000:.1f} ms ({legacy_time / len(corpus) * 1e6:.0f} us/email)")
+    print(f"current:  {current_time * 1000:.1f} ms ({current_time / len(corpus) * 1e6:.0f} us/email)")
+    print(f"speedup:  {legacy_time / current_time:.2f}x")
+    print(f"mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
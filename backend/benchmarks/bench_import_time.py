@@ -0,0 +1,106 @@
+"""
+Measure import time of the API app, the CLI and the heavier modules.
+
+Each target is imported in a fresh interpreter with `python -X importtime`;
+the report gives the total time, the time the target adds on top of its
+framework (fastapi / typer preloaded) and the slowest modules it pulls in, plus
+any heavy optional libraries that were loaded eagerly.
+
+From backend/:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 5 --top 15 --output imports.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# module -> framework modules preloaded when measuring what the module itself adds
+TARGETS = {
+    "beanscounter.api.app": ["fastapi", "starlette", "pydantic"],
+    "beanscounter.cli": ["typer"],
+    "beanscounter.core.po_reader": [],
+    "beanscounter.integrations.gmail_client": [],
+    "beanscounter.integrations.async_quickbooks_client": [],
+}
+
+# Libraries that should only load when a PO is read, Gmail is used or QuickBooks is called
+HEAVY_MODULES = ("pdfplumber", "pytesseract", "PIL", "rich", "googleapiclient.discovery", "google.oauth2",
+                 "google_auth_oauthlib", "requests", "httpx")
+
+
+def import_profile(module: str, preload: Optional[List[str]] = None) -> Tuple[List[Tuple[str, int, int]], List[str]]:
+    """
+    Import a module in a fresh interpreter under -X importtime.
+
+    Args:
+        module: Module to import
+        preload: Modules imported first (their cost is excluded from the module's cumulative time)
+
+    Returns:
+        Tuple of ([(module, self_us, cumulative_us), ...] in import order, heavy modules loaded)
+    """
+    code = "".join(f"import {name}; " for name in preload or []) + (
+        f"import {module}, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR / "src"),
+                                                                      os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                            env=env, cwd=BACKEND_DIR, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    heavy = [name for name in result.stdout.strip().split(",") if name]
+    return rows, heavy
+
+
+def cumulative_ms(rows: List[Tuple[str, int, int]], module: str) -> float:
+    """Cumulative import time of a module in milliseconds (0 if it was already loaded)."""
+    return next((cumulative / 1000 for name, _, cumulative in rows if name == module), 0.0)
+
+
+def measure(module: str, preload: List[str], runs: int, top: int) -> Dict[str, Any]:
+    totals, own = [], []
+    rows, heavy = [], []
+    for _ in range(runs):
+        rows, heavy = import_profile(module)
+        totals.append(cumulative_ms(rows, module))
+        own.append(cumulative_ms(import_profile(module, preload)[0], module) if preload else totals[-1])
+    slowest = sorted(rows, key=lambda row: -row[1])[:top]
+    return {
+        "total_ms": round(statistics.median(totals), 1),
+        "own_ms": round(statistics.median(own), 1),
+        "preloaded": preload,
+        "heavy_modules_loaded": heavy,
+        "slowest_self_ms": [{"module": name, "self_ms": round(self_us / 1000, 2)} for name, self_us, _ in slowest],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure package import time")
+    parser.add_argument("--modules", nargs="+", default=list(TARGETS))
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list per target")
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {module: measure(module, TARGETS.get(module, []), args.runs, args.top) for module in args.modules}
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
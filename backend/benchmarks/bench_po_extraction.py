@@ -0,0 +1,220 @@
+"""
+Benchmark POReader.extract_data and _parse_text on a synthetic PO corpus.
+
+Generates table-layout, Good Eggs, multi-page and scanned POs (see po_corpus.py),
+then reports per variant: throughput, mean/p50/p95 latency and peak RSS, as JSON
+so runs from different commits can be compared.
+
+Standalone (from backend/):
+    python benchmarks/bench_po_extraction.py --output results.json
+    python benchmarks/bench_po_extraction.py --compare results.json
+
+With pytest-benchmark:
+    pytest benchmarks/bench_po_extraction.py --benchmark-only
+"""
+
+import argparse
+import json
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+from po_corpus import VARIANTS, generate_corpus  # noqa: E402
+from beanscounter.core.po_reader import POReader  # noqa: E402
+
+OCR_VARIANTS = ("scanned_png", "scanned_jpg")
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _measure(fn: Callable[[Any], Any], inputs: List[Any], iterations: int) -> Dict[str, Any]:
+    """Run fn over every input `iterations` times and summarize per-call latency."""
+    samples = []
+    fn(inputs[0])  # warm-up (imports, font metrics, regex caches)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            samples.append(time.perf_counter() - start)
+    wall = time.perf_counter() - started
+    return {
+        "calls": len(samples),
+        "throughput_per_s": round(len(samples) / wall, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(_percentile(samples, 95) * 1000, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _parse_inputs(reader: POReader, paths: List[Path]) -> List[tuple]:
+    """Capture the text, tables and spatial blocks _parse_text receives for each file."""
+    captured = []
+    original = reader._parse_text
+
+    def capture(text, tables, filename, ship_to_text="", attn_text=""):
+        captured.append((text, tables, filename, ship_to_text, attn_text))
+        return original(text, tables, filename, ship_to_text, attn_text)
+
+    reader._parse_text = capture
+    try:
+        for path in paths:
+            reader.extract_data(path)
+    finally:
+        reader._parse_text = original
+    return captured
+
+
+def run_benchmarks(variants=VARIANTS, per_variant: int = 5, iterations: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate the corpus and benchmark every variant.
+
+    Args:
+        variants: Variants to run
+        per_variant: Documents generated per variant
+        iterations: Passes over each variant's documents
+        seed: Corpus random seed
+
+    Returns:
+        JSON-serializable results
+    """
+    reader = POReader()
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="po-bench-") as tmp:
+        corpus = generate_corpus(Path(tmp), variants, per_variant, seed)
+        for variant, paths in corpus.items():
+            if variant in OCR_VARIANTS and not shutil.which("tesseract"):
+                results[variant] = {"skipped": "tesseract not installed"}
+                continue
+            parse_inputs = _parse_inputs(reader, paths)
+            results[variant] = {
+                "documents": len(paths),
+                "bytes": sum(path.stat().st_size for path in paths),
+                "extract_data": _measure(reader.extract_data, paths, iterations),
+                "parse_text": _measure(lambda args: reader._parse_text(*args), parse_inputs, iterations),
+            }
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "per_variant": per_variant,
+            "iterations": iterations,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Describe p50/p95 changes between two result files.
+
+    Args:
+        baseline: Earlier results
+        current: New results
+
+    Returns:
+        One line per variant and stage
+    """
+    lines = []
+    for variant, stages in current["results"].items():
+        base = baseline.get("results", {}).get(variant, {})
+        for stage in ("extract_data", "parse_text"):
+            if stage not in stages or stage not in base:
+                continue
+            changes = []
+            for metric in ("p50_ms", "p95_ms"):
+                old, new = base[stage][metric], stages[stage][metric]
+                delta = (new - old) / old * 100 if old else 0.0
+                changes.append(f"{metric} {old:.2f} -> {new:.2f} ({delta:+.1f}%)")
+            lines.append(f"{variant:12s} {stage:12s} " + ", ".join(changes))
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PO extraction and parsing")
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=VARIANTS)
+    parser.add_argument("--per-variant", type=int, default=5, help="Documents generated per variant")
+    parser.add_argument("--iterations", type=int, default=3, help="Passes over each variant's documents")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON results to compare against")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.variants, args.per_variant, args.iterations, args.seed)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+    if args.compare:
+        print("\n".join(compare(json.loads(args.compare.read_text()), results)))
+
+
+# pytest-benchmark entry points (pytest benchmarks/bench_po_extraction.py --benchmark-only)
+
+def _pytest_corpus(tmp_path_factory, variant: str) -> List[Path]:
+    import pytest
+    if variant in OCR_VARIANTS and not shutil.which("tesseract"):
+        pytest.skip("tesseract not installed")
+    return generate_corpus(tmp_path_factory.mktemp(variant), (variant,), per_variant=3)[variant]
+
+
+def _parametrize(fn):
+    import pytest
+    return pytest.mark.parametrize("variant", VARIANTS)(fn)
+
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    pass
+else:
+    @_parametrize
+    def test_extract_data(benchmark, tmp_path_factory, variant):
+        reader = POReader()
+        paths = _pytest_corpus(tmp_path_factory, variant)
+        benchmark(lambda: [reader.extract_data(path) for path in paths])
+
+    @_parametrize
+    def test_parse_text(benchmark, tmp_path_factory, variant):
+        reader = POReader()
+        inputs = _parse_inputs(reader, _pytest_corpus(tmp_path_factory, variant))
+        benchmark(lambda: [reader._parse_text(*args) for args in inputs])
+
+
+if __name__ == "__main__":
+    main()
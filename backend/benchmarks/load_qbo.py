@@ -0,0 +1,304 @@
+"""
+Load-test the QuickBooks integration against the local stub server (qbo_stub.py).
+
+Scenarios, each against a fresh stub with 10k items and 5k customers by default:
+
+- listing: full item and customer listings (count + concurrent pages) with the
+  sync and async clients
+- matching: item catalog fetch and index, PO line mapping, batched customer and
+  DocNumber lookups
+- bulk_create: bulk_convert_pos_to_qb_invoices for many POs (concurrent creates)
+
+Results (wall time, throughput, p50/p95 per repetition, API calls, 429s and
+client retries) are printed as JSON so runs from different commits can be
+compared offline.
+
+From backend/:
+    python benchmarks/load_qbo.py --latency-ms 80 --output qbo.json
+    python benchmarks/load_qbo.py --scenarios bulk_create --invoices 300 --throttle-rate 0.05
+    python benchmarks/load_qbo.py --compare qbo.json
+
+Client-side limits default to Intuit's (500 requests/minute, 10 concurrent);
+raise --requests-per-minute to measure the stub-bound throughput instead.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+from qbo_stub import StubConfig, StubServer  # noqa: E402
+
+SCENARIOS = ("listing", "matching", "bulk_create")
+REALM_ID = "9130350000000000"
+
+
+def _configure(base_url: str, requests_per_minute: int, max_concurrent: int) -> None:
+    """Point the clients at the stub and size the realm rate limiter (read on first use)."""
+    os.environ["QBO_BASE_URL"] = base_url
+    os.environ["QBO_TOKEN_URL"] = f"{base_url}/oauth2/v1/tokens/bearer"
+    os.environ["QBO_REQUESTS_PER_MINUTE"] = str(requests_per_minute)
+    os.environ["QBO_MAX_CONCURRENT_REQUESTS"] = str(max_concurrent)
+    from beanscounter.integrations import qb_rate_limiter
+    qb_rate_limiter._limiters.pop(REALM_ID, None)
+
+
+def _clients(retry_base_delay: float):
+    from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
+    from beanscounter.integrations.qb_rate_limiter import RetryPolicy
+    from beanscounter.integrations.quickbooks_client import QuickBooksClient
+    credentials = dict(client_id="stub-client", client_secret="stub-secret", refresh_token="stub-refresh",
+                       realm_id=REALM_ID, retry_policy=RetryPolicy(base_delay=retry_base_delay))
+    return QuickBooksClient(**credentials), AsyncQuickBooksClient(**credentials)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _summarize(samples: List[float], units: int) -> Dict[str, Any]:
+    """Latency summary for repeated runs that each process `units` rows/POs."""
+    return {
+        "runs": len(samples),
+        "per_second": round(units * len(samples) / sum(samples), 1) if sum(samples) else None,
+        "mean_ms": round(statistics.fmean(samples) * 1000, 1),
+        "p50_ms": round(_percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(_percentile(samples, 95) * 1000, 1),
+    }
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> tuple:
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def _synthetic_pos(count: int, items: List[Dict[str, Any]], customer_ids: List[str], seed: int,
+                   first_doc_number: int = 500000) -> List[Dict[str, Any]]:
+    """Bulk-invoice entries whose lines match catalog items by SKU or by name."""
+    rng = random.Random(seed)
+    entries = []
+    for index in range(count):
+        po_items = []
+        for line in range(rng.randint(3, 20)):
+            item = rng.choice(items)
+            qty, rate = rng.randint(1, 24), round(rng.uniform(5, 80), 2)
+            po_item = {"product_name": item["Name"], "quantity": qty, "rate": rate, "price": round(qty * rate, 2)}
+            if line % 2 == 0:
+                po_item["sku"] = item["Sku"]
+            po_items.append(po_item)
+        entries.append({
+            "customer_id": rng.choice(customer_ids),
+            "po_filename": f"load_po_{index}.pdf",
+            "invoice_data": {"po_number": f"LOAD-{first_doc_number + index}", "order_date": "11/03/2025",
+                             "delivery_date": "11/10/2025", "items": po_items},
+        })
+    return entries
+
+
+def scenario_listing(args: argparse.Namespace) -> Dict[str, Any]:
+    sync_client, async_client = _clients(args.retry_base_delay)
+    samples, items = _time(sync_client.get_all_items, args.repeat)
+    customer_samples, customers = _time(lambda: sync_client.query_all("Customer", columns=["Id", "DisplayName"]),
+                                        args.repeat)
+
+    async def async_listing() -> List[float]:
+        async_samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            await async_client.get_all_items()
+            async_samples.append(time.perf_counter() - start)
+        await async_client.aclose()
+        return async_samples
+
+    return {
+        "items_sync": {"rows": len(items), **_summarize(samples, len(items))},
+        "customers_sync": {"rows": len(customers), **_summarize(customer_samples, len(customers))},
+        "items_async": {"rows": len(items), **_summarize(asyncio.run(async_listing()), len(items))},
+    }
+
+
+def scenario_matching(args: argparse.Namespace) -> Dict[str, Any]:
+    from beanscounter.services.po_to_invoice_service import _index_qb_items, _map_po_items_to_qb_lines
+    sync_client, async_client = _clients(args.retry_base_delay)
+
+    fetch_samples, items = _time(sync_client.get_all_items, args.repeat)
+    index_samples, item_index = _time(lambda: _index_qb_items(items), args.repeat)
+    customer_ids = [str(i) for i in range(1, args.customers + 1)]
+    entries = _synthetic_pos(args.invoices, items, customer_ids, args.seed)
+    lines = sum(len(entry["invoice_data"]["items"]) for entry in entries)
+    map_samples, _ = _time(
+        lambda: [_map_po_items_to_qb_lines(entry["invoice_data"]["items"], None, item_index=item_index)
+                 for entry in entries],
+        args.repeat,
+    )
+
+    async def lookups() -> List[float]:
+        lookup_samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            await asyncio.gather(
+                async_client.get_customers_by_ids([entry["customer_id"] for entry in entries]),
+                async_client.find_invoices_by_docnumbers([f"PO-{100000 + i}" for i in range(len(entries))]),
+            )
+            lookup_samples.append(time.perf_counter() - start)
+        await async_client.aclose()
+        return lookup_samples
+
+    return {
+        "fetch_items": {"rows": len(items), **_summarize(fetch_samples, len(items))},
+        "index_items": _summarize(index_samples, len(items)),
+        "map_lines": {"pos": len(entries), "lines": lines, **_summarize(map_samples, lines)},
+        "batched_lookups": {"pos": len(entries), **_summarize(asyncio.run(lookups()), len(entries))},
+    }
+
+
+def scenario_bulk_create(args: argparse.Namespace) -> Dict[str, Any]:
+    from beanscounter.services import invoice_storage_service
+    from beanscounter.services.bulk_invoice_service import bulk_convert_pos_to_qb_invoices
+    sync_client, _ = _clients(args.retry_base_delay)
+    items = sync_client.get_all_items()
+    customer_ids = [str(i) for i in range(1, args.customers + 1)]
+
+    samples, summary = [], {}
+    with tempfile.TemporaryDirectory(prefix="qbo-load-") as tmp:
+        invoice_storage_service.STORAGE_FILE = Path(tmp) / "invoices.json"
+        for run in range(args.repeat):
+            # Fresh DocNumbers per run so every PO is created rather than reported as "exists"
+            entries = _synthetic_pos(args.invoices, items, customer_ids, args.seed + run,
+                                     first_doc_number=500000 + run * args.invoices)
+
+            async def create() -> Dict[str, Any]:
+                _, async_client = _clients(args.retry_base_delay)
+                async with async_client:
+                    return await bulk_convert_pos_to_qb_invoices(entries, async_client)
+
+            start = time.perf_counter()
+            summary = asyncio.run(create())["summary"]
+            samples.append(time.perf_counter() - start)
+    return {"invoices": args.invoices, "summary": summary, **_summarize(samples, args.invoices)}
+
+
+def run_scenario(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run one scenario against a freshly generated stub.
+
+    Args:
+        name: One of SCENARIOS
+        args: Parsed command-line options
+
+    Returns:
+        Scenario results plus stub call counts and client limiter counters
+    """
+    from beanscounter.integrations.qb_rate_limiter import get_rate_limit_metrics
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.throttle_rate, args.stub_max_concurrent,
+                        args.retry_after, args.items, args.customers, args.stub_invoices, args.seed)
+    server = StubServer(config)
+    with server as base_url:
+        _configure(base_url, args.requests_per_minute, args.max_concurrent)
+        started = time.perf_counter()
+        result = {"scenario": globals()[f"scenario_{name}"](args)}
+        result["wall_s"] = round(time.perf_counter() - started, 2)
+        result["stub"] = dict(server.app.state.stats)
+        limiter = get_rate_limit_metrics().get(REALM_ID, {})
+        result["client"] = {k: v for k, v in limiter.items() if isinstance(v, (int, float))}
+    return result
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Describe p50/p95 changes between two result files.
+
+    Args:
+        baseline: Earlier results
+        current: New results
+
+    Returns:
+        One line per scenario step
+    """
+    lines = []
+    for scenario, result in current["results"].items():
+        base = baseline.get("results", {}).get(scenario, {}).get("scenario", {})
+        steps = result["scenario"]
+        steps = {"": steps} if "p50_ms" in steps else steps
+        base = {"": base} if "p50_ms" in base else base
+        for step, values in steps.items():
+            if step not in base or "p50_ms" not in base[step]:
+                continue
+            changes = []
+            for metric in ("p50_ms", "p95_ms"):
+                old, new = base[step][metric], values[metric]
+                delta = (new - old) / old * 100 if old else 0.0
+                changes.append(f"{metric} {old:.1f} -> {new:.1f} ({delta:+.1f}%)")
+            lines.append(f"{scenario:12s} {step:16s} " + ", ".join(changes))
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the QuickBooks clients against the local stub")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per scenario step")
+    parser.add_argument("--invoices", type=int, default=100, help="POs per matching / bulk_create run")
+    parser.add_argument("--items", type=int, default=10000, help="Items in the stub dataset")
+    parser.add_argument("--customers", type=int, default=5000, help="Customers in the stub dataset")
+    parser.add_argument("--stub-invoices", type=int, default=1000, help="Existing invoices in the stub dataset")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub latency per API call")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Extra random stub latency per call")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of calls the stub answers with 429")
+    parser.add_argument("--stub-max-concurrent", type=int, help="Stub answers 429 above this many in-flight calls")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with stub 429s")
+    parser.add_argument("--retry-base-delay", type=float, default=0.1, help="Client backoff base in seconds")
+    parser.add_argument("--requests-per-minute", type=int, default=500, help="Client-side realm rate limit")
+    parser.add_argument("--max-concurrent", type=int, default=10, help="Client-side realm concurrency cap")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON results to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **{k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        },
+        "results": {name: run_scenario(name, args) for name in args.scenarios},
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+    if args.compare:
+        print("\n".join(compare(json.loads(args.compare.read_text()), results)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Synthetic PayPal invoice corpus for convert.py.
+
+Invoices follow the single-column PayPal layout parse_invoice_data() reads
+(Invoice No# / dates / BILL TO / SHIP TO / QTY/HRS-PRICE-AMOUNT($) item blocks /
+totals) and are written with po_corpus.write_pdf. Used by
+bench_convert_backends.py and the convert.py tests.
+"""
+
+import random
+from pathlib import Path
+from typing import List
+
+from po_corpus import PAGE_HEIGHT, write_pdf
+
+_CUSTOMERS = ["Acme Foods Inc", "Bayview Market", "Sunset Grocers", "Green Valley Co-op", "Harbor Deli"]
+_DISHES = [
+    ("Chicken Tikka Masala with Kati Roll Bento Box", "includes complimentary Samosa with Tamarind Chutney"),
+    ("Punjabi Saag Paneer Bento Box", None),
+    ("Dal Makhani with Jeera Rice", "served with Garlic Naan"),
+    ("Vegetable Korma Bento Box", None),
+    ("Chana Masala Family Tray", "serves 10, with Raita"),
+]
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+LINES_PER_PAGE = 60
+
+
+def paypal_invoice_lines(rng: random.Random, index: int) -> List[str]:
+    """Text lines of one PayPal invoice, top to bottom."""
+    customer = rng.choice(_CUSTOMERS)
+    month = rng.randrange(12)
+    day = rng.randint(1, 14)
+    lines = [
+        "INVOICE",
+        "Invoice No#", f"INV-{1000 + index}",
+        "Invoice Date", f"{_MONTHS[month]} {day:02d}, 2025",
+        "Due Date", f"{_MONTHS[month]} {day + 14:02d}, 2025",
+        "BILL TO", customer, "Accounts Payable", f"{rng.randint(100, 9999)} Market Street",
+        "San Francisco, CA 94103", "ap@example.com",
+        "SHIP TO", customer, "Receiving Dock", f"{rng.randint(100, 9999)} Mission Street", "San Francisco, CA 94110",
+        "# ITEMS & DESCRIPTION", "QTY/HRS", "PRICE", "AMOUNT($)",
+    ]
+    subtotal = 0.0
+    for number in range(1, rng.randint(1, 6) + 1):
+        name, note = rng.choice(_DISHES)
+        qty = rng.randint(5, 60)
+        rate = rng.choice([12.5, 18.0, 26.0, 42.75])
+        amount = qty * rate
+        subtotal += amount
+        lines += [str(number), name] + ([note] if note else []) + [str(qty), f"${rate:,.2f}", f"${amount:,.2f}"]
+    tax = round(subtotal * 0.09875, 2)
+    tip = float(rng.choice([0, 20, 50]))
+    total = subtotal + tax + tip
+    lines += [
+        f"Subtotal ${subtotal:,.2f}", f"Tax ${tax:,.2f}", f"Tip ${tip:,.2f}", f"TOTAL ${total:,.2f}",
+        f"Amount paid ${total:,.2f}", "AMOUNT DUE $0.00",
+    ]
+    return lines
+
+
+def generate_paypal_corpus(folder: Path, count: int = 10, seed: int = 0) -> List[Path]:
+    """
+    Write synthetic PayPal invoice PDFs.
+
+    Args:
+        folder: Output directory
+        count: Number of invoices
+        seed: Random seed
+
+    Returns:
+        PDF paths
+    """
+    rng = random.Random(seed)
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        lines = paypal_invoice_lines(rng, index)
+        pages = []
+        for start in range(0, len(lines), LINES_PER_PAGE):
+            chunk = lines[start:start + LINES_PER_PAGE]
+            pages.append([("text", 50, PAGE_HEIGHT - 40 - 12 * row, 10, line) for row, line in enumerate(chunk)])
+        path = folder / f"paypal_{index:04d}.pdf"
+        write_pdf(path, pages)
+        paths.append(path)
+    return paths
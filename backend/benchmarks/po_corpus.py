@@ -0,0 +1,249 @@
+"""
+Synthetic PO corpus for the extraction benchmarks.
+
+PDFs are written by a minimal hand-rolled PDF writer (Helvetica text plus ruled
+lines), so no PDF library is needed to generate them. Variants:
+
+- table: ruled item table (Item / Description / Qty / Rate / Amount), read by
+  pdfplumber's table extraction
+- goodeggs: text-only "Product Code / Item Name / Qty / Size / Cost / Extended
+  Cost" layout, read by the header-based line parser
+- multipage: table layout with the item table spread over several pages
+- scanned_png / scanned_jpg: the table layout rendered as an image, read by OCR
+
+Documents vary in customer, PO number, dates and row count, driven by a seed so
+runs are reproducible.
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+
+VARIANTS = ("table", "goodeggs", "multipage", "scanned_png", "scanned_jpg")
+
+_CUSTOMERS = ["Acme Foods Inc", "Bayview Market", "Sunset Grocers", "Green Valley Co-op", "Harbor Deli"]
+_PRODUCTS = [
+    ("COLD-SAAG", "Veg,IndianBento,PunjabiSaagPaneer,5lb"),
+    ("COLD-DAL", "Veg,IndianBento,DalMakhani,5lb"),
+    ("COLD-TIKKA", "NonVeg,IndianBento,ChickenTikkaMasala,5lb"),
+    ("COLD-CHANA", "Veg,IndianBento,ChanaMasala,5lb"),
+    ("COLD-RICE", "Veg,IndianBento,JeeraRice,10lb"),
+    ("COLD-KORMA", "Veg,IndianBento,VegKorma,5lb"),
+]
+
+# A page is a list of drawing operations: ("text", x, y, size, string) or ("line", x1, y1, x2, y2)
+Page = List[Tuple]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, pages: List[Page]) -> None:
+    """
+    Write a PDF with Helvetica text and stroked lines.
+
+    Args:
+        path: Output file path
+        pages: Drawing operations per page, in PDF points from the bottom-left
+    """
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled in once the page tree exists
+    pages_obj = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    page_ids = []
+    for ops in pages:
+        stream = []
+        for op in ops:
+            if op[0] == "text":
+                _, x, y, size, text = op
+                stream.append(f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({_escape(text)}) Tj ET")
+            else:
+                _, x1, y1, x2, y2 = op
+                stream.append(f"0.5 w {x1:.1f} {y1:.1f} m {x2:.1f} {y2:.1f} l S")
+        content = "\n".join(stream).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_obj} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        ))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_obj - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_obj} 0 R >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    Path(path).write_bytes(bytes(out))
+
+
+def _header_lines(rng: random.Random, customer: str, po_number: str) -> List[str]:
+    day = rng.randint(1, 20)
+    return [
+        customer,
+        "Purchase Order",
+        f"PO #: {po_number}",
+        f"Order Date: 11/{day:02d}/2025",
+        f"Delivery Date: 11/{day + 5:02d}/2025",
+        "Ordered By: Purchasing Dept",
+        "Bill To:",
+        customer,
+        f"{rng.randint(100, 9999)} Market Street",
+        "San Francisco, CA 94103",
+        "Ship To:",
+        customer,
+        f"{rng.randint(100, 9999)} Mission Street",
+        "San Francisco, CA 94110",
+    ]
+
+
+def _items(rng: random.Random, count: int) -> List[Dict]:
+    items = []
+    for _ in range(count):
+        code, name = rng.choice(_PRODUCTS)
+        qty = rng.randint(1, 24)
+        rate = round(rng.uniform(20, 60), 2)
+        items.append({"code": code, "name": name, "qty": qty, "rate": rate, "amount": round(qty * rate, 2)})
+    return items
+
+
+def _table_pages(rng: random.Random, customer: str, po_number: str, items: List[Dict],
+                 rows_per_page: int) -> List[Page]:
+    columns = [(40, "Item"), (140, "Description"), (400, "Qty"), (450, "Rate"), (510, "Amount")]
+    right = 572
+    row_height = 18
+    pages = []
+    chunks = [items[i:i + rows_per_page] for i in range(0, len(items), rows_per_page)] or [[]]
+    for page_number, chunk in enumerate(chunks):
+        ops: Page = []
+        y = PAGE_HEIGHT - 50
+        header = _header_lines(rng, customer, po_number) if page_number == 0 else [customer, f"Page {page_number + 1}"]
+        for line in header:
+            ops.append(("text", 40, y, 10, line))
+            y -= 14
+        y -= 10
+
+        # Ruled table: header row plus one row per item
+        top = y
+        rows = [[label for _, label in columns]] + [
+            [item["code"], item["name"][:40], str(item["qty"]), f"{item['rate']:.2f}", f"{item['amount']:.2f}"]
+            for item in chunk
+        ]
+        for row in rows:
+            ops.append(("line", 40, y, right, y))
+            for (x, _), value in zip(columns, row):
+                ops.append(("text", x + 3, y - 13, 9, value))
+            y -= row_height
+        ops.append(("line", 40, y, right, y))
+        for x in [x for x, _ in columns] + [right]:
+            ops.append(("line", x, top, x, y))
+
+        if page_number == len(chunks) - 1:
+            total = sum(item["amount"] for item in items)
+            ops.append(("text", 400, y - 20, 10, f"Total: ${total:,.2f}"))
+        pages.append(ops)
+    return pages
+
+
+def _goodeggs_pages(rng: random.Random, po_number: str, items: List[Dict]) -> List[Page]:
+    ops: Page = []
+    y = PAGE_HEIGHT - 50
+    lines = _header_lines(rng, "Good Eggs", po_number)
+    lines.append("Product Code Item Name Qty Size Cost Extended Cost")
+    for item in items:
+        lines.append(f"{item['code']} {item['name']} {item['qty']}EACH (5 Pounds) "
+                     f"$ {item['rate']:.2f} $ {item['amount']:.2f}")
+    lines.append(f"Total $ {sum(item['amount'] for item in items):,.2f}")
+    for line in lines:
+        ops.append(("text", 40, y, 9, line))
+        y -= 13
+    return [ops]
+
+
+def _render_image(path: Path, pages: List[Page]) -> None:
+    """Rasterize the first page at 2x, like a scanned document."""
+    scale = 2
+    image = Image.new("RGB", (PAGE_WIDTH * scale, PAGE_HEIGHT * scale), color="white")
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 18)
+    except OSError:
+        font = ImageFont.load_default()
+    for op in pages[0]:
+        if op[0] == "text":
+            _, x, y, _, text = op
+            draw.text((x * scale, (PAGE_HEIGHT - y - 10) * scale), text, fill="black", font=font)
+        else:
+            _, x1, y1, x2, y2 = op
+            draw.line((x1 * scale, (PAGE_HEIGHT - y1) * scale, x2 * scale, (PAGE_HEIGHT - y2) * scale), fill="black")
+    image.save(path)
+
+
+def generate_document(folder: Path, variant: str, index: int, seed: int = 0) -> Path:
+    """
+    Generate one synthetic PO.
+
+    Args:
+        folder: Output folder
+        variant: One of VARIANTS
+        index: Document index (varies customer, PO number and row count)
+        seed: Base random seed
+
+    Returns:
+        Path of the generated file
+    """
+    rng = random.Random(f"{seed}-{variant}-{index}")
+    customer = rng.choice(_CUSTOMERS)
+    po_number = f"PO-{rng.randint(10000, 99999)}"
+
+    if variant == "table":
+        path = folder / f"table_{index}.pdf"
+        write_pdf(path, _table_pages(rng, customer, po_number, _items(rng, rng.randint(3, 25)), rows_per_page=30))
+    elif variant == "goodeggs":
+        path = folder / f"goodeggs_{index}.pdf"
+        write_pdf(path, _goodeggs_pages(rng, po_number, _items(rng, rng.randint(3, 25))))
+    elif variant == "multipage":
+        path = folder / f"multipage_{index}.pdf"
+        write_pdf(path, _table_pages(rng, customer, po_number, _items(rng, rng.randint(60, 120)), rows_per_page=30))
+    elif variant in ("scanned_png", "scanned_jpg"):
+        path = folder / f"{variant}_{index}.{variant.rsplit('_', 1)[1]}"
+        _render_image(path, _table_pages(rng, customer, po_number, _items(rng, rng.randint(3, 12)), rows_per_page=30))
+    else:
+        raise ValueError(f"Unknown variant: {variant}")
+    return path
+
+
+def generate_corpus(folder: Path, variants=VARIANTS, per_variant: int = 5, seed: int = 0) -> Dict[str, List[Path]]:
+    """
+    Generate documents for each variant.
+
+    Args:
+        folder: Output folder (created if missing)
+        variants: Variants to generate
+        per_variant: Documents per variant
+        seed: Base random seed
+
+    Returns:
+        Dictionary mapping variant to generated paths
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    return {variant: [generate_document(folder, variant, i, seed) for i in range(per_variant)] for variant in variants}
@@ -0,0 +1,782 @@
+"""
+Local QuickBooks Online stub server for performance testing.
+
+Implements the parts of the QBO v3 API the clients use, over an in-memory
+synthetic company:
+
+- POST /oauth2/v1/tokens/bearer (refresh_token grant)
+- POST|GET /v3/company/{realm}/query (select / count(*), where with =, in, like,
+  and/or, orderby, startposition, maxresults)
+- GET /v3/company/{realm}/{entity}/{id} and POST /v3/company/{realm}/{entity}
+  (create, or sparse update when Id is given) for Invoice, Item, Customer,
+  Account and Term
+- POST /v3/company/{realm}/batch (up to 30 BatchItemRequest entries)
+- GET /v3/company/{realm}/cdc?entities=...&changedSince=...
+
+Every API call can be slowed down (fixed latency plus jitter) and answered with
+HTTP 429, either at random or when more calls are in flight than Intuit allows.
+GET /_stub/stats returns per-endpoint call counts; POST /_stub/reset clears them.
+
+Run standalone (from backend/):
+    python benchmarks/qbo_stub.py --port 8765 --latency-ms 80 --throttle-rate 0.02
+
+then point the app at it:
+    QBO_BASE_URL=http://127.0.0.1:8765 QBO_TOKEN_URL=http://127.0.0.1:8765/oauth2/v1/tokens/bearer
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import secrets
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+ENTITIES = {
+    "invoice": "Invoice",
+    "item": "Item",
+    "customer": "Customer",
+    "account": "Account",
+    "term": "Term",
+}
+
+# QuickBooks limits mirrored by the stub
+MAX_RESULTS = 1000
+DEFAULT_MAX_RESULTS = 100
+MAX_BATCH_ITEMS = 30
+
+_WORDS = ["Saag", "Paneer", "Dal", "Makhani", "Tikka", "Masala", "Chana", "Jeera", "Rice", "Korma", "Aloo",
+          "Gobi", "Biryani", "Naan", "Raita", "Samosa", "Pakora", "Vindaloo", "Rajma", "Bhindi"]
+_LINES = ["Veg", "NonVeg", "Vegan"]
+_SIZES = ["2lb", "5lb", "10lb", "Case", "Each"]
+_COMPANY_WORDS = ["Acme", "Bayview", "Sunset", "Green Valley", "Harbor", "Mission", "Golden Gate", "Pacific",
+                  "Redwood", "Summit", "Lakeside", "Cedar", "Orchard", "Union", "Hillside"]
+_COMPANY_KINDS = ["Foods", "Market", "Grocers", "Co-op", "Deli", "Kitchen", "Cafe", "Provisions"]
+
+
+class StubConfig:
+    """Latency, throttling and dataset settings for the stub server."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, throttle_rate: float = 0.0,
+                 max_concurrent: Optional[int] = None, retry_after: Optional[float] = None,
+                 items: int = 10000, customers: int = 5000, invoices: int = 1000, seed: int = 0):
+        """
+        Args:
+            latency_ms: Fixed delay added to every API call
+            jitter_ms: Extra uniformly distributed delay (0..jitter_ms) per call
+            throttle_rate: Fraction of API calls answered with HTTP 429
+            max_concurrent: Answer 429 while more calls than this are in flight (Intuit allows 10)
+            retry_after: Retry-After seconds sent with 429 responses (header omitted if None)
+            items: Synthetic items to generate
+            customers: Synthetic customers to generate
+            invoices: Synthetic invoices to generate
+            seed: Random seed for the dataset and throttling
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.items = items
+        self.customers = customers
+        self.invoices = invoices
+        self.seed = seed
+
+
+class StubError(Exception):
+    """An API error returned to the caller as a QBO Fault."""
+
+    def __init__(self, message: str, detail: str = "", code: str = "2500", status: int = 400,
+                 fault_type: str = "ValidationFault"):
+        super().__init__(message)
+        self.message = message
+        self.detail = detail or message
+        self.code = code
+        self.status = status
+        self.fault_type = fault_type
+
+    def fault(self) -> Dict[str, Any]:
+        return {"Error": [{"Message": self.message, "Detail": self.detail, "code": self.code}],
+                "type": self.fault_type}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _metadata(timestamp: str) -> Dict[str, str]:
+    return {"CreateTime": timestamp, "LastUpdatedTime": timestamp}
+
+
+# ---------- Query language ----------
+
+_SELECT_RE = re.compile(
+    r"^\s*select\s+(?P<columns>.+?)\s+from\s+(?P<entity>\w+)"
+    r"(?:\s+where\s+(?P<where>.+?))?"
+    r"(?:\s+order\s*by\s+(?P<order>[\w.]+)(?:\s+(?P<direction>asc|desc))?)?"
+    r"(?:\s+startposition\s+(?P<start>\d+))?"
+    r"(?:\s+maxresults\s+(?P<max>\d+))?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_CONDITION_RE = re.compile(
+    r"\s*(?:(?P<conj>and|or)\s+)?(?P<field>[\w.]+)\s*(?P<op>!=|<=|>=|=|<|>|\blike\b|\bin\b)\s*"
+    r"(?P<value>'(?:[^']|'')*'|\((?:[^')]|'(?:[^']|'')*')*\)|true|false|-?\d+(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+_QUOTED_RE = re.compile(r"'((?:[^']|'')*)'")
+
+Condition = Tuple[str, str, Any]
+
+
+def _literal(token: str) -> Any:
+    if token.startswith("'"):
+        return token[1:-1].replace("''", "'")
+    if token.lower() in ("true", "false"):
+        return token.lower() == "true"
+    return float(token)
+
+
+def parse_where(where: str) -> List[List[Condition]]:
+    """
+    Parse a where clause into OR-groups of AND-ed conditions.
+
+    Args:
+        where: Where clause without the "where" keyword
+
+    Returns:
+        List of groups; a row matches if every condition of any group matches
+
+    Raises:
+        StubError: If the clause cannot be parsed
+    """
+    groups: List[List[Condition]] = [[]]
+    position = 0
+    while position < len(where.rstrip()):
+        match = _CONDITION_RE.match(where, position)
+        if not match or (match.group("conj") is None) != (position == 0):
+            raise StubError("QueryParserError: Encountered an error while parsing the query",
+                            f"Unable to parse where clause near: {where[position:position + 40]!r}", code="4000")
+        if (match.group("conj") or "").lower() == "or":
+            groups.append([])
+        op = match.group("op").lower()
+        token = match.group("value")
+        if op == "in":
+            value = [v.replace("''", "'") for v in _QUOTED_RE.findall(token)]
+        else:
+            value = _literal(token)
+        if op == "like":
+            value = re.compile("^" + re.escape(str(value)).replace("%", ".*").replace("_", ".") + "$",
+                               re.IGNORECASE | re.DOTALL)
+        groups[-1].append((match.group("field"), op, value))
+        position = match.end()
+    return groups
+
+
+def _field(row: Dict[str, Any], field: str) -> Any:
+    value: Any = row
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    if isinstance(value, dict):
+        # References compare by Id; email/web addresses by their text
+        return value.get("value", value.get("Address", value.get("URI")))
+    return value
+
+
+def _comparable(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value.lower()
+    return value
+
+
+def _matches(row: Dict[str, Any], condition: Condition) -> bool:
+    field, op, expected = condition
+    actual = _field(row, field)
+    if actual is None:
+        return False
+    if op == "in":
+        return str(actual).lower() in {str(v).lower() for v in expected}
+    if op == "like":
+        return bool(expected.match(str(actual)))
+    if isinstance(expected, bool):
+        return bool(actual) == expected if op == "=" else bool(actual) != expected
+    left, right = _comparable(actual), _comparable(expected if isinstance(expected, str) else str(expected))
+    if type(left) is not type(right):
+        left, right = str(actual).lower(), str(expected).lower()
+    if op == "=":
+        return left == right
+    if op == "!=":
+        return left != right
+    if op == "<":
+        return left < right
+    if op == "<=":
+        return left <= right
+    if op == ">":
+        return left > right
+    return left >= right
+
+
+def _sort_key(field: str):
+    def key(row: Dict[str, Any]) -> Tuple[int, Any]:
+        value = _field(row, field)
+        if value is None:
+            return (2, "")
+        comparable = _comparable(value) if isinstance(value, str) else value
+        return (0, comparable) if isinstance(comparable, (int, float)) else (1, str(comparable))
+    return key
+
+
+class QBOStore:
+    """In-memory QuickBooks company: entity rows keyed by Id, in creation order."""
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[str, Dict[str, Any]]] = {name: {} for name in ENTITIES.values()}
+        self._next_id: Counter = Counter()
+        # Unique keys: (entity, lower-cased value) -> Id
+        self._unique: Dict[Tuple[str, str], str] = {}
+
+    _UNIQUE_FIELDS = {"Item": "Name", "Customer": "DisplayName", "Invoice": "DocNumber", "Term": "Name",
+                      "Account": "Name"}
+
+    def _unique_key(self, entity: str, row: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        field = self._UNIQUE_FIELDS.get(entity)
+        value = row.get(field) if field else None
+        return (entity, str(value).lower()) if value else None
+
+    def add(self, entity: str, row: Dict[str, Any], timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Store a new row, assigning Id, SyncToken and MetaData.
+
+        Args:
+            entity: Entity name (e.g. "Invoice")
+            row: Row fields
+            timestamp: Creation time (defaults to now)
+
+        Returns:
+            The stored row
+
+        Raises:
+            StubError: If the row's name / DocNumber is already taken
+        """
+        key = self._unique_key(entity, row)
+        if key and key in self._unique:
+            if entity == "Invoice":
+                raise StubError("Duplicate Document Number Error",
+                                f"Duplicate Document Number Error : You must specify a different number. "
+                                f"This number has already been used. DocNumber={row['DocNumber']}", code="6140")
+            raise StubError("Duplicate Name Exists Error",
+                            f"The name supplied already exists. : Another {entity} is already using this name.",
+                            code="6240")
+        self._next_id[entity] += 1
+        row_id = str(self._next_id[entity])
+        row = {**row, "Id": row_id, "SyncToken": "0", "domain": "QBO", "sparse": False,
+               "MetaData": _metadata(timestamp or _now())}
+        self.rows[entity][row_id] = row
+        if key:
+            self._unique[key] = row_id
+        return row
+
+    def get(self, entity: str, row_id: str) -> Dict[str, Any]:
+        row = self.rows[entity].get(str(row_id))
+        if row is None:
+            raise StubError("Object Not Found",
+                            f"Object Not Found : Something you're trying to use has been made inactive or "
+                            f"is not found. {entity} Id={row_id}", code="610")
+        return row
+
+    def update(self, entity: str, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply a (sparse) update; SyncToken must match the stored one.
+
+        Args:
+            entity: Entity name
+            changes: Fields to change, including Id and SyncToken
+
+        Returns:
+            The updated row
+        """
+        row = self.get(entity, changes["Id"])
+        if str(changes.get("SyncToken")) != row["SyncToken"]:
+            raise StubError("Stale Object Error",
+                            "Stale Object Error : You and another user were working on the same thing.",
+                            code="5010")
+        key = self._unique_key(entity, row)
+        updated = {**row, **{k: v for k, v in changes.items() if k not in ("Id", "SyncToken", "sparse")}}
+        new_key = self._unique_key(entity, updated)
+        if new_key != key:
+            if new_key and new_key in self._unique:
+                raise StubError("Duplicate Name Exists Error", "The name supplied already exists.", code="6240")
+            self._unique.pop(key, None)
+            if new_key:
+                self._unique[new_key] = row["Id"]
+        updated["SyncToken"] = str(int(row["SyncToken"]) + 1)
+        updated["MetaData"] = {**row["MetaData"], "LastUpdatedTime": _now()}
+        self.rows[entity][row["Id"]] = updated
+        return updated
+
+    def query(self, query_str: str) -> Dict[str, Any]:
+        """
+        Run a QBO select statement.
+
+        Args:
+            query_str: Query text
+
+        Returns:
+            QueryResponse body
+
+        Raises:
+            StubError: If the query cannot be parsed or names an unknown entity
+        """
+        match = _SELECT_RE.match(query_str)
+        if not match:
+            raise StubError("QueryParserError: Encountered an error while parsing the query",
+                            f"Invalid query: {query_str[:200]}", code="4000")
+        entity = ENTITIES.get(match.group("entity").lower())
+        if entity is None:
+            raise StubError("QueryValidationError", f"Unsupported entity: {match.group('entity')}", code="4001")
+
+        rows = list(self.rows[entity].values())
+        if match.group("where"):
+            groups = parse_where(match.group("where"))
+            rows = [row for row in rows if any(all(_matches(row, c) for c in group) for group in groups)]
+
+        columns = match.group("columns").strip()
+        if re.fullmatch(r"count\(\s*\*\s*\)", columns, re.IGNORECASE):
+            return {"QueryResponse": {"totalCount": len(rows)}, "time": _now()}
+
+        order = match.group("order")
+        descending = (match.group("direction") or "").lower() == "desc"
+        if order and not (order == "Id" and not descending):  # rows are already in Id order
+            rows.sort(key=_sort_key(order), reverse=descending)
+
+        start = max(1, int(match.group("start") or 1))
+        max_results = min(MAX_RESULTS, int(match.group("max") or DEFAULT_MAX_RESULTS))
+        page = rows[start - 1:start - 1 + max_results]
+        if columns != "*":
+            wanted = ["Id"] + [c.strip() for c in columns.split(",") if c.strip() != "Id"]
+            page = [{c: row[c] for c in wanted if c in row} for row in page]
+        if not page:
+            return {"QueryResponse": {}, "time": _now()}
+        return {"QueryResponse": {entity: page, "startPosition": start, "maxResults": len(page)}, "time": _now()}
+
+    def changed_since(self, entity: str, since: str) -> List[Dict[str, Any]]:
+        """Rows of an entity created or updated at or after an ISO timestamp."""
+        cutoff = datetime.fromisoformat(since.replace("Z", "+00:00"))
+        if cutoff.tzinfo is None:
+            cutoff = cutoff.replace(tzinfo=timezone.utc)
+        return [row for row in self.rows[entity].values()
+                if datetime.fromisoformat(row["MetaData"]["LastUpdatedTime"]) >= cutoff]
+
+    # ---------- Entity creation with QBO-like validation ----------
+
+    def create(self, entity: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create (or sparse-update, when Id is present) an entity from a request body.
+
+        Args:
+            entity: Entity name
+            body: Request JSON
+
+        Returns:
+            The stored row
+        """
+        if body.get("Id"):
+            return self.update(entity, body)
+        if entity == "Invoice":
+            return self._create_invoice(body)
+        if entity == "Customer" and not body.get("DisplayName"):
+            raise StubError("Required param missing, need to supply the required value for the API",
+                            "Required parameter DisplayName is missing in the request", code="2020")
+        if entity in ("Item", "Account", "Term") and not body.get("Name"):
+            raise StubError("Required param missing, need to supply the required value for the API",
+                            "Required parameter Name is missing in the request", code="2020")
+        if entity == "Item":
+            body = {"Active": True, "Type": "Service", "UnitPrice": 0, **body}
+        if entity == "Customer":
+            body = {"Active": True, "Balance": 0, **body}
+        return self.add(entity, body)
+
+    def _create_invoice(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        customer_id = (body.get("CustomerRef") or {}).get("value")
+        if not customer_id:
+            raise StubError("Required param missing, need to supply the required value for the API",
+                            "Required parameter CustomerRef is missing in the request", code="2020")
+        customer = self.get("Customer", customer_id)
+        lines = body.get("Line") or []
+        if not lines:
+            raise StubError("Required param missing, need to supply the required value for the API",
+                            "Required parameter Line is missing in the request", code="2020")
+
+        stored_lines = []
+        total = 0.0
+        for number, line in enumerate(lines, start=1):
+            detail = line.get("SalesItemLineDetail")
+            if detail and detail.get("ItemRef"):
+                item = self.get("Item", detail["ItemRef"].get("value"))
+                detail = {**detail, "ItemRef": {"value": item["Id"], "name": item["Name"]}}
+                line = {**line, "SalesItemLineDetail": detail}
+            amount = round(float(line.get("Amount", 0)), 2)
+            total += amount
+            stored_lines.append({**line, "Id": str(number), "LineNum": number, "Amount": amount})
+        total = round(total, 2)
+        stored_lines.append({"Amount": total, "DetailType": "SubTotalLineDetail", "SubTotalLineDetail": {}})
+
+        invoice = {
+            **body,
+            "CustomerRef": {"value": customer["Id"], "name": customer["DisplayName"]},
+            "Line": stored_lines,
+            "TxnDate": body.get("TxnDate") or datetime.now().strftime("%Y-%m-%d"),
+            "TotalAmt": total,
+            "Balance": total,
+            "EmailStatus": body.get("EmailStatus", "NotSet"),
+            "PrintStatus": "NeedToPrint",
+        }
+        if not invoice.get("DocNumber"):
+            invoice["DocNumber"] = str(1001 + len(self.rows["Invoice"]))
+        return self.add("Invoice", invoice)
+
+
+def generate_dataset(store: QBOStore, items: int = 10000, customers: int = 5000, invoices: int = 1000,
+                     seed: int = 0) -> QBOStore:
+    """
+    Fill a store with a synthetic company.
+
+    Args:
+        store: Store to fill
+        items: Number of items (unique Name and Sku)
+        customers: Number of customers (unique DisplayName)
+        invoices: Number of invoices (DocNumber PO-100000, PO-100001, ...)
+        seed: Random seed
+
+    Returns:
+        The same store
+    """
+    rng = random.Random(seed)
+    created = (datetime.now(timezone.utc) - timedelta(days=90)).isoformat(timespec="seconds")
+
+    income = store.add("Account", {"Name": "Sales of Product Income", "AccountType": "Income",
+                                   "AccountSubType": "SalesOfProductIncome", "Active": True}, created)
+    store.add("Account", {"Name": "Services", "AccountType": "Income", "AccountSubType": "ServiceFeeIncome",
+                          "Active": True}, created)
+    store.add("Account", {"Name": "Checking", "AccountType": "Bank", "AccountSubType": "Checking",
+                          "Active": True}, created)
+    for name, days in (("Due on receipt", 0), ("Net 15", 15), ("Net 30", 30), ("Net 60", 60)):
+        store.add("Term", {"Name": name, "Type": "STANDARD", "DueDays": days, "Active": True}, created)
+
+    income_ref = {"value": income["Id"], "name": income["Name"]}
+    item_rows = []
+    for index in range(items):
+        words = rng.sample(_WORDS, 2)
+        name = f"{rng.choice(_LINES)},IndianBento,{''.join(words)},{rng.choice(_SIZES)} #{index}"
+        item_rows.append(store.add("Item", {
+            "Name": name,
+            "Sku": f"SKU-{index:05d}",
+            "Description": f"{' '.join(words)} ({name.split(',')[-1].split(' #')[0]})",
+            "Type": rng.choice(("Service", "NonInventory", "Inventory")),
+            "UnitPrice": round(rng.uniform(5, 80), 2),
+            "Taxable": False,
+            "Active": True,
+            "IncomeAccountRef": income_ref,
+        }, created))
+
+    customer_rows = []
+    for index in range(customers):
+        company = f"{rng.choice(_COMPANY_WORDS)} {rng.choice(_COMPANY_KINDS)}"
+        slug = re.sub(r"[^a-z0-9]", "", company.lower())
+        customer_rows.append(store.add("Customer", {
+            "DisplayName": f"{company} #{index}",
+            "CompanyName": company,
+            "PrimaryEmailAddr": {"Address": f"ap{index}@{slug}.example.com"},
+            "BillAddr": {"Line1": f"{rng.randint(100, 9999)} Market Street", "City": "San Francisco",
+                         "CountrySubDivisionCode": "CA", "PostalCode": "94103"},
+            "Balance": 0,
+            "Active": True,
+        }, created))
+
+    for index in range(invoices):
+        customer = rng.choice(customer_rows)
+        lines = []
+        for _ in range(rng.randint(1, 6)):
+            item = rng.choice(item_rows)
+            qty = rng.randint(1, 24)
+            lines.append({
+                "DetailType": "SalesItemLineDetail",
+                "Amount": round(qty * item["UnitPrice"], 2),
+                "SalesItemLineDetail": {"ItemRef": {"value": item["Id"]}, "Qty": qty,
+                                        "UnitPrice": item["UnitPrice"], "TaxCodeRef": {"value": "NON"}},
+            })
+        txn = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 300))
+        invoice = store._create_invoice({
+            "CustomerRef": {"value": customer["Id"]},
+            "DocNumber": f"PO-{100000 + index}",
+            "TxnDate": txn.strftime("%Y-%m-%d"),
+            "DueDate": (txn + timedelta(days=30)).strftime("%Y-%m-%d"),
+            "Line": lines,
+            "EmailStatus": rng.choice(("NotSet", "EmailSent")),
+        })
+        invoice["MetaData"] = _metadata(created)
+    return store
+
+
+# ---------- HTTP app ----------
+
+def _fault_response(error: StubError) -> JSONResponse:
+    return JSONResponse({"Fault": error.fault(), "time": _now()}, status_code=error.status)
+
+
+def create_app(config: Optional[StubConfig] = None, store: Optional[QBOStore] = None) -> FastAPI:
+    """
+    Build the stub FastAPI app.
+
+    Args:
+        config: Latency/throttling/dataset settings (defaults to StubConfig())
+        store: Pre-built store (a synthetic dataset is generated if None)
+
+    Returns:
+        FastAPI application; app.state.config and app.state.store can be changed at runtime
+    """
+    config = config or StubConfig()
+    if store is None:
+        store = generate_dataset(QBOStore(), config.items, config.customers, config.invoices, config.seed)
+
+    app = FastAPI(title="QuickBooks Online stub")
+    app.state.config = config
+    app.state.store = store
+    app.state.stats = Counter()
+    app.state.in_flight = 0
+    app.state.tokens = set()
+    rng = random.Random(config.seed)
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/_stub"):
+            return await call_next(request)
+        stats: Counter = app.state.stats
+        settings: StubConfig = app.state.config
+        endpoint = _endpoint_name(request.method, path)
+        stats["requests"] += 1
+        stats[endpoint] += 1
+
+        app.state.in_flight += 1
+        try:
+            throttled = rng.random() < settings.throttle_rate or (
+                settings.max_concurrent is not None and app.state.in_flight > settings.max_concurrent
+            )
+            delay = settings.latency_ms + (rng.uniform(0, settings.jitter_ms) if settings.jitter_ms else 0.0)
+            if delay:
+                await asyncio.sleep(delay / 1000)
+            if throttled:
+                stats["throttled"] += 1
+                headers = {}
+                if settings.retry_after is not None:
+                    headers["Retry-After"] = f"{settings.retry_after:g}"
+                return JSONResponse(
+                    {"Fault": {"Error": [{"Message": "message=ThrottleExceeded; errorCode=003001; statusCode=429",
+                                          "Detail": "The request limit was reached.", "code": "3001"}],
+                               "type": "SERVICE"}, "time": _now()},
+                    status_code=429, headers=headers,
+                )
+            return await call_next(request)
+        finally:
+            app.state.in_flight -= 1
+
+    def require_bearer(request: Request) -> None:
+        auth = request.headers.get("authorization", "")
+        if not auth.startswith("Bearer ") or auth[7:] not in app.state.tokens:
+            raise StubError("message=AuthenticationFailed; errorCode=003200; statusCode=401",
+                            "Token invalid or expired", code="3200", status=401, fault_type="AUTHENTICATION")
+
+    @app.exception_handler(StubError)
+    async def stub_error_handler(request: Request, error: StubError):
+        return _fault_response(error)
+
+    @app.post("/oauth2/v1/tokens/bearer")
+    async def token(request: Request):
+        form = parse_qs((await request.body()).decode())
+        if not request.headers.get("authorization", "").startswith("Basic "):
+            return JSONResponse({"error": "invalid_client"}, status_code=401)
+        if form.get("grant_type") != ["refresh_token"] or not form.get("refresh_token"):
+            return JSONResponse({"error": "invalid_grant", "error_description": "Incorrect or invalid refresh token"},
+                                status_code=400)
+        access_token = secrets.token_urlsafe(24)
+        app.state.tokens.add(access_token)
+        return {"access_token": access_token, "refresh_token": form["refresh_token"][0], "token_type": "bearer",
+                "expires_in": 3600, "x_refresh_token_expires_in": 8726400}
+
+    @app.api_route("/v3/company/{realm_id}/query", methods=["GET", "POST"])
+    async def query(realm_id: str, request: Request):
+        require_bearer(request)
+        query_str = request.query_params.get("query") or (await request.body()).decode()
+        return app.state.store.query(query_str)
+
+    @app.post("/v3/company/{realm_id}/batch")
+    async def batch(realm_id: str, request: Request):
+        require_bearer(request)
+        items = (await request.json()).get("BatchItemRequest") or []
+        if len(items) > MAX_BATCH_ITEMS:
+            raise StubError("Batch size limit exceeded",
+                            f"Batch request can contain at most {MAX_BATCH_ITEMS} items", code="2100")
+        responses = []
+        for item in items:
+            response: Dict[str, Any] = {"bId": item.get("bId")}
+            try:
+                response.update(_batch_operation(app.state.store, item))
+            except StubError as e:
+                response["Fault"] = e.fault()
+            responses.append(response)
+        return {"BatchItemResponse": responses, "time": _now()}
+
+    @app.get("/v3/company/{realm_id}/cdc")
+    async def cdc(realm_id: str, request: Request, entities: str, changedSince: str):
+        require_bearer(request)
+        results = []
+        for name in entities.split(","):
+            entity = ENTITIES.get(name.strip().lower())
+            if entity is None:
+                raise StubError("Invalid entity", f"Unsupported CDC entity: {name}", code="4001")
+            rows = app.state.store.changed_since(entity, changedSince)[:MAX_RESULTS]
+            results.append({entity: rows, "startPosition": 1, "maxResults": len(rows), "totalCount": len(rows)})
+        return {"CDCResponse": [{"QueryResponse": results}], "time": _now()}
+
+    @app.get("/v3/company/{realm_id}/{entity}/{entity_id}")
+    async def read_entity(realm_id: str, entity: str, entity_id: str, request: Request):
+        require_bearer(request)
+        name = _entity_name(entity)
+        return {name: app.state.store.get(name, entity_id), "time": _now()}
+
+    @app.post("/v3/company/{realm_id}/{entity}")
+    async def create_entity(realm_id: str, entity: str, request: Request):
+        require_bearer(request)
+        name = _entity_name(entity)
+        return {name: app.state.store.create(name, await request.json()), "time": _now()}
+
+    @app.get("/_stub/stats")
+    async def stats():
+        return {"stats": dict(app.state.stats),
+                "rows": {entity: len(rows) for entity, rows in app.state.store.rows.items()}}
+
+    @app.post("/_stub/reset")
+    async def reset():
+        app.state.stats.clear()
+        return {"status": "ok"}
+
+    return app
+
+
+def _entity_name(path_segment: str) -> str:
+    name = ENTITIES.get(path_segment.lower())
+    if name is None:
+        raise StubError("Unsupported Operation", f"Unsupported entity: {path_segment}", code="500")
+    return name
+
+
+def _endpoint_name(method: str, path: str) -> str:
+    """Name a call for the stats counters, e.g. "post_query" or "get_invoice"."""
+    parts = path.strip("/").split("/")
+    if parts[:1] == ["oauth2"]:
+        return "token"
+    segment = parts[3] if len(parts) > 3 and parts[0] == "v3" else parts[-1]
+    return f"{method.lower()}_{segment.lower()}"
+
+
+def _batch_operation(store: QBOStore, item: Dict[str, Any]) -> Dict[str, Any]:
+    if "Query" in item:
+        return store.query(item["Query"])
+    operation = item.get("operation", "create")
+    for entity in ENTITIES.values():
+        if entity in item:
+            body = item[entity]
+            if operation == "create":
+                return {entity: store.create(entity, {k: v for k, v in body.items() if k != "Id"})}
+            if operation == "update":
+                return {entity: store.update(entity, body)}
+            if operation == "delete":
+                row = store.get(entity, body.get("Id"))
+                del store.rows[entity][row["Id"]]
+                key = store._unique_key(entity, row)
+                if key:
+                    store._unique.pop(key, None)
+                return {entity: {"Id": row["Id"], "status": "Deleted", "domain": "QBO"}}
+            raise StubError("Unsupported Operation", f"Unsupported batch operation: {operation}", code="500")
+    raise StubError("Invalid batch item", "Batch item has no Query or entity body", code="2000")
+
+
+class StubServer:
+    """
+    Run the stub in a background thread, e.g. for load tests.
+
+        with StubServer(StubConfig(latency_ms=50)) as base_url:
+            ...
+    """
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0,
+                 store: Optional[QBOStore] = None):
+        self.app = create_app(config, store)
+        self.server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning",
+                                                    access_log=False, lifespan="off"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.base_url = ""
+
+    def start(self) -> str:
+        """Start serving and return the base URL."""
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("QBO stub server failed to start")
+            time.sleep(0.01)
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    def stop(self) -> None:
+        """Stop serving."""
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local QuickBooks Online stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay per API call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random delay per call (0..N ms)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--max-concurrent", type=int, help="Answer 429 above this many in-flight calls")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--customers", type=int, default=5000)
+    parser.add_argument("--invoices", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.throttle_rate, args.max_concurrent, args.retry_after,
+                        args.items, args.customers, args.invoices, args.seed)
+    print(f"QBO stub on http://{args.host}:{args.port} "
+          f"({config.items} items, {config.customers} customers, {config.invoices} invoices)")
+    print(f"  QBO_BASE_URL=http://{args.host}:{args.port} "
+          f"QBO_TOKEN_URL=http://{args.host}:{args.port}/oauth2/v1/tokens/bearer")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
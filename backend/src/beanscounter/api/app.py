@@ -1,11 +1,36 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from beanscounter.api.routers.invoices import router as invoices_router
 from beanscounter.api.routers.settings import router as settings_router
 from beanscounter.api.routers.quickbooks import router as quickbooks_router
 from beanscounter.api.routers.gmail import router as gmail_router
+from beanscounter.api.routers.metrics import router as metrics_router
+from beanscounter.core.metrics import (
+    describe, finish_request_timing, observe, server_timing_header, start_request_timing
+)
+from beanscounter.integrations.async_quickbooks_client import close_shared_http_client
+from beanscounter.services.invoice_status_service import STATUS_REFRESH_INTERVAL_SECONDS, run_status_refresh_loop
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep stored invoice statuses fresh for the PO list
+    refresh_task = None
+    if STATUS_REFRESH_INTERVAL_SECONDS > 0:
+        refresh_task = asyncio.create_task(run_status_refresh_loop(STATUS_REFRESH_INTERVAL_SECONDS))
+    yield
+    if refresh_task:
+        refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await refresh_task
+    # Release pooled QuickBooks connections
+    await close_shared_http_client()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -16,7 +41,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+REQUEST_METRIC = "beanscounter_http_request_duration_seconds"
+describe(REQUEST_METRIC, "HTTP request latency by endpoint")
+
+
+@app.middleware("http")
+async def record_request_timing(request: Request, call_next):
+    """Record per-endpoint latency and return sub-phase timings as a Server-Timing header."""
+    token = start_request_timing()
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+    finally:
+        elapsed = time.perf_counter() - start
+        phases = finish_request_timing(token)
+        # Label by route template so /invoices/pos/{filename} is one series
+        route = request.scope.get("route")
+        observe(REQUEST_METRIC, elapsed, method=request.method,
+                route=getattr(route, "path", None) or "unmatched", status=status)
+    response.headers["Server-Timing"] = server_timing_header(elapsed, phases)
+    return response
+
+
 app.include_router(invoices_router)
 app.include_router(settings_router)
 app.include_router(quickbooks_router)
 app.include_router(gmail_router)
+app.include_router(metrics_router)
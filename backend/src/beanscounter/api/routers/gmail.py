@@ -4,9 +4,7 @@ Handles Gmail OAuth2 authentication and email syncing.
 """
 
 import os
-import json
 from datetime import datetime
-from pathlib import Path
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
@@ -25,36 +23,13 @@ from beanscounter.services.gmail_settings_service import (
     test_gmail_connection
 )
 from beanscounter.integrations.gmail_client import GmailClient
-from beanscounter.services.gmail_sync_service import sync_emails_from_gmail
+from beanscounter.services.gmail_sync_service import load_sync_history
+from beanscounter.services.gmail_sync_job_service import start_sync_job, get_sync_job
 
 
 router = APIRouter(prefix="/gmail", tags=["gmail"])
 
 
-# Sync history file
-BACKEND_ROOT = Path(__file__).parents[5] / "backend"
-SYNC_HISTORY_FILE = BACKEND_ROOT / "data" / "gmail_sync_history.json"
-
-
-def _load_sync_history() -> Dict[str, Any]:
-    """Load sync history from file."""
-    if not SYNC_HISTORY_FILE.exists():
-        return {}
-    
-    try:
-        with open(SYNC_HISTORY_FILE, "r") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-
-def _save_sync_history(history: Dict[str, Any]):
-    """Save sync history to file."""
-    SYNC_HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(SYNC_HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=2)
-
-
 class GmailSettingsRequest(BaseModel):
     starting_date: Optional[str] = None  # ISO format YYYY-MM-DD
     client_id: Optional[str] = None
@@ -220,15 +195,20 @@ def test_gmail_settings():
 
 
 @router.post("/sync")
-def sync_gmail_emails(start_date: Optional[str] = None):
+def sync_gmail_emails(start_date: Optional[str] = None, full: bool = False):
     """
-    Manual sync trigger - fetch emails and download PDFs.
+    Manual sync trigger - start fetching emails and downloading PDFs in the background.
+    
+    Runs an incremental sync from the historyId saved by the previous sync unless
+    a start date is given or a full sync is requested. If a sync is already running,
+    no new sync is started and the running job is returned.
     
     Args:
-        start_date: Optional start date in ISO format (YYYY-MM-DD)
+        start_date: Optional start date in ISO format (YYYY-MM-DD); forces a full search
+        full: Ignore the saved historyId and search everything after the start date
         
     Returns:
-        Sync results
+        {"started": bool, "job": {...}} - poll GET /gmail/sync/status for progress
     """
     try:
         # Parse start date if provided
@@ -240,29 +220,22 @@ def sync_gmail_emails(start_date: Optional[str] = None):
                 # Try YYYY-MM-DD format
                 parsed_start_date = datetime.strptime(start_date, "%Y-%m-%d")
         
-        # Run sync
-        sync_result = sync_emails_from_gmail(parsed_start_date)
-        
-        # Save sync history
-        history = {
-            "last_sync": datetime.now().isoformat(),
-            "emails_processed": sync_result["emails_processed"],
-            "pdfs_downloaded": sync_result["pdfs_downloaded"],
-            "errors": sync_result["errors"],
-            "downloaded_files": sync_result.get("downloaded_files", [])
-        }
-        _save_sync_history(history)
-        
-        return sync_result
+        job, started = start_sync_job(parsed_start_date, full=full)
+        return {"started": started, "job": job}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
 
 
 @router.get("/sync/status")
 def get_sync_status():
-    """Get last sync status/results."""
-    history = _load_sync_history()
-    if not history:
+    """
+    Get last sync status/results plus the running or last sync job.
+    
+    While a sync runs, "job" reports live progress (emails scanned, PDFs
+    downloaded, skipped reasons); once finished it carries the full sync result.
+    """
+    history = load_sync_history()
+    job = get_sync_job()
+    if not history and not job:
         return {"message": "No sync history available"}
-    return history
-
+    return {**history, "job": job}
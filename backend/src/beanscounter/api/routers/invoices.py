@@ -7,6 +7,7 @@ import subprocess
 import platform
 from beanscounter.core.po_reader import POReader
 from beanscounter.services.invoice_storage_service import get_all_invoice_records
+from beanscounter.services.po_extraction_service import get_extracted_data, flush_extraction_cache
 from beanscounter.services.product_mapping_service import (
     get_sku_for_product_string,
     set_product_mapping,
@@ -18,7 +19,7 @@ from beanscounter.services.product_mapping_service import (
 )
 from beanscounter.services.product_matching_service import match_products_to_skus
 from beanscounter.services.settings_service import get_qb_credentials
-from beanscounter.integrations.quickbooks_client import QuickBooksClient
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
 
 # Assuming POs are stored in a 'data/pos' directory relative to backend root
 # Adjust this path as needed based on where the user keeps their POs
@@ -81,20 +82,22 @@ def list_pos() -> List[Dict[str, Any]]:
     pos = []
     processed_files = []
     
+    # Load invoice records once for all files
+    invoice_records = get_all_invoice_records()
+    
     # Process PDF files
     pdf_files = list(PO_DIR.glob("*.pdf"))
     for f in pdf_files:
         processed_files.append(f.name)
         try:
             # Extract basic metadata from the PO
-            extracted = reader.extract_data(f)
+            extracted = get_extracted_data(f, reader)
             
             # Format amount properly
             invoice_amount = extracted.get("invoice_amount", 0)
             formatted_amount = f"${invoice_amount:.2f}" if invoice_amount else ""
             
             # Get invoice status if invoice exists
-            invoice_records = get_all_invoice_records()
             invoice_record = invoice_records.get(f.name)
             
             # Skip files marked as "Not a PO"
@@ -139,7 +142,6 @@ def list_pos() -> List[Dict[str, Any]]:
             # If extraction fails, still include the file with minimal info
             print(f"Error extracting {f.name}: {e}")
             # Get invoice status if invoice exists
-            invoice_records = get_all_invoice_records()
             invoice_record = invoice_records.get(f.name)
             
             # Skip files marked as "Not a PO"
@@ -166,14 +168,13 @@ def list_pos() -> List[Dict[str, Any]]:
         for f in image_files:
             processed_files.append(f.name)
             try:
-                extracted = reader.extract_data(f)
+                extracted = get_extracted_data(f, reader)
                 
                 # Format amount properly
                 invoice_amount = extracted.get("invoice_amount", 0)
                 formatted_amount = f"${invoice_amount:.2f}" if invoice_amount else ""
                 
                 # Get invoice status if invoice exists
-                invoice_records = get_all_invoice_records()
                 invoice_record = invoice_records.get(f.name)
                 
                 # Skip files marked as "Not a PO"
@@ -217,7 +218,6 @@ def list_pos() -> List[Dict[str, Any]]:
             except Exception as e:
                 print(f"Error extracting {f.name}: {e}")
                 # Get invoice status if invoice exists
-                invoice_records = get_all_invoice_records()
                 invoice_record = invoice_records.get(f.name)
                 
                 # Skip files marked as "Not a PO"
@@ -238,6 +238,8 @@ def list_pos() -> List[Dict[str, Any]]:
                     "source": None
                 })
     
+    # Persist any POs parsed by this request
+    flush_extraction_cache()
     return pos
 
 
@@ -301,8 +303,8 @@ def parse_po(filename: str) -> Dict[str, Any]:
         raise HTTPException(status_code=404, detail="File not found")
     
     try:
-        reader = POReader()
-        data = reader.extract_data(file_path)
+        data = get_extracted_data(file_path)
+        flush_extraction_cache()
         
         # Map backend data model to frontend expected format
         # Frontend expects: vendor_name, vendor_address, po_number, date, total_amount, line_items
@@ -351,7 +353,7 @@ def parse_po(filename: str) -> Dict[str, Any]:
 
 
 @router.post("/save-to-quickbooks")
-def save_invoice_to_quickbooks(request: Dict[str, Any]):
+async def save_invoice_to_quickbooks(request: Dict[str, Any]):
     """
     Save invoice to QuickBooks.
     
@@ -378,9 +380,9 @@ def save_invoice_to_quickbooks(request: Dict[str, Any]):
         if not invoice_data:
             raise HTTPException(status_code=400, detail="invoice_data is required")
         
-        from beanscounter.services.po_to_invoice_service import convert_po_to_qb_invoice
+        from beanscounter.services.po_to_invoice_service import convert_po_to_qb_invoice_async
         
-        result = convert_po_to_qb_invoice(invoice_data, customer_id)
+        result = await convert_po_to_qb_invoice_async(invoice_data, customer_id)
         
         if result["status"] == "error":
             raise HTTPException(status_code=500, detail=result.get("error", "Unknown error"))
@@ -388,8 +390,6 @@ def save_invoice_to_quickbooks(request: Dict[str, Any]):
         # Save invoice record if invoice was created successfully and po_filename is provided
         if result["status"] in ("created", "exists") and result.get("invoice") and po_filename:
             from beanscounter.services.invoice_storage_service import save_invoice_record
-            from beanscounter.services.settings_service import get_qb_credentials
-            from beanscounter.integrations.quickbooks_client import QuickBooksClient
             
             # Fetch full invoice details including status fields
             invoice = result["invoice"]
@@ -399,14 +399,14 @@ def save_invoice_to_quickbooks(request: Dict[str, Any]):
                 try:
                     credentials = get_qb_credentials()
                     if credentials:
-                        qb_client = QuickBooksClient(
+                        qb_client = AsyncQuickBooksClient(
                             client_id=credentials["client_id"],
                             client_secret=credentials["client_secret"],
                             refresh_token=credentials["refresh_token"],
                             realm_id=credentials["realm_id"],
                             environment=credentials["environment"]
                         )
-                        status_info = qb_client.get_invoice_status(invoice_id)
+                        status_info = await qb_client.get_invoice_status(invoice_id)
                         if status_info:
                             # Merge status info into invoice data
                             invoice["EmailStatus"] = status_info.get("email_status")
@@ -423,8 +423,43 @@ def save_invoice_to_quickbooks(request: Dict[str, Any]):
         raise HTTPException(status_code=500, detail=f"Failed to save invoice: {str(e)}")
 
 
+@router.post("/save-to-quickbooks/bulk")
+async def save_invoices_to_quickbooks_bulk(request: Dict[str, Any]):
+    """
+    Save many invoices to QuickBooks in one request.
+
+    Request body:
+        {
+            "invoices": [
+                {
+                    "customer_id": str,
+                    "po_filename": str,
+                    "invoice_data": {...}  # Same as /save-to-quickbooks
+                },
+                ...
+            ]
+        }
+
+    Returns:
+        Per-PO results in request order plus created/exists/error counts.
+        Failures of individual POs do not fail the request.
+    """
+    invoices = request.get("invoices")
+    if not isinstance(invoices, list) or not invoices:
+        raise HTTPException(status_code=400, detail="invoices must be a non-empty list")
+
+    try:
+        from beanscounter.services.bulk_invoice_service import bulk_convert_pos_to_qb_invoices
+
+        return await bulk_convert_pos_to_qb_invoices(invoices)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save invoices: {str(e)}")
+
+
 @router.get("/invoice-record/{po_filename}")
-def get_invoice_record(po_filename: str):
+async def get_invoice_record(po_filename: str):
     """
     Get invoice record for a PO file.
     
@@ -435,32 +470,16 @@ def get_invoice_record(po_filename: str):
         Invoice record with status or null if not found
     """
     try:
-        from beanscounter.services.invoice_storage_service import get_invoice_record, update_invoice_status, mark_as_not_po
-        from beanscounter.services.settings_service import get_qb_credentials
-        from beanscounter.integrations.quickbooks_client import QuickBooksClient
+        from beanscounter.services.invoice_storage_service import get_invoice_record
+        from beanscounter.services.invoice_status_service import refresh_invoice_statuses, is_status_fresh
         
         record = get_invoice_record(po_filename)
-        if record and record.get("qb_invoice_id"):
-            # Refresh status from QuickBooks
+        if record and record.get("qb_invoice_id") and not is_status_fresh(record):
+            # Refresh status from QuickBooks unless the background job checked it recently
             try:
-                credentials = get_qb_credentials()
-                if credentials:
-                    qb_client = QuickBooksClient(
-                        client_id=credentials["client_id"],
-                        client_secret=credentials["client_secret"],
-                        refresh_token=credentials["refresh_token"],
-                        realm_id=credentials["realm_id"],
-                        environment=credentials["environment"]
-                    )
-                    status_info = qb_client.get_invoice_status(record["qb_invoice_id"])
-                    if status_info:
-                        update_invoice_status(
-                            po_filename,
-                            email_status=status_info.get("email_status"),
-                            balance=status_info.get("balance")
-                        )
-                        # Reload record with updated status
-                        record = get_invoice_record(po_filename)
+                await refresh_invoice_statuses([po_filename])
+                # Reload record with updated status
+                record = get_invoice_record(po_filename)
             except Exception as e:
                 print(f"Failed to refresh invoice status: {e}")
         
@@ -473,6 +492,26 @@ def get_invoice_record(po_filename: str):
         raise HTTPException(status_code=500, detail=f"Failed to get invoice record: {str(e)}")
 
 
+@router.post("/invoice-records/refresh-status")
+async def refresh_invoice_record_statuses():
+    """
+    Refresh the status of every stored invoice from QuickBooks now.
+    
+    Statuses are fetched in batches of many invoice IDs and saved in one write.
+    
+    Returns:
+        Counts of checked and updated records and PO filenames whose invoice was not found
+    """
+    try:
+        from beanscounter.services.invoice_status_service import refresh_invoice_statuses
+        
+        return await refresh_invoice_statuses()
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to refresh invoice statuses: {str(e)}")
+
+
 @router.post("/pos/{po_filename}/mark-not-po")
 def mark_po_as_not_po(po_filename: str):
     """
@@ -565,7 +604,7 @@ def suggest_company_from_email(request: Dict[str, Any]):
 
 
 @router.get("/products/qb-items")
-def get_qb_items() -> Dict[str, Any]:
+async def get_qb_items() -> Dict[str, Any]:
     """
     Get all QuickBooks items with their SKUs.
     
@@ -586,7 +625,7 @@ def get_qb_items() -> Dict[str, Any]:
         if not credentials:
             raise HTTPException(status_code=400, detail="QuickBooks credentials not configured")
         
-        qb_client = QuickBooksClient(
+        qb_client = AsyncQuickBooksClient(
             client_id=credentials["client_id"],
             client_secret=credentials["client_secret"],
             refresh_token=credentials["refresh_token"],
@@ -594,7 +633,7 @@ def get_qb_items() -> Dict[str, Any]:
             environment=credentials["environment"]
         )
         
-        items = qb_client.get_all_items()
+        items = await qb_client.get_all_items()
         return {"items": items}
     except HTTPException:
         raise
@@ -603,7 +642,7 @@ def get_qb_items() -> Dict[str, Any]:
 
 
 @router.post("/products/match")
-def match_products(request: Dict[str, Any]) -> Dict[str, Any]:
+async def match_products(request: Dict[str, Any]) -> Dict[str, Any]:
     """
     Match ProductStrings to QuickBooks SKUs.
     
@@ -638,7 +677,7 @@ def match_products(request: Dict[str, Any]) -> Dict[str, Any]:
         if not credentials:
             raise HTTPException(status_code=400, detail="QuickBooks credentials not configured")
         
-        qb_client = QuickBooksClient(
+        qb_client = AsyncQuickBooksClient(
             client_id=credentials["client_id"],
             client_secret=credentials["client_secret"],
             refresh_token=credentials["refresh_token"],
@@ -646,7 +685,7 @@ def match_products(request: Dict[str, Any]) -> Dict[str, Any]:
             environment=credentials["environment"]
         )
         
-        items = qb_client.get_all_items()
+        items = await qb_client.get_all_items()
         
         # Match products
         matches = match_products_to_skus(product_strings, items, threshold)
@@ -758,7 +797,7 @@ def get_product_mapping(product_string: str) -> Dict[str, Any]:
 
 
 @router.get("/products/skus")
-def get_all_skus_with_mappings() -> Dict[str, Any]:
+async def get_all_skus_with_mappings() -> Dict[str, Any]:
     """
     Get all SKUs from QuickBooks with their associated ProductStrings.
     This is a 1:many mapping (one SKU maps to many ProductStrings).
@@ -787,14 +826,14 @@ def get_all_skus_with_mappings() -> Dict[str, Any]:
         qb_items = []
         if credentials:
             try:
-                qb_client = QuickBooksClient(
+                qb_client = AsyncQuickBooksClient(
                     client_id=credentials["client_id"],
                     client_secret=credentials["client_secret"],
                     refresh_token=credentials["refresh_token"],
                     realm_id=credentials["realm_id"],
                     environment=credentials["environment"]
                 )
-                qb_items = qb_client.get_all_items()
+                qb_items = await qb_client.get_all_items()
             except Exception as e:
                 print(f"Failed to fetch QB items: {e}")
         
@@ -864,7 +903,7 @@ def get_all_skus_with_mappings() -> Dict[str, Any]:
 
 
 @router.post("/products/skus/{sku}/product-strings")
-def add_product_string_to_sku(sku: str, request: Dict[str, Any]) -> Dict[str, Any]:
+async def add_product_string_to_sku(sku: str, request: Dict[str, Any]) -> Dict[str, Any]:
     """
     Add a ProductString mapping to a SKU.
     
@@ -888,14 +927,14 @@ def add_product_string_to_sku(sku: str, request: Dict[str, Any]) -> Dict[str, An
         
         if credentials:
             try:
-                qb_client = QuickBooksClient(
+                qb_client = AsyncQuickBooksClient(
                     client_id=credentials["client_id"],
                     client_secret=credentials["client_secret"],
                     refresh_token=credentials["refresh_token"],
                     realm_id=credentials["realm_id"],
                     environment=credentials["environment"]
                 )
-                items = qb_client.get_all_items()
+                items = await qb_client.get_all_items()
                 for item in items:
                     if item.get("Sku") == sku:
                         sku_name = item.get("Name")
@@ -929,7 +968,7 @@ def remove_product_string_from_sku(sku: str, product_string: str) -> Dict[str, A
 
 
 @router.post("/products/refresh")
-def refresh_skus() -> Dict[str, Any]:
+async def refresh_skus() -> Dict[str, Any]:
     """
     Delete all current SKU mappings and reimport SKUs from QuickBooks.
     This will:
@@ -948,7 +987,7 @@ def refresh_skus() -> Dict[str, Any]:
         if not credentials:
             raise HTTPException(status_code=400, detail="QuickBooks credentials not configured")
         
-        qb_client = QuickBooksClient(
+        qb_client = AsyncQuickBooksClient(
             client_id=credentials["client_id"],
             client_secret=credentials["client_secret"],
             refresh_token=credentials["refresh_token"],
@@ -957,7 +996,7 @@ def refresh_skus() -> Dict[str, Any]:
         )
         
         # Get all items from QuickBooks
-        qb_items = qb_client.get_all_items()
+        qb_items = await qb_client.get_all_items()
         
         # Debug: Log what we're getting from QuickBooks
         print(f"DEBUG: Total items fetched from QuickBooks: {len(qb_items)}")
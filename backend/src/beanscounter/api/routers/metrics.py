@@ -0,0 +1,31 @@
+"""
+Metrics Router
+Exposes request latency and sub-phase timing histograms in Prometheus text format.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from beanscounter.core.metrics import describe, render_prometheus
+from beanscounter.integrations.qb_rate_limiter import get_rate_limit_metrics
+
+router = APIRouter(tags=["metrics"])
+
+describe("beanscounter_qb_rate_limiter", "QuickBooks client-side rate limiter counters per realm")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """
+    Get all recorded metrics in Prometheus text format.
+    
+    Returns:
+        Request latency histograms per endpoint, sub-phase histograms
+        (PDF extraction, OCR, JSON store, QuickBooks, Gmail) and QuickBooks
+        rate limiter counters
+    """
+    limiter_gauges = {}
+    for realm_id, counters in get_rate_limit_metrics().items():
+        for counter, value in counters.items():
+            limiter_gauges[(("counter", counter), ("realm", realm_id))] = value
+    text = render_prometheus({"beanscounter_qb_rate_limiter": limiter_gauges} if limiter_gauges else None)
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
@@ -7,18 +7,19 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
 from beanscounter.services.qb_customer_service import search_customers, get_customer
 from beanscounter.services.settings_service import get_qb_credentials, get_max_invoice_number_attempts
-from beanscounter.integrations.quickbooks_client import QuickBooksClient
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
+from beanscounter.integrations.qb_rate_limiter import get_rate_limit_metrics
 
 router = APIRouter(prefix="/quickbooks", tags=["quickbooks"])
 
 
-def _get_qb_client() -> QuickBooksClient:
-    """Get QuickBooks client instance using stored credentials."""
+def _get_async_qb_client() -> AsyncQuickBooksClient:
+    """Get async QuickBooks client instance using stored credentials."""
     credentials = get_qb_credentials()
     if not credentials:
         raise RuntimeError("QuickBooks credentials not configured")
     
-    return QuickBooksClient(
+    return AsyncQuickBooksClient(
         client_id=credentials["client_id"],
         client_secret=credentials["client_secret"],
         refresh_token=credentials["refresh_token"],
@@ -72,7 +73,7 @@ def get_qb_customer(customer_id: str):
 
 
 @router.get("/invoices/last-for-customer/{customer_id}")
-def get_last_invoice_for_customer(customer_id: str):
+async def get_last_invoice_for_customer(customer_id: str):
     """
     Get the most recent invoice for a customer.
     
@@ -83,8 +84,8 @@ def get_last_invoice_for_customer(customer_id: str):
         Last invoice data or null if no invoices exist
     """
     try:
-        qb_client = _get_qb_client()
-        invoice = qb_client.find_last_invoice_for_customer(customer_id)
+        qb_client = _get_async_qb_client()
+        invoice = await qb_client.find_last_invoice_for_customer(customer_id)
         return {"invoice": invoice} if invoice else {"invoice": None}
     except RuntimeError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -93,7 +94,7 @@ def get_last_invoice_for_customer(customer_id: str):
 
 
 @router.get("/invoices/check-number")
-def check_invoice_number(docnumber: str = Query(..., description="Invoice document number to check")):
+async def check_invoice_number(docnumber: str = Query(..., description="Invoice document number to check")):
     """
     Check if an invoice with the given document number already exists.
     
@@ -104,8 +105,8 @@ def check_invoice_number(docnumber: str = Query(..., description="Invoice docume
         Object with exists boolean
     """
     try:
-        qb_client = _get_qb_client()
-        exists = qb_client.invoice_number_exists(docnumber)
+        qb_client = _get_async_qb_client()
+        exists = await qb_client.invoice_number_exists(docnumber)
         return {"exists": exists}
     except RuntimeError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -114,7 +115,7 @@ def check_invoice_number(docnumber: str = Query(..., description="Invoice docume
 
 
 @router.get("/invoices/next-number/{customer_id}")
-def get_next_invoice_number(customer_id: str):
+async def get_next_invoice_number(customer_id: str):
     """
     Get the next available invoice number for a customer.
     Finds the last invoice, increments the number, and verifies it doesn't exist
@@ -127,10 +128,10 @@ def get_next_invoice_number(customer_id: str):
         Next available invoice number
     """
     try:
-        qb_client = _get_qb_client()
+        qb_client = _get_async_qb_client()
         
         # Find last invoice for customer
-        last_invoice = qb_client.find_last_invoice_for_customer(customer_id)
+        last_invoice = await qb_client.find_last_invoice_for_customer(customer_id)
         
         if not last_invoice or not last_invoice.get("DocNumber"):
             # No previous invoices, start with 1
@@ -171,7 +172,7 @@ def get_next_invoice_number(customer_id: str):
         # Keep incrementing until we find an unused invoice number
         max_attempts = get_max_invoice_number_attempts()
         attempt = 0
-        while qb_client.invoice_number_exists(next_number) and attempt < max_attempts:
+        while await qb_client.invoice_number_exists(next_number) and attempt < max_attempts:
             # If it exists, increment and try again
             import re
             numbers = re.findall(r'\d+', next_number)
@@ -207,3 +208,13 @@ def get_next_invoice_number(customer_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get next invoice number: {str(e)}")
 
+
+@router.get("/rate-limit/metrics")
+def get_qb_rate_limit_metrics():
+    """
+    Get client-side QuickBooks rate limiter metrics per realm.
+    
+    Returns:
+        Requests sent, time spent throttled, retries and 429/5xx counts per realm
+    """
+    return {"realms": get_rate_limit_metrics()}
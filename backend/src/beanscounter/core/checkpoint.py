@@ -0,0 +1,144 @@
+"""
+Checkpoint manifest for resumable batch conversion.
+
+The manifest records, per input file, the SHA-256 of its contents, whether it
+was converted or failed, and where the output went. A rerun with resume skips
+inputs that are recorded as done with the same hash and whose output still
+exists; failed, changed and new inputs are converted again.
+
+The manifest is an append-only JSON Lines journal: each update is one fsynced
+line, so recording progress costs the same at file 5,000 as at file 1 and a
+crash loses at most the line being written. The last line for an input wins;
+a torn last line is ignored on load, and the journal is compacted when it is
+opened if it holds superseded lines.
+"""
+
+import hashlib
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from beanscounter.core import json_store
+
+MANIFEST_NAME = ".beanscounter-manifest.jsonl"
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Hash a file's contents without reading it into memory at once.
+
+    Args:
+        path: File to hash
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CheckpointManifest:
+    """Per-input conversion progress, persisted as a JSON Lines journal."""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Journal file; created on the first update
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        lines = self._load()
+        if lines > len(self.entries):
+            self._compact()
+
+    def _load(self) -> int:
+        if not self.path.exists():
+            return 0
+        lines = 0
+        with open(self.path, "rb") as f:
+            for raw in f:
+                if not raw.strip():
+                    continue
+                lines += 1 if raw.endswith(b"\n") else 2  # rewrite a torn line before appending after it
+                try:
+                    entry = json_store.loads(raw)
+                    self.entries[entry["input"]] = entry
+                except (ValueError, KeyError, TypeError):
+                    print(f"Ignoring unreadable line in {self.path.name}")
+        return lines
+
+    def _compact(self) -> None:
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            for entry in self.entries.values():
+                f.write(json_store.dumps(entry) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(json_store.dumps(entry) + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries[entry["input"]] = entry
+
+    def is_complete(self, key: str, sha256: str) -> bool:
+        """
+        Check whether an input was converted and is unchanged since.
+
+        Args:
+            key: Input identifier (e.g. file name relative to the input directory)
+            sha256: Current hash of the input
+
+        Returns:
+            True if the input is recorded as done with this hash and its output exists
+        """
+        entry = self.entries.get(key)
+        return (
+            entry is not None
+            and entry["status"] == STATUS_DONE
+            and entry["sha256"] == sha256
+            and Path(entry["output"]).exists()
+        )
+
+    def mark_done(self, key: str, sha256: str, output: Path, **details: Any) -> None:
+        """
+        Record a successful conversion.
+
+        Args:
+            key: Input identifier
+            sha256: Hash of the input that was converted
+            output: Output file written for it
+            **details: Extra JSON-serializable fields stored with the entry
+        """
+        self._append({"input": key, "sha256": sha256, "status": STATUS_DONE, "output": str(output), **details,
+                      "updated_at": datetime.now().isoformat(timespec="seconds")})
+
+    def mark_failed(self, key: str, sha256: str, error: str) -> None:
+        """
+        Record a failed conversion so a resumed run retries it.
+
+        Args:
+            key: Input identifier
+            sha256: Hash of the input that failed
+            error: Error message
+        """
+        self._append({"input": key, "sha256": sha256, "status": STATUS_FAILED, "output": None, "error": error,
+                      "updated_at": datetime.now().isoformat(timespec="seconds")})
+
+    def status(self, key: str) -> Optional[str]:
+        """Recorded status of an input, or None if it has never been processed."""
+        entry = self.entries.get(key)
+        return entry["status"] if entry else None
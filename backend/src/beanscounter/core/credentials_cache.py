@@ -0,0 +1,76 @@
+"""
+In-memory cache for values loaded from a file, such as decrypted credentials.
+
+A cached value is reused while the file's modification time and size are
+unchanged, so repeated lookups cost one stat() instead of a read, a JSON parse
+and Fernet decryption. Writers in this process call invalidate() after saving or
+deleting the file; edits from outside the process are picked up through mtime.
+Decrypted values are only ever held in memory, never written back to disk.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Get a file's (mtime_ns, size) signature.
+
+    Args:
+        path: File path
+
+    Returns:
+        Signature tuple, or None if the file does not exist
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class CredentialsCache:
+    """Cache of a single value derived from a file, invalidated on file change."""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: File the cached value is loaded from
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._value: Any = None
+        self._loaded = False
+
+    def get(self, loader: Callable[[], Any]) -> Any:
+        """
+        Get the cached value, reloading it if the file changed.
+
+        Exceptions from the loader propagate and nothing is cached, so a failed
+        decryption is retried on the next call.
+
+        Args:
+            loader: Function that reads the file and builds the value
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        signature = file_signature(self.path)
+        with self._lock:
+            if self._loaded and signature == self._signature:
+                return self._value
+        value = loader()
+        with self._lock:
+            self._signature = signature
+            self._value = value
+            self._loaded = True
+        return value
+
+    def invalidate(self) -> None:
+        """Drop the cached value so the next get() reloads it."""
+        with self._lock:
+            self._signature = None
+            self._value = None
+            self._loaded = False
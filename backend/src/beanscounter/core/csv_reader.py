@@ -2,11 +2,16 @@
 CSV Reader Module
 
 Provides functionality for parsing CSV files containing invoice data.
+
+Column names are matched case-insensitively once per file (resolve_headers);
+rows are then read by position into slotted CSVRow records with Qty, Rate and
+Taxable already converted, and streamed by iter_rows() instead of being
+collected into a list.
 """
 
 import csv
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
 
 
 def _parse_date_auto(s: str) -> datetime:
@@ -34,6 +39,158 @@ def _parse_date_auto(s: str) -> datetime:
     raise ValueError(f"Unrecognized date format: {s}")
 
 
+# Canonical column name -> CSVRow attribute
+COLUMNS = {
+    "Customer": "customer",
+    "InvoiceNumber": "invoice_number",
+    "InvoiceDate": "invoice_date",
+    "DueDate": "due_date",
+    "Terms": "terms",
+    "Item": "item",
+    "Description": "description",
+    "Qty": "qty",
+    "Rate": "rate",
+    "Taxable": "taxable",
+}
+
+REQUIRED_COLUMNS = ["Customer", "InvoiceNumber", "Item", "Qty", "Rate"]
+
+_TRUE_VALUES = frozenset(("y", "yes", "true", "1"))
+
+
+class CSVRow:
+    """One line item row of an invoice CSV."""
+
+    __slots__ = ("line", "customer", "invoice_number", "invoice_date", "due_date", "terms", "item",
+                 "description", "qty", "rate", "taxable")
+
+    def __init__(self, line: int, customer: str, invoice_number: str, invoice_date: str, due_date: str,
+                 terms: str, item: str, description: str, qty: float, rate: float, taxable: bool):
+        self.line = line  # line number in the file (header is line 1)
+        self.customer = customer
+        self.invoice_number = invoice_number
+        self.invoice_date = invoice_date
+        self.due_date = due_date
+        self.terms = terms
+        self.item = item
+        self.description = description
+        self.qty = qty
+        self.rate = rate
+        self.taxable = taxable
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"CSVRow({fields})"
+
+
+def resolve_headers(fieldnames: List[Optional[str]]) -> Dict[str, int]:
+    """
+    Map canonical column names to their position in the header row.
+
+    Args:
+        fieldnames: Header row as read from the file
+
+    Returns:
+        Dictionary mapping canonical name (e.g. "InvoiceNumber") to column index;
+        columns not present are omitted, and the first of duplicate headers wins
+
+    Raises:
+        ValueError: If CSV is missing required columns
+    """
+    canonical = {name.lower(): name for name in COLUMNS}
+    positions: Dict[str, int] = {}
+    for index, header in enumerate(fieldnames):
+        name = canonical.get((header or "").strip().lower())
+        if name and name not in positions:
+            positions[name] = index
+    missing = [r for r in REQUIRED_COLUMNS if r not in positions]
+    if missing:
+        raise ValueError(f"CSV missing required columns: {', '.join(missing)}")
+    return positions
+
+
+def iter_rows(path: str) -> Iterator[CSVRow]:
+    """
+    Stream the rows of an invoice CSV as typed records.
+
+    Args:
+        path: Path to the CSV file
+
+    Yields:
+        CSVRow per data row (blank lines are skipped); missing values are "",
+        Qty defaults to 1, Rate to 0 and Taxable to False
+
+    Raises:
+        ValueError: If CSV is missing required columns or a row has an invalid Qty or Rate
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rdr = csv.reader(f)
+        header = next(rdr, None)
+        if header is None:
+            return
+        positions = resolve_headers(header)
+        # Absent optional columns read from an index past the end of every (padded) row
+        width = len(header)
+        order = [positions.get(name, width) for name in COLUMNS]
+        pad = [""] * (width + 1)
+        for values in rdr:
+            if not values:
+                continue
+            if len(values) <= width:
+                values = values + pad[len(values):]
+            (customer, invoice_number, invoice_date, due_date, terms, item, description,
+             qty, rate, taxable) = [values[i].strip() for i in order]
+            try:
+                qty_f = float(qty or "1")
+                rate_f = float(rate or "0")
+            except ValueError:
+                raise ValueError(f"Bad Qty/Rate in row {rdr.line_num}: Qty={qty!r}, Rate={rate!r}")
+            yield CSVRow(rdr.line_num, customer, invoice_number, invoice_date, due_date, terms, item,
+                         description, qty_f, rate_f, taxable.lower() in _TRUE_VALUES)
+
+
+def _build_payload(rows: List[CSVRow]) -> Dict[str, Any]:
+    """
+    Build the invoice payload for the rows of one invoice number.
+
+    Raises:
+        ValueError: If a date is invalid
+    """
+    first = rows[0]
+    terms = first.terms  # e.g., "Net 15"
+
+    # Compute dates
+    invoice_dt = _parse_date_auto(first.invoice_date) if first.invoice_date else datetime.utcnow()
+    due_dt = _parse_date_auto(first.due_date) if first.due_date else None
+    if (not due_dt) and terms and terms.lower().strip().startswith("net"):
+        try:
+            net_days = int(terms.split()[-1])
+            due_dt = invoice_dt + timedelta(days=net_days)
+        except Exception:
+            pass
+
+    line_items = [
+        {
+            "name": r.item,
+            "description": r.description,
+            "qty": r.qty,
+            "rate": r.rate,
+            "taxable": r.taxable,
+        }
+        for r in rows
+    ]
+
+    payload = {
+        "customer": first.customer,
+        "invoice_number": first.invoice_number,
+        "invoice_date": invoice_dt.strftime("%Y-%m-%d"),
+        "due_date": due_dt.strftime("%Y-%m-%d") if due_dt else "",
+        "terms": terms,
+        "lines": line_items,
+    }
+    return payload
+
+
 def parse_csv(path: str) -> Dict[str, Any]:
     """
     Parse a CSV file containing invoice data.
@@ -55,80 +212,46 @@ def parse_csv(path: str) -> Dict[str, Any]:
     Raises:
         ValueError: If CSV is missing required columns or has invalid data
     """
-    rows = []
-    with open(path, newline="", encoding="utf-8-sig") as f:
-        rdr = csv.DictReader(f)
-        for raw in rdr:
-            row = {(k.strip() if isinstance(k, str) else k): (v.strip() if isinstance(v, str) else v)
-                  for k, v in raw.items()}
-            rows.append(row)
+    rows = list(iter_rows(path))
     if not rows:
         raise ValueError("CSV had no data rows.")
 
-    def g(row, *names, default=""):
-        """Helper to get case-insensitive column value"""
-        for n in names:
-            for k in row.keys():
-                if k and k.lower() == n.lower():
-                    return row[k]
-        return default
-
-    # Validate required columns
-    required = ["Customer", "InvoiceNumber", "Item", "Qty", "Rate"]
-    missing = [r for r in required if all((h or "").lower() != r.lower() for h in rows[0].keys())]
-    if missing:
-        raise ValueError(f"CSV missing required columns: {', '.join(missing)}")
-
     # Ensure one invoice number
-    inv_numbers = {g(r, "InvoiceNumber") for r in rows}
+    inv_numbers = {r.invoice_number for r in rows}
     if len(inv_numbers) != 1:
         raise ValueError(f"CSV contains multiple InvoiceNumbers: {inv_numbers}")
-    invoice_number = inv_numbers.pop()
+    return _build_payload(rows)
 
-    customer = g(rows[0], "Customer")
-    invoice_date_str = g(rows[0], "InvoiceDate")
-    due_date_str = g(rows[0], "DueDate")
-    terms = g(rows[0], "Terms")  # e.g., "Net 15"
 
-    # Compute dates
-    invoice_dt = _parse_date_auto(invoice_date_str) if invoice_date_str else datetime.utcnow()
-    due_dt = _parse_date_auto(due_date_str) if due_date_str else None
-    if (not due_dt) and terms and terms.lower().strip().startswith("net"):
-        try:
-            net_days = int(terms.split()[-1])
-            due_dt = invoice_dt + timedelta(days=net_days)
-        except Exception:
-            pass
+def iter_csv_invoices(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the invoices of a multi-invoice CSV, one payload per InvoiceNumber.
 
-    line_items = []
-    for r in rows:
-        item_name = g(r, "Item")
-        desc = g(r, "Description")
-        qty = g(r, "Qty") or "1"
-        rate = g(r, "Rate") or "0"
-        taxable_raw = g(r, "Taxable")
-        taxable = str(taxable_raw).lower() in ("y", "yes", "true", "1") if taxable_raw != "" else False
+    Rows of an invoice must be contiguous (as in an export sorted or grouped by
+    InvoiceNumber); only the rows of the invoice being read are held in memory.
 
-        try:
-            qty_f = float(qty)
-            rate_f = float(rate)
-        except Exception:
-            raise ValueError(f"Bad Qty/Rate in row: {r}")
+    Args:
+        path: Path to the CSV file
 
-        line_items.append({
-            "name": item_name,
-            "description": desc,
-            "qty": qty_f,
-            "rate": rate_f,
-            "taxable": taxable,
-        })
+    Yields:
+        Invoice payloads in file order, shaped like parse_csv's result
 
-    payload = {
-        "customer": customer,
-        "invoice_number": invoice_number,
-        "invoice_date": invoice_dt.strftime("%Y-%m-%d"),
-        "due_date": due_dt.strftime("%Y-%m-%d") if due_dt else "",
-        "terms": terms,
-        "lines": line_items,
-    }
-    return payload
\ No newline at end of file
+    Raises:
+        ValueError: If CSV is missing required columns, has invalid data, or an
+            InvoiceNumber reappears after other invoices
+    """
+    seen = set()
+    current = None
+    rows: List[CSVRow] = []
+    for row in iter_rows(path):
+        if row.invoice_number != current:
+            if rows:
+                yield _build_payload(rows)
+            if row.invoice_number in seen:
+                raise ValueError(f"InvoiceNumber {row.invoice_number} appears in more than one group of rows; "
+                                 f"group the CSV by InvoiceNumber")
+            seen.add(row.invoice_number)
+            current, rows = row.invoice_number, []
+        rows.append(row)
+    if rows:
+        yield _build_payload(rows)
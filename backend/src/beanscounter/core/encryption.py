@@ -4,9 +4,33 @@ Uses Fernet symmetric encryption from the cryptography library.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from cryptography.fernet import Fernet
 from typing import Optional
+from beanscounter.core.credentials_cache import CredentialsCache
+
+# backend/src/beanscounter/core/encryption.py -> backend/data/.encryption_key
+# Path: core -> beanscounter -> src -> backend
+KEY_FILE = Path(__file__).parent.parent.parent.parent / "data" / ".encryption_key"
+
+# Key file contents, re-read only when the file changes
+_key_cache = CredentialsCache(KEY_FILE)
+
+
+def _read_key_file() -> Optional[bytes]:
+    """Read the key file, or None if it does not exist."""
+    if not KEY_FILE.exists():
+        return None
+    with open(KEY_FILE, "r") as f:
+        # Key file contains base64-encoded string, convert to bytes
+        return f.read().strip().encode()
+
+
+@lru_cache(maxsize=8)
+def _get_fernet(key: bytes) -> Fernet:
+    """Get a Fernet instance for a key, reused across calls."""
+    return Fernet(key)
 
 
 def get_encryption_key() -> bytes:
@@ -29,15 +53,9 @@ def get_encryption_key() -> bytes:
             return Fernet.generate_key()
     
     # Try to read from key file
-    # backend/src/beanscounter/core/encryption.py -> backend/data/.encryption_key
-    # Path: core -> beanscounter -> src -> backend
-    backend_root = Path(__file__).parent.parent.parent.parent
-    key_file = backend_root / "data" / ".encryption_key"
-    if key_file.exists():
-        with open(key_file, "r") as f:
-            key_str = f.read().strip()
-            # Key file contains base64-encoded string, convert to bytes
-            return key_str.encode()
+    key = _key_cache.get(_read_key_file)
+    if key:
+        return key
     
     raise RuntimeError(
         "ENCRYPTION_KEY environment variable not set. "
@@ -59,7 +77,7 @@ def encrypt_value(value: str, key: Optional[bytes] = None) -> str:
     if key is None:
         key = get_encryption_key()
     
-    f = Fernet(key)
+    f = _get_fernet(key)
     encrypted = f.encrypt(value.encode())
     return encrypted.decode()
 
@@ -81,7 +99,7 @@ def decrypt_value(encrypted_value: str, key: Optional[bytes] = None) -> str:
     if key is None:
         key = get_encryption_key()
     
-    f = Fernet(key)
+    f = _get_fernet(key)
     try:
         decrypted = f.decrypt(encrypted_value.encode())
         return decrypted.decode()
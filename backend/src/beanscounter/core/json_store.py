@@ -0,0 +1,178 @@
+"""
+Atomic JSON file storage shared by the services.
+
+- Writes go to a temp file in the same folder, are fsynced and then renamed over
+  the target, so a crash mid-write never leaves a truncated store behind
+- One re-entrant lock per file; hold file_lock() (or use update_json()) around a
+  read-modify-write so concurrent writers do not lose each other's updates
+- Compact serialization, using orjson when it is installed
+- Parsed contents are cached in memory and reused while the file's mtime and size
+  are unchanged; callers always get their own copy
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from beanscounter.core.metrics import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_locks_guard = threading.Lock()
+_locks: Dict[Path, threading.RLock] = {}
+
+_cache_lock = threading.Lock()
+_cache: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+
+
+def file_lock(path: Path) -> threading.RLock:
+    """
+    Get the lock guarding a JSON file.
+
+    Args:
+        path: JSON file path
+
+    Returns:
+        Re-entrant lock shared by every caller using the same path
+    """
+    path = Path(path)
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = threading.RLock()
+        return lock
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize data to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def loads(raw: bytes) -> Any:
+    """Parse JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """
+    Read a JSON file, using the in-memory copy if the file has not changed.
+
+    Args:
+        path: JSON file path
+        default: Value returned (as a copy) if the file is missing or cannot be parsed
+
+    Returns:
+        Parsed contents; a deep copy the caller may modify
+    """
+    path = Path(path)
+    signature = _signature(path)
+    if signature is None:
+        return copy.deepcopy(default)
+
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached and cached[0] == signature:
+        return copy.deepcopy(cached[1])
+
+    with file_lock(path):
+        try:
+            with timed("json_store", op="read"), open(path, "rb") as f:
+                data = loads(f.read())
+        except Exception as e:
+            print(f"Error loading {path.name}: {e}")
+            return copy.deepcopy(default)
+        with _cache_lock:
+            _cache[path] = (signature, data)
+        return copy.deepcopy(data)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """
+    Atomically write a JSON file.
+
+    Args:
+        path: JSON file path
+        data: JSON-serializable data
+
+    Raises:
+        OSError: If the file cannot be written (the previous contents are kept)
+    """
+    path = Path(path)
+    with timed("json_store", op="write"):
+        _write_atomic(path, data)
+
+
+def _write_atomic(path: Path, data: Any) -> None:
+    raw = dumps(data)
+    with file_lock(path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        signature = _signature(path)
+        with _cache_lock:
+            if signature is not None:
+                _cache[path] = (signature, copy.deepcopy(data))
+            else:
+                _cache.pop(path, None)
+
+
+def update_json(path: Path, update: Callable[[Any], Any], default: Any = None) -> Any:
+    """
+    Read, modify and write a JSON file while holding its lock.
+
+    Args:
+        path: JSON file path
+        update: Function that modifies the data in place; return False to skip the write
+        default: Data used if the file is missing or cannot be parsed
+
+    Returns:
+        The value returned by update
+    """
+    with file_lock(path):
+        data = read_json(path, default)
+        result = update(data)
+        if result is not False:
+            write_json(path, data)
+        return result
+
+
+def delete_json(path: Path) -> None:
+    """
+    Delete a JSON file and drop its cached contents.
+
+    Args:
+        path: JSON file path
+    """
+    path = Path(path)
+    with file_lock(path):
+        if path.exists():
+            path.unlink()
+        with _cache_lock:
+            _cache.pop(path, None)
@@ -0,0 +1,195 @@
+"""
+Lightweight in-process performance metrics.
+
+- Latency histograms keyed by metric name and labels, rendered in Prometheus
+  text format by render_prometheus()
+- timed() records the duration of a sub-phase (PDF extraction, OCR, JSON store
+  I/O, QuickBooks and Gmail calls) into the beanscounter_phase_seconds histogram
+- While a request is being handled, timed() also adds the duration to that
+  request's phase totals, which the API middleware returns as a Server-Timing
+  header
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PHASE_METRIC = "beanscounter_phase_seconds"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed buckets."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Record one observation (caller holds the registry lock)."""
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+_registry_lock = threading.Lock()
+_histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+_help: Dict[str, str] = {
+    PHASE_METRIC: "Time spent in request sub-phases",
+}
+
+# Per-request phase totals: name -> [seconds, calls]; None outside a request. Worker threads
+# started with a copy of the request's context (e.g. paginated QuickBooks queries) update
+# the same dict, so updates hold _phases_lock
+_request_phases: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_phases", default=None)
+_phases_lock = threading.Lock()
+
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    """
+    Record a duration in a histogram.
+
+    Args:
+        name: Metric name
+        seconds: Duration in seconds
+        **labels: Label values identifying the series
+    """
+    key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+    with _registry_lock:
+        series = _histograms.setdefault(name, {})
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+
+def describe(name: str, help_text: str) -> None:
+    """Set the HELP text shown for a metric."""
+    _help[name] = help_text
+
+
+@contextmanager
+def timed(phase: str, **labels: str) -> Iterator[None]:
+    """
+    Time a block as a sub-phase of the current request.
+
+    Args:
+        phase: Phase name (e.g. "pdf_extraction", "quickbooks", "gmail")
+        **labels: Extra labels, e.g. call="query_invoice"
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe(PHASE_METRIC, elapsed, phase=phase, **labels)
+        phases = _request_phases.get()
+        if phases is not None:
+            name = "_".join([phase, *(str(v) for v in labels.values())])
+            with _phases_lock:
+                totals = phases.setdefault(name, [0.0, 0])
+                totals[0] += elapsed
+                totals[1] += 1
+
+
+def start_request_timing() -> object:
+    """
+    Start collecting phase totals for the current request.
+
+    Returns:
+        Token to pass to finish_request_timing()
+    """
+    return _request_phases.set({})
+
+
+def finish_request_timing(token: object) -> Dict[str, List[float]]:
+    """
+    Stop collecting phase totals for the current request.
+
+    Args:
+        token: Token from start_request_timing()
+
+    Returns:
+        Dictionary mapping phase name to [seconds, calls]
+    """
+    with _phases_lock:
+        phases = {name: list(totals) for name, totals in (_request_phases.get() or {}).items()}
+    _request_phases.reset(token)
+    return phases
+
+
+_TOKEN_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def server_timing_header(total_seconds: float, phases: Dict[str, List[float]]) -> str:
+    """
+    Build a Server-Timing header value.
+
+    Args:
+        total_seconds: Total request time
+        phases: Phase totals from finish_request_timing()
+
+    Returns:
+        Header value such as 'total;dur=12.3, quickbooks_query_invoice;dur=8.1;desc="2 calls"'
+    """
+    entries = [f"total;dur={total_seconds * 1000:.1f}"]
+    for name, (seconds, calls) in sorted(phases.items(), key=lambda item: -item[1][0]):
+        entries.append(f'{_TOKEN_RE.sub("_", name)};dur={seconds * 1000:.1f};desc="{calls} calls"')
+    return ", ".join(entries)
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus(gauges: Optional[Dict[str, Dict[LabelKey, float]]] = None) -> str:
+    """
+    Render all histograms (and optional gauges) in Prometheus text format.
+
+    Args:
+        gauges: Optional extra gauges as {metric name: {label key: value}}
+
+    Returns:
+        Prometheus exposition text
+    """
+    lines = []
+    with _registry_lock:
+        for name in sorted(_histograms):
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in sorted(_histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+    for name in sorted(gauges or {}):
+        if name in _help:
+            lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} gauge")
+        for key, value in sorted(gauges[name].items()):
+            lines.append(f"{name}{_format_labels(key)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    """Drop all recorded histograms (used by tests)."""
+    with _registry_lock:
+        _histograms.clear()
@@ -1,21 +1,30 @@
 import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-import pdfplumber
-import pytesseract
-from PIL import Image
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
+# pdfplumber, pytesseract, PIL and rich are imported where they are used, so
+# importing this module (API routers, services) stays cheap
 
-console = Console()
+from beanscounter.core.metrics import timed
+from beanscounter.core.profiling import NULL_TIMER, StageTimer, write_speedscope
+
+
+@lru_cache(maxsize=None)
+def _console():
+    """Get the shared rich console, importing rich on first use."""
+    from rich.console import Console
+    return Console()
 
 class POReader:
-    def __init__(self):
-        pass
+    def __init__(self, timer: Optional[StageTimer] = None):
+        """
+        Args:
+            timer: Optional StageTimer collecting per-stage timings (profiling is off if None)
+        """
+        self.timer = timer or NULL_TIMER
 
     def scan_directory(self, path: Path) -> List[Path]:
         """Find all supported PO files in the directory."""
@@ -24,6 +33,11 @@ class POReader:
 
     def extract_data(self, file_path: Path) -> Dict[str, Any]:
         """Extract structured data from a PO file."""
+        with self.timer.stage("extract_data"):
+            return self._extract_data(file_path)
+
+    def _extract_data(self, file_path: Path) -> Dict[str, Any]:
+        timer = self.timer
         text = ""
         ship_to_text = ""
         attn_text = ""
@@ -31,10 +45,12 @@ class POReader:
         
         try:
             if file_path.suffix.lower() == ".pdf":
-                with pdfplumber.open(file_path) as pdf:
+                with timed("pdf_extraction"), self._open_pdf(file_path) as pdf:
                     for page in pdf.pages:
-                        text += page.extract_text() + "\n"
-                        extracted_tables = page.extract_tables()
+                        with timer.stage("page_text"):
+                            text += page.extract_text() + "\n"
+                        with timer.stage("page_tables"):
+                            extracted_tables = page.extract_tables()
                         if extracted_tables:
                             tables.extend(extracted_tables)
                         
@@ -69,19 +85,31 @@ class POReader:
                                         attn_text = crop.extract_text()
                                     except Exception:
                                         pass
+                        timer.lap("spatial_search")
 
             else:
-                image = Image.open(file_path)
-                text = pytesseract.image_to_string(image)
+                with timed("ocr"), timer.stage("ocr"):
+                    import pytesseract
+                    from PIL import Image
+                    image = Image.open(file_path)
+                    text = pytesseract.image_to_string(image)
                 # Image table extraction is hard without specialized tools, skipping for now
         except Exception as e:
-            console.print(f"[red]Error reading {file_path.name}: {e}[/red]")
+            _console().print(f"[red]Error reading {file_path.name}: {e}[/red]")
             return {}
 
-        return self._parse_text(text, tables, file_path.name, ship_to_text, attn_text)
+        with timed("po_parse"), timer.stage("parse"):
+            return self._parse_text(text, tables, file_path.name, ship_to_text, attn_text)
+
+    def _open_pdf(self, file_path: Path):
+        with self.timer.stage("pdf_open"):
+            import pdfplumber
+            return pdfplumber.open(file_path)
 
     def _parse_text(self, text: str, tables: List[List[List[str]]], filename: str, ship_to_text: str = "", attn_text: str = "") -> Dict[str, Any]:
         """Heuristic parsing of text and tables."""
+        timer = self.timer
+        timer.mark()
         # Company domain to exclude from customer emails
         COMPANY_DOMAIN = "indianbento.com"
         
@@ -120,6 +148,7 @@ class POReader:
                 # Assume this is the vendor/customer name
                 data["customer"] = clean_line
                 break
+        timer.lap("customer")
 
         # 2. PO Number
         # Try specific patterns first
@@ -183,6 +212,7 @@ class POReader:
                         data["po_number"] = candidates[0][1]
                         break
 
+        timer.lap("po_number")
 
         # 3. Dates
         # Heuristic: Look for lines containing "Date"
@@ -250,6 +280,7 @@ class POReader:
                          data["delivery_date"] = all_dates[1]
                      else:
                          data["delivery_date"] = all_dates[0]
+        timer.lap("dates")
 
         # 3b. Ordered By
         if data.get("ordered_by", "Unknown") == "Unknown":
@@ -262,6 +293,7 @@ class POReader:
                         if val:
                             data["ordered_by"] = val
                             break
+        timer.lap("ordered_by")
 
         # 4. Addresses (Heuristic: Look for "Bill To" and "Ship To")
         lower_text = text.lower()
@@ -422,6 +454,7 @@ class POReader:
             first_line = data["customer_address"].split('\n')[0].strip()
             if first_line and not first_line[0].isdigit():  # Make sure it's not an address line starting with a number
                 data["customer"] = first_line
+        timer.lap("addresses")
 
         # 5. Items (Try to find a table with Qty/Rate/Amount)
         items_found = False
@@ -727,6 +760,7 @@ class POReader:
                 # e.g. they are contiguous or look like a block
                 data["items"] = potential_items
 
+        timer.lap("items")
 
         # 6. Invoice Amount
         if data["items"]:
@@ -738,6 +772,7 @@ class POReader:
                     data["invoice_amount"] = float(amount_match.group(1).replace(",", ""))
                 except:
                     pass
+        timer.lap("invoice_amount")
 
         # 7. Customer Email
         # Extract all email addresses from the text
@@ -764,6 +799,7 @@ class POReader:
             # If no finance email found, use the first customer email
             if data["customer_email"] == "Unknown":
                 data["customer_email"] = customer_emails[0]
+        timer.lap("emails")
 
         # 8. Try to match domain to company name if customer name is missing
         if data.get("customer") == "Unknown" and data.get("customer_email") and data["customer_email"] != "Unknown":
@@ -793,11 +829,15 @@ class POReader:
             except Exception as e:
                 # If domain matching fails, keep customer as "Unknown"
                 print(f"Domain matching failed: {e}")
+        timer.lap("domain_match")
 
         return data
 
     def print_invoice(self, data: Dict[str, Any]):
         """Print formatted invoice data."""
+        from rich.panel import Panel
+        from rich.table import Table
+        console = _console()
         console.print(Panel(f"[bold blue]Invoice Data: {data['source_file']}[/bold blue]"))
         
         console.print(f"Customer: [green]{data.get('customer', 'Unknown')}[/green]")
@@ -824,13 +864,43 @@ class POReader:
         console.print(table)
         console.print(f"[bold green]Total Amount: ${data['invoice_amount']:.2f}[/bold green]\n")
 
+def print_profile(timer: StageTimer, files: int) -> None:
+    """Print the aggregate per-stage breakdown collected while reading files."""
+    from rich.table import Table
+    breakdown = timer.breakdown()
+    overall = next((row["total_ms"] for row in breakdown if row["stage"] == "extract_data"), 0.0)
+    table = Table(title=f"Stage breakdown ({files} files)")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("Mean ms", justify="right")
+    table.add_column("% of extract", justify="right")
+    for row in breakdown:
+        share = f"{row['total_ms'] / overall * 100:.1f}%" if overall else "-"
+        table.add_row("  " * row["depth"] + row["stage"].rsplit("/", 1)[-1], str(row["calls"]),
+                      f"{row['total_ms']:.1f}", f"{row['mean_ms']:.2f}", share)
+    _console().print(table)
+
+
 def main():
-    reader = POReader()
-    
-    if len(sys.argv) > 1:
-        input_path = Path(sys.argv[1])
-    else:
-        input_path = Path(".")
+    import argparse
+    import cProfile
+    import pstats
+
+    console = _console()
+    parser = argparse.ArgumentParser(description="Extract and print PO data from a file or directory")
+    parser.add_argument("path", nargs="?", type=Path, default=Path("."))
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a per-stage timing breakdown across all files instead of the invoices")
+    parser.add_argument("--pstats", type=Path, help="Also dump cProfile stats to this file (implies --profile)")
+    parser.add_argument("--speedscope", type=Path,
+                        help="Also write a per-file stage timeline for speedscope.app (implies --profile)")
+    args = parser.parse_args()
+    profile = args.profile or args.pstats or args.speedscope
+
+    timer = StageTimer(record_events=bool(args.speedscope)) if profile else None
+    reader = POReader(timer)
+    input_path = args.path
 
     if input_path.is_file():
         files = [input_path]
@@ -845,11 +915,33 @@ def main():
         return
 
     console.print(f"[bold]Found {len(files)} files to process...[/bold]\n")
-    
+
+    if not profile:
+        for file_path in files:
+            data = reader.extract_data(file_path)
+            if data:
+                reader.print_invoice(data)
+        return
+
+    profiler = cProfile.Profile() if args.pstats else None
+    timelines = []
     for file_path in files:
-        data = reader.extract_data(file_path)
-        if data:
-            reader.print_invoice(data)
+        if profiler:
+            profiler.enable()
+        reader.extract_data(file_path)
+        if profiler:
+            profiler.disable()
+        if args.speedscope:
+            timelines.append((file_path.name, timer.take_events()))
+
+    print_profile(timer, len(files))
+    if profiler:
+        profiler.dump_stats(args.pstats)
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(15)
+        console.print(f"cProfile stats written to {args.pstats} (python -m pstats {args.pstats})")
+    if args.speedscope:
+        write_speedscope(args.speedscope, timelines)
+        console.print(f"Speedscope timeline written to {args.speedscope} (open at https://www.speedscope.app)")
 
 if __name__ == "__main__":
     main()
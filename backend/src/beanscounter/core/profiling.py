@@ -0,0 +1,170 @@
+"""
+Per-stage wall-clock profiling for the PO reader.
+
+StageTimer accumulates time per stage path (e.g. "extract_data/parse/items")
+and can keep open/close events for a timeline that is written in speedscope's
+evented format (https://www.speedscope.app). Stages are nested with stage();
+lap() closes a sequential section of the enclosing stage without indenting the
+code it measures.
+
+NULL_TIMER is the disabled default: its stage() and lap() do nothing, so
+instrumented code costs a method call per stage when profiling is off.
+
+A StageTimer is not thread-safe; use one per thread.
+"""
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+# (kind "O"/"C", stage path, perf_counter timestamp)
+Event = Tuple[str, str, float]
+
+
+class StageTimer:
+    """Accumulates wall time per stage, optionally keeping events for a timeline."""
+
+    def __init__(self, record_events: bool = False):
+        """
+        Args:
+            record_events: Keep open/close events for write_speedscope()
+        """
+        self.record_events = record_events
+        self.totals: Dict[str, List[float]] = {}  # stage path -> [seconds, calls]
+        self.events: List[Event] = []
+        self._root = ["", time.perf_counter()]  # [path, end of the last lap or nested stage]
+        self._stack = [self._root]
+
+    def _record(self, path: str, start: float, end: float) -> None:
+        totals = self.totals.setdefault(path, [0.0, 0])
+        totals[0] += end - start
+        totals[1] += 1
+        if self.record_events:
+            self.events.append(("O", path, start))
+            self.events.append(("C", path, end))
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a block as a stage nested in the current one.
+
+        Args:
+            name: Stage name (e.g. "pdf_open")
+        """
+        parent = self._stack[-1]
+        path = f"{parent[0]}/{name}" if parent[0] else name
+        totals = self.totals.setdefault(path, [0.0, 0])  # parents listed before their children
+        start = time.perf_counter()
+        frame = [path, start]
+        self._stack.append(frame)
+        if self.record_events:
+            self.events.append(("O", path, start))
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            end = time.perf_counter()
+            totals[0] += end - start
+            totals[1] += 1
+            if self.record_events:
+                self.events.append(("C", path, end))
+            parent[1] = end
+
+    def mark(self) -> None:
+        """Start the first lap of the current stage now."""
+        self._stack[-1][1] = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        """
+        Record the time since the previous lap (or nested stage, or mark()) as a sub-stage.
+
+        Args:
+            name: Name of the section that just finished (e.g. "po_number")
+        """
+        frame = self._stack[-1]
+        end = time.perf_counter()
+        self._record(f"{frame[0]}/{name}" if frame[0] else name, frame[1], end)
+        frame[1] = end
+
+    def take_events(self) -> List[Event]:
+        """Return the recorded events and start a new timeline."""
+        events, self.events = self.events, []
+        return events
+
+    def breakdown(self) -> List[Dict[str, float]]:
+        """
+        Summarize stage totals in first-seen order.
+
+        Returns:
+            List of {"stage", "depth", "calls", "total_ms", "mean_ms"}
+        """
+        return [
+            {
+                "stage": path,
+                "depth": path.count("/"),
+                "calls": int(calls),
+                "total_ms": round(seconds * 1000, 3),
+                "mean_ms": round(seconds * 1000 / calls, 3) if calls else 0.0,
+            }
+            for path, (seconds, calls) in self.totals.items()
+        ]
+
+
+class _NullStageTimer:
+    """Disabled StageTimer."""
+
+    _context = nullcontext()
+
+    def stage(self, name: str):
+        return self._context
+
+    def mark(self) -> None:
+        pass
+
+    def lap(self, name: str) -> None:
+        pass
+
+
+NULL_TIMER = _NullStageTimer()
+
+
+def write_speedscope(path: Path, timelines: List[Tuple[str, List[Event]]]) -> None:
+    """
+    Write timelines as a speedscope file, one profile per timeline.
+
+    Args:
+        path: Output JSON path
+        timelines: (profile name, events from StageTimer.take_events()) pairs
+    """
+    frames: List[Dict[str, str]] = []
+    frame_ids: Dict[str, int] = {}
+    profiles = []
+    for name, events in timelines:
+        if not events:
+            continue
+        origin = events[0][2]
+        profile_events = []
+        for kind, stage_path, at in events:
+            frame = frame_ids.get(stage_path)
+            if frame is None:
+                frame = frame_ids[stage_path] = len(frames)
+                frames.append({"name": stage_path.rsplit("/", 1)[-1], "file": stage_path})
+            profile_events.append({"type": kind, "frame": frame, "at": round((at - origin) * 1000, 4)})
+        profiles.append({
+            "type": "evented",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": profile_events[-1]["at"],
+            "events": profile_events,
+        })
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": profiles,
+        "name": Path(path).stem,
+        "exporter": "beanscounter",
+    }
+    Path(path).write_text(json.dumps(document))
@@ -0,0 +1,653 @@
+"""
+Async QuickBooks Client Module
+
+Provides an asyncio client for the QuickBooks Online API built on httpx.
+Mirrors the surface of QuickBooksClient so FastAPI endpoints can await
+QuickBooks round trips instead of blocking a threadpool worker.
+"""
+
+import asyncio
+import base64
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+from beanscounter.core.metrics import timed
+from beanscounter.integrations.quickbooks_client import (
+    IN_CLAUSE_BATCH_SIZE, MAX_BATCH_ITEMS, MINOR_VERSION, QUERY_PAGE_SIZE, QBOAPIError, api_base_url,
+    build_in_clause, build_invoice_body, build_select, create_may_have_applied, query_call_name, query_rows,
+    request_call_name, token_url
+)
+from beanscounter.integrations.qb_rate_limiter import RetryPolicy, get_rate_limiter
+
+if TYPE_CHECKING:  # httpx is imported on first use to keep API startup fast
+    import httpx
+
+# Connection pool shared by all AsyncQuickBooksClient instances, keyed by event loop
+_shared_http_client: Optional["httpx.AsyncClient"] = None
+_shared_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_shared_http_client() -> "httpx.AsyncClient":
+    """
+    Get the pooled httpx.AsyncClient for the running event loop.
+
+    A new pool is created if none exists yet or if the previous one was
+    created on a different (e.g. closed) event loop.
+
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    import httpx
+
+    global _shared_http_client, _shared_http_loop
+    loop = asyncio.get_running_loop()
+    if _shared_http_client is None or _shared_http_client.is_closed or _shared_http_loop is not loop:
+        _shared_http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        _shared_http_loop = loop
+    return _shared_http_client
+
+
+async def close_shared_http_client() -> None:
+    """Close the shared connection pool (called on application shutdown)."""
+    global _shared_http_client, _shared_http_loop
+    if _shared_http_client is not None and not _shared_http_client.is_closed:
+        await _shared_http_client.aclose()
+    _shared_http_client = None
+    _shared_http_loop = None
+
+
+class AsyncQuickBooksClient:
+    """
+    Async client for interacting with QuickBooks Online API.
+
+    Handles:
+    - Authentication via OAuth2 refresh tokens
+    - API requests over a pooled httpx.AsyncClient, under the shared realm
+      rate limiter with retries
+    - Item, invoice and invoice status lookups and invoice creation
+    - Batched lookups by name and Batch API writes for bulk imports
+    """
+
+    def __init__(self, client_id: str, client_secret: str, refresh_token: str, realm_id: str,
+                 environment: str = "production", http_client: Optional["httpx.AsyncClient"] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
+        """
+        Initialize async QuickBooks client with authentication credentials.
+
+        Args:
+            client_id: QuickBooks OAuth2 client ID
+            client_secret: QuickBooks OAuth2 client secret
+            refresh_token: OAuth2 refresh token
+            realm_id: QuickBooks company ID
+            environment: "production" or "sandbox"
+            http_client: Optional httpx.AsyncClient (defaults to the shared pool)
+            retry_policy: Retry/backoff policy (defaults to RetryPolicy())
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.realm_id = realm_id
+        self.environment = environment.lower().strip()
+        self._http_client = http_client
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = get_rate_limiter(realm_id)
+        self._access_token = None
+        self._token_lock = asyncio.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """Get the base URL for QuickBooks API based on environment"""
+        return api_base_url(self.environment)
+
+    @property
+    def http(self) -> "httpx.AsyncClient":
+        """Get the httpx client used for requests."""
+        return self._http_client or get_shared_http_client()
+
+    async def get_access_token(self) -> str:
+        """
+        Get a valid access token, refreshing if needed.
+
+        Concurrent callers share a single refresh.
+
+        Returns:
+            Valid OAuth2 access token
+
+        Raises:
+            RuntimeError: If token refresh fails
+        """
+        if self._access_token:
+            return self._access_token
+        async with self._token_lock:
+            if not self._access_token:
+                self._access_token = await self._get_access_token()
+        return self._access_token
+
+    async def _get_access_token(self) -> str:
+        """
+        Get a fresh access token using the refresh token.
+
+        Returns:
+            OAuth2 access token
+
+        Raises:
+            RuntimeError: If token refresh fails
+        """
+        import httpx
+
+        auth = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+        headers = {
+            "Authorization": f"Basic {auth}",
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept": "application/json",
+        }
+        data = {
+            "grant_type": "refresh_token",
+            "refresh_token": self.refresh_token
+        }
+        try:
+            with timed("quickbooks", call="token"):
+                r = await self.http.post(token_url(), headers=headers, data=data, timeout=30)
+            if r.status_code != 200:
+                error_detail = r.text
+                try:
+                    error_json = r.json()
+                    if "error" in error_json:
+                        error_detail = f"{error_json.get('error', 'Unknown error')}"
+                        if "error_description" in error_json:
+                            error_detail += f": {error_json['error_description']}"
+                except ValueError:
+                    pass
+                raise RuntimeError(f"Failed to refresh token (HTTP {r.status_code}): {error_detail}")
+
+            j = r.json()
+            if "access_token" not in j:
+                raise RuntimeError("Invalid response from OAuth server: access_token not found in response")
+            return j["access_token"]
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Network error during token refresh: {str(e)}")
+        except ValueError as e:
+            raise RuntimeError(f"Invalid JSON response from OAuth server: {str(e)}")
+
+    async def _send(self, method: str, url: str, idempotent: bool = True, **kwargs) -> "httpx.Response":
+        """
+        Send an HTTP request under the realm rate limiter, retrying throttled
+        and transient failures with exponential backoff.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            idempotent: Whether the call may be retried after an HTTP 5xx or a network error once
+                the request may have been sent (non-idempotent calls only retry 429 and connect failures)
+            **kwargs: Passed through to httpx.AsyncClient.request
+
+        Returns:
+            Final response (may still be an error response)
+        """
+        import httpx
+
+        attempt = 0
+        while True:
+            try:
+                async with self.rate_limiter.async_slot():
+                    r = await self.http.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                # Connect errors mean nothing was sent; anything else may have reached QuickBooks
+                sent = not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if (sent and not idempotent) or attempt >= self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            else:
+                self.rate_limiter.on_response(r.status_code)
+                if not self.retry_policy.should_retry(r.status_code, attempt, idempotent):
+                    return r
+                delay = self.retry_policy.delay(attempt, r.headers.get("Retry-After"))
+            self.rate_limiter.on_retry(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def request(self, method: str, path: str, params: Dict = None, json_body: Dict = None) -> Dict:
+        """
+        Make a request to the QuickBooks API with automatic retry for rate limits
+        and transient server errors.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            path: API endpoint path (e.g., "/customer")
+            params: Query parameters
+            json_body: Request body as JSON
+
+        Returns:
+            Response JSON
+
+        Raises:
+            QBOAPIError: If QuickBooks returns an error status
+        """
+        url = f"{self.base_url}/v3/company/{self.realm_id}{path}"
+        headers = {
+            "Authorization": f"Bearer {await self.get_access_token()}",
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        }
+        if params is None:
+            params = {}
+        params["minorversion"] = MINOR_VERSION
+
+        with timed("quickbooks", call=request_call_name(method, path)):
+            r = await self._send(method, url, idempotent=method.upper() == "GET",
+                                 headers=headers, params=params, json=json_body)
+
+        if r.status_code >= 400:
+            raise QBOAPIError(r.status_code, r.text)
+
+        return r.json()
+
+    async def query(self, query_str: str) -> Dict:
+        """
+        Execute a QuickBooks SQL-like query, retrying on throttling.
+
+        Args:
+            query_str: QuickBooks query string
+
+        Returns:
+            Query response JSON
+
+        Raises:
+            RuntimeError: If query fails
+        """
+        url = f"{self.base_url}/v3/company/{self.realm_id}/query"
+        headers = {
+            "Authorization": f"Bearer {await self.get_access_token()}",
+            "Accept": "application/json",
+            "Content-Type": "application/text",
+        }
+        params = {"minorversion": MINOR_VERSION}
+
+        with timed("quickbooks", call=query_call_name(query_str)):
+            r = await self._send("POST", url, headers=headers, params=params, content=query_str)
+
+        if r.status_code >= 400:
+            raise RuntimeError(f"QBO Query error {r.status_code}: {r.text}")
+
+        return r.json()
+
+    async def count(self, entity: str, where: Optional[str] = None) -> int:
+        """
+        Count entities matching an optional filter.
+
+        Args:
+            entity: Entity name (e.g., "Item")
+            where: Optional where clause (without the "where" keyword)
+
+        Returns:
+            Number of matching rows
+        """
+        q = f"select count(*) from {entity}"
+        if where:
+            q += f" where {where}"
+        res = await self.query(q)
+        return int(res.get("QueryResponse", {}).get("totalCount", 0))
+
+    async def query_all(self, entity: str, columns: Optional[List[str]] = None, where: Optional[str] = None,
+                        order_by: Optional[str] = "Id", page_size: int = QUERY_PAGE_SIZE,
+                        max_concurrency: Optional[int] = None) -> List[Dict]:
+        """
+        Fetch every row of an entity, fetching pages concurrently.
+
+        Same semantics as QuickBooksClient.query_all.
+
+        Args:
+            entity: Entity name (e.g., "Item")
+            columns: Columns to select (all columns if None)
+            where: Optional where clause (without the "where" keyword)
+            order_by: Column giving a stable page order
+            page_size: Rows per page (QuickBooks max is 1000)
+            max_concurrency: Maximum concurrent page requests (defaults to the realm concurrency cap)
+
+        Returns:
+            List of entity rows
+        """
+        base = build_select(entity, columns, where, order_by)
+        total = await self.count(entity, where)
+        semaphore = asyncio.Semaphore(max_concurrency or self.rate_limiter.max_concurrent)
+
+        async def fetch_page(start_position: int) -> List[Dict]:
+            async with semaphore:
+                res = await self.query(f"{base} startposition {start_position} maxresults {page_size}")
+            return query_rows(res, entity)
+
+        pages = list(await asyncio.gather(*(fetch_page(start) for start in range(1, total + 1, page_size))))
+
+        rows = [row for page in pages for row in page]
+        # Pick up rows created after the count
+        next_start = total + 1
+        while pages and len(pages[-1]) >= page_size:
+            page = await fetch_page(next_start)
+            if not page:
+                break
+            rows.extend(page)
+            pages.append(page)
+            next_start += page_size
+        return rows
+
+    async def query_in(self, entity: str, column: str, values: List[str],
+                       columns: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Fetch rows whose column matches any of the given values.
+
+        Values are deduplicated and split into "in (...)" batches that are
+        queried concurrently.
+
+        Args:
+            entity: Entity name (e.g., "Customer")
+            column: Column to match (e.g., "Id")
+            values: Values to look up
+            columns: Columns to select (all columns if None)
+
+        Returns:
+            List of matching entity rows
+        """
+        unique = list(dict.fromkeys(v for v in values if v))
+        batches = [unique[i:i + IN_CLAUSE_BATCH_SIZE] for i in range(0, len(unique), IN_CLAUSE_BATCH_SIZE)]
+
+        async def fetch_batch(batch: List[str]) -> List[Dict]:
+            q = build_select(entity, columns, build_in_clause(column, batch))
+            res = await self.query(f"{q} maxresults {QUERY_PAGE_SIZE}")
+            return query_rows(res, entity)
+
+        results = await asyncio.gather(*(fetch_batch(batch) for batch in batches))
+        return [row for rows in results for row in rows]
+
+    async def get_customers_by_ids(self, customer_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get Id and DisplayName for many customers in as few queries as possible.
+
+        Args:
+            customer_ids: QuickBooks customer IDs
+
+        Returns:
+            Dictionary mapping customer ID to customer data (missing IDs are omitted)
+        """
+        rows = await self.query_in("Customer", "Id", customer_ids, columns=["Id", "DisplayName"])
+        return {row["Id"]: row for row in rows if row.get("Id")}
+
+    async def find_invoices_by_docnumbers(self, docnumbers: List[str]) -> Dict[str, Dict]:
+        """
+        Find existing invoices for many document numbers.
+
+        Args:
+            docnumbers: Invoice document numbers
+
+        Returns:
+            Dictionary mapping DocNumber to invoice data (numbers without an invoice are omitted)
+        """
+        rows = await self.query_in(
+            "Invoice", "DocNumber", docnumbers,
+            columns=["Id", "DocNumber", "TxnDate", "TotalAmt", "Balance", "EmailStatus", "CustomerRef"]
+        )
+        found = {}
+        for row in rows:
+            found.setdefault(row.get("DocNumber"), row)
+        return found
+
+    async def _find_by_names(self, entity: str, column: str, names: List[str],
+                             columns: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Look up many rows by name, keyed by lowercased name (QuickBooks name matching is case-insensitive)."""
+        rows = await self.query_in(entity, column, names, columns=columns)
+        found = {}
+        for row in rows:
+            found.setdefault((row.get(column) or "").lower(), row)
+        return found
+
+    async def find_customers_by_display_names(self, names: List[str]) -> Dict[str, Dict]:
+        """
+        Find many customers by display name.
+
+        Args:
+            names: Customer display names
+
+        Returns:
+            Dictionary mapping lowercased display name to customer data (Id, DisplayName)
+        """
+        return await self._find_by_names("Customer", "DisplayName", names, columns=["Id", "DisplayName"])
+
+    async def find_items_by_names(self, names: List[str]) -> Dict[str, Dict]:
+        """
+        Find many items by name.
+
+        Args:
+            names: Item names
+
+        Returns:
+            Dictionary mapping lowercased item name to item data (Id, Name)
+        """
+        return await self._find_by_names("Item", "Name", names, columns=["Id", "Name"])
+
+    async def find_terms_by_names(self, names: List[str]) -> Dict[str, Dict]:
+        """
+        Find many sales terms by name.
+
+        Args:
+            names: Term names (e.g., "Net 15")
+
+        Returns:
+            Dictionary mapping lowercased term name to term data (Id, Name)
+        """
+        return await self._find_by_names("Term", "Name", names, columns=["Id", "Name"])
+
+    async def find_income_account_ref(self) -> Dict:
+        """
+        Find an income account to use for items.
+
+        Returns:
+            Income account reference
+
+        Raises:
+            RuntimeError: If no income accounts found
+        """
+        res = await self.query("select Id, Name, AccountType from Account where AccountType = 'Income' order by Id asc")
+        accts = query_rows(res, "Account")
+        if not accts:
+            raise RuntimeError("No Income accounts found. Please provide an IncomeAccountRef.")
+        return {"value": accts[0]["Id"], "name": accts[0].get("Name")}
+
+    async def batch(self, operations: List[Dict]) -> List[Dict]:
+        """
+        Run operations through the Batch API.
+
+        Operations are sent MAX_BATCH_ITEMS per request, with requests in flight
+        concurrently up to the realm concurrency cap. An operation that fails
+        gets a response carrying a "Fault" instead of the entity; the other
+        operations in its request are unaffected.
+
+        Args:
+            operations: BatchItemRequest entries, e.g.
+                {"operation": "create", "Customer": {"DisplayName": "Acme"}};
+                a "bId" is assigned from the position if missing
+
+        Returns:
+            One BatchItemResponse per operation, in request order
+
+        Raises:
+            RuntimeError: If a batch request fails as a whole
+        """
+        operations = [{**operation, "bId": str(operation.get("bId", index))}
+                      for index, operation in enumerate(operations)]
+        chunks = [operations[i:i + MAX_BATCH_ITEMS] for i in range(0, len(operations), MAX_BATCH_ITEMS)]
+        semaphore = asyncio.Semaphore(self.rate_limiter.max_concurrent)
+
+        async def send(chunk: List[Dict]) -> List[Dict]:
+            async with semaphore:
+                res = await self.request("POST", "/batch", json_body={"BatchItemRequest": chunk})
+            by_id = {response.get("bId"): response for response in res.get("BatchItemResponse", [])}
+            return [
+                by_id.get(operation["bId"]) or {"bId": operation["bId"], "Fault": {
+                    "type": "ValidationFault", "Error": [{"Message": "No response for batch item"}]}}
+                for operation in chunk
+            ]
+
+        results = await asyncio.gather(*(send(chunk) for chunk in chunks))
+        return [response for responses in results for response in responses]
+
+    async def get_customer_by_id(self, customer_id: str) -> Optional[Dict]:
+        """
+        Get a customer's Id and DisplayName by ID.
+
+        Args:
+            customer_id: QuickBooks customer ID
+
+        Returns:
+            Customer data or None if not found
+        """
+        safe_id = customer_id.replace("'", "''")
+        res = await self.query(f"select Id, DisplayName from Customer where Id = '{safe_id}'")
+        customers = res.get("QueryResponse", {}).get("Customer", [])
+        if isinstance(customers, dict):
+            return customers
+        return customers[0] if customers else None
+
+    async def get_all_items(self, raise_errors: bool = False) -> List[Dict]:
+        """
+        Get all items from QuickBooks with their SKUs.
+
+        Args:
+            raise_errors: Raise if the fetch fails instead of returning an empty list
+
+        Returns:
+            List of item dictionaries (Id, Name, Sku, Type, Description)
+        """
+        try:
+            return await self.query_all("Item", columns=["Id", "Name", "Sku", "Type", "Description"])
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Error fetching items: {e}")
+            return []
+
+    async def find_invoice_by_docnumber(self, docnumber: str) -> Optional[Dict]:
+        """
+        Find an invoice by document number.
+
+        Args:
+            docnumber: Invoice document number
+
+        Returns:
+            Invoice data or None if not found
+        """
+        safe_doc = docnumber.replace("'", "''")
+        q = f"select Id, DocNumber, TxnDate, TotalAmt, Balance, EmailStatus from Invoice where DocNumber = '{safe_doc}'"
+        res = await self.query(q)
+        invs = res.get("QueryResponse", {}).get("Invoice", [])
+        return invs[0] if invs else None
+
+    async def invoice_number_exists(self, docnumber: str) -> bool:
+        """
+        Check if an invoice with the given document number already exists.
+
+        Args:
+            docnumber: Invoice document number to check
+
+        Returns:
+            True if invoice exists, False otherwise
+        """
+        return await self.find_invoice_by_docnumber(docnumber) is not None
+
+    async def get_invoice_status(self, invoice_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get invoice status information (EmailStatus, Balance) from QuickBooks.
+
+        Args:
+            invoice_id: QuickBooks invoice ID
+
+        Returns:
+            Dictionary with status info: {"email_status": str, "balance": float, "total_amount": float}
+            or None if invoice not found
+        """
+        safe_id = invoice_id.replace("'", "''")
+        q = f"select Id, DocNumber, EmailStatus, Balance, TotalAmt from Invoice where Id = '{safe_id}'"
+        try:
+            res = await self.query(q)
+            invs = res.get("QueryResponse", {}).get("Invoice", [])
+            if not invs:
+                return None
+
+            invoice = invs[0] if isinstance(invs, list) else invs
+            return {
+                "email_status": invoice.get("EmailStatus"),
+                "balance": float(invoice.get("Balance", 0)),
+                "total_amount": float(invoice.get("TotalAmt", 0))
+            }
+        except Exception as e:
+            print(f"Error getting invoice status: {e}")
+            return None
+
+    async def find_last_invoice_for_customer(self, customer_id: str) -> Optional[Dict]:
+        """
+        Find the most recent invoice for a customer, ordered by creation date.
+
+        Args:
+            customer_id: QuickBooks customer ID
+
+        Returns:
+            Most recent invoice data or None if no invoices found
+        """
+        safe_id = customer_id.replace("'", "''")
+        q = f"select Id, DocNumber, TxnDate, TotalAmt from Invoice where CustomerRef = '{safe_id}' orderby TxnDate desc maxresults 1"
+        try:
+            res = await self.query(q)
+            invs = res.get("QueryResponse", {}).get("Invoice", [])
+            if isinstance(invs, dict):
+                return invs
+            return invs[0] if invs else None
+        except Exception as e:
+            print(f"Error finding last invoice: {e}")
+            return None
+
+    def build_invoice_body(self, customer_ref: Dict, doc_number: str, invoice_date: str,
+                           due_date: str, term_ref: Dict, line_objects: List[Dict]) -> Dict:
+        """
+        Build an invoice request body (see quickbooks_client.build_invoice_body).
+        """
+        return build_invoice_body(customer_ref, doc_number, invoice_date, due_date, term_ref, line_objects)
+
+    async def create_invoice(self, invoice_body: Dict) -> Dict:
+        """
+        Create an invoice.
+
+        Same duplicate protection as QuickBooksClient.create_invoice: after a 5xx or
+        a network error the DocNumber is looked up instead of re-posting.
+
+        Args:
+            invoice_body: Invoice request body
+
+        Returns:
+            Created invoice data
+
+        Raises:
+            RuntimeError: If the create fails and no invoice with the DocNumber exists
+        """
+        import httpx
+
+        try:
+            res = await self.request("POST", "/invoice", json_body=invoice_body)
+        except (QBOAPIError, httpx.TransportError) as e:
+            if not create_may_have_applied(e) or not invoice_body.get("DocNumber"):
+                raise
+            existing = await self.find_invoice_by_docnumber(invoice_body["DocNumber"])
+            if existing:
+                return existing
+            raise
+        return res["Invoice"]
+
+    async def aclose(self) -> None:
+        """Close the underlying httpx client if it was supplied by the caller."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+    async def __aenter__(self) -> 'AsyncQuickBooksClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
@@ -7,18 +7,111 @@ Handles OAuth2 authentication, email search, and attachment download.
 import os
 import base64
 import re
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+# google-auth, google-auth-oauthlib and googleapiclient (including its errors module)
+# are imported on first use; together they add a few hundred ms to API startup
+from beanscounter.core.metrics import timed
 
 
 # Gmail API scopes
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+# Maximum sub-requests per Gmail batch HTTP request
+GMAIL_BATCH_SIZE = 100
+
+# Statuses for batched sub-requests that are retried in a follow-up batch
+RETRYABLE_BATCH_STATUSES = {429, 500, 503}
+
+# Maximum message IDs per messages().list page
+GMAIL_LIST_PAGE_SIZE = 500
+
+# Headers requested for format='metadata' pre-filtering (enough to resolve the sender from headers)
+METADATA_HEADERS = ["From", "Subject", "Date", "X-Original-From", "X-Forwarded-From", "Reply-To"]
+
+# Maximum characters of text/plain body decoded for sender scanning; forwarded
+# headers sit at the top of the body, so the rest is never needed
+MAX_BODY_SCAN_CHARS = 64 * 1024
+
+_EMAIL = r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}'
+_EMAIL_RE = re.compile(r'\b' + _EMAIL + r'\b')
+_EMAIL_DOMAIN_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@([A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\b')
+
+# Forwarded-sender patterns in the email body, in priority order. Each pattern is
+# paired with lower-case literals it cannot match without, so patterns whose
+# literals are absent are skipped instead of scanning the whole body.
+_FORWARDED_SENDER_PATTERNS = [(literals, re.compile(pattern, re.IGNORECASE | re.MULTILINE | re.DOTALL))
+                              for literals, pattern in [
+    # Pattern 1: "---------- Forwarded message ---------\nFrom: Name <email@domain.com>"
+    # Example: "---------- Forwarded message ---------\nFrom: Bermet Zumabaeva <bermet.zumabaeva@goodeggs.com>"
+    (('forwarded', 'from:'), r'-{3,}\s*Forwarded\s+message\s*-{3,}[\s\S]*?From:\s*(?:[^<\n]+<)?(' + _EMAIL + r')'),
+    
+    # Pattern 2: "On [date], [name] (email@domain.com) <other@domain.com> wrote:"
+    # Example: "On Tue, Nov 18, 2025 at 11:52 AM Chanae Jones (chanae@elevategourmetbrands.com) <system@sent-via.netsuite.com> wrote:"
+    # This pattern captures the email in parentheses, which is usually the actual sender
+    (('wrote:',), r'On\s+[^,]+,\s+[^(]+\((' + _EMAIL + r')\)\s*<[^>]+>\s+wrote:'),
+    
+    # Pattern 3: "On [date], [name] <email@domain.com> wrote:"
+    # Example: "On Wed, Nov 26, 2025 at 11:26 AM Lee, Denise <Denise.Lee4@ucsf.edu> wrote:"
+    (('wrote:',), r'On\s+[^,]+,\s+[^<]+<(' + _EMAIL + r')>\s+wrote:'),
+    
+    # Pattern 4: "Original Message" or "Begin forwarded message" followed by From:
+    (('message', 'from:'), r'(?:Original\s+Message|Begin\s+forwarded\s+message)[\s\S]*?From:\s*(?:[^<\n]+<)?(' + _EMAIL + r')'),
+    
+    # Pattern 5: "-----Original Message-----" pattern
+    (('original', 'from:'), r'-{3,}Original\s+Message-{3,}[\s\S]*?From:\s*(?:[^<\n]+<)?(' + _EMAIL + r')'),
+    
+    # Pattern 6: "From: email@domain.com" (standalone, at start of line or after whitespace)
+    (('from:',), r'(?:^|\n)\s*From:\s*(?:[^<\n]+<)?(' + _EMAIL + r')'),
+    
+    # Pattern 7: "On [date], [name] <email@domain.com> wrote:" (simpler, more flexible version)
+    (('wrote:',), r'On\s+.*?<(' + _EMAIL + r')>\s+wrote:'),
+    
+    # Pattern 8: "Sent from" or "Sent by"
+    (('sent',), r'Sent\s+(?:from|by):\s*(' + _EMAIL + r')'),
+]]
+
+# "Name (email@domain.com)" - last resort, only near the top of the body
+_PAREN_EMAIL_RE = re.compile(r'\((' + _EMAIL + r')\)', re.IGNORECASE)
+_PAREN_SCAN_CHARS = 2000
+_SYSTEM_ADDRESS_MARKERS = ('noreply', 'no-reply', 'donotreply', 'system@', 'sent-via')
+
+_SNIPPET_FROM_RE = re.compile(r'From:\s*(' + _EMAIL + r')', re.IGNORECASE)
+
+# PO number patterns in subject/snippet, in priority order
+# Common patterns: PO-123, PO #123, Purchase Order 123, P.O. 123
+_PO_NUMBER_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'PO[#\s-]?(\d+)',
+    r'Purchase\s+Order[#\s-]?(\d+)',
+    r'P\.O\.\s*[#\s-]?(\d+)',
+    r'PO\s*Number[#\s:]?\s*(\d+)',
+    r'PO\s*:\s*(\d+)',
+]]
+
+
+def _decode_base64url_prefix(data: str, max_bytes: Optional[int]) -> bytes:
+    """Decode base64url data, or only enough of it to yield max_bytes."""
+    if max_bytes is not None:
+        # Every 4 base64 characters decode to 3 bytes
+        prefix_len = ((max_bytes + 2) // 3) * 4
+        if prefix_len < len(data):
+            return base64.urlsafe_b64decode(data[:prefix_len])
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _is_forwarder_address(address: str, forwarding_domain: Optional[str]) -> bool:
+    """Check if an address belongs to the forwarding side and must be skipped."""
+    address = address.lower()
+    if forwarding_domain:
+        return forwarding_domain in address
+    return "indianbento.com" in address
+
+
+class HistoryExpiredError(Exception):
+    """Raised when a Gmail historyId is too old for the History API (HTTP 404)."""
+
 
 class GmailClient:
     """
@@ -50,9 +143,12 @@ class GmailClient:
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri or os.getenv("GMAIL_REDIRECT_URI", "http://localhost:5173/gmail/callback")
         self._service = None
+        self._local = threading.local()
+        self._credentials_lock = threading.Lock()
         self._credentials = None
         
         if access_token and refresh_token:
+            from google.oauth2.credentials import Credentials
             self._credentials = Credentials(
                 token=access_token,
                 refresh_token=refresh_token,
@@ -64,18 +160,37 @@ class GmailClient:
     
     @property
     def service(self):
-        """Get Gmail API service, refreshing token if needed."""
-        if self._service is None:
-            if self._credentials is None:
-                raise RuntimeError("Gmail credentials not initialized. Please authenticate first.")
-            
-            # Refresh token if expired
-            if self._credentials.expired and self._credentials.refresh_token:
-                self._credentials.refresh(Request())
+        """
+        Get Gmail API service, refreshing token if needed.
+        
+        googleapiclient services are not thread-safe, so each thread gets its own
+        service object sharing the same credentials.
+        """
+        if self._service is not None:
+            return self._service
+        
+        service = getattr(self._local, "service", None)
+        if service is None:
+            with self._credentials_lock:
+                if self._credentials is None:
+                    raise RuntimeError("Gmail credentials not initialized. Please authenticate first.")
+                
+                # Refresh token if expired
+                if self._credentials.expired and self._credentials.refresh_token:
+                    from google.auth.transport.requests import Request
+                    self._credentials.refresh(Request())
             
-            self._service = build('gmail', 'v1', credentials=self._credentials)
+            from googleapiclient.discovery import build
+            service = build('gmail', 'v1', credentials=self._credentials)
+            self._local.service = service
         
-        return self._service
+        return service
+    
+    @staticmethod
+    def _execute(request: Any, call: str) -> Any:
+        """Execute a Gmail API request, recording its latency as a gmail phase."""
+        with timed("gmail", call=call):
+            return request.execute()
     
     @staticmethod
     def get_authorization_url(client_id: str, client_secret: str, redirect_uri: str) -> str:
@@ -90,6 +205,7 @@ class GmailClient:
         Returns:
             Authorization URL
         """
+        from google_auth_oauthlib.flow import Flow
         flow = Flow.from_client_config(
             {
                 "web": {
@@ -127,6 +243,7 @@ class GmailClient:
         Returns:
             Dictionary with access_token and refresh_token
         """
+        from google_auth_oauthlib.flow import Flow
         flow = Flow.from_client_config(
             {
                 "web": {
@@ -156,8 +273,9 @@ class GmailClient:
         Returns:
             User profile dictionary or None if failed
         """
+        from googleapiclient.errors import HttpError
         try:
-            profile = self.service.users().getProfile(userId='me').execute()
+            profile = self._execute(self.service.users().getProfile(userId='me'), "profile")
             return profile
         except HttpError as e:
             print(f"Error getting user profile: {e}")
@@ -174,29 +292,109 @@ class GmailClient:
         Returns:
             List of email IDs
         """
-        try:
-            # Build search query
-            date_str = start_date.strftime('%Y/%m/%d')
-            
-            if query:
-                # If custom query provided, use it and add date filter
-                search_query = f'{query} after:{date_str}'
-            else:
-                # Default: search for PDF attachments
-                search_query = f'has:attachment filename:pdf after:{date_str}'
-            
-            # Search for messages
-            results = self.service.users().messages().list(
-                userId='me',
-                q=search_query,
-                maxResults=500
-            ).execute()
+        return list(self.iter_email_ids(start_date, query=query))
+    
+    def iter_email_ids(self, start_date: datetime, query: str = None,
+                       page_size: int = GMAIL_LIST_PAGE_SIZE) -> Iterator[str]:
+        """
+        Yield IDs of emails matching criteria, following nextPageToken lazily.
+        
+        Args:
+            start_date: Start date for email search
+            query: Additional Gmail search query (optional)
+            page_size: Message IDs per list call (max 500)
             
-            messages = results.get('messages', [])
-            return [msg['id'] for msg in messages]
-        except HttpError as e:
-            print(f"Error searching emails: {e}")
-            return []
+        Yields:
+            Email IDs, newest first
+        """
+        from googleapiclient.errors import HttpError
+        # Build search query
+        date_str = start_date.strftime('%Y/%m/%d')
+        
+        if query:
+            # If custom query provided, use it and add date filter
+            search_query = f'{query} after:{date_str}'
+        else:
+            # Default: search for PDF attachments
+            search_query = f'has:attachment filename:pdf after:{date_str}'
+        
+        page_token = None
+        while True:
+            try:
+                # Search for messages
+                results = self._execute(self.service.users().messages().list(
+                    userId='me',
+                    q=search_query,
+                    maxResults=page_size,
+                    pageToken=page_token
+                ), "messages_list")
+            except HttpError as e:
+                print(f"Error searching emails: {e}")
+                return
+            
+            for msg in results.get('messages', []):
+                yield msg['id']
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return
+    
+    def get_current_history_id(self) -> Optional[str]:
+        """
+        Get the mailbox's current historyId.
+        
+        Returns:
+            historyId string or None if the profile could not be read
+        """
+        profile = self.get_user_profile()
+        return str(profile["historyId"]) if profile and profile.get("historyId") else None
+    
+    def list_added_message_ids(self, start_history_id: str, label_id: str = "INBOX") -> Tuple[List[str], str]:
+        """
+        List messages added to a label since a historyId using the History API.
+        
+        Args:
+            start_history_id: historyId saved by the previous sync
+            label_id: Only report messages added with this label
+            
+        Returns:
+            Tuple of (added message IDs in the order they were added, latest historyId)
+            
+        Raises:
+            HistoryExpiredError: If start_history_id is no longer available
+            HttpError: For other Gmail API errors
+        """
+        from googleapiclient.errors import HttpError
+        message_ids = []
+        seen = set()
+        latest_history_id = start_history_id
+        page_token = None
+        while True:
+            try:
+                results = self._execute(self.service.users().history().list(
+                    userId='me',
+                    startHistoryId=start_history_id,
+                    historyTypes=['messageAdded'],
+                    labelId=label_id,
+                    maxResults=GMAIL_LIST_PAGE_SIZE,
+                    pageToken=page_token
+                ), "history_list")
+            except HttpError as e:
+                if getattr(e, "resp", None) is not None and e.resp.status == 404:
+                    raise HistoryExpiredError(f"historyId {start_history_id} has expired") from e
+                raise
+            
+            for record in results.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    message_id = added.get('message', {}).get('id')
+                    if message_id and message_id not in seen:
+                        seen.add(message_id)
+                        message_ids.append(message_id)
+            
+            latest_history_id = str(results.get('historyId', latest_history_id))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return message_ids, latest_history_id
     
     def get_email_details(self, email_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -208,55 +406,120 @@ class GmailClient:
         Returns:
             Email data dictionary or None if failed
         """
+        from googleapiclient.errors import HttpError
         try:
-            message = self.service.users().messages().get(
+            message = self._execute(self.service.users().messages().get(
                 userId='me',
                 id=email_id,
                 format='full'
-            ).execute()
+            ), "messages_get")
             
             return message
         except HttpError as e:
             print(f"Error getting email details: {e}")
             return None
     
-    def get_email_body_text(self, email_data: Dict[str, Any]) -> str:
+    def get_emails_details_batch(self, email_ids: List[str], batch_size: int = GMAIL_BATCH_SIZE,
+                                 max_attempts: int = 3, format: str = 'full',
+                                 metadata_headers: Optional[List[str]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get email details for many messages using Gmail batch HTTP requests.
+        
+        Messages are fetched up to batch_size (max 100) per HTTP round trip.
+        Sub-requests that are rate limited or fail with a server error are
+        retried in a follow-up batch.
+        
+        Args:
+            email_ids: Gmail message IDs
+            batch_size: Sub-requests per batch (1-100)
+            max_attempts: Attempts per message before giving up
+            format: Message format ('full' or 'metadata')
+            metadata_headers: Headers to return when format is 'metadata' (all if None)
+            
+        Returns:
+            Dictionary mapping each email ID to its email data (None if it could not be fetched)
+        """
+        from googleapiclient.errors import HttpError
+        batch_size = max(1, min(batch_size, GMAIL_BATCH_SIZE))
+        results: Dict[str, Optional[Dict[str, Any]]] = {email_id: None for email_id in email_ids}
+        pending = list(results)
+        
+        for attempt in range(max_attempts):
+            if not pending:
+                break
+            if attempt:
+                time.sleep(2 ** attempt)
+            retry = []
+            
+            def callback(request_id, response, exception):
+                if exception is None:
+                    results[request_id] = response
+                    return
+                status = getattr(getattr(exception, "resp", None), "status", None)
+                if status in RETRYABLE_BATCH_STATUSES:
+                    retry.append(request_id)
+                else:
+                    print(f"Error getting email details for {request_id}: {exception}")
+            
+            for start in range(0, len(pending), batch_size):
+                batch = self.service.new_batch_http_request(callback=callback)
+                for email_id in pending[start:start + batch_size]:
+                    params = {"userId": 'me', "id": email_id, "format": format}
+                    if format == 'metadata' and metadata_headers:
+                        params["metadataHeaders"] = metadata_headers
+                    batch.add(self.service.users().messages().get(**params), request_id=email_id)
+                try:
+                    self._execute(batch, "messages_batch_get")
+                except HttpError as e:
+                    print(f"Error executing Gmail batch request: {e}")
+                    retry.extend(pending[start:start + batch_size])
+            pending = retry
+        
+        if pending:
+            print(f"Giving up on {len(pending)} email(s) after {max_attempts} attempts")
+        return results
+    
+    def get_email_body_text(self, email_data: Dict[str, Any], max_chars: Optional[int] = None) -> str:
         """
         Extract plain text body from email data.
         
+        Only text/plain parts are decoded. With max_chars, decoding stops once that
+        many characters are collected, so large bodies are never fully decoded.
+        
         Args:
             email_data: Email data from get_email_details()
+            max_chars: Optional cap on the returned text length
             
         Returns:
             Plain text body content
         """
-        body_text = ""
-        payload = email_data.get("payload", {})
+        chunks = []
+        remaining = max_chars
         
-        def extract_text_from_part(part):
-            """Recursively extract text from email parts."""
-            text = ""
-            mime_type = part.get("mimeType", "")
-            body = part.get("body", {})
+        # Walk parts depth-first in document order
+        stack = [email_data.get("payload", {})]
+        while stack and (remaining is None or remaining > 0):
+            part = stack.pop()
             
             # Get text/plain content
-            if mime_type == "text/plain":
-                data = body.get("data")
+            if part.get("mimeType", "") == "text/plain":
+                data = part.get("body", {}).get("data")
                 if data:
                     try:
-                        text = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+                        # UTF-8 uses at most 4 bytes per character
+                        max_bytes = remaining * 4 if remaining is not None else None
+                        text = _decode_base64url_prefix(data, max_bytes).decode('utf-8', errors='ignore')
+                        if remaining is not None:
+                            text = text[:remaining]
+                            remaining -= len(text)
+                        chunks.append(text)
                     except Exception:
                         pass
             
             # Recursively check nested parts
-            parts = part.get("parts", [])
-            for nested_part in parts:
-                text += extract_text_from_part(nested_part)
-            
-            return text
+            stack.extend(reversed(part.get("parts", [])))
         
-        # Extract from main payload
-        body_text = extract_text_from_part(payload)
+        body_text = "".join(chunks)
         
         # Fallback to snippet if no body text found
         if not body_text:
@@ -264,34 +527,30 @@ class GmailClient:
         
         return body_text
     
-    def extract_original_sender(self, email_data: Dict[str, Any]) -> Optional[str]:
-        """
-        Extract original sender email from forwarded email.
-        
-        Args:
-            email_data: Email data from get_email_details()
-            
-        Returns:
-            Original sender email address or None
-        """
-        headers = email_data.get("payload", {}).get("headers", [])
-        
-        # Build a dict from headers
+    @staticmethod
+    def _get_header_dict(email_data: Dict[str, Any]) -> Dict[str, str]:
+        """Build a lower-cased header name -> value dict from email data."""
         header_dict = {}
-        for header in headers:
+        for header in email_data.get("payload", {}).get("headers", []):
             name = header.get("name", "").lower()
             value = header.get("value", "")
             header_dict[name] = value
-        
-        # Get forwarding email domain to exclude
+        return header_dict
+    
+    @staticmethod
+    def _get_forwarding_domain(header_dict: Dict[str, str]) -> Optional[str]:
+        """Get the domain of the From header, which is excluded as the forwarder."""
         forwarding_email = header_dict.get("from", "")
-        forwarding_domain = None
         if forwarding_email:
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@([A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\b'
-            matches = re.findall(email_pattern, forwarding_email)
-            if matches:
-                forwarding_domain = matches[0].lower()
-        
+            match = _EMAIL_DOMAIN_RE.search(forwarding_email)
+            if match:
+                return match.group(1).lower()
+        return None
+    
+    @staticmethod
+    def _extract_sender_from_header_dict(header_dict: Dict[str, str],
+                                         forwarding_domain: Optional[str]) -> Optional[str]:
+        """Resolve the original sender from headers only (see extract_original_sender)."""
         sender_email = None
         
         # Priority order for headers:
@@ -315,94 +574,76 @@ class GmailClient:
         
         # Extract email address from header value
         if sender_email:
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            matches = re.findall(email_pattern, sender_email)
-            if matches:
-                extracted = matches[0]
-                # Exclude forwarding domain
-                if forwarding_domain and forwarding_domain not in extracted.lower():
-                    return extracted
-                elif not forwarding_domain and "indianbento.com" not in extracted.lower():
-                    return extracted
+            match = _EMAIL_RE.search(sender_email)
+            # Exclude forwarding domain
+            if match and not _is_forwarder_address(match.group(0), forwarding_domain):
+                return match.group(0)
+        return None
+    
+    def extract_sender_from_headers(self, email_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Resolve the original sender using headers only.
+        
+        Works on format='metadata' messages. When it returns an address,
+        extract_original_sender returns the same address for the full message;
+        None means the body is needed to decide.
+        
+        Args:
+            email_data: Email data (metadata or full)
+            
+        Returns:
+            Original sender email address or None
+        """
+        header_dict = self._get_header_dict(email_data)
+        return self._extract_sender_from_header_dict(header_dict, self._get_forwarding_domain(header_dict))
+    
+    def extract_original_sender(self, email_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Extract original sender email from forwarded email.
+        
+        Args:
+            email_data: Email data from get_email_details()
+            
+        Returns:
+            Original sender email address or None
+        """
+        header_dict = self._get_header_dict(email_data)
+        forwarding_domain = self._get_forwarding_domain(header_dict)
+        
+        extracted = self._extract_sender_from_header_dict(header_dict, forwarding_domain)
+        if extracted:
+            return extracted
         
         # Try parsing email body for forwarded email patterns
-        body_text = self.get_email_body_text(email_data)
+        body_text = self.get_email_body_text(email_data, max_chars=MAX_BODY_SCAN_CHARS)
         
         if body_text:
-            # Common forwarded email patterns - ordered by specificity and reliability
-            # More specific patterns first, then fallback to more general ones
-            patterns = [
-                # Pattern 1: "---------- Forwarded message ---------\nFrom: Name <email@domain.com>"
-                # Example: "---------- Forwarded message ---------\nFrom: Bermet Zumabaeva <bermet.zumabaeva@goodeggs.com>"
-                r'-{3,}\s*Forwarded\s+message\s*-{3,}[\s\S]*?From:\s*(?:[^<\n]+<)?([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})',
-                
-                # Pattern 2: "On [date], [name] (email@domain.com) <other@domain.com> wrote:"
-                # Example: "On Tue, Nov 18, 2025 at 11:52 AM Chanae Jones (chanae@elevategourmetbrands.com) <system@sent-via.netsuite.com> wrote:"
-                # This pattern captures the email in parentheses, which is usually the actual sender
-                r'On\s+[^,]+,\s+[^(]+\(([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\)\s*<[^>]+>\s+wrote:',
-                
-                # Pattern 3: "On [date], [name] <email@domain.com> wrote:"
-                # Example: "On Wed, Nov 26, 2025 at 11:26 AM Lee, Denise <Denise.Lee4@ucsf.edu> wrote:"
-                r'On\s+[^,]+,\s+[^<]+<([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})>\s+wrote:',
-                
-                # Pattern 4: "Original Message" or "Begin forwarded message" followed by From:
-                r'(?:Original\s+Message|Begin\s+forwarded\s+message)[\s\S]*?From:\s*(?:[^<\n]+<)?([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})',
-                
-                # Pattern 5: "-----Original Message-----" pattern
-                r'-{3,}Original\s+Message-{3,}[\s\S]*?From:\s*(?:[^<\n]+<)?([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})',
-                
-                # Pattern 6: "From: email@domain.com" (standalone, at start of line or after whitespace)
-                r'(?:^|\n)\s*From:\s*(?:[^<\n]+<)?([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})',
-                
-                # Pattern 7: "On [date], [name] <email@domain.com> wrote:" (simpler, more flexible version)
-                r'On\s+.*?<([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})>\s+wrote:',
-                
-                # Pattern 8: "Sent from" or "Sent by"
-                r'Sent\s+(?:from|by):\s*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})',
-            ]
-            
-            # Try each pattern in order
-            for pattern in patterns:
-                matches = re.findall(pattern, body_text, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-                if matches:
-                    # Check all matches to find one that's not from forwarding domain
-                    for extracted in matches:
-                        # Exclude forwarding domain
-                        if forwarding_domain and forwarding_domain not in extracted.lower():
-                            return extracted
-                        elif not forwarding_domain and "indianbento.com" not in extracted.lower():
-                            return extracted
+            # Patterns are tried in priority order; the first non-forwarder match wins
+            body_lower = body_text.lower()
+            for literals, pattern in _FORWARDED_SENDER_PATTERNS:
+                if not all(literal in body_lower for literal in literals):
+                    continue
+                for match in pattern.finditer(body_text):
+                    if not _is_forwarder_address(match.group(1), forwarding_domain):
+                        return match.group(1)
             
             # Fallback: Look for email addresses in parentheses after names (common in email threads)
-            # This is a more general pattern, so we use it as a last resort
-            # Example: "Name (email@domain.com)" - but only if it appears early in the body
-            # (first 2000 characters to avoid false matches in signatures)
-            body_preview = body_text[:2000]
-            paren_pattern = r'\(([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\)'
-            paren_matches = re.findall(paren_pattern, body_preview, re.IGNORECASE)
-            if paren_matches:
-                for extracted in paren_matches:
-                    # Exclude forwarding domain and common system addresses
-                    if forwarding_domain and forwarding_domain not in extracted.lower():
-                        # Also exclude common system/notification addresses
-                        if not any(sys_domain in extracted.lower() for sys_domain in ['noreply', 'no-reply', 'donotreply', 'system@', 'sent-via']):
-                            return extracted
-                    elif not forwarding_domain and "indianbento.com" not in extracted.lower():
-                        if not any(sys_domain in extracted.lower() for sys_domain in ['noreply', 'no-reply', 'donotreply', 'system@', 'sent-via']):
-                            return extracted
+            # Only the top of the body is used to avoid false matches in signatures
+            for match in _PAREN_EMAIL_RE.finditer(body_text, 0, _PAREN_SCAN_CHARS):
+                extracted = match.group(1)
+                if _is_forwarder_address(extracted, forwarding_domain):
+                    continue
+                # Also exclude common system/notification addresses
+                if not any(marker in extracted.lower() for marker in _SYSTEM_ADDRESS_MARKERS):
+                    return extracted
         
         # Fallback: try snippet
         snippet = email_data.get("snippet", "")
         if snippet:
-            from_pattern = r'From:\s*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})'
-            matches = re.findall(from_pattern, snippet, re.IGNORECASE)
-            if matches:
-                extracted = matches[0]
-                # Exclude forwarding domain
-                if forwarding_domain and forwarding_domain not in extracted.lower():
-                    return extracted
-                elif not forwarding_domain and "indianbento.com" not in extracted.lower():
-                    return extracted
+            match = _SNIPPET_FROM_RE.search(snippet)
+            # Exclude forwarding domain
+            if match and not _is_forwarder_address(match.group(1), forwarding_domain):
+                return match.group(1)
         
         return None
     
@@ -452,18 +693,21 @@ class GmailClient:
             "attachment_names": attachment_names
         }
     
-    def get_pdf_attachments(self, email_id: str) -> List[Dict[str, Any]]:
+    def get_pdf_attachments(self, email_id: str, email_data: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Get all PDF attachments from an email.
         
         Args:
             email_id: Gmail message ID
+            email_data: Already fetched email data (optional, avoids fetching the message again)
             
         Returns:
             List of attachment dictionaries with id, filename, size
         """
+        from googleapiclient.errors import HttpError
         try:
-            email_data = self.get_email_details(email_id)
+            if email_data is None:
+                email_data = self.get_email_details(email_id)
             if not email_data:
                 return []
             
@@ -508,12 +752,13 @@ class GmailClient:
         Returns:
             Attachment data as bytes or None if failed
         """
+        from googleapiclient.errors import HttpError
         try:
-            attachment = self.service.users().messages().attachments().get(
+            attachment = self._execute(self.service.users().messages().attachments().get(
                 userId='me',
                 messageId=email_id,
                 id=attachment_id
-            ).execute()
+            ), "attachments_get")
             
             file_data = base64.urlsafe_b64decode(attachment['data'])
             return file_data
@@ -542,22 +787,13 @@ class GmailClient:
         # Get body snippet
         snippet = email_data.get("snippet", "")
         
-        # Search for PO number patterns
-        # Common patterns: PO-123, PO #123, Purchase Order 123, P.O. 123
-        po_patterns = [
-            r'PO[#\s-]?(\d+)',
-            r'Purchase\s+Order[#\s-]?(\d+)',
-            r'P\.O\.\s*[#\s-]?(\d+)',
-            r'PO\s*Number[#\s:]?\s*(\d+)',
-            r'PO\s*:\s*(\d+)',
-        ]
-        
         text_to_search = f"{subject} {snippet}"
         
-        for pattern in po_patterns:
-            matches = re.findall(pattern, text_to_search, re.IGNORECASE)
-            if matches:
-                return matches[0]
+        # Search for PO number patterns in priority order
+        for pattern in _PO_NUMBER_PATTERNS:
+            match = pattern.search(text_to_search)
+            if match:
+                return match.group(1)
         
         return None
 
@@ -0,0 +1,317 @@
+"""
+QuickBooks Rate Limiter Module
+
+Client-side throttling for QuickBooks Online API calls.
+
+Intuit enforces per-realm limits (500 requests per minute and 10 concurrent
+requests per realm and app). Exceeding them returns HTTP 429. This module
+keeps every QuickBooksClient / AsyncQuickBooksClient created for the same
+realm under those limits by sharing one limiter per realm:
+
+- Token bucket sized to the per-minute limit, which halves its refill rate
+  on 429 and slowly recovers on success (AIMD)
+- Concurrency cap shared by threads and asyncio tasks
+- Exponential backoff with full jitter that honours Retry-After
+- Counters for throttled time, retries and error responses
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+# Intuit per-realm limits
+INTUIT_REQUESTS_PER_MINUTE = 500
+INTUIT_MAX_CONCURRENT_REQUESTS = 10
+
+# Status codes that are always safe to retry: a throttled request was not processed
+RETRYABLE_STATUSES = {429}
+
+# Server errors retried only for idempotent calls: a POST that timed out at the
+# gateway may already have been applied, so repeating it could create a duplicate
+IDEMPOTENT_RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honouring Retry-After."""
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        """
+        Args:
+            max_retries: Maximum number of retries after the first attempt
+            base_delay: Backoff base in seconds
+            max_delay: Upper bound for a single backoff in seconds
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, status_code: int, attempt: int, idempotent: bool = True) -> bool:
+        """
+        Check if a response status should be retried.
+
+        Args:
+            status_code: HTTP status code
+            attempt: Number of retries already performed
+            idempotent: Whether the call can be safely repeated after a 5xx
+
+        Returns:
+            True if the call should be retried
+        """
+        if attempt >= self.max_retries:
+            return False
+        if status_code in RETRYABLE_STATUSES:
+            return True
+        return idempotent and status_code in IDEMPOTENT_RETRYABLE_STATUSES
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Compute how long to wait before the next retry.
+
+        Args:
+            attempt: Number of retries already performed (0 for the first retry)
+            retry_after: Value of the Retry-After header, if any
+
+        Returns:
+            Delay in seconds
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP date).
+
+    Args:
+        value: Header value
+
+    Returns:
+        Delay in seconds or None if missing/unparseable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RealmRateLimiter:
+    """
+    Token bucket plus concurrency cap for a single QuickBooks realm.
+
+    Safe to share between threads and asyncio tasks.
+    """
+
+    def __init__(self, requests_per_minute: int = INTUIT_REQUESTS_PER_MINUTE,
+                 max_concurrent: int = INTUIT_MAX_CONCURRENT_REQUESTS):
+        """
+        Args:
+            requests_per_minute: Sustained request rate
+            max_concurrent: Maximum in-flight requests
+        """
+        self.max_rate = requests_per_minute / 60.0
+        self.min_rate = self.max_rate / 16
+        self.rate = self.max_rate
+        self.capacity = float(max_concurrent)
+        self.max_concurrent = max_concurrent
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        # Per event loop gate in front of _slots, so waiting tasks sleep on the loop
+        # and at most max_concurrent of them wait on _slots from worker threads
+        self._loop_gates: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._metrics = {
+            "requests": 0,
+            "throttled_requests": 0,
+            "throttled_seconds": 0.0,
+            "retries": 0,
+            "backoff_seconds": 0.0,
+            "responses_429": 0,
+            "responses_5xx": 0,
+        }
+
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+            return max(wait, self._paused_until - now)
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self._metrics["requests"] += 1
+            if waited > 0.001:
+                self._metrics["throttled_requests"] += 1
+                self._metrics["throttled_seconds"] += waited
+
+    @contextmanager
+    def slot(self):
+        """
+        Block until a request may be sent (for synchronous callers).
+
+        A concurrency slot is taken first and the rate token only once it is held,
+        so time spent waiting for a slot is not also charged against the rate.
+        """
+        start = time.monotonic()
+        self._slots.acquire()
+        try:
+            wait = self._reserve()
+            if wait > 0:
+                time.sleep(wait)
+            self._record_wait(time.monotonic() - start)
+            yield
+        finally:
+            self._slots.release()
+
+    def _loop_gate(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            gate = self._loop_gates.get(loop)
+            if gate is None:
+                gate = self._loop_gates[loop] = asyncio.Semaphore(self.max_concurrent)
+            return gate
+
+    async def _acquire_slot_async(self) -> None:
+        """Take a shared concurrency slot without blocking the event loop."""
+        if self._slots.acquire(blocking=False):
+            return
+        # Slots held by other threads or loops: wait on a worker thread
+        acquire = asyncio.ensure_future(asyncio.to_thread(self._slots.acquire))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # Hand the slot back once the abandoned acquire completes
+            acquire.add_done_callback(
+                lambda f: self._slots.release() if not f.cancelled() and f.exception() is None else None
+            )
+            raise
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """
+        Wait until a request may be sent (for asyncio callers).
+
+        Tasks queue on a per-loop asyncio.Semaphore, then take the slot shared with
+        threads and other loops, then the rate token (see slot()).
+        """
+        start = time.monotonic()
+        async with self._loop_gate():
+            await self._acquire_slot_async()
+            try:
+                wait = self._reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._record_wait(time.monotonic() - start)
+                yield
+            finally:
+                self._slots.release()
+
+    def on_response(self, status_code: int) -> None:
+        """
+        Adapt the send rate to a response.
+
+        Throttling responses halve the rate; successes recover it gradually.
+
+        Args:
+            status_code: HTTP status code of the response
+        """
+        with self._lock:
+            if status_code == 429:
+                self._metrics["responses_429"] += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+            elif status_code >= 500:
+                self._metrics["responses_5xx"] += 1
+            elif status_code < 400 and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+
+    def on_retry(self, delay: float) -> None:
+        """
+        Record a retry and pause all callers for the realm for the backoff delay.
+
+        Args:
+            delay: Backoff delay in seconds
+        """
+        with self._lock:
+            self._metrics["retries"] += 1
+            self._metrics["backoff_seconds"] += delay
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of the limiter counters.
+
+        Returns:
+            Dictionary of counters plus the current requests-per-minute rate
+        """
+        with self._lock:
+            snapshot = dict(self._metrics)
+            snapshot["throttled_seconds"] = round(snapshot["throttled_seconds"], 3)
+            snapshot["backoff_seconds"] = round(snapshot["backoff_seconds"], 3)
+            snapshot["current_requests_per_minute"] = round(self.rate * 60, 1)
+            snapshot["max_concurrent"] = self.max_concurrent
+            return snapshot
+
+
+_limiters: Dict[str, RealmRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(realm_id: str) -> RealmRateLimiter:
+    """
+    Get the shared limiter for a realm, creating it on first use.
+
+    Limits can be tuned with QBO_REQUESTS_PER_MINUTE and QBO_MAX_CONCURRENT_REQUESTS.
+
+    Args:
+        realm_id: QuickBooks company ID
+
+    Returns:
+        RealmRateLimiter instance
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(realm_id)
+        if limiter is None:
+            limiter = RealmRateLimiter(
+                requests_per_minute=int(os.getenv("QBO_REQUESTS_PER_MINUTE", INTUIT_REQUESTS_PER_MINUTE)),
+                max_concurrent=int(os.getenv("QBO_MAX_CONCURRENT_REQUESTS", INTUIT_MAX_CONCURRENT_REQUESTS)),
+            )
+            _limiters[realm_id] = limiter
+        return limiter
+
+
+def get_rate_limit_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Get limiter counters for every realm seen by this process.
+
+    Returns:
+        Dictionary mapping realm ID to its metrics snapshot
+    """
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {realm_id: limiter.metrics() for realm_id, limiter in limiters.items()}
@@ -6,14 +6,199 @@ Handles authentication, API requests, and entity management.
 """
 
 import os
+import re
 import time
 import base64
-import requests
-from typing import Dict, Any, List, Optional
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+from beanscounter.core.metrics import timed
+from beanscounter.integrations.qb_rate_limiter import RetryPolicy, get_rate_limiter
+
+if TYPE_CHECKING:  # requests is imported on first use to keep API startup fast
+    import requests
 
 # Safe modern minorversion for QBO API
 MINOR_VERSION = "70"
 
+# QuickBooks max rows per query page
+QUERY_PAGE_SIZE = 1000
+
+# Values per "in (...)" clause, keeping query strings well under URL/body limits
+IN_CLAUSE_BATCH_SIZE = 100
+
+# QuickBooks max operations per /batch request
+MAX_BATCH_ITEMS = 30
+
+TOKEN_URL = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
+
+
+def api_base_url(environment: str) -> str:
+    """
+    Get the QuickBooks API base URL.
+    
+    QBO_BASE_URL overrides the Intuit host (e.g. to point at a local stub server).
+    
+    Args:
+        environment: "production" or "sandbox"
+        
+    Returns:
+        Base URL without a trailing slash
+    """
+    override = os.getenv("QBO_BASE_URL")
+    if override:
+        return override.rstrip("/")
+    if environment == "sandbox":
+        return "https://sandbox-quickbooks.api.intuit.com"
+    return "https://quickbooks.api.intuit.com"
+
+
+def token_url() -> str:
+    """Get the OAuth2 token endpoint; QBO_TOKEN_URL overrides the Intuit default."""
+    return os.getenv("QBO_TOKEN_URL") or TOKEN_URL
+
+
+def build_select(entity: str, columns: Optional[List[str]] = None, where: Optional[str] = None,
+                 order_by: Optional[str] = None) -> str:
+    """
+    Build a QuickBooks select statement without pagination clauses.
+    
+    Args:
+        entity: Entity name (e.g., "Item")
+        columns: Columns to select (all columns if None)
+        where: Optional where clause (without the "where" keyword)
+        order_by: Optional column to order by; added to the selected columns if missing
+        
+    Returns:
+        Query string
+    """
+    if columns:
+        cols = list(columns)
+        if order_by and order_by not in cols:
+            cols.append(order_by)
+        select = ", ".join(cols)
+    else:
+        select = "*"
+    q = f"select {select} from {entity}"
+    if where:
+        q += f" where {where}"
+    if order_by:
+        q += f" orderby {order_by}"
+    return q
+
+
+def build_in_clause(column: str, values: List[str]) -> str:
+    """
+    Build a where clause matching any of the given values.
+    
+    Args:
+        column: Column name (e.g., "Id")
+        values: Values to match; single quotes are escaped
+        
+    Returns:
+        Where clause (without the "where" keyword)
+    """
+    quoted = ", ".join("'" + str(v).replace("'", "''") + "'" for v in values)
+    return f"{column} in ({quoted})"
+
+
+_QUERY_ENTITY_RE = re.compile(r'\bfrom\s+(\w+)', re.IGNORECASE)
+_COUNT_RE = re.compile(r'\bcount\(\s*\*\s*\)', re.IGNORECASE)
+
+
+def query_call_name(query_str: str) -> str:
+    """
+    Name a query for timing metrics.
+    
+    Args:
+        query_str: QuickBooks query string
+        
+    Returns:
+        Name such as "query_invoice" or "count_customer"
+    """
+    match = _QUERY_ENTITY_RE.search(query_str)
+    entity = match.group(1).lower() if match else "unknown"
+    return f"{'count' if _COUNT_RE.search(query_str) else 'query'}_{entity}"
+
+
+def request_call_name(method: str, path: str) -> str:
+    """
+    Name an API request for timing metrics, e.g. "post_invoice" for POST /invoice.
+    
+    Args:
+        method: HTTP method
+        path: API endpoint path
+        
+    Returns:
+        Lower-case method and first path segment
+    """
+    segment = path.strip("/").split("/")[0] or "root"
+    return f"{method.lower()}_{segment.lower()}"
+
+
+def create_may_have_applied(error: Exception) -> bool:
+    """Whether a failed create may still have been applied (a 5xx or a network error, not a 4xx)."""
+    return not isinstance(error, QBOAPIError) or error.status_code >= 500
+
+
+class QBOAPIError(RuntimeError):
+    """Error response from the QuickBooks API."""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"QBO API error {status_code}: {text}")
+        self.status_code = status_code
+
+
+def query_rows(res: Dict, entity: str) -> List[Dict]:
+    """
+    Get entity rows from a query response, normalizing a single dict to a list.
+    
+    Args:
+        res: Query response JSON
+        entity: Entity name (e.g., "Item")
+        
+    Returns:
+        List of entity rows
+    """
+    rows = res.get("QueryResponse", {}).get(entity, [])
+    if isinstance(rows, dict):
+        return [rows]
+    return rows if isinstance(rows, list) else []
+
+
+def build_invoice_body(customer_ref: Dict, doc_number: str, invoice_date: str,
+                       due_date: str, term_ref: Dict, line_objects: List[Dict]) -> Dict:
+    """
+    Build an invoice request body.
+    
+    Args:
+        customer_ref: Customer reference object
+        doc_number: Invoice document number
+        invoice_date: Invoice date (YYYY-MM-DD)
+        due_date: Due date (YYYY-MM-DD)
+        term_ref: Term reference object
+        line_objects: List of line item objects
+        
+    Returns:
+        Invoice request body
+    """
+    body = {
+        "CustomerRef": {"value": customer_ref["value"], "name": customer_ref.get("name")},
+        "DocNumber": doc_number,     # QBO enforces uniqueness
+        "TxnDate": invoice_date,     # "YYYY-MM-DD"
+        "Line": line_objects,
+    }
+    if term_ref:
+        # Prefer Id if we have it; QBO will ignore unknown names
+        if "value" in term_ref:
+            body["SalesTermRef"] = {"value": term_ref["value"], "name": term_ref.get("name")}
+        else:
+            body["SalesTermRef"] = {"name": term_ref.get("name")}
+    if due_date:
+        body["DueDate"] = due_date
+    return body
+
 
 class QuickBooksClient:
     """
@@ -21,12 +206,12 @@ class QuickBooksClient:
     
     Handles:
     - Authentication via OAuth2 refresh tokens
-    - API requests with error handling and rate limiting
+    - API requests with error handling, client-side rate limiting and retries
     - Entity lookups and creation (customers, items, terms, invoices)
     """
     
     def __init__(self, client_id: str, client_secret: str, refresh_token: str, realm_id: str, 
-                 environment: str = "production"):
+                 environment: str = "production", retry_policy: Optional[RetryPolicy] = None):
         """
         Initialize QuickBooks client with authentication credentials.
         
@@ -36,12 +221,15 @@ class QuickBooksClient:
             refresh_token: OAuth2 refresh token
             realm_id: QuickBooks company ID
             environment: "production" or "sandbox"
+            retry_policy: Retry/backoff policy (defaults to RetryPolicy())
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.refresh_token = refresh_token
         self.realm_id = realm_id
         self.environment = environment.lower().strip()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = get_rate_limiter(realm_id)
         self._access_token = None
         
     @classmethod
@@ -57,6 +245,7 @@ class QuickBooksClient:
             
         Optional env vars:
             QBO_ENV: "production" or "sandbox" (default: production)
+            QBO_BASE_URL, QBO_TOKEN_URL: Override the API and OAuth hosts
             
         Returns:
             QuickBooksClient instance
@@ -89,9 +278,7 @@ class QuickBooksClient:
     @property
     def base_url(self) -> str:
         """Get the base URL for QuickBooks API based on environment"""
-        if self.environment == "sandbox":
-            return "https://sandbox-quickbooks.api.intuit.com"
-        return "https://quickbooks.api.intuit.com"
+        return api_base_url(self.environment)
     
     @property
     def access_token(self) -> str:
@@ -118,7 +305,9 @@ class QuickBooksClient:
         Raises:
             RuntimeError: If token refresh fails
         """
-        url = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
+        import requests
+
+        url = token_url()
         auth = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
         headers = {
             "Authorization": f"Basic {auth}",
@@ -130,7 +319,8 @@ class QuickBooksClient:
             "refresh_token": self.refresh_token
         }
         try:
-            r = requests.post(url, headers=headers, data=data, timeout=30)
+            with timed("quickbooks", call="token"):
+                r = requests.post(url, headers=headers, data=data, timeout=30)
             if r.status_code != 200:
                 # Try to parse error response for better error message
                 error_detail = r.text
@@ -154,9 +344,47 @@ class QuickBooksClient:
         except ValueError as e:
             raise RuntimeError(f"Invalid JSON response from OAuth server: {str(e)}")
     
+    def _send(self, method: str, url: str, idempotent: bool = True, **kwargs) -> "requests.Response":
+        """
+        Send an HTTP request under the realm rate limiter, retrying throttled
+        and transient failures with exponential backoff.
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            idempotent: Whether the call may be retried after an HTTP 5xx or a network error once
+                the request may have been sent (non-idempotent calls only retry 429 and connect timeouts)
+            **kwargs: Passed through to requests.request
+            
+        Returns:
+            Final response (may still be an error response)
+        """
+        import requests
+
+        attempt = 0
+        while True:
+            try:
+                with self.rate_limiter.slot():
+                    r = requests.request(method, url, timeout=60, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # A connect timeout means nothing was sent; anything else may have reached QuickBooks
+                sent = not isinstance(e, requests.exceptions.ConnectTimeout)
+                if (sent and not idempotent) or attempt >= self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            else:
+                self.rate_limiter.on_response(r.status_code)
+                if not self.retry_policy.should_retry(r.status_code, attempt, idempotent):
+                    return r
+                delay = self.retry_policy.delay(attempt, r.headers.get("Retry-After"))
+            self.rate_limiter.on_retry(delay)
+            time.sleep(delay)
+            attempt += 1
+    
     def request(self, method: str, path: str, params: Dict = None, json_body: Dict = None) -> Dict:
         """
-        Make a request to the QuickBooks API with automatic retry for rate limits.
+        Make a request to the QuickBooks API with automatic retry for rate limits
+        and transient server errors.
         
         Args:
             method: HTTP method (GET, POST, etc.)
@@ -168,7 +396,7 @@ class QuickBooksClient:
             Response JSON
             
         Raises:
-            RuntimeError: If API request fails
+            QBOAPIError: If QuickBooks returns an error status
         """
         url = f"{self.base_url}/v3/company/{self.realm_id}{path}"
         headers = {
@@ -180,21 +408,18 @@ class QuickBooksClient:
             params = {}
         params["minorversion"] = MINOR_VERSION
         
-        r = requests.request(method, url, headers=headers, params=params, json=json_body, timeout=60)
-        
-        # Handle rate limiting with retry
-        if r.status_code == 429:
-            time.sleep(2)
-            r = requests.request(method, url, headers=headers, params=params, json=json_body, timeout=60)
+        with timed("quickbooks", call=request_call_name(method, path)):
+            r = self._send(method, url, idempotent=method.upper() == "GET",
+                           headers=headers, params=params, json=json_body)
             
         if r.status_code >= 400:
-            raise RuntimeError(f"QBO API error {r.status_code}: {r.text}")
+            raise QBOAPIError(r.status_code, r.text)
             
         return r.json()
     
     def query(self, query_str: str) -> Dict:
         """
-        Execute a QuickBooks SQL-like query.
+        Execute a QuickBooks SQL-like query, retrying on throttling.
         
         Args:
             query_str: QuickBooks query string
@@ -213,13 +438,80 @@ class QuickBooksClient:
         }
         params = {"minorversion": MINOR_VERSION}
         
-        r = requests.post(url, headers=headers, params=params, data=query_str, timeout=60)
+        with timed("quickbooks", call=query_call_name(query_str)):
+            r = self._send("POST", url, headers=headers, params=params, data=query_str)
         
         if r.status_code >= 400:
             raise RuntimeError(f"QBO Query error {r.status_code}: {r.text}")
             
         return r.json()
     
+    def count(self, entity: str, where: Optional[str] = None) -> int:
+        """
+        Count entities matching an optional filter.
+        
+        Args:
+            entity: Entity name (e.g., "Item")
+            where: Optional where clause (without the "where" keyword)
+            
+        Returns:
+            Number of matching rows
+        """
+        q = f"select count(*) from {entity}"
+        if where:
+            q += f" where {where}"
+        res = self.query(q)
+        return int(res.get("QueryResponse", {}).get("totalCount", 0))
+    
+    def query_all(self, entity: str, columns: Optional[List[str]] = None, where: Optional[str] = None,
+                  order_by: Optional[str] = "Id", page_size: int = QUERY_PAGE_SIZE,
+                  max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Fetch every row of an entity, fetching pages concurrently.
+        
+        Issues a count(*) first, then requests all pages in parallel (bounded by
+        the realm concurrency cap) and reassembles them in order. If rows were
+        added after the count, trailing pages are fetched until a short page.
+        
+        Args:
+            entity: Entity name (e.g., "Item")
+            columns: Columns to select (all columns if None)
+            where: Optional where clause (without the "where" keyword)
+            order_by: Column giving a stable page order
+            page_size: Rows per page (QuickBooks max is 1000)
+            max_workers: Maximum concurrent page requests (defaults to the realm concurrency cap)
+            
+        Returns:
+            List of entity rows
+        """
+        base = build_select(entity, columns, where, order_by)
+        total = self.count(entity, where)
+        
+        def fetch_page(start_position: int) -> List[Dict]:
+            res = self.query(f"{base} startposition {start_position} maxresults {page_size}")
+            return query_rows(res, entity)
+        
+        starts = list(range(1, total + 1, page_size))
+        pages = []
+        if starts:
+            workers = min(len(starts), max_workers or self.rate_limiter.max_concurrent)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # Each page runs in a copy of the caller's context so its timing reaches the request's phases
+                futures = [pool.submit(contextvars.copy_context().run, fetch_page, start) for start in starts]
+                pages = [future.result() for future in futures]
+        
+        rows = [row for page in pages for row in page]
+        # Pick up rows created after the count
+        next_start = total + 1
+        while pages and len(pages[-1]) >= page_size:
+            page = fetch_page(next_start)
+            if not page:
+                break
+            rows.extend(page)
+            pages.append(page)
+            next_start += page_size
+        return rows
+    
     # ---------- Entity lookups/ensures ----------
     def find_customer_by_display_name(self, name: str) -> Optional[Dict]:
         """
@@ -283,10 +575,13 @@ class QuickBooksClient:
         items = res.get("QueryResponse", {}).get("Item", [])
         return items[0] if items else None
     
-    def get_all_items(self) -> List[Dict]:
+    def get_all_items(self, raise_errors: bool = False) -> List[Dict]:
         """
         Get all items from QuickBooks with their SKUs.
         
+        Args:
+            raise_errors: Raise if the fetch fails instead of returning an empty list
+            
         Returns:
             List of item dictionaries, each containing:
             - Id: Item ID
@@ -295,38 +590,14 @@ class QuickBooksClient:
             - Type: Item type
             - Description: Item description (if available)
         """
-        items = []
-        max_results = 1000  # QuickBooks max per query
-        start_position = 1
-        
-        while True:
-            # Query with pagination - include Description for product details
-            q = f"select Id, Name, Sku, Type, Description from Item startposition {start_position} maxresults {max_results}"
-            try:
-                res = self.query(q)
-                query_response = res.get("QueryResponse", {})
-                batch = query_response.get("Item", [])
-                
-                # Handle single item vs list
-                if isinstance(batch, dict):
-                    batch = [batch]
-                
-                if not batch:
-                    break
-                
-                items.extend(batch)
-                
-                # Check if there are more results
-                max_results_returned = query_response.get("maxResults", len(batch))
-                if len(batch) < max_results_returned:
-                    break
-                
-                start_position += len(batch)
-            except Exception as e:
-                print(f"Error fetching items: {e}")
-                break
-        
-        return items
+        try:
+            # Include Description for product details
+            return self.query_all("Item", columns=["Id", "Name", "Sku", "Type", "Description"])
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Error fetching items: {e}")
+            return []
     
     def find_income_account_ref(self) -> Dict:
         """
@@ -508,44 +779,36 @@ class QuickBooksClient:
     def build_invoice_body(self, customer_ref: Dict, doc_number: str, invoice_date: str, 
                           due_date: str, term_ref: Dict, line_objects: List[Dict]) -> Dict:
         """
-        Build an invoice request body.
-        
-        Args:
-            customer_ref: Customer reference object
-            doc_number: Invoice document number
-            invoice_date: Invoice date (YYYY-MM-DD)
-            due_date: Due date (YYYY-MM-DD)
-            term_ref: Term reference object
-            line_objects: List of line item objects
-            
-        Returns:
-            Invoice request body
+        Build an invoice request body (see build_invoice_body).
         """
-        body = {
-            "CustomerRef": {"value": customer_ref["value"], "name": customer_ref.get("name")},
-            "DocNumber": doc_number,     # QBO enforces uniqueness
-            "TxnDate": invoice_date,     # "YYYY-MM-DD"
-            "Line": line_objects,
-        }
-        if term_ref:
-            # Prefer Id if we have it; QBO will ignore unknown names
-            if "value" in term_ref:
-                body["SalesTermRef"] = {"value": term_ref["value"], "name": term_ref.get("name")}
-            else:
-                body["SalesTermRef"] = {"name": term_ref.get("name")}
-        if due_date:
-            body["DueDate"] = due_date
-        return body
+        return build_invoice_body(customer_ref, doc_number, invoice_date, due_date, term_ref, line_objects)
     
     def create_invoice(self, invoice_body: Dict) -> Dict:
         """
         Create an invoice.
         
+        Creates are not retried after a 5xx or a network error, since QuickBooks may
+        have created the invoice anyway; instead the DocNumber is looked up, and the
+        invoice found is returned if the create did go through.
+        
         Args:
             invoice_body: Invoice request body
             
         Returns:
             Created invoice data
+            
+        Raises:
+            RuntimeError: If the create fails and no invoice with the DocNumber exists
         """
-        res = self.request("POST", "/invoice", json_body=invoice_body)
+        import requests
+
+        try:
+            res = self.request("POST", "/invoice", json_body=invoice_body)
+        except (QBOAPIError, requests.exceptions.RequestException) as e:
+            if not create_may_have_applied(e) or not invoice_body.get("DocNumber"):
+                raise
+            existing = self.find_invoice_by_docnumber(invoice_body["DocNumber"])
+            if existing:
+                return existing
+            raise
         return res["Invoice"]
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+Attachment Download Service
+Downloads Gmail PDF attachments concurrently into the PO folder.
+
+- Bounded thread pool so a big sync does not open unbounded Gmail connections
+- Each file is written to a temp file in the PO folder and atomically renamed
+  into place, so the PO list never sees a partially written PDF
+- Content-hash index (size + SHA-256 -> filename) so attachments that vendors
+  re-send are detected in O(1) and not saved twice
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional, Set
+from beanscounter.core.json_store import read_json, write_json
+
+# Concurrent attachment downloads per sync
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+# Chunk size used when hashing and writing files
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _content_key(size: int, sha256: str) -> str:
+    """Build the content-hash index key."""
+    return f"{size}:{sha256}"
+
+
+def _hash_file(path: Path) -> str:
+    """Compute the SHA-256 of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentHashIndex:
+    """
+    Index of PDFs in a folder by size and SHA-256.
+
+    Persisted as JSON next to the data folder. On load, entries for deleted files are
+    dropped and PDFs that are not indexed yet are hashed, so the index stays correct
+    even when files are added or removed outside the sync.
+    """
+
+    def __init__(self, folder: Path, index_file: Path):
+        """
+        Args:
+            folder: Folder whose PDFs are indexed
+            index_file: JSON file the index is persisted to
+        """
+        self.folder = folder
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, str] = {}
+        self._load()
+
+    def _load(self) -> None:
+        entries: Dict[str, str] = read_json(self.index_file, {})
+
+        # Drop entries whose file is gone, then index files that are missing
+        self._by_key = {key: name for key, name in entries.items() if (self.folder / name).exists()}
+        indexed = set(self._by_key.values())
+        changed = len(self._by_key) != len(entries)
+        if self.folder.exists():
+            for path in self.folder.glob("*.pdf"):
+                if path.name not in indexed:
+                    self._by_key.setdefault(_content_key(path.stat().st_size, _hash_file(path)), path.name)
+                    changed = True
+        if changed:
+            self.save()
+
+    def find(self, size: int, sha256: str) -> Optional[str]:
+        """
+        Find an existing file with the given content.
+
+        Args:
+            size: File size in bytes
+            sha256: Hex SHA-256 digest
+
+        Returns:
+            Filename of the existing copy or None
+        """
+        with self._lock:
+            return self._by_key.get(_content_key(size, sha256))
+
+    def add(self, size: int, sha256: str, filename: str) -> Optional[str]:
+        """
+        Record a file's content unless the same content is already indexed.
+
+        Args:
+            size: File size in bytes
+            sha256: Hex SHA-256 digest
+            filename: Filename in the folder
+
+        Returns:
+            None if recorded, or the filename of the existing copy
+        """
+        with self._lock:
+            key = _content_key(size, sha256)
+            existing = self._by_key.get(key)
+            if existing:
+                return existing
+            self._by_key[key] = filename
+            return None
+
+    def remove(self, size: int, sha256: str) -> None:
+        """Forget a file's content (e.g. when saving it failed)."""
+        with self._lock:
+            self._by_key.pop(_content_key(size, sha256), None)
+
+    def save(self) -> None:
+        """Persist the index."""
+        with self._lock:
+            entries = dict(self._by_key)
+        write_json(self.index_file, entries)
+
+
+class AttachmentDownloader:
+    """
+    Bounded pool that downloads attachments and saves them into a folder.
+
+    Use as a context manager; leaving the block waits for pending downloads and
+    persists the content-hash index.
+    """
+
+    def __init__(self, gmail_client: Any, folder: Path, index_file: Path,
+                 max_workers: int = DEFAULT_DOWNLOAD_WORKERS):
+        """
+        Args:
+            gmail_client: GmailClient used to download attachment data
+            folder: Destination folder for PDFs
+            index_file: JSON file for the content-hash index
+            max_workers: Maximum concurrent downloads
+        """
+        self.gmail_client = gmail_client
+        self.folder = folder
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.index = ContentHashIndex(folder, index_file)
+        self._names_lock = threading.Lock()
+        self._reserved_names: Set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="attachment-download")
+
+    def submit(self, email_id: str, attachment_id: str, base_name: str) -> Future:
+        """
+        Queue an attachment download.
+
+        Args:
+            email_id: Gmail message ID
+            attachment_id: Gmail attachment ID
+            base_name: Filename without extension; a _N suffix is added if taken
+
+        Returns:
+            Future resolving to {"status": "saved"|"duplicate"|"failed", "filename", "error"}
+        """
+        return self._executor.submit(self._download, email_id, attachment_id, base_name)
+
+    def _reserve_filename(self, base_name: str) -> str:
+        """Pick a filename that neither exists nor is being written by another worker."""
+        with self._names_lock:
+            filename = f"{base_name}.pdf"
+            counter = 1
+            while filename in self._reserved_names or (self.folder / filename).exists():
+                filename = f"{base_name}_{counter}.pdf"
+                counter += 1
+            self._reserved_names.add(filename)
+            return filename
+
+    def _download(self, email_id: str, attachment_id: str, base_name: str) -> Dict[str, Any]:
+        try:
+            pdf_data = self.gmail_client.download_attachment(email_id, attachment_id)
+            if not pdf_data:
+                return {"status": "failed", "filename": None,
+                        "error": f"Failed to download attachment {attachment_id} from email {email_id}"}
+
+            size = len(pdf_data)
+            sha256 = hashlib.sha256(pdf_data).hexdigest()
+            existing = self.index.find(size, sha256)
+            if existing:
+                return {"status": "duplicate", "filename": existing, "error": None}
+
+            # Write to a temp file in the same folder, then atomically rename into place
+            fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix=".download-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    view = memoryview(pdf_data)
+                    for start in range(0, size, _CHUNK_SIZE):
+                        f.write(view[start:start + _CHUNK_SIZE])
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                # Another worker may have saved the same content meanwhile
+                filename = self._reserve_filename(base_name)
+                try:
+                    existing = self.index.add(size, sha256, filename)
+                    if existing:
+                        return {"status": "duplicate", "filename": existing, "error": None}
+                    try:
+                        os.replace(tmp_path, self.folder / filename)
+                    except OSError:
+                        self.index.remove(size, sha256)
+                        raise
+                finally:
+                    with self._names_lock:
+                        self._reserved_names.discard(filename)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            return {"status": "saved", "filename": filename, "error": None}
+        except Exception as e:
+            return {"status": "failed", "filename": None,
+                    "error": f"Error downloading attachment {attachment_id}: {str(e)}"}
+
+    def close(self) -> None:
+        """Wait for pending downloads and persist the content-hash index."""
+        self._executor.shutdown(wait=True)
+        self.index.save()
+
+    def __enter__(self) -> 'AttachmentDownloader':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
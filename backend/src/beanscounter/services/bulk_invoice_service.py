@@ -0,0 +1,155 @@
+"""
+Bulk Invoice Service
+Creates QuickBooks invoices for many POs in one pass.
+
+Lookups that the single-PO path repeats per invoice are done once per batch:
+the item catalog is fetched once, customers and existing DocNumbers are
+resolved with batched "in (...)" queries, invoices are created concurrently
+under the realm rate limiter, and invoice records are written to storage once.
+"""
+
+import asyncio
+from typing import Dict, Any, List, Optional
+from beanscounter.services.settings_service import get_qb_credentials
+from beanscounter.services.invoice_storage_service import save_invoice_records
+from beanscounter.services.po_to_invoice_service import (
+    _build_po_invoice_body, _index_qb_items, _resolve_doc_number
+)
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
+
+
+def _result(po_filename: Optional[str], status: str, invoice: Optional[Dict[str, Any]] = None,
+            error: Optional[str] = None) -> Dict[str, Any]:
+    """Build a per-PO result entry."""
+    return {
+        "po_filename": po_filename,
+        "status": status,
+        "invoice": invoice,
+        "error": error
+    }
+
+
+async def bulk_convert_pos_to_qb_invoices(entries: List[Dict[str, Any]],
+                                          qb_client: Optional[AsyncQuickBooksClient] = None) -> Dict[str, Any]:
+    """
+    Convert many POs to QuickBooks invoices and create them.
+
+    Each entry is processed independently: a bad customer, a missing line item or a
+    failed create only marks that PO as an error. Invoices whose DocNumber already
+    exists in QuickBooks are reported as "exists" and not created again; a DocNumber
+    repeated within the request is created once and reported as an error afterwards.
+
+    The create response already carries EmailStatus, Balance and TotalAmt, so no
+    follow-up status fetch is made per invoice.
+
+    Args:
+        entries: List of {"customer_id": str, "po_filename": str, "invoice_data": {...}}
+            with the same fields as POST /invoices/save-to-quickbooks
+        qb_client: AsyncQuickBooksClient to use (created from stored credentials if None)
+
+    Returns:
+        Dictionary with per-PO results (in request order) and a summary:
+        {
+            "results": [{"po_filename", "status": "created"|"exists"|"error", "invoice", "error"}, ...],
+            "summary": {"created": int, "exists": int, "error": int}
+        }
+
+    Raises:
+        RuntimeError: If credentials not configured or the batch lookups fail
+    """
+    if qb_client is None:
+        credentials = get_qb_credentials()
+        if not credentials:
+            raise RuntimeError("QuickBooks credentials not configured")
+
+        qb_client = AsyncQuickBooksClient(
+            client_id=credentials["client_id"],
+            client_secret=credentials["client_secret"],
+            refresh_token=credentials["refresh_token"],
+            realm_id=credentials["realm_id"],
+            environment=credentials["environment"]
+        )
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(entries)
+    pending = []  # (index, entry, doc_number)
+    for index, entry in enumerate(entries):
+        po_filename = entry.get("po_filename")
+        if not entry.get("customer_id"):
+            results[index] = _result(po_filename, "error", error="customer_id is required")
+        elif not entry.get("invoice_data"):
+            results[index] = _result(po_filename, "error", error="invoice_data is required")
+        else:
+            pending.append((index, entry, _resolve_doc_number(entry["invoice_data"])))
+
+    if pending:
+        try:
+            all_items, customers, existing = await asyncio.gather(
+                qb_client.get_all_items(raise_errors=True),
+                qb_client.get_customers_by_ids([str(entry["customer_id"]) for _, entry, _ in pending]),
+                qb_client.find_invoices_by_docnumbers([doc_number for _, _, doc_number in pending]),
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to load QuickBooks data for bulk invoice creation: {e}")
+
+        item_index = _index_qb_items(all_items)
+        seen_doc_numbers = set()
+        to_create = []  # (index, po_filename, invoice_body)
+        for index, entry, doc_number in pending:
+            po_filename = entry.get("po_filename")
+            customer_id = str(entry["customer_id"])
+
+            if doc_number in existing:
+                results[index] = _result(po_filename, "exists", invoice=existing[doc_number])
+                continue
+            if doc_number in seen_doc_numbers:
+                results[index] = _result(po_filename, "error", error=f"Duplicate DocNumber {doc_number} in request")
+                continue
+
+            customer = customers.get(customer_id)
+            if not customer:
+                results[index] = _result(
+                    po_filename, "error",
+                    error=f"Invalid customer ID: Customer with ID {customer_id} not found in QuickBooks"
+                )
+                continue
+            customer_ref = {"value": customer["Id"], "name": customer.get("DisplayName", "")}
+
+            try:
+                invoice_body = _build_po_invoice_body(qb_client, entry["invoice_data"], customer_ref,
+                                                      doc_number, item_index)
+            except ValueError as e:
+                results[index] = _result(po_filename, "error", error=str(e))
+                continue
+
+            seen_doc_numbers.add(doc_number)
+            to_create.append((index, po_filename, invoice_body))
+
+        # Bound in-flight creates to the realm concurrency cap; the limiter paces the rate
+        semaphore = asyncio.Semaphore(qb_client.rate_limiter.max_concurrent)
+
+        async def create(index: int, po_filename: Optional[str], invoice_body: Dict[str, Any]) -> None:
+            async with semaphore:
+                try:
+                    created = await qb_client.create_invoice(invoice_body)
+                    results[index] = _result(po_filename, "created", invoice=created)
+                except Exception as e:
+                    results[index] = _result(po_filename, "error", error=str(e))
+
+        await asyncio.gather(*(create(*item) for item in to_create))
+
+    # Persist every created/existing invoice in a single storage write
+    records = {
+        result["po_filename"]: result["invoice"]
+        for result in results
+        if result["status"] in ("created", "exists") and result["invoice"] and result["po_filename"]
+    }
+    save_invoice_records(records)
+
+    summary = {"created": 0, "exists": 0, "error": 0}
+    for result in results:
+        summary[result["status"]] += 1
+
+    return {
+        "results": results,
+        "summary": summary
+    }
@@ -1,15 +1,47 @@
 from pathlib import Path
+from typing import Optional
 from beanscounter.core.pdf_parser import parse_pdf
 from beanscounter.core.invoice_mapper import map_to_quickbooks
 from beanscounter.core.csv_writer import write_csv
+from beanscounter.core.checkpoint import MANIFEST_NAME, CheckpointManifest, file_sha256
 
-def convert_directory(input_dir: Path, output_dir: Path) -> int:
+def convert_directory(input_dir: Path, output_dir: Path, resume: bool = False,
+                      manifest_path: Optional[Path] = None) -> int:
+    """
+    Convert every PDF in a directory to a QuickBooks CSV, recording progress in a checkpoint manifest.
+
+    Args:
+        input_dir: Directory containing PDFs
+        output_dir: Directory for the CSVs
+        resume: Skip PDFs the manifest records as converted, unchanged and with their CSV present
+        manifest_path: Manifest location (default: output_dir / MANIFEST_NAME)
+
+    Returns:
+        Number of PDFs converted in this run (skipped ones are not counted)
+
+    Raises:
+        Exception: Whatever the conversion of a PDF raised; the PDF is recorded as failed
+            first, so a resumed run retries it after the completed ones are skipped
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = CheckpointManifest(manifest_path or output_dir / MANIFEST_NAME)
     count = 0
-    for pdf in input_dir.glob("*.pdf"):
-        parsed = parse_pdf(pdf)
-        qb_invoice = map_to_quickbooks(parsed)
-        out_file = output_dir / (pdf.stem + ".csv")
-        write_csv(out_file, qb_invoice)
+    skipped = 0
+    for pdf in sorted(input_dir.glob("*.pdf")):
+        digest = file_sha256(pdf)
+        if resume and manifest.is_complete(pdf.name, digest):
+            skipped += 1
+            continue
+        try:
+            parsed = parse_pdf(pdf)
+            qb_invoice = map_to_quickbooks(parsed)
+            out_file = output_dir / (pdf.stem + ".csv")
+            write_csv(out_file, qb_invoice)
+        except Exception as e:
+            manifest.mark_failed(pdf.name, digest, str(e))
+            raise
+        manifest.mark_done(pdf.name, digest, out_file)
         count += 1
+    if skipped:
+        print(f"Skipped {skipped} PDF(s) already converted (see {manifest.path})")
     return count
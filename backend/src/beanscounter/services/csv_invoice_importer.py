@@ -13,23 +13,52 @@ CSV required columns (case-insensitive; extra columns ignored):
   Customer, InvoiceNumber, InvoiceDate, DueDate, Terms, Item, Description, Qty, Rate, Taxable
 Each row = one line item for the SAME invoice number.
 
+With --bulk, the CSV may hold many invoices, with rows grouped by InvoiceNumber.
+The file is streamed in chunks of invoices; per chunk, existing DocNumbers and
+all distinct customers, items and terms are resolved with batched "in (...)"
+queries, missing customers and items are created through the Batch API, and
+invoices are posted concurrently under the realm rate limiter.
+
 Usage:
   export QBO_CLIENT_ID=...
   export QBO_CLIENT_SECRET=...
   export QBO_REFRESH_TOKEN=...
   export QBO_REALM_ID=...
   python -m paypal2quickbooks.services.csv_invoice_importer path/to/invoice.csv
+  python -m paypal2quickbooks.services.csv_invoice_importer --bulk path/to/export.csv
 """
 
 import sys
 import json
 import os
+import asyncio
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 # Import refactored modules
-from beanscounter.core.csv_reader import parse_csv
+from beanscounter.core.csv_reader import iter_csv_invoices, parse_csv
 from beanscounter.integrations.quickbooks_client import QuickBooksClient
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient, close_shared_http_client
+
+# Invoices resolved and posted together in bulk mode; bounds memory for large exports
+IMPORT_CHUNK_SIZE = 500
+
+
+def _line_object(ln: Dict[str, Any], item_ref: Dict) -> Dict[str, Any]:
+    """Build a SalesItemLineDetail line for a parsed CSV line."""
+    amount = round(ln["qty"] * ln["rate"], 2)
+    return {
+        "DetailType": "SalesItemLineDetail",
+        "Amount": amount,
+        "Description": ln["description"] or ln["name"],
+        "SalesItemLineDetail": {
+            "ItemRef": item_ref,
+            "Qty": ln["qty"],
+            "UnitPrice": ln["rate"],
+            "TaxCodeRef": {"value": "TAX"} if ln["taxable"] else {"value": "NON"}
+        }
+    }
 
 
 def create_invoice_from_csv(csv_path: str) -> Dict[str, Any]:
@@ -67,19 +96,7 @@ def create_invoice_from_csv(csv_path: str) -> Dict[str, Any]:
     line_objects = []
     for ln in payload["lines"]:
         item_ref = qb_client.ensure_item(ln["name"], taxable=ln["taxable"])
-        amount = round(ln["qty"] * ln["rate"], 2)
-        detail = {
-            "DetailType": "SalesItemLineDetail",
-            "Amount": amount,
-            "Description": ln["description"] or ln["name"],
-            "SalesItemLineDetail": {
-                "ItemRef": item_ref,
-                "Qty": ln["qty"],
-                "UnitPrice": ln["rate"],
-                "TaxCodeRef": {"value": "TAX"} if ln["taxable"] else {"value": "NON"}
-            }
-        }
-        line_objects.append(detail)
+        line_objects.append(_line_object(ln, item_ref))
 
     # Build invoice body
     inv_body = qb_client.build_invoice_body(
@@ -96,16 +113,237 @@ def create_invoice_from_csv(csv_path: str) -> Dict[str, Any]:
     return {"status": "created", "invoice": created}
 
 
+def _result(invoice_number: str, status: str, invoice: Optional[Dict[str, Any]] = None,
+            error: Optional[str] = None) -> Dict[str, Any]:
+    """Build a per-invoice result entry."""
+    return {
+        "invoice_number": invoice_number,
+        "status": status,
+        "invoice": invoice,
+        "error": error
+    }
+
+
+def _fault_message(response: Dict[str, Any]) -> str:
+    """Describe the Fault of a BatchItemResponse."""
+    errors = response.get("Fault", {}).get("Error") or [{}]
+    return "; ".join(e.get("Detail") or e.get("Message") or "Unknown error" for e in errors)
+
+
+class _BulkImport:
+    """Name -> reference caches shared by the chunks of one bulk import."""
+
+    def __init__(self, qb_client: AsyncQuickBooksClient):
+        self.qb = qb_client
+        self.customers: Dict[str, Any] = {}  # lowercased name -> ref, or error message
+        self.items: Dict[str, Any] = {}
+        self.terms: Dict[str, Dict] = {}
+        self._income_account_ref: Optional[Dict] = None
+
+    async def _create_missing(self, entity: str, cache: Dict[str, Any], bodies: Dict[str, Dict]) -> None:
+        """Create entities through the Batch API and cache their refs (or the fault)."""
+        if not bodies:
+            return
+        names = list(bodies)
+        responses = await self.qb.batch([{"operation": "create", entity: bodies[name]} for name in names])
+        name_field = "DisplayName" if entity == "Customer" else "Name"
+        for name, response in zip(names, responses):
+            created = response.get(entity)
+            if created:
+                cache[name.lower()] = {"value": created["Id"], "name": created.get(name_field, name)}
+            else:
+                cache[name.lower()] = f"Failed to create {entity} {name}: {_fault_message(response)}"
+
+    async def resolve(self, payloads: List[Dict[str, Any]]) -> Dict[str, Dict]:
+        """
+        Resolve customers, items and terms for a chunk, creating missing customers and items.
+
+        Returns:
+            Existing invoices in QuickBooks by DocNumber
+        """
+        # Names differing only in case are the same QuickBooks entity; keep the first spelling
+        customer_names = list({p["customer"].lower(): p["customer"] for p in payloads
+                               if p["customer"].lower() not in self.customers}.values())
+        item_taxable: Dict[str, bool] = {}  # first spelling -> taxable if any line is
+        item_spelling: Dict[str, str] = {}
+        for p in payloads:
+            for ln in p["lines"]:
+                key = ln["name"].lower()
+                if key not in self.items:
+                    name = item_spelling.setdefault(key, ln["name"])
+                    item_taxable[name] = item_taxable.get(name, False) or ln["taxable"]
+        term_names = {p["terms"] for p in payloads if p["terms"] and p["terms"].lower() not in self.terms}
+
+        existing, customers, items, terms = await asyncio.gather(
+            self.qb.find_invoices_by_docnumbers([p["invoice_number"] for p in payloads]),
+            self.qb.find_customers_by_display_names(customer_names),
+            self.qb.find_items_by_names(list(item_taxable)),
+            self.qb.find_terms_by_names(list(term_names)),
+        )
+
+        for key, row in customers.items():
+            self.customers[key] = {"value": row["Id"], "name": row.get("DisplayName")}
+        for key, row in items.items():
+            self.items[key] = {"value": row["Id"], "name": row.get("Name")}
+        for name in term_names:
+            term = terms.get(name.lower())
+            # Unknown names are sent as-is, like ensure_sales_term_ref; QBO ignores them
+            self.terms[name.lower()] = {"value": term["Id"], "name": term.get("Name")} if term else {"name": name}
+
+        missing_items = {name: taxable for name, taxable in item_taxable.items() if name.lower() not in self.items}
+        if missing_items and self._income_account_ref is None:
+            self._income_account_ref = await self.qb.find_income_account_ref()
+        await asyncio.gather(
+            self._create_missing("Customer", self.customers, {
+                name: {"DisplayName": name} for name in customer_names if name.lower() not in self.customers
+            }),
+            self._create_missing("Item", self.items, {
+                name: {"Name": name, "Type": "Service", "IncomeAccountRef": self._income_account_ref,
+                       "Taxable": taxable}
+                for name, taxable in missing_items.items()
+            }),
+        )
+        return existing
+
+    def build_body(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the invoice body for a payload from the resolved refs.
+
+        Raises:
+            ValueError: If its customer or an item could not be created
+        """
+        customer_ref = self.customers[payload["customer"].lower()]
+        if isinstance(customer_ref, str):
+            raise ValueError(customer_ref)
+        line_objects = []
+        for ln in payload["lines"]:
+            item_ref = self.items[ln["name"].lower()]
+            if isinstance(item_ref, str):
+                raise ValueError(item_ref)
+            line_objects.append(_line_object(ln, item_ref))
+        return self.qb.build_invoice_body(
+            customer_ref=customer_ref,
+            doc_number=payload["invoice_number"],
+            invoice_date=payload["invoice_date"],
+            due_date=payload["due_date"],
+            term_ref=self.terms.get(payload["terms"].lower()) if payload["terms"] else None,
+            line_objects=line_objects
+        )
+
+
+async def import_invoices_from_csv(csv_path: str, qb_client: Optional[AsyncQuickBooksClient] = None,
+                                   chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Create QuickBooks invoices for every invoice in a multi-invoice CSV.
+
+    The whole file is read once up front to validate it, so an invalid row
+    anywhere fails the import before anything is written to QuickBooks. After
+    that, each invoice is processed independently: a failed customer or item
+    creation or a failed invoice post only marks that invoice as an error.
+    Invoices whose DocNumber already exists in QuickBooks are reported as "exists".
+
+    Args:
+        csv_path: Path to the CSV file, rows grouped by InvoiceNumber
+        qb_client: AsyncQuickBooksClient to use (created from QBO_* env vars if None)
+        chunk_size: Invoices resolved and posted together
+
+    Returns:
+        Dictionary with per-invoice results (in file order) and a summary:
+        {
+            "results": [{"invoice_number", "status": "created"|"exists"|"error", "invoice", "error"}, ...],
+            "summary": {"created": int, "exists": int, "error": int}
+        }
+
+    Raises:
+        RuntimeError: If credentials are missing or the batched lookups fail
+        ValueError: If CSV data is invalid (raised before any QuickBooks call)
+    """
+    # Cheap validation pass (no network); the import below streams the file again
+    for _ in iter_csv_invoices(csv_path):
+        pass
+    
+    if qb_client is None:
+        env = QuickBooksClient.from_env()
+        qb_client = AsyncQuickBooksClient(
+            client_id=env.client_id,
+            client_secret=env.client_secret,
+            refresh_token=env.refresh_token,
+            realm_id=env.realm_id,
+            environment=env.environment
+        )
+
+    bulk = _BulkImport(qb_client)
+    results: List[Dict[str, Any]] = []
+    # Bound in-flight creates to the realm concurrency cap; the limiter paces the rate
+    semaphore = asyncio.Semaphore(qb_client.rate_limiter.max_concurrent)
+    invoices = iter_csv_invoices(csv_path)
+
+    async def create(index: int, invoice_number: str, invoice_body: Dict[str, Any]) -> None:
+        async with semaphore:
+            try:
+                created = await qb_client.create_invoice(invoice_body)
+                results[index] = _result(invoice_number, "created", invoice=created)
+            except Exception as e:
+                results[index] = _result(invoice_number, "error", error=str(e))
+
+    while True:
+        chunk = list(islice(invoices, chunk_size))
+        if not chunk:
+            break
+        try:
+            existing = await bulk.resolve(chunk)
+        except Exception as e:
+            raise RuntimeError(f"Failed to load QuickBooks data for CSV import: {e}")
+
+        to_create = []
+        for payload in chunk:
+            invoice_number = payload["invoice_number"]
+            results.append(None)
+            if invoice_number in existing:
+                results[-1] = _result(invoice_number, "exists", invoice=existing[invoice_number])
+                continue
+            try:
+                to_create.append((len(results) - 1, invoice_number, bulk.build_body(payload)))
+            except ValueError as e:
+                results[-1] = _result(invoice_number, "error", error=str(e))
+        await asyncio.gather(*(create(*item) for item in to_create))
+
+    summary = {"created": 0, "exists": 0, "error": 0}
+    for result in results:
+        summary[result["status"]] += 1
+
+    return {
+        "results": results,
+        "summary": summary
+    }
+
+
+async def _run_bulk_import(csv_path: str) -> Dict[str, Any]:
+    """Run a bulk import from the command line and close the shared connection pool."""
+    try:
+        return await import_invoices_from_csv(csv_path)
+    finally:
+        await close_shared_http_client()
+
+
 def main():
     """Command-line entry point for CSV invoice import."""
-    if len(sys.argv) != 2:
-        print("Usage: python -m paypal2quickbooks.services.csv_invoice_importer path/to/invoice.csv")
+    args = sys.argv[1:]
+    bulk = "--bulk" in args
+    args = [a for a in args if a != "--bulk"]
+    if len(args) != 1:
+        print("Usage: python -m paypal2quickbooks.services.csv_invoice_importer [--bulk] path/to/invoice.csv")
         sys.exit(1)
     
-    csv_path = sys.argv[1]
+    csv_path = args[0]
     
     try:
-        result = create_invoice_from_csv(csv_path)
+        if bulk:
+            result = asyncio.run(_run_bulk_import(csv_path))
+            result = {"summary": result["summary"],
+                      "errors": [r for r in result["results"] if r["status"] == "error"]}
+        else:
+            result = create_invoice_from_csv(csv_path)
         print(json.dumps(result, indent=2))
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
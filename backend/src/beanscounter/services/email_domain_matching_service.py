@@ -3,25 +3,82 @@ Email Domain Matching Service
 Matches email sender domains to QuickBooks customer domains.
 """
 
-from typing import Set, Optional, Dict, Any
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
 from beanscounter.core.domain_utils import extract_domain, normalize_domain
+from beanscounter.core.json_store import delete_json, file_lock, read_json, write_json
 from beanscounter.services.qb_customer_service import search_customers_by_domain
 
+# Get backend root directory (backend/src/beanscounter/services/email_domain_matching_service.py -> backend/)
+BACKEND_ROOT = Path(__file__).parent.parent.parent.parent
+DOMAIN_DECISIONS_FILE = BACKEND_ROOT / "data" / "domain_decisions.json"
 
-def get_qb_customer_domains() -> Set[str]:
+# How long domain -> customer decisions are reused across syncs. Misses expire sooner
+# so a newly added QuickBooks customer is picked up quickly.
+MATCH_TTL_SECONDS = int(os.getenv("DOMAIN_MATCH_TTL_SECONDS", str(24 * 3600)))
+NO_MATCH_TTL_SECONDS = int(os.getenv("DOMAIN_NO_MATCH_TTL_SECONDS", "3600"))
+
+_decisions_lock = threading.Lock()
+_decisions: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def _customer_domains(cust: Dict[str, Any]) -> List[str]:
+    """Normalized domains of a customer's PrimaryEmailAddr and WebAddr."""
+    domains = []
+    # Extract domain from PrimaryEmailAddr
+    email_addr = cust.get("PrimaryEmailAddr", {})
+    if isinstance(email_addr, dict):
+        email = email_addr.get("Address", "")
+        if email:
+            domain = extract_domain(email)
+            if domain:
+                normalized = normalize_domain(domain)
+                if normalized:
+                    domains.append(normalized)
+    
+    # Also check WebAddr for domain matching
+    web_addr = cust.get("WebAddr", {})
+    if isinstance(web_addr, dict):
+        url = web_addr.get("URI", "")
+        if url:
+            # Extract domain from URL
+            from urllib.parse import urlparse
+            parsed = urlparse(url)
+            if parsed.netloc:
+                domain = normalize_domain(parsed.netloc)
+                if domain:
+                    domains.append(domain)
+    return domains
+
+
+def get_qb_customer_domain_index(raise_errors: bool = False) -> Dict[str, str]:
     """
-    Fetch all QuickBooks customer email domains.
+    Map every QuickBooks customer email/web domain to a customer display name.
+    
+    Costs one paginated scan of the customers, so a sync builds it once and
+    resolves every sender domain against it (see resolve_customer_domain).
+    When several customers share a domain, the first one returned wins.
     
+    Args:
+        raise_errors: Raise if the customers cannot be fetched instead of returning an empty index
+        
     Returns:
-        Set of normalized email domains from QuickBooks customers
+        Dictionary mapping normalized domain to customer display name
+        (empty if QuickBooks is not configured)
+        
+    Raises:
+        Exception: Only with raise_errors, if the customer query fails
     """
     try:
         from beanscounter.services.settings_service import get_qb_credentials
-        from beanscounter.integrations.quickbooks_client import QuickBooksClient
+        from beanscounter.integrations.quickbooks_client import QuickBooksClient, query_rows
         
         credentials = get_qb_credentials()
         if not credentials:
-            return set()
+            return {}
         
         qb_client = QuickBooksClient(
             client_id=credentials["client_id"],
@@ -31,97 +88,22 @@ def get_qb_customer_domains() -> Set[str]:
             environment=credentials["environment"]
         )
         
-        # Query all customers with email addresses
-        # Note: QuickBooks API may return maxResults, so we need to handle pagination
-        all_customers = []
-        max_results = 1000  # QuickBooks default max
-        start_position = 1
-        
-        while True:
-            try:
-                query = f"select PrimaryEmailAddr, WebAddr from Customer maxresults {max_results} startposition {start_position}"
-                result = qb_client.query(query)
-                query_response = result.get("QueryResponse", {})
-                customers_raw = query_response.get("Customer", [])
-                
-                # Handle single dict vs list
-                if isinstance(customers_raw, dict):
-                    all_customers.append(customers_raw)
-                elif isinstance(customers_raw, list):
-                    all_customers.extend(customers_raw)
-                else:
-                    # No customers returned
-                    break
-                
-                # Check if there are more results
-                # If customers_raw is a list, check its length
-                if isinstance(customers_raw, list):
-                    num_returned = len(customers_raw)
-                else:
-                    num_returned = 1 if customers_raw else 0
-                
-                max_results_returned = query_response.get("maxResults", num_returned)
-                
-                # If no customers returned, we're done
-                if not customers_raw:
-                    break
-                
-                # If we got a single dict, we're done (no pagination needed)
-                if isinstance(customers_raw, dict):
-                    break
-                
-                # If we got fewer than requested, we're done
-                if num_returned < max_results_returned:
-                    break
-                
-                # If we got exactly what we asked for, there might be more
-                start_position += num_returned
-            except Exception as e:
-                print(f"Error querying customers (page {start_position}): {e}")
-                # If this is the first page and it fails, we might have a syntax issue
-                # Try without pagination parameters as fallback
-                if start_position == 1:
-                    try:
-                        query = "select PrimaryEmailAddr, WebAddr from Customer"
-                        result = qb_client.query(query)
-                        query_response = result.get("QueryResponse", {})
-                        customers_raw = query_response.get("Customer", [])
-                        if isinstance(customers_raw, dict):
-                            all_customers.append(customers_raw)
-                        elif isinstance(customers_raw, list):
-                            all_customers.extend(customers_raw)
-                    except Exception as e2:
-                        print(f"Error with fallback query: {e2}")
-                break
+        # Query all customers with email addresses; pages are fetched concurrently
+        try:
+            all_customers = qb_client.query_all("Customer", columns=["DisplayName", "PrimaryEmailAddr", "WebAddr"])
+        except Exception as e:
+            print(f"Error querying customers: {e}")
+            # Try without pagination parameters as fallback
+            result = qb_client.query("select DisplayName, PrimaryEmailAddr, WebAddr from Customer")
+            all_customers = query_rows(result, "Customer")
         
-        domains = set()
+        index: Dict[str, str] = {}
         for cust in all_customers:
-            # Extract domain from PrimaryEmailAddr
-            email_addr = cust.get("PrimaryEmailAddr", {})
-            if isinstance(email_addr, dict):
-                email = email_addr.get("Address", "")
-                if email:
-                    domain = extract_domain(email)
-                    if domain:
-                        normalized = normalize_domain(domain)
-                        if normalized:
-                            domains.add(normalized)
-            
-            # Also check WebAddr for domain matching
-            web_addr = cust.get("WebAddr", {})
-            if isinstance(web_addr, dict):
-                url = web_addr.get("URI", "")
-                if url:
-                    # Extract domain from URL
-                    from urllib.parse import urlparse
-                    parsed = urlparse(url)
-                    if parsed.netloc:
-                        domain = normalize_domain(parsed.netloc)
-                        if domain:
-                            domains.add(domain)
+            for domain in _customer_domains(cust):
+                index.setdefault(domain, cust.get("DisplayName"))
         
-        print(f"DEBUG: Found {len(all_customers)} customers, extracted {len(domains)} unique domains")
-        return domains
+        print(f"DEBUG: Found {len(all_customers)} customers, extracted {len(index)} unique domains")
+        return index
     except Exception as e:
         import traceback
         error_msg = str(e)
@@ -133,103 +115,116 @@ def get_qb_customer_domains() -> Set[str]:
             print("Please reauthorize QuickBooks in the Settings page.")
         
         print(f"Traceback: {traceback.format_exc()}")
-        return set()
+        if raise_errors:
+            raise
+        return {}
 
 
-def extract_sender_domain(email_data: Dict[str, Any]) -> Optional[str]:
+def get_qb_customer_domains() -> Set[str]:
     """
-    Extract domain from original sender email.
-    Handles forwarded emails by checking various headers.
+    Fetch all QuickBooks customer email domains.
     
-    Args:
-        email_data: Email data from Gmail API (includes headers)
-        
     Returns:
-        Normalized sender domain or None if not found
+        Set of normalized email domains from QuickBooks customers
     """
-    headers = email_data.get("payload", {}).get("headers", [])
-    
-    # Build a dict from headers for easier lookup
-    header_dict = {}
-    for header in headers:
-        name = header.get("name", "").lower()
-        value = header.get("value", "")
-        header_dict[name] = value
-    
-    # Priority order for finding original sender:
-    # 1. X-Original-From (common in forwarded emails)
-    # 2. From (if not from indianbento.com)
-    # 3. Reply-To
-    # 4. Parse email body for "From:" patterns
-    
-    sender_email = None
-    
-    # Check X-Original-From
-    if "x-original-from" in header_dict:
-        sender_email = header_dict["x-original-from"]
-    # Check From header (if not from indianbento.com)
-    elif "from" in header_dict:
-        from_header = header_dict["from"]
-        if "indianbento.com" not in from_header.lower():
-            sender_email = from_header
-    # Check Reply-To
-    elif "reply-to" in header_dict:
-        sender_email = header_dict["reply-to"]
-    
-    # Extract email address from header value (may contain name <email>)
-    if sender_email:
-        import re
-        # Pattern to match email addresses
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        matches = re.findall(email_pattern, sender_email)
-        if matches:
-            sender_email = matches[0]
-    
-    # If still no sender found, try parsing email body
-    if not sender_email:
-        body = email_data.get("snippet", "") or ""
-        # Look for "From:" patterns in body
-        from_pattern = r'From:\s*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})'
-        matches = re.findall(from_pattern, body, re.IGNORECASE)
-        if matches:
-            sender_email = matches[0]
-    
-    if sender_email:
-        domain = extract_domain(sender_email)
-        if domain:
-            return normalize_domain(domain)
-    
-    return None
+    return set(get_qb_customer_domain_index())
+
+
+def _load_decisions() -> Dict[str, Dict[str, Any]]:
+    """Load persisted domain decisions once per process (caller holds _decisions_lock)."""
+    global _decisions
+    if _decisions is None:
+        _decisions = read_json(DOMAIN_DECISIONS_FILE, {})
+    return _decisions
+
+
+def _is_fresh(decision: Dict[str, Any], now: float) -> bool:
+    ttl = MATCH_TTL_SECONDS if decision.get("matched") else NO_MATCH_TTL_SECONDS
+    return now - decision.get("checked_at", 0) < ttl
 
 
-def matches_qb_customer(sender_domain: str) -> bool:
+def _save_decision(domain: str, decision: Dict[str, Any], now: float) -> None:
+    """Persist one decision; snapshot under the file lock so a later snapshot is never overwritten by an older one."""
+    with file_lock(DOMAIN_DECISIONS_FILE):
+        with _decisions_lock:
+            decisions = _load_decisions()
+            decisions[domain] = {**decision, "checked_at": now}
+            snapshot = dict(decisions)
+        try:
+            write_json(DOMAIN_DECISIONS_FILE, snapshot)
+        except Exception as e:
+            print(f"Error saving domain decisions: {e}")
+
+
+def resolve_customer_domain(sender_domain: str,
+                            session_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+                            clock: Callable[[], float] = time.time,
+                            customer_index: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     """
-    Check if sender domain matches any QuickBooks customer domain.
+    Decide whether a sender domain belongs to a QuickBooks customer, with caching.
+    
+    Decisions are looked up in the per-sync session cache first. With a
+    customer_index (built once per sync by get_qb_customer_domain_index) the
+    domain is resolved against it directly. Without one, a fresh decision from
+    the persistent cache (subject to MATCH_TTL_SECONDS / NO_MATCH_TTL_SECONDS) is
+    reused, and otherwise the index is built for this call.
     
-    Uses search_customers_by_domain for more robust matching that checks
-    both email addresses and web addresses.
+    Only decisions from a successful customer query are persisted. If the query
+    fails the decision is "no match" with lookup_failed set; it is kept for the
+    rest of the sync only, so the next sync looks the domain up again.
     
     Args:
-        sender_domain: Normalized sender domain
+        sender_domain: Sender domain
+        session_cache: Optional dict reused for the duration of one sync
+        clock: Returns the current time in seconds (time.time by default)
+        customer_index: Domain -> customer name index for this sync (see get_qb_customer_domain_index)
         
     Returns:
-        True if domain matches a QB customer, False otherwise
+        Dictionary with:
+        {
+            "matched": bool,
+            "customer_name": str or None,  # First matching customer's display name
+            "lookup_failed": bool          # Customers could not be fetched; the domain is undecided
+        }
     """
-    if not sender_domain:
-        return False
-    
-    normalized_sender = normalize_domain(sender_domain)
-    
-    # Use search_customers_by_domain which checks both PrimaryEmailAddr and WebAddr
-    # This is more reliable than just checking the cached domain set
-    try:
-        customers = search_customers_by_domain(normalized_sender)
-        return len(customers) > 0
-    except Exception as e:
-        print(f"Error checking QB customer match for domain {normalized_sender}: {e}")
-        # Fallback to domain set check
-        qb_domains = get_qb_customer_domains()
-        return normalized_sender in qb_domains
+    normalized_sender = normalize_domain(sender_domain) if sender_domain else ""
+    if not normalized_sender:
+        return {"matched": False, "customer_name": None, "lookup_failed": False}
+    
+    if session_cache is not None and normalized_sender in session_cache:
+        return session_cache[normalized_sender]
+    
+    decision = None
+    if customer_index is None:
+        with _decisions_lock:
+            cached = _load_decisions().get(normalized_sender)
+        if cached and _is_fresh(cached, clock()):
+            decision = {"matched": cached["matched"], "customer_name": cached.get("customer_name"),
+                        "lookup_failed": False}
+        else:
+            try:
+                customer_index = get_qb_customer_domain_index(raise_errors=True)
+            except Exception as e:
+                print(f"Error checking QB customer match for domain {normalized_sender}: {e}")
+                decision = {"matched": False, "customer_name": None, "lookup_failed": True}
+    
+    if decision is None:
+        matched = normalized_sender in customer_index
+        decision = {"matched": matched, "customer_name": customer_index.get(normalized_sender),
+                    "lookup_failed": False}
+        _save_decision(normalized_sender, {"matched": matched, "customer_name": decision["customer_name"]}, clock())
+    
+    if session_cache is not None:
+        session_cache[normalized_sender] = decision
+    return decision
+
+
+def clear_domain_decisions() -> None:
+    """Forget all cached domain decisions (called when QuickBooks credentials are saved or deleted)."""
+    global _decisions
+    with _decisions_lock:
+        _decisions = {}
+        delete_json(DOMAIN_DECISIONS_FILE)
 
 
 def get_customer_name_from_email(email: str) -> Optional[str]:
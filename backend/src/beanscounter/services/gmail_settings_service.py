@@ -4,42 +4,34 @@ Manages Gmail OAuth2 credentials and sync settings.
 Stores encrypted credentials in a JSON file.
 """
 
-import json
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
+from beanscounter.core.credentials_cache import CredentialsCache
 from beanscounter.core.encryption import encrypt_value, decrypt_value, get_encryption_key
+from beanscounter.core.json_store import file_lock, read_json, write_json
 
 
 # Get backend root directory (backend/src/beanscounter/services/gmail_settings_service.py -> backend/)
 BACKEND_ROOT = Path(__file__).parent.parent.parent.parent
 SETTINGS_FILE = BACKEND_ROOT / "data" / "settings.json"
 
-
-def _ensure_data_dir():
-    """Ensure the data directory exists."""
-    SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+# Decrypted Gmail credentials, reloaded only when the settings file changes
+_oauth_credentials_cache = CredentialsCache(SETTINGS_FILE)
+_tokens_cache = CredentialsCache(SETTINGS_FILE)
 
 
 def _load_settings() -> Dict[str, Any]:
     """Load settings from file."""
-    _ensure_data_dir()
-    if not SETTINGS_FILE.exists():
-        return {}
-    
-    try:
-        with open(SETTINGS_FILE, "r") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    return read_json(SETTINGS_FILE, {})
 
 
 def _save_settings(settings: Dict[str, Any]):
     """Save settings to file."""
-    _ensure_data_dir()
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(settings, f, indent=2)
+    write_json(SETTINGS_FILE, settings)
+    _oauth_credentials_cache.invalidate()
+    _tokens_cache.invalidate()
 
 
 def save_gmail_oauth_credentials(client_id: str, client_secret: str, redirect_uri: str) -> None:
@@ -53,15 +45,17 @@ def save_gmail_oauth_credentials(client_id: str, client_secret: str, redirect_ur
     """
     key = get_encryption_key()
     
-    settings = _load_settings()
-    if "gmail" not in settings:
-        settings["gmail"] = {}
-    
-    settings["gmail"]["client_id"] = encrypt_value(client_id, key)
-    settings["gmail"]["client_secret"] = encrypt_value(client_secret, key)
-    settings["gmail"]["redirect_uri"] = redirect_uri  # Not sensitive, store as-is
-    
-    _save_settings(settings)
+    # Hold the file lock so concurrent updates are not lost
+    with file_lock(SETTINGS_FILE):
+        settings = _load_settings()
+        if "gmail" not in settings:
+            settings["gmail"] = {}
+        
+        settings["gmail"]["client_id"] = encrypt_value(client_id, key)
+        settings["gmail"]["client_secret"] = encrypt_value(client_secret, key)
+        settings["gmail"]["redirect_uri"] = redirect_uri  # Not sensitive, store as-is
+        
+        _save_settings(settings)
 
 
 def save_gmail_tokens(access_token: str, refresh_token: str) -> None:
@@ -74,24 +68,34 @@ def save_gmail_tokens(access_token: str, refresh_token: str) -> None:
     """
     key = get_encryption_key()
     
-    settings = _load_settings()
-    if "gmail" not in settings:
-        settings["gmail"] = {}
-    
-    settings["gmail"]["access_token"] = encrypt_value(access_token, key)
-    settings["gmail"]["refresh_token"] = encrypt_value(refresh_token, key)
-    
-    _save_settings(settings)
+    # Hold the file lock so concurrent updates are not lost
+    with file_lock(SETTINGS_FILE):
+        settings = _load_settings()
+        if "gmail" not in settings:
+            settings["gmail"] = {}
+        
+        settings["gmail"]["access_token"] = encrypt_value(access_token, key)
+        settings["gmail"]["refresh_token"] = encrypt_value(refresh_token, key)
+        
+        _save_settings(settings)
 
 
 def get_gmail_oauth_credentials() -> Optional[Dict[str, str]]:
     """
     Retrieve and decrypt Gmail OAuth2 client credentials.
     
+    Decrypted credentials are cached in memory until the settings file changes.
+    
     Returns:
         Dictionary with credentials or None if not configured
         Keys: client_id, client_secret, redirect_uri
     """
+    credentials = _oauth_credentials_cache.get(_load_gmail_oauth_credentials)
+    return dict(credentials) if credentials else None
+
+
+def _load_gmail_oauth_credentials() -> Optional[Dict[str, str]]:
+    """Read and decrypt Gmail OAuth2 client credentials from the settings file."""
     settings = _load_settings()
     gmail_settings = settings.get("gmail")
     
@@ -116,10 +120,18 @@ def get_gmail_tokens() -> Optional[Dict[str, str]]:
     """
     Retrieve and decrypt Gmail OAuth2 tokens.
     
+    Decrypted tokens are cached in memory until the settings file changes.
+    
     Returns:
         Dictionary with tokens or None if not configured
         Keys: access_token, refresh_token
     """
+    tokens = _tokens_cache.get(_load_gmail_tokens)
+    return dict(tokens) if tokens else None
+
+
+def _load_gmail_tokens() -> Optional[Dict[str, str]]:
+    """Read and decrypt Gmail OAuth2 tokens from the settings file."""
     settings = _load_settings()
     gmail_settings = settings.get("gmail")
     
@@ -182,10 +194,12 @@ def has_gmail_credentials() -> bool:
 
 def delete_gmail_credentials() -> None:
     """Remove Gmail configuration."""
-    settings = _load_settings()
-    if "gmail" in settings:
-        del settings["gmail"]
-        _save_settings(settings)
+    # Hold the file lock so concurrent updates are not lost
+    with file_lock(SETTINGS_FILE):
+        settings = _load_settings()
+        if "gmail" in settings:
+            del settings["gmail"]
+            _save_settings(settings)
 
 
 def save_gmail_starting_date(date: str) -> None:
@@ -195,12 +209,14 @@ def save_gmail_starting_date(date: str) -> None:
     Args:
         date: Starting date in ISO format (YYYY-MM-DD)
     """
-    settings = _load_settings()
-    if "gmail" not in settings:
-        settings["gmail"] = {}
-    
-    settings["gmail"]["starting_date"] = date
-    _save_settings(settings)
+    # Hold the file lock so concurrent updates are not lost
+    with file_lock(SETTINGS_FILE):
+        settings = _load_settings()
+        if "gmail" not in settings:
+            settings["gmail"] = {}
+        
+        settings["gmail"]["starting_date"] = date
+        _save_settings(settings)
 
 
 def get_gmail_starting_date() -> Optional[str]:
@@ -225,12 +241,14 @@ def save_gmail_forwarding_email(email: str) -> None:
     Args:
         email: Email address that forwards POs (e.g., "pashmina@indianbento.com")
     """
-    settings = _load_settings()
-    if "gmail" not in settings:
-        settings["gmail"] = {}
-    
-    settings["gmail"]["forwarding_email"] = email
-    _save_settings(settings)
+    # Hold the file lock so concurrent updates are not lost
+    with file_lock(SETTINGS_FILE):
+        settings = _load_settings()
+        if "gmail" not in settings:
+            settings["gmail"] = {}
+        
+        settings["gmail"]["forwarding_email"] = email
+        _save_settings(settings)
 
 
 def get_gmail_forwarding_email() -> Optional[str]:
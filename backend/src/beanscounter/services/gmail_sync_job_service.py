@@ -0,0 +1,94 @@
+"""
+Gmail Sync Job Service
+Runs Gmail syncs on a background worker thread and tracks their progress.
+
+Only one sync runs at a time: starting a sync while another is running returns
+the running job instead of starting a second one.
+"""
+
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from beanscounter.services.gmail_sync_service import run_gmail_sync
+
+_job_lock = threading.Lock()
+_current_job: Optional[Dict[str, Any]] = None
+
+
+def _snapshot(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a job for callers so the worker can keep updating it."""
+    with _job_lock:
+        snapshot = dict(job)
+        snapshot["progress"] = dict(job["progress"])
+        snapshot["progress"]["skipped_reasons"] = dict(job["progress"].get("skipped_reasons", {}))
+        return snapshot
+
+
+def _run_sync_job(job: Dict[str, Any], start_date: Optional[datetime], full: bool) -> None:
+    """Worker thread body: run the sync and record the outcome on the job."""
+    try:
+        result = run_gmail_sync(start_date, full=full, progress=job["progress"])
+        error = None if result.get("success") else ", ".join(result.get("errors", [])) or "Unknown error"
+    except Exception as e:
+        print(f"Gmail sync job {job['job_id']} failed: {e}")
+        result, error = None, str(e)
+    # One locked update, so a job that reads as finished always has finished_at and its result
+    with _job_lock:
+        job["result"] = result
+        job["error"] = error
+        job["finished_at"] = datetime.now().isoformat()
+        job["status"] = "failed" if error is not None else "completed"
+
+
+def start_sync_job(start_date: Optional[datetime] = None, full: bool = False) -> Tuple[Dict[str, Any], bool]:
+    """
+    Start a Gmail sync on a background thread, unless one is already running.
+
+    Args:
+        start_date: Optional start date; forces a full search
+        full: Ignore the saved historyId and search everything after the start date
+
+    Returns:
+        Tuple of (job snapshot, started) where started is False if an already
+        running job was returned instead
+    """
+    global _current_job
+    with _job_lock:
+        if _current_job and _current_job["status"] == "running":
+            running = _current_job
+            started = False
+        else:
+            running = {
+                "job_id": uuid.uuid4().hex,
+                "status": "running",
+                "started_at": datetime.now().isoformat(),
+                "finished_at": None,
+                "full": full or start_date is not None,
+                "progress": {
+                    "emails_scanned": 0,
+                    "pdfs_downloaded": 0,
+                    "errors": 0,
+                    "skipped_reasons": {}
+                },
+                "result": None,
+                "error": None
+            }
+            _current_job = running
+            started = True
+            threading.Thread(
+                target=_run_sync_job, args=(running, start_date, full), name="gmail-sync", daemon=True
+            ).start()
+    return _snapshot(running), started
+
+
+def get_sync_job() -> Optional[Dict[str, Any]]:
+    """
+    Get the running or most recently finished sync job.
+
+    Returns:
+        Job snapshot with status ("running", "completed", "failed"), live progress
+        counters and, once finished, the sync result; None if no job ran in this process
+    """
+    job = _current_job
+    return _snapshot(job) if job else None
@@ -5,21 +5,24 @@ Orchestrates email fetching and PDF download from Gmail.
 
 import os
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from beanscounter.integrations.gmail_client import GmailClient
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from beanscounter.integrations.gmail_client import (
+    GmailClient, GMAIL_BATCH_SIZE, METADATA_HEADERS, HistoryExpiredError
+)
 from beanscounter.services.gmail_settings_service import (
     get_gmail_credentials, 
     get_gmail_starting_date,
     get_gmail_forwarding_email
 )
 from beanscounter.services.email_domain_matching_service import (
-    extract_sender_domain,
-    matches_qb_customer,
-    get_customer_name_from_email
+    resolve_customer_domain
 )
+from beanscounter.services.attachment_download_service import AttachmentDownloader
 from beanscounter.core.domain_utils import extract_domain, normalize_domain
+from beanscounter.core.json_store import read_json, write_json
 
 
 # PO directory (same as invoices router)
@@ -27,6 +30,26 @@ from beanscounter.core.domain_utils import extract_domain, normalize_domain
 BACKEND_ROOT = Path(__file__).parent.parent.parent.parent
 PO_DIR = BACKEND_ROOT / "data" / "pos"
 
+# Size + SHA-256 index of PDFs in PO_DIR, used to skip re-sent attachments
+CONTENT_INDEX_FILE = BACKEND_ROOT / "data" / "po_content_index.json"
+
+# Sync history file (last sync results and the Gmail historyId for incremental sync)
+SYNC_HISTORY_FILE = BACKEND_ROOT / "data" / "gmail_sync_history.json"
+
+# Incremental syncs that retry a message which could not be fetched, processed or
+# downloaded before it is given up on
+MAX_EMAIL_RETRIES = int(os.getenv("GMAIL_MAX_EMAIL_RETRIES", "5"))
+
+
+def load_sync_history() -> Dict[str, Any]:
+    """Load sync history from file."""
+    return read_json(SYNC_HISTORY_FILE, {})
+
+
+def save_sync_history(history: Dict[str, Any]):
+    """Save sync history to file."""
+    write_json(SYNC_HISTORY_FILE, history)
+
 
 def _ensure_po_dir():
     """Ensure PO directory exists."""
@@ -50,12 +73,212 @@ def _sanitize_filename(filename: str) -> str:
     return filename
 
 
-def sync_emails_from_gmail(start_date: Optional[datetime] = None) -> Dict[str, Any]:
+def _needs_full_message(gmail_client: GmailClient, summary: Dict[str, Any],
+                        domain_decisions: Dict[str, Dict[str, Any]],
+                        customer_index: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Decide from a format='metadata' message whether the full message is needed.
+    
+    Messages whose header sender is not a QuickBooks customer, or whose PO number
+    already exists, are rejected here and processed from the metadata alone (the
+    sync loop reaches the same skip decision). Messages whose sender can only be
+    found in the body, or whose domain could not be looked up, are fetched in full.
+    
+    Args:
+        gmail_client: GmailClient instance
+        summary: Message fetched with format='metadata'
+        domain_decisions: Per-sync cache of domain decisions (see resolve_customer_domain)
+        customer_index: Domain -> customer name index built at the start of the sync
+        
+    Returns:
+        True if the full message should be fetched
+    """
+    sender_email = gmail_client.extract_sender_from_headers(summary)
+    if not sender_email:
+        return True
+    sender_domain = extract_domain(sender_email)
+    if not sender_domain:
+        return False
+    decision = resolve_customer_domain(sender_domain, domain_decisions, customer_index=customer_index)
+    if decision["lookup_failed"]:
+        return True
+    if not decision["matched"]:
+        return False
+    
+    po_number = gmail_client.extract_po_number(summary)
+    if po_number:
+        from beanscounter.services.po_metadata_service import po_number_exists
+        if po_number_exists(_sanitize_filename(po_number)):
+            return False
+    return True
+
+
+def _iter_email_data(gmail_client: GmailClient, email_ids: Iterator[str], result: Dict[str, Any],
+                     domain_decisions: Dict[str, Dict[str, Any]],
+                     customer_index: Optional[Dict[str, str]] = None
+                     ) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Yield (email_id, email_data) for every message, fetching as little as possible.
+    
+    IDs are consumed lazily in chunks of GMAIL_BATCH_SIZE. Each chunk is fetched with
+    format='metadata' first; only messages that pass the cheap filters are fetched
+    in full. Every message is fetched at most once per format.
+    
+    Args:
+        gmail_client: GmailClient instance
+        email_ids: Message IDs (e.g., from GmailClient.iter_email_ids)
+        result: Sync result; emails_processed is updated as IDs are consumed
+        domain_decisions: Per-sync cache of domain decisions (see resolve_customer_domain)
+        customer_index: Domain -> customer name index built at the start of the sync
+        
+    Yields:
+        Tuples of email ID and full or metadata email data (None if it could not be fetched)
+    """
+    while True:
+        chunk = list(islice(email_ids, GMAIL_BATCH_SIZE))
+        if not chunk:
+            return
+        result["emails_processed"] += len(chunk)
+        
+        email_details = gmail_client.get_emails_details_batch(
+            chunk, format='metadata', metadata_headers=METADATA_HEADERS
+        )
+        full_ids = [
+            email_id for email_id, summary in email_details.items()
+            if summary and _needs_full_message(gmail_client, summary, domain_decisions, customer_index)
+        ]
+        if full_ids:
+            email_details.update(gmail_client.get_emails_details_batch(full_ids))
+        
+        for email_id in chunk:
+            yield email_id, email_details.get(email_id)
+
+
+# Overlap between the previous sync time and the incremental search window
+INCREMENTAL_WINDOW_SLACK = timedelta(days=1)
+
+
+def _collect_downloads(pending_downloads: List[Dict[str, Any]], result: Dict[str, Any],
+                       skipped_reasons: Dict[str, int], block: bool) -> None:
+    """
+    Record finished attachment downloads in the sync result.
+    
+    An email is finished once all of its downloads are; its new PDFs are queued for
+    background extraction, its PO source metadata is saved and it is added to the
+    successful emails list. Emails whose attachments
+    were all duplicates of existing PDFs are counted as duplicate_pdf. If any
+    attachment failed, the email is added to failed_email_ids instead and its PO
+    source is not saved, so the retry is not skipped as an existing PO.
+    
+    Args:
+        pending_downloads: Queued emails (removed from the list once recorded)
+        result: Sync result to update
+        skipped_reasons: Skip counters to update
+        block: Wait for every pending download instead of only recording finished ones
+    """
+    from beanscounter.services.po_metadata_service import save_po_source
+    from beanscounter.services.po_extraction_service import queue_extraction
+    
+    remaining = []
+    for pending in pending_downloads:
+        if not block and not all(future.done() for future in pending["futures"]):
+            remaining.append(pending)
+            continue
+        
+        downloaded_filenames = []
+        duplicates = 0
+        failed = False
+        for future in pending["futures"]:
+            outcome = future.result()
+            if outcome["status"] == "saved":
+                result["pdfs_downloaded"] += 1
+                result["downloaded_files"].append(outcome["filename"])
+                downloaded_filenames.append(outcome["filename"])
+            elif outcome["status"] == "duplicate":
+                duplicates += 1
+            else:
+                failed = True
+                result["errors"].append(outcome["error"])
+                print(outcome["error"])
+        
+        if failed:
+            result["failed_email_ids"].append(pending["email_id"])
+            if downloaded_filenames:
+                queue_extraction(PO_DIR / filename for filename in downloaded_filenames)
+            continue
+        
+        if duplicates and not downloaded_filenames:
+            skipped_reasons["duplicate_pdf"] += 1
+        
+        # Store successful email info and save source metadata
+        if downloaded_filenames:
+            # Parse the new POs in the background so the PO list finds them cached
+            queue_extraction(PO_DIR / filename for filename in downloaded_filenames)
+            
+            metadata = pending["metadata"]
+            po_number = pending["po_number"]
+            
+            # Save source metadata for this PO
+            # Store both by PO number and by filename (in case PO number extraction differs)
+            # Save for each downloaded filename - this allows lookup by filename even if PO number extraction differs
+            if po_number != "UNKNOWN":
+                for downloaded_filename in downloaded_filenames:
+                    save_po_source(
+                        po_number=po_number,
+                        source_type="email",
+                        email_subject=metadata["subject"],
+                        email_date=metadata["date"],
+                        filename=downloaded_filename  # Store filename so we can look it up later
+                    )
+            
+            result["debug_info"]["successful_emails"].append({
+                "email_id": pending["email_id"],
+                "subject": metadata["subject"],
+                "date": metadata["date"],
+                "attachment_names": metadata["attachment_names"],
+                "downloaded_filenames": downloaded_filenames,
+                "sender_email": pending["sender_email"],
+                "customer_name": pending["customer_name"],
+                "po_number": po_number
+            })
+    
+    pending_downloads[:] = remaining
+
+
+def _report_progress(progress: Optional[Dict[str, Any]], emails_scanned: int, result: Dict[str, Any],
+                     skipped_reasons: Dict[str, int]) -> None:
+    """Copy live counters into the caller's progress dict, if one was given."""
+    if progress is None:
+        return
+    progress["emails_scanned"] = emails_scanned
+    progress["pdfs_downloaded"] = result["pdfs_downloaded"]
+    progress["errors"] = len(result["errors"])
+    progress["skipped_reasons"] = dict(skipped_reasons)
+
+
+def sync_emails_from_gmail(start_date: Optional[datetime] = None, history_id: Optional[str] = None,
+                           last_sync: Optional[datetime] = None,
+                           progress: Optional[Dict[str, Any]] = None,
+                           retry_email_ids: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Sync emails from Gmail, filter by customer domains, and download PDFs.
     
+    With a history_id from the previous sync, only messages added to the inbox since
+    then are processed (incremental sync via the History API). Added messages are
+    kept only if they also match the sync search query over a window starting a day
+    before last_sync. If the history_id has expired, a full search is run instead.
+    
+    Messages that could not be fetched or processed, or whose attachments failed to
+    download, are returned in failed_email_ids; an incremental sync given them as
+    retry_email_ids processes them again ahead of the newly added messages.
+    
     Args:
-        start_date: Start date for email search (defaults to saved starting_date)
+        start_date: Start date for a full search (defaults to saved starting_date)
+        history_id: historyId saved by the previous sync (None for a full search)
+        last_sync: Time of the previous sync, bounding the incremental search window
+        progress: Optional dict updated in place with emails_scanned, pdfs_downloaded,
+            errors and skipped_reasons as the sync runs (for live status reporting)
+        retry_email_ids: Message IDs that failed in earlier syncs, processed again first
         
     Returns:
         Dictionary with sync results:
@@ -64,7 +287,10 @@ def sync_emails_from_gmail(start_date: Optional[datetime] = None) -> Dict[str, A
             "emails_processed": int,
             "pdfs_downloaded": int,
             "errors": List[str],
-            "downloaded_files": List[str]
+            "downloaded_files": List[str],
+            "sync_mode": "full"|"incremental",
+            "history_id": str or None,  # historyId to pass to the next sync
+            "failed_email_ids": List[str]  # Messages to retry on the next sync
         }
     """
     _ensure_po_dir()
@@ -75,6 +301,9 @@ def sync_emails_from_gmail(start_date: Optional[datetime] = None) -> Dict[str, A
         "pdfs_downloaded": 0,
         "errors": [],
         "downloaded_files": [],
+        "sync_mode": "full",
+        "history_id": None,
+        "failed_email_ids": [],
         "debug_info": {
             "skipped_reasons": {},
             "sample_sender_emails": [],
@@ -88,21 +317,6 @@ def sync_emails_from_gmail(start_date: Optional[datetime] = None) -> Dict[str, A
     }
     
     try:
-        # Check QuickBooks connection before proceeding
-        from beanscounter.services.settings_service import test_qb_connection, has_qb_credentials
-        if has_qb_credentials():
-            qb_test = test_qb_connection()
-            if not qb_test["success"]:
-                result["success"] = False
-                error_msg = qb_test.get("message", "QuickBooks connection failed")
-                if "invalid_grant" in error_msg.lower() or "refresh token" in error_msg.lower():
-                    result["errors"].append(
-                        "QuickBooks authentication failed: The refresh token is expired or invalid. "
-                        "Please reauthorize QuickBooks in Settings > QuickBooks."
-                    )
-                else:
-                    result["errors"].append(f"QuickBooks connection failed: {error_msg}. Please check your QuickBooks settings.")
-                return result
         # Get Gmail credentials
         credentials = get_gmail_credentials()
         if not credentials:
@@ -143,7 +357,6 @@ def sync_emails_from_gmail(start_date: Optional[datetime] = None) -> Dict[str, A
                     start_date = datetime.strptime(starting_date_str, "%Y-%m-%d")
             else:
                 # Default to 30 days ago
-                from datetime import timedelta
                 start_date = datetime.now() - timedelta(days=30)
         
         # Build search query with forwarding email filter
@@ -158,19 +371,66 @@ def sync_emails_from_gmail(start_date: Optional[datetime] = None) -> Dict[str, A
             # Default: search inbox with PDF attachments
             additional_query = "in:inbox has:attachment filename:pdf"
         
-        # Search for emails
-        email_ids = gmail_client.search_emails(start_date, query=additional_query)
-        result["emails_processed"] = len(email_ids)
+        # Messages that failed in earlier syncs go first; they already matched the query
+        retry_ids = list(dict.fromkeys(retry_email_ids or []))
+        
+        # Incremental sync: only messages added since the previous sync's historyId
+        email_ids = None
+        if history_id:
+            try:
+                added_ids, result["history_id"] = gmail_client.list_added_message_ids(history_id)
+                result["sync_mode"] = "incremental"
+                if not added_ids and not retry_ids:
+                    return result
+                
+                # Keep added messages that match the sync query
+                added = set(added_ids)
+                window_start = (last_sync - INCREMENTAL_WINDOW_SLACK) if last_sync else start_date
+                start_date = max(start_date, window_start)
+                email_ids = (
+                    email_id for email_id in gmail_client.iter_email_ids(start_date, query=additional_query)
+                    if email_id in added
+                )
+            except HistoryExpiredError as e:
+                print(f"{e}; falling back to a full search")
+        
+        if email_ids is None:
+            # Record the mailbox position before searching so nothing is missed next time
+            result["history_id"] = gmail_client.get_current_history_id()
+            # Message IDs are paged in lazily while emails are processed
+            email_ids = gmail_client.iter_email_ids(start_date, query=additional_query)
+        if retry_ids:
+            retry_set = set(retry_ids)
+            email_ids = chain(retry_ids, (email_id for email_id in email_ids if email_id not in retry_set))
         
         # Log search query for debugging
         date_str = start_date.strftime('%Y/%m/%d')
         final_query = f"{additional_query} after:{date_str}"
         result["debug_info"]["search_query"] = final_query
         
-        # Get all QuickBooks customer domains upfront for comparison
-        from beanscounter.services.email_domain_matching_service import get_qb_customer_domains
+        # Check QuickBooks connection before proceeding
+        from beanscounter.services.settings_service import test_qb_connection, has_qb_credentials
+        if has_qb_credentials():
+            qb_test = test_qb_connection()
+            if not qb_test["success"]:
+                result["success"] = False
+                error_msg = qb_test.get("message", "QuickBooks connection failed")
+                if "invalid_grant" in error_msg.lower() or "refresh token" in error_msg.lower():
+                    result["errors"].append(
+                        "QuickBooks authentication failed: The refresh token is expired or invalid. "
+                        "Please reauthorize QuickBooks in Settings > QuickBooks."
+                    )
+                else:
+                    result["errors"].append(f"QuickBooks connection failed: {error_msg}. Please check your QuickBooks settings.")
+                return result
+        
+        # Index all QuickBooks customer domains once; every sender domain is resolved against it
+        from beanscounter.services.email_domain_matching_service import get_qb_customer_domain_index
+        customer_index: Optional[Dict[str, str]] = None
+        qb_domains = set()
         try:
-            qb_domains = get_qb_customer_domains()
+            customer_index = get_qb_customer_domain_index(raise_errors=True)
+            qb_domains = set(customer_index)
             result["debug_info"]["qb_customer_domains"] = sorted(list(qb_domains))
             if not qb_domains:
                 # Check if this is due to authentication failure
@@ -190,259 +450,235 @@ def sync_emails_from_gmail(start_date: Optional[datetime] = None) -> Dict[str, A
             "no_sender_domain": 0,
             "domain_not_in_qb": 0,
             "no_pdf_attachments": 0,
-            "po_already_exists": 0
+            "po_already_exists": 0,
+            "duplicate_pdf": 0
         }
         
         sample_sender_emails = []
         email_domains = {}  # domain -> count
         
-        for email_id in email_ids:
-            try:
-                # Get email details
-                email_data = gmail_client.get_email_details(email_id)
-                if not email_data:
-                    skipped_reasons["no_email_data"] += 1
-                    continue
+        # Domain decisions for this sync (shared with the metadata pre-filter)
+        domain_decisions: Dict[str, Dict[str, Any]] = {}
+        
+        # Attachments download concurrently while later emails are filtered; the pool is shut down
+        # and the content-hash index saved even if the loop raises
+        with AttachmentDownloader(gmail_client, PO_DIR, CONTENT_INDEX_FILE) as downloader:
+            pending_downloads: List[Dict[str, Any]] = []
+            # PO numbers queued for download but not yet recorded by save_po_source
+            po_numbers_in_flight = set()
+        
+            emails_scanned = 0
+            for email_id, email_data in _iter_email_data(gmail_client, email_ids, result, domain_decisions,
+                                                            customer_index):
+                _report_progress(progress, emails_scanned, result, skipped_reasons)
+                emails_scanned += 1
+                try:
+                    # Get email details
+                    if not email_data:
+                        skipped_reasons["no_email_data"] += 1
+                        result["failed_email_ids"].append(email_id)
+                        continue
                 
-                # Get email metadata
-                metadata = gmail_client.get_email_metadata(email_data)
+                    # Get email metadata
+                    metadata = gmail_client.get_email_metadata(email_data)
                 
-                # Extract original sender domain
-                sender_email = gmail_client.extract_original_sender(email_data)
-                if not sender_email:
-                    skipped_reasons["no_sender_email"] += 1
-                    # Log detailed debug info
-                    headers = email_data.get("payload", {}).get("headers", [])
-                    from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
+                    # Extract original sender domain
+                    sender_email = gmail_client.extract_original_sender(email_data)
+                    if not sender_email:
+                        skipped_reasons["no_sender_email"] += 1
+                        # Log detailed debug info
+                        headers = email_data.get("payload", {}).get("headers", [])
+                        from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
                     
-                    # Get email body snippet for debugging
-                    body_snippet = gmail_client.get_email_body_text(email_data)
+                        # Get email body snippet for debugging
+                        body_snippet = gmail_client.get_email_body_text(email_data)
                     
-                    # Check for forwarded email indicators
-                    has_forwarded_indicators = False
-                    forwarded_indicators = []
-                    if body_snippet:
-                        indicators = [
-                            "Original Message",
-                            "Begin forwarded message",
-                            "-----Original Message-----",
-                            "On .* wrote:"
-                        ]
-                        for indicator in indicators:
-                            if re.search(indicator, body_snippet, re.IGNORECASE):
-                                forwarded_indicators.append(indicator)
-                                has_forwarded_indicators = True
+                        # Check for forwarded email indicators
+                        has_forwarded_indicators = False
+                        forwarded_indicators = []
+                        if body_snippet:
+                            indicators = [
+                                "Original Message",
+                                "Begin forwarded message",
+                                "-----Original Message-----",
+                                "On .* wrote:"
+                            ]
+                            for indicator in indicators:
+                                if re.search(indicator, body_snippet, re.IGNORECASE):
+                                    forwarded_indicators.append(indicator)
+                                    has_forwarded_indicators = True
                     
-                    # Create detailed error message
-                    error_message = (
-                        f"Could not extract the original sender email address from this forwarded email. "
-                        f"The email was forwarded from '{from_header}', but the system could not find the original sender's email address "
-                        f"in the email headers (X-Original-From, X-Forwarded-From) or in the email body content. "
-                        f"This is needed to match the email against QuickBooks customers. "
-                        f"Forwarded email indicators found: {has_forwarded_indicators}."
-                    )
+                        # Create detailed error message
+                        error_message = (
+                            f"Could not extract the original sender email address from this forwarded email. "
+                            f"The email was forwarded from '{from_header}', but the system could not find the original sender's email address "
+                            f"in the email headers (X-Original-From, X-Forwarded-From) or in the email body content. "
+                            f"This is needed to match the email against QuickBooks customers. "
+                            f"Forwarded email indicators found: {has_forwarded_indicators}."
+                        )
                     
-                    # Store debug info for this email with error message
-                    result["debug_info"]["email_debug"].append({
-                        "email_id": email_id,
-                        "subject": metadata["subject"],
-                        "date": metadata["date"],
-                        "attachment_names": metadata["attachment_names"],
-                        "from_header": from_header,
-                        "has_forwarded_indicators": has_forwarded_indicators,
-                        "forwarded_indicators": forwarded_indicators,
-                        "error": error_message
-                    })
-                    continue
+                        # Store debug info for this email with error message
+                        result["debug_info"]["email_debug"].append({
+                            "email_id": email_id,
+                            "subject": metadata["subject"],
+                            "date": metadata["date"],
+                            "attachment_names": metadata["attachment_names"],
+                            "from_header": from_header,
+                            "has_forwarded_indicators": has_forwarded_indicators,
+                            "forwarded_indicators": forwarded_indicators,
+                            "error": error_message
+                        })
+                        continue
                 
-                sender_domain = extract_domain(sender_email)
-                if not sender_domain:
-                    skipped_reasons["no_sender_domain"] += 1
-                    headers = email_data.get("payload", {}).get("headers", [])
-                    from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
-                    error_message = (
-                        f"Could not extract domain from the original sender email address '{sender_email}'. "
-                        f"The email was forwarded from '{from_header}', and while the original sender email was found, "
-                        f"the domain portion could not be extracted. This is needed to match against QuickBooks customers."
-                    )
-                    result["debug_info"]["email_debug"].append({
-                        "email_id": email_id,
-                        "subject": metadata["subject"],
-                        "date": metadata["date"],
-                        "attachment_names": metadata["attachment_names"],
-                        "from_header": from_header,
-                        "has_forwarded_indicators": False,
-                        "forwarded_indicators": [],
-                        "error": error_message,
-                        "sender_email": sender_email
-                    })
-                    continue
+                    sender_domain = extract_domain(sender_email)
+                    if not sender_domain:
+                        skipped_reasons["no_sender_domain"] += 1
+                        headers = email_data.get("payload", {}).get("headers", [])
+                        from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
+                        error_message = (
+                            f"Could not extract domain from the original sender email address '{sender_email}'. "
+                            f"The email was forwarded from '{from_header}', and while the original sender email was found, "
+                            f"the domain portion could not be extracted. This is needed to match against QuickBooks customers."
+                        )
+                        result["debug_info"]["email_debug"].append({
+                            "email_id": email_id,
+                            "subject": metadata["subject"],
+                            "date": metadata["date"],
+                            "attachment_names": metadata["attachment_names"],
+                            "from_header": from_header,
+                            "has_forwarded_indicators": False,
+                            "forwarded_indicators": [],
+                            "error": error_message,
+                            "sender_email": sender_email
+                        })
+                        continue
                 
-                normalized_domain = normalize_domain(sender_domain)
+                    normalized_domain = normalize_domain(sender_domain)
                 
-                # Collect all domains from emails
-                email_domains[normalized_domain] = email_domains.get(normalized_domain, 0) + 1
+                    # Collect all domains from emails
+                    email_domains[normalized_domain] = email_domains.get(normalized_domain, 0) + 1
                 
-                # Collect sample data for debugging
-                if len(sample_sender_emails) < 10:
-                    sample_sender_emails.append(sender_email)
+                    # Collect sample data for debugging
+                    if len(sample_sender_emails) < 10:
+                        sample_sender_emails.append(sender_email)
                 
-                # Check if domain matches QuickBooks customer
-                if not matches_qb_customer(normalized_domain):
-                    skipped_reasons["domain_not_in_qb"] += 1
-                    headers = email_data.get("payload", {}).get("headers", [])
-                    from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
-                    error_message = (
-                        f"The original sender's email domain '{normalized_domain}' (from email '{sender_email}') "
-                        f"does not match any QuickBooks customer. Only emails from domains that match existing QuickBooks customers are processed."
-                    )
-                    result["debug_info"]["email_debug"].append({
-                        "email_id": email_id,
-                        "subject": metadata["subject"],
-                        "date": metadata["date"],
-                        "attachment_names": metadata["attachment_names"],
-                        "from_header": from_header,
-                        "has_forwarded_indicators": False,
-                        "forwarded_indicators": [],
-                        "error": error_message,
-                        "sender_email": sender_email,
-                        "sender_domain": normalized_domain
-                    })
-                    continue
+                    # Check if domain matches QuickBooks customer
+                    domain_decision = resolve_customer_domain(normalized_domain, domain_decisions,
+                                                              customer_index=customer_index)
+                    if domain_decision["lookup_failed"]:
+                        raise RuntimeError(f"Could not look up QuickBooks customers for domain '{normalized_domain}'")
+                    if not domain_decision["matched"]:
+                        skipped_reasons["domain_not_in_qb"] += 1
+                        headers = email_data.get("payload", {}).get("headers", [])
+                        from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
+                        error_message = (
+                            f"The original sender's email domain '{normalized_domain}' (from email '{sender_email}') "
+                            f"does not match any QuickBooks customer. Only emails from domains that match existing QuickBooks customers are processed."
+                        )
+                        result["debug_info"]["email_debug"].append({
+                            "email_id": email_id,
+                            "subject": metadata["subject"],
+                            "date": metadata["date"],
+                            "attachment_names": metadata["attachment_names"],
+                            "from_header": from_header,
+                            "has_forwarded_indicators": False,
+                            "forwarded_indicators": [],
+                            "error": error_message,
+                            "sender_email": sender_email,
+                            "sender_domain": normalized_domain
+                        })
+                        continue
                 
-                # Get customer name from email
-                customer_name = get_customer_name_from_email(sender_email)
-                if not customer_name:
-                    # Fallback to domain-based name
-                    from beanscounter.core.domain_utils import domain_to_company_name
-                    customer_name = domain_to_company_name(normalized_domain)
+                    # Get customer name from email
+                    customer_name = domain_decision["customer_name"]
+                    if not customer_name:
+                        # Fallback to domain-based name
+                        from beanscounter.core.domain_utils import domain_to_company_name
+                        customer_name = domain_to_company_name(normalized_domain)
                 
-                # Sanitize customer name for filename
-                customer_name_safe = _sanitize_filename(customer_name)
+                    # Sanitize customer name for filename
+                    customer_name_safe = _sanitize_filename(customer_name)
                 
-                # Extract PO number from email
-                po_number = gmail_client.extract_po_number(email_data)
-                if not po_number:
-                    po_number = "UNKNOWN"
-                else:
-                    po_number = _sanitize_filename(po_number)
+                    # Extract PO number from email
+                    po_number = gmail_client.extract_po_number(email_data)
+                    if not po_number:
+                        po_number = "UNKNOWN"
+                    else:
+                        po_number = _sanitize_filename(po_number)
                 
-                # Check if PO number already exists
-                from beanscounter.services.po_metadata_service import po_number_exists, save_po_source
-                if po_number_exists(po_number) and po_number != "UNKNOWN":
-                    skipped_reasons["po_already_exists"] = skipped_reasons.get("po_already_exists", 0) + 1
-                    headers = email_data.get("payload", {}).get("headers", [])
-                    from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
-                    error_message = (
-                        f"PO number '{po_number}' already exists in the system. "
-                        f"This email was forwarded from '{from_header}' and will be skipped to avoid duplicates."
-                    )
-                    result["debug_info"]["email_debug"].append({
-                        "email_id": email_id,
-                        "subject": metadata["subject"],
-                        "date": metadata["date"],
-                        "attachment_names": metadata["attachment_names"],
-                        "from_header": from_header,
-                        "has_forwarded_indicators": False,
-                        "forwarded_indicators": [],
-                        "error": error_message,
-                        "po_number": po_number
-                    })
-                    continue
+                    # Check if PO number already exists
+                    from beanscounter.services.po_metadata_service import po_number_exists
+                    if po_number != "UNKNOWN" and (po_number in po_numbers_in_flight or po_number_exists(po_number)):
+                        skipped_reasons["po_already_exists"] = skipped_reasons.get("po_already_exists", 0) + 1
+                        headers = email_data.get("payload", {}).get("headers", [])
+                        from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
+                        error_message = (
+                            f"PO number '{po_number}' already exists in the system. "
+                            f"This email was forwarded from '{from_header}' and will be skipped to avoid duplicates."
+                        )
+                        result["debug_info"]["email_debug"].append({
+                            "email_id": email_id,
+                            "subject": metadata["subject"],
+                            "date": metadata["date"],
+                            "attachment_names": metadata["attachment_names"],
+                            "from_header": from_header,
+                            "has_forwarded_indicators": False,
+                            "forwarded_indicators": [],
+                            "error": error_message,
+                            "po_number": po_number
+                        })
+                        continue
                 
-                # Get PDF attachments
-                pdf_attachments = gmail_client.get_pdf_attachments(email_id)
-                if not pdf_attachments:
-                    skipped_reasons["no_pdf_attachments"] += 1
-                    headers = email_data.get("payload", {}).get("headers", [])
-                    from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
-                    error_message = (
-                        f"No PDF attachments found in this email. The email was forwarded from '{from_header}' "
-                        f"and the original sender was '{sender_email}', but no PDF files were attached. "
-                        f"Only emails with PDF attachments are processed as Purchase Orders."
-                    )
-                    result["debug_info"]["email_debug"].append({
-                        "email_id": email_id,
-                        "subject": metadata["subject"],
-                        "date": metadata["date"],
-                        "attachment_names": metadata["attachment_names"],
-                        "from_header": from_header,
-                        "has_forwarded_indicators": False,
-                        "forwarded_indicators": [],
-                        "error": error_message
-                    })
-                    continue
+                    # Get PDF attachments
+                    pdf_attachments = gmail_client.get_pdf_attachments(email_id, email_data)
+                    if not pdf_attachments:
+                        skipped_reasons["no_pdf_attachments"] += 1
+                        headers = email_data.get("payload", {}).get("headers", [])
+                        from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
+                        error_message = (
+                            f"No PDF attachments found in this email. The email was forwarded from '{from_header}' "
+                            f"and the original sender was '{sender_email}', but no PDF files were attached. "
+                            f"Only emails with PDF attachments are processed as Purchase Orders."
+                        )
+                        result["debug_info"]["email_debug"].append({
+                            "email_id": email_id,
+                            "subject": metadata["subject"],
+                            "date": metadata["date"],
+                            "attachment_names": metadata["attachment_names"],
+                            "from_header": from_header,
+                            "has_forwarded_indicators": False,
+                            "forwarded_indicators": [],
+                            "error": error_message
+                        })
+                        continue
                 
-                # Download each PDF attachment
-                downloaded_filenames = []
-                for attachment in pdf_attachments:
-                    try:
-                        # Download attachment
-                        pdf_data = gmail_client.download_attachment(email_id, attachment["id"])
-                        if not pdf_data:
-                            result["errors"].append(f"Failed to download attachment {attachment['id']} from email {email_id}")
-                            continue
-                        
-                        # Generate filename: PO_{customer_name}_{po_number}_{MM-DD-YYYY}.pdf
-                        date_str = datetime.now().strftime("%m-%d-%Y")
-                        filename = f"PO_{customer_name_safe}_{po_number}_{date_str}.pdf"
-                        
-                        # Ensure unique filename
-                        file_path = PO_DIR / filename
-                        counter = 1
-                        while file_path.exists():
-                            base_name = f"PO_{customer_name_safe}_{po_number}_{date_str}"
-                            filename = f"{base_name}_{counter}.pdf"
-                            file_path = PO_DIR / filename
-                            counter += 1
-                        
-                        # Save PDF file
-                        with open(file_path, 'wb') as f:
-                            f.write(pdf_data)
-                        
-                        result["pdfs_downloaded"] += 1
-                        result["downloaded_files"].append(filename)
-                        downloaded_filenames.append(filename)
-                        
-                    except Exception as e:
-                        error_msg = f"Error downloading attachment {attachment.get('id', 'unknown')}: {str(e)}"
-                        result["errors"].append(error_msg)
-                        print(error_msg)
-                
-                # Store successful email info and save source metadata
-                if downloaded_filenames:
-                    headers = email_data.get("payload", {}).get("headers", [])
-                    from_header = next((h.get("value", "") for h in headers if h.get("name", "").lower() == "from"), "Not found")
-                    
-                    # Save source metadata for this PO
-                    # Store both by PO number and by filename (in case PO number extraction differs)
-                    # Save for each downloaded filename - this allows lookup by filename even if PO number extraction differs
-                    if po_number != "UNKNOWN":
-                        for downloaded_filename in downloaded_filenames:
-                            save_po_source(
-                                po_number=po_number,
-                                source_type="email",
-                                email_subject=metadata["subject"],
-                                email_date=metadata["date"],
-                                filename=downloaded_filename  # Store filename so we can look it up later
-                            )
-                    
-                    result["debug_info"]["successful_emails"].append({
+                    # Queue PDF downloads; results are collected as they complete
+                    date_str = datetime.now().strftime("%m-%d-%Y")
+                    base_name = f"PO_{customer_name_safe}_{po_number}_{date_str}"
+                    pending_downloads.append({
                         "email_id": email_id,
-                        "subject": metadata["subject"],
-                        "date": metadata["date"],
-                        "attachment_names": metadata["attachment_names"],
-                        "downloaded_filenames": downloaded_filenames,
+                        "metadata": metadata,
                         "sender_email": sender_email,
                         "customer_name": customer_name,
-                        "po_number": po_number
+                        "po_number": po_number,
+                        "futures": [
+                            downloader.submit(email_id, attachment["id"], base_name)
+                            for attachment in pdf_attachments
+                        ]
                     })
+                    if po_number != "UNKNOWN":
+                        po_numbers_in_flight.add(po_number)
+                    _collect_downloads(pending_downloads, result, skipped_reasons, block=False)
                 
-            except Exception as e:
-                error_msg = f"Error processing email {email_id}: {str(e)}"
-                result["errors"].append(error_msg)
-                print(error_msg)
-                continue
+                except Exception as e:
+                    error_msg = f"Error processing email {email_id}: {str(e)}"
+                    result["errors"].append(error_msg)
+                    result["failed_email_ids"].append(email_id)
+                    print(error_msg)
+                    continue
+        
+            _collect_downloads(pending_downloads, result, skipped_reasons, block=True)
+        _report_progress(progress, emails_scanned, result, skipped_reasons)
         
         # Add summary of skipped emails and debug info
         result["debug_info"]["skipped_reasons"] = skipped_reasons
@@ -471,3 +707,74 @@ def sync_emails_from_gmail(start_date: Optional[datetime] = None) -> Dict[str, A
         result["errors"].append(f"Sync failed: {str(e)}")
         return result
 
+
+
+def run_gmail_sync(start_date: Optional[datetime] = None, full: bool = False,
+                   progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run a sync and record it in the sync history.
+    
+    Runs an incremental sync from the historyId saved by the previous sync unless
+    a start date is given or a full sync is requested. Messages that failed are
+    saved with the history and retried by the next incremental syncs, up to
+    MAX_EMAIL_RETRIES times each, so advancing the historyId never drops them.
+    
+    Args:
+        start_date: Optional start date; forces a full search
+        full: Ignore the saved historyId and search everything after the start date
+        progress: Optional dict updated with live counters (see sync_emails_from_gmail)
+        
+    Returns:
+        Sync results from sync_emails_from_gmail
+    """
+    previous = load_sync_history()
+    history_id = None
+    last_sync = None
+    # Message ID -> failed attempts, carried over from earlier syncs
+    retries: Dict[str, int] = dict(previous.get("retry_email_ids") or {})
+    if not full and start_date is None:
+        history_id = previous.get("history_id")
+        if previous.get("history_synced_at"):
+            try:
+                last_sync = datetime.fromisoformat(previous["history_synced_at"])
+            except ValueError:
+                last_sync = None
+    
+    # Run sync
+    sync_started_at = datetime.now().isoformat()
+    sync_result = sync_emails_from_gmail(start_date, history_id=history_id, last_sync=last_sync, progress=progress,
+                                         retry_email_ids=list(retries) if history_id else None)
+    
+    # Only advance the history position after a successful sync so failed runs are retried
+    next_history_id = previous.get("history_id")
+    history_synced_at = previous.get("history_synced_at")
+    if sync_result["success"] and sync_result.get("history_id"):
+        next_history_id = sync_result["history_id"]
+        history_synced_at = sync_started_at
+        # An incremental sync processed every queued retry, so only those that failed again stay;
+        # a full sync did not get them, so they stay queued
+        queued = {} if history_id else dict(retries)
+        for email_id in sync_result.get("failed_email_ids", []):
+            attempts = retries.get(email_id, 0) + 1
+            if attempts > MAX_EMAIL_RETRIES:
+                sync_result["errors"].append(f"Giving up on email {email_id} after {MAX_EMAIL_RETRIES} retries")
+                queued.pop(email_id, None)
+                continue
+            queued[email_id] = attempts
+        retries = queued
+    
+    # Save sync history
+    history = {
+        "last_sync": datetime.now().isoformat(),
+        "emails_processed": sync_result["emails_processed"],
+        "pdfs_downloaded": sync_result["pdfs_downloaded"],
+        "errors": sync_result["errors"],
+        "downloaded_files": sync_result.get("downloaded_files", []),
+        "sync_mode": sync_result.get("sync_mode", "full"),
+        "history_id": next_history_id,
+        "history_synced_at": history_synced_at,
+        "retry_email_ids": retries
+    }
+    save_sync_history(history)
+    
+    return sync_result
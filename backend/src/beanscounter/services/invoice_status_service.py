@@ -0,0 +1,141 @@
+"""
+Invoice Status Service
+Refreshes stored invoice statuses (EmailStatus, Balance) from QuickBooks in batches.
+
+Statuses are fetched with "select ... from Invoice where Id in (...)" queries of many
+IDs at once and written back to invoice storage in a single save, so the PO list can
+use stored statuses instead of querying QuickBooks once per row.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from beanscounter.services.settings_service import get_qb_credentials
+from beanscounter.services.invoice_storage_service import get_all_invoice_records, update_invoice_statuses
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
+
+# How often the background job refreshes statuses; 0 disables it
+STATUS_REFRESH_INTERVAL_SECONDS = int(os.getenv("INVOICE_STATUS_REFRESH_SECONDS", "300"))
+
+
+def is_status_fresh(record: Dict[str, Any], max_age_seconds: float = STATUS_REFRESH_INTERVAL_SECONDS) -> bool:
+    """
+    Check if a stored invoice record's status was checked recently.
+
+    Args:
+        record: Invoice record from storage
+        max_age_seconds: Maximum age of last_status_check in seconds
+
+    Returns:
+        True if the status is younger than max_age_seconds
+    """
+    last_check = record.get("last_status_check")
+    if not last_check or max_age_seconds <= 0:
+        return False
+    try:
+        age = (datetime.now() - datetime.fromisoformat(last_check)).total_seconds()
+    except ValueError:
+        return False
+    return age < max_age_seconds
+
+
+async def refresh_invoice_statuses(po_filenames: Optional[List[str]] = None, max_age_seconds: float = 0,
+                                   qb_client: Optional[AsyncQuickBooksClient] = None) -> Dict[str, Any]:
+    """
+    Refresh EmailStatus, Balance and TotalAmt for stored invoices.
+
+    Args:
+        po_filenames: PO filenames to refresh (all records with a QuickBooks invoice if None)
+        max_age_seconds: Skip records checked within this many seconds (0 refreshes all)
+        qb_client: AsyncQuickBooksClient to use (created from stored credentials if None)
+
+    Returns:
+        Dictionary with counts:
+        {
+            "checked": int,    # Records whose status was requested
+            "updated": int,    # Records whose email status or balance changed
+            "missing": [str]   # PO filenames whose invoice was not found in QuickBooks
+        }
+
+    Raises:
+        RuntimeError: If credentials not configured
+    """
+    records = get_all_invoice_records()
+    if po_filenames is not None:
+        records = {name: records[name] for name in po_filenames if name in records}
+
+    # Map QuickBooks invoice ID -> PO filenames (the same invoice may back several POs)
+    pos_by_invoice_id: Dict[str, List[str]] = {}
+    for po_filename, record in records.items():
+        invoice_id = record.get("qb_invoice_id")
+        if not invoice_id or is_status_fresh(record, max_age_seconds):
+            continue
+        pos_by_invoice_id.setdefault(str(invoice_id), []).append(po_filename)
+
+    if not pos_by_invoice_id:
+        return {"checked": 0, "updated": 0, "missing": []}
+
+    if qb_client is None:
+        credentials = get_qb_credentials()
+        if not credentials:
+            raise RuntimeError("QuickBooks credentials not configured")
+
+        qb_client = AsyncQuickBooksClient(
+            client_id=credentials["client_id"],
+            client_secret=credentials["client_secret"],
+            refresh_token=credentials["refresh_token"],
+            realm_id=credentials["realm_id"],
+            environment=credentials["environment"]
+        )
+
+    rows = await qb_client.query_in(
+        "Invoice", "Id", list(pos_by_invoice_id), columns=["Id", "EmailStatus", "Balance", "TotalAmt"]
+    )
+
+    statuses = {}
+    updated = 0
+    found_ids = set()
+    for row in rows:
+        invoice_id = str(row.get("Id"))
+        found_ids.add(invoice_id)
+        status = {
+            "email_status": row.get("EmailStatus"),
+            "balance": float(row.get("Balance", 0) or 0),
+            "total_amount": float(row.get("TotalAmt", 0) or 0),
+        }
+        for po_filename in pos_by_invoice_id.get(invoice_id, []):
+            record = records[po_filename]
+            if (record.get("email_status"), record.get("balance")) != (status["email_status"], status["balance"]):
+                updated += 1
+            statuses[po_filename] = status
+
+    checked = [name for names in pos_by_invoice_id.values() for name in names]
+    update_invoice_statuses(statuses, checked=checked)
+
+    missing = [name for invoice_id, names in pos_by_invoice_id.items() if invoice_id not in found_ids
+               for name in names]
+    return {"checked": len(checked), "updated": updated, "missing": missing}
+
+
+async def run_status_refresh_loop(interval_seconds: float = STATUS_REFRESH_INTERVAL_SECONDS) -> None:
+    """
+    Refresh stale invoice statuses forever, sleeping between runs.
+
+    Intended to run as a background task for the lifetime of the API process.
+    Errors are logged and retried on the next run.
+
+    Args:
+        interval_seconds: Seconds between refresh runs
+    """
+    while True:
+        try:
+            if get_qb_credentials():
+                result = await refresh_invoice_statuses(max_age_seconds=interval_seconds)
+                if result["checked"]:
+                    print(f"Invoice status refresh: checked {result['checked']}, updated {result['updated']}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Invoice status refresh failed: {e}")
+        await asyncio.sleep(interval_seconds)
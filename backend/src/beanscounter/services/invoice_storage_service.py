@@ -4,60 +4,32 @@ Stores invoice creation records to persist across sessions.
 Maps PO files to QuickBooks invoices.
 """
 
-import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
+from beanscounter.core.json_store import read_json, update_json
 
 # Get backend root directory (backend/src/beanscounter/services/invoice_storage_service.py -> backend/)
 BACKEND_ROOT = Path(__file__).parent.parent.parent.parent
 STORAGE_FILE = BACKEND_ROOT / "data" / "invoices.json"
 
 
-def _ensure_data_dir():
-    """Ensure the data directory exists."""
-    STORAGE_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-
 def _load_invoices() -> Dict[str, Any]:
     """Load invoice records from storage file."""
-    _ensure_data_dir()
-    if not STORAGE_FILE.exists():
-        return {}
-    
-    try:
-        with open(STORAGE_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading invoices: {e}")
-        return {}
+    return read_json(STORAGE_FILE, {})
 
 
-def _save_invoices(invoices: Dict[str, Any]):
-    """Save invoice records to storage file."""
-    _ensure_data_dir()
+def _update_invoices(update) -> None:
+    """Apply an in-place update to the invoice records under the storage file lock."""
     try:
-        with open(STORAGE_FILE, 'w') as f:
-            json.dump(invoices, f, indent=2)
+        update_json(STORAGE_FILE, update, {})
     except Exception as e:
         print(f"Error saving invoices: {e}")
         raise
 
 
-def save_invoice_record(po_filename: str, invoice_data: Dict[str, Any]) -> None:
-    """
-    Save an invoice record for a PO file.
-    
-    Args:
-        po_filename: PO filename (e.g., "PO123.pdf")
-        invoice_data: Invoice data from QuickBooks including:
-            - Id: QuickBooks invoice ID
-            - DocNumber: Invoice document number
-            - TxnDate: Transaction date
-            - CustomerRef: Customer reference object
-    """
-    invoices = _load_invoices()
-    
+def _build_invoice_record(invoice_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a stored invoice record from QuickBooks invoice data."""
     # Extract customer info safely
     customer_ref = invoice_data.get("CustomerRef")
     customer_id = None
@@ -71,7 +43,7 @@ def save_invoice_record(po_filename: str, invoice_data: Dict[str, Any]) -> None:
     balance = float(invoice_data.get("Balance", 0)) if invoice_data.get("Balance") else 0
     total_amount = float(invoice_data.get("TotalAmt", 0)) if invoice_data.get("TotalAmt") else 0
     
-    invoices[po_filename] = {
+    return {
         "qb_invoice_id": invoice_data.get("Id"),
         "doc_number": invoice_data.get("DocNumber"),
         "txn_date": invoice_data.get("TxnDate"),
@@ -83,8 +55,37 @@ def save_invoice_record(po_filename: str, invoice_data: Dict[str, Any]) -> None:
         "total_amount": total_amount,
         "last_status_check": datetime.now().isoformat()
     }
+
+
+def save_invoice_record(po_filename: str, invoice_data: Dict[str, Any]) -> None:
+    """
+    Save an invoice record for a PO file.
     
-    _save_invoices(invoices)
+    Args:
+        po_filename: PO filename (e.g., "PO123.pdf")
+        invoice_data: Invoice data from QuickBooks including:
+            - Id: QuickBooks invoice ID
+            - DocNumber: Invoice document number
+            - TxnDate: Transaction date
+            - CustomerRef: Customer reference object
+    """
+    save_invoice_records({po_filename: invoice_data})
+
+
+def save_invoice_records(invoices_by_po: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Save invoice records for many PO files with a single read and write of the storage file.
+    
+    Args:
+        invoices_by_po: Dictionary mapping PO filename to QuickBooks invoice data
+            (same fields as save_invoice_record)
+    """
+    if not invoices_by_po:
+        return
+    
+    records = {po_filename: _build_invoice_record(invoice_data)
+               for po_filename, invoice_data in invoices_by_po.items()}
+    _update_invoices(lambda invoices: invoices.update(records))
 
 
 def get_invoice_record(po_filename: str) -> Optional[Dict[str, Any]]:
@@ -120,14 +121,35 @@ def update_invoice_status(po_filename: str, email_status: Optional[str] = None,
         email_status: Email status from QuickBooks
         balance: Current balance from QuickBooks
     """
-    invoices = _load_invoices()
-    if po_filename in invoices:
-        if email_status is not None:
-            invoices[po_filename]["email_status"] = email_status
-        if balance is not None:
-            invoices[po_filename]["balance"] = balance
-        invoices[po_filename]["last_status_check"] = datetime.now().isoformat()
-        _save_invoices(invoices)
+    update_invoice_statuses({po_filename: {"email_status": email_status, "balance": balance}})
+
+
+def update_invoice_statuses(statuses: Dict[str, Dict[str, Any]], checked: Optional[List[str]] = None) -> None:
+    """
+    Update status information for many invoices with a single write.
+    
+    Args:
+        statuses: Dictionary mapping PO filename to a dict with any of
+            email_status, balance, total_amount
+        checked: PO filenames that were checked; their last_status_check is
+            updated even if no status was returned (defaults to the keys of statuses)
+    """
+    now = datetime.now().isoformat()
+    
+    def apply(invoices: Dict[str, Any]) -> bool:
+        changed = False
+        for po_filename in set(statuses) | set(checked or []):
+            record = invoices.get(po_filename)
+            if record is None:
+                continue
+            for field, value in statuses.get(po_filename, {}).items():
+                if value is not None:
+                    record[field] = value
+            record["last_status_check"] = now
+            changed = True
+        return changed
+    
+    _update_invoices(apply)
 
 
 def mark_as_not_po(po_filename: str) -> None:
@@ -137,14 +159,11 @@ def mark_as_not_po(po_filename: str) -> None:
     Args:
         po_filename: PO filename (e.g., "PO123.pdf")
     """
-    invoices = _load_invoices()
-    
-    # Create or update record with "Not a PO" status
-    if po_filename not in invoices:
-        invoices[po_filename] = {}
-    
-    invoices[po_filename]["po_status"] = "Not a PO"
-    invoices[po_filename]["marked_at"] = datetime.now().isoformat()
+    def apply(invoices: Dict[str, Any]) -> None:
+        # Create or update record with "Not a PO" status
+        record = invoices.setdefault(po_filename, {})
+        record["po_status"] = "Not a PO"
+        record["marked_at"] = datetime.now().isoformat()
     
-    _save_invoices(invoices)
+    _update_invoices(apply)
 
@@ -0,0 +1,217 @@
+"""
+PO Extraction Service
+Caches POReader.extract_data results and extracts new PO files in the background.
+
+Results are stored in a persistent cache keyed by filename and validated by file
+size and modification time, so a PO is parsed once rather than on every PO list
+request. Gmail sync queues each downloaded PDF for extraction on a small worker
+pool, so new POs are already parsed when the list is opened; a lookup for a file
+that is still queued or being parsed waits for that extraction instead of parsing
+it a second time.
+"""
+
+import copy
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+from beanscounter.core.json_store import read_json, write_json
+
+# Get backend root directory (backend/src/beanscounter/services/po_extraction_service.py -> backend/)
+BACKEND_ROOT = Path(__file__).parent.parent.parent.parent
+CACHE_FILE = BACKEND_ROOT / "data" / "po_extraction_cache.json"
+
+# Bump when POReader output changes so stale cache entries are re-extracted
+# (2: entries record their file path so entries of deleted files can be pruned)
+EXTRACTION_CACHE_VERSION = 2
+
+# Background extraction workers
+EXTRACTION_WORKERS = int(os.getenv("PO_EXTRACTION_WORKERS", "2"))
+
+_cache_lock = threading.Lock()
+_cache: Optional[Dict[str, Any]] = None
+_dirty = False
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+# Filename -> Future of its queued or running background extraction (guarded by _executor_lock)
+_in_flight: Dict[str, Future] = {}
+_reader_local = threading.local()
+
+
+def _load_cache() -> Dict[str, Any]:
+    """Load the extraction cache from disk once per process (caller holds _cache_lock)."""
+    global _cache
+    if _cache is None:
+        _cache = read_json(CACHE_FILE, {})
+    return _cache
+
+
+def _prune_missing_files() -> None:
+    """Drop cache entries whose PO file no longer exists (or that predate path tracking)."""
+    global _dirty
+    with _cache_lock:
+        paths = {name: entry.get("path") for name, entry in _load_cache().items()}
+    missing = [name for name, path in paths.items() if not path or not os.path.exists(path)]
+    if not missing:
+        return
+    with _cache_lock:
+        cache = _load_cache()
+        for name in missing:
+            cache.pop(name, None)
+        _dirty = True
+
+
+def flush_extraction_cache() -> None:
+    """Write the extraction cache to disk if it changed, dropping entries of deleted files."""
+    global _dirty
+    _prune_missing_files()
+    with _cache_lock:
+        if not _dirty:
+            return
+        entries = dict(_load_cache())
+        _dirty = False
+    try:
+        write_json(CACHE_FILE, entries)
+    except Exception as e:
+        print(f"Error saving PO extraction cache: {e}")
+
+
+def _file_signature(file_path: Path) -> Dict[str, int]:
+    stat = file_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def get_cached_extraction(file_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Get cached extraction data for a PO file if it is still valid.
+
+    Args:
+        file_path: Path to the PO file
+
+    Returns:
+        Copy of the extracted data, or None if not cached or the file changed
+    """
+    try:
+        signature = _file_signature(file_path)
+    except OSError:
+        return None
+    with _cache_lock:
+        entry = _load_cache().get(file_path.name)
+        if (entry and entry.get("version") == EXTRACTION_CACHE_VERSION
+                and entry.get("size") == signature["size"] and entry.get("mtime_ns") == signature["mtime_ns"]):
+            return copy.deepcopy(entry["data"])
+    return None
+
+
+def _store_extraction(file_path: Path, signature: Dict[str, int], data: Dict[str, Any]) -> None:
+    global _dirty
+    with _cache_lock:
+        _load_cache()[file_path.name] = {
+            "version": EXTRACTION_CACHE_VERSION,
+            "path": str(file_path),
+            "size": signature["size"],
+            "mtime_ns": signature["mtime_ns"],
+            "extracted_at": datetime.now().isoformat(),
+            "data": copy.deepcopy(data)
+        }
+        _dirty = True
+
+
+def _get_reader():
+    """Get a POReader for the current thread."""
+    reader = getattr(_reader_local, "reader", None)
+    if reader is None:
+        from beanscounter.core.po_reader import POReader
+        reader = POReader()
+        _reader_local.reader = reader
+    return reader
+
+
+def get_extracted_data(file_path: Path, reader: Any = None) -> Dict[str, Any]:
+    """
+    Get extracted PO data, using the cache when the file has not changed.
+
+    If the file is queued for background extraction (see queue_extraction), waits
+    for that result rather than parsing the file again. Failed extractions (empty
+    results) are not cached so they are retried.
+    Call flush_extraction_cache() after a batch of lookups to persist new entries.
+
+    Args:
+        file_path: Path to the PO file
+        reader: POReader instance to use on a cache miss (optional)
+
+    Returns:
+        Extracted data dictionary (empty if extraction failed)
+    """
+    cached = get_cached_extraction(file_path)
+    if cached is not None:
+        return cached
+
+    with _executor_lock:
+        future = _in_flight.get(file_path.name)
+    if future is not None:
+        return copy.deepcopy(future.result())
+    return _extract(file_path, reader)
+
+
+def _extract(file_path: Path, reader: Any = None) -> Dict[str, Any]:
+    """Extract a PO on the calling thread and cache a non-empty result."""
+    cached = get_cached_extraction(file_path)
+    if cached is not None:
+        return cached
+
+    signature = _file_signature(file_path)
+    data = (reader or _get_reader()).extract_data(file_path)
+    if data:
+        _store_extraction(file_path, signature, data)
+    return data
+
+
+def _extract_in_background(file_path: Path) -> Dict[str, Any]:
+    global _pending
+    try:
+        return _extract(file_path)
+    except Exception as e:
+        print(f"Background extraction failed for {file_path.name}: {e}")
+        return {}
+    finally:
+        with _executor_lock:
+            _pending -= 1
+            _in_flight.pop(file_path.name, None)
+            drained = _pending == 0
+        # Persist once the queue drains rather than after every file
+        if drained:
+            flush_extraction_cache()
+
+
+def queue_extraction(file_paths: Iterable[Path]) -> List[Future]:
+    """
+    Queue PO files for background extraction into the cache.
+
+    A file that is already queued or being extracted is not queued again; its
+    existing Future is returned.
+
+    Args:
+        file_paths: Paths of PO files to extract
+
+    Returns:
+        Futures resolving to the extracted data
+    """
+    global _executor, _pending
+    futures = []
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS, thread_name_prefix="po-extraction")
+        for file_path in file_paths:
+            file_path = Path(file_path)
+            future = _in_flight.get(file_path.name)
+            if future is None:
+                _pending += 1
+                future = _executor.submit(_extract_in_background, file_path)
+                _in_flight[file_path.name] = future
+            futures.append(future)
+    return futures
@@ -3,38 +3,18 @@ PO Metadata Service
 Stores and retrieves metadata about POs, including their source (email or file).
 """
 
-import json
 from pathlib import Path
 from typing import Dict, Any, Optional
+from beanscounter.core.json_store import read_json, update_json
 
 # Metadata file location
 BACKEND_ROOT = Path(__file__).parent.parent.parent.parent
 METADATA_FILE = BACKEND_ROOT / "data" / "po_metadata.json"
 
 
-def _ensure_metadata_file():
-    """Ensure metadata file exists."""
-    METADATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    if not METADATA_FILE.exists():
-        with open(METADATA_FILE, 'w') as f:
-            json.dump({}, f, indent=2)
-
-
 def _load_metadata() -> Dict[str, Any]:
     """Load PO metadata from file."""
-    _ensure_metadata_file()
-    try:
-        with open(METADATA_FILE, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
-
-def _save_metadata(metadata: Dict[str, Any]):
-    """Save PO metadata to file."""
-    _ensure_metadata_file()
-    with open(METADATA_FILE, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    return read_json(METADATA_FILE, {})
 
 
 def po_number_exists(po_number: str) -> bool:
@@ -86,8 +66,6 @@ def save_po_source(po_number: str, source_type: str, **kwargs):
             - For email: email_subject, email_date, filename (optional, to track which file was created)
             - For file: filename
     """
-    metadata = _load_metadata()
-    
     source_info = {
         "source_type": source_type
     }
@@ -101,8 +79,7 @@ def save_po_source(po_number: str, source_type: str, **kwargs):
     elif source_type == "file":
         source_info["filename"] = kwargs.get("filename", "")
     
-    metadata[po_number] = source_info
-    _save_metadata(metadata)
+    update_json(METADATA_FILE, lambda metadata: metadata.update({po_number: source_info}), {})
 
 
 def get_po_source_by_filename(filename: str) -> Optional[Dict[str, Any]]:
@@ -3,10 +3,12 @@ PO to Invoice Converter Service
 Converts PO data structure to QuickBooks invoice format and creates invoice.
 """
 
-from typing import Dict, Any, List, Optional
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from beanscounter.services.settings_service import get_qb_credentials
 from beanscounter.integrations.quickbooks_client import QuickBooksClient
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
 from beanscounter.services.product_mapping_service import get_sku_for_product_string
 
 
@@ -48,24 +50,16 @@ def _format_date_for_qb(date_str: str) -> str:
         return None
 
 
-def _map_po_items_to_qb_lines(po_items: List[Dict[str, Any]], qb_client: QuickBooksClient) -> List[Dict[str, Any]]:
+def _index_qb_items(all_items: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
     """
-    Convert PO line items to QuickBooks line items.
-    Uses product mapping to match ProductString to SKU when available.
-    Only uses existing QuickBooks items - does NOT create new items.
-    Unmatched products are added as DescriptionOnly lines (no item reference).
+    Index QuickBooks items by SKU and by lower-cased Name.
     
     Args:
-        po_items: List of PO items with product_name, quantity, rate, price
-        qb_client: QuickBooksClient instance
+        all_items: QuickBooks items
         
     Returns:
-        List of QuickBooks line item objects
+        Tuple of (items_by_sku, items_by_name)
     """
-    line_objects = []
-    
-    # Get all QuickBooks items to look up by SKU and Name (read-only)
-    all_items = qb_client.get_all_items()
     items_by_sku = {}
     items_by_name = {}  # Also index by Name for fallback matching
     for qb_item in all_items:
@@ -78,6 +72,35 @@ def _map_po_items_to_qb_lines(po_items: List[Dict[str, Any]], qb_client: QuickBo
         item_name = qb_item.get("Name")
         if item_name:
             items_by_name[item_name.lower()] = qb_item
+    return items_by_sku, items_by_name
+
+
+def _map_po_items_to_qb_lines(po_items: List[Dict[str, Any]], qb_client: Optional[QuickBooksClient],
+                              all_items: Optional[List[Dict[str, Any]]] = None,
+                              item_index: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Convert PO line items to QuickBooks line items.
+    Uses product mapping to match ProductString to SKU when available.
+    Only uses existing QuickBooks items - does NOT create new items.
+    Unmatched products are added as DescriptionOnly lines (no item reference).
+    
+    Args:
+        po_items: List of PO items with product_name, quantity, rate, price
+        qb_client: QuickBooksClient instance (used to load items if all_items is None)
+        all_items: Pre-fetched QuickBooks items (optional)
+        item_index: Pre-built result of _index_qb_items (optional, takes precedence over all_items)
+        
+    Returns:
+        List of QuickBooks line item objects
+    """
+    line_objects = []
+    
+    # Get all QuickBooks items to look up by SKU and Name (read-only)
+    if item_index is None:
+        if all_items is None:
+            all_items = qb_client.get_all_items()
+        item_index = _index_qb_items(all_items)
+    items_by_sku, items_by_name = item_index
     
     for item in po_items:
         product_name = item.get("product_name", "")
@@ -153,6 +176,67 @@ def _map_po_items_to_qb_lines(po_items: List[Dict[str, Any]], qb_client: QuickBo
     return line_objects
 
 
+def _resolve_doc_number(po_details: Dict[str, Any]) -> str:
+    """
+    Get invoice number from PO (use invoice_number if provided, otherwise po_number).
+    
+    Args:
+        po_details: PO data dictionary
+        
+    Returns:
+        Invoice document number
+    """
+    doc_number = po_details.get("invoice_number") or po_details.get("po_number", "Unknown")
+    if doc_number == "Unknown":
+        # Generate from source file if available
+        source_file = po_details.get("source_file", "")
+        if source_file:
+            doc_number = source_file.replace(".pdf", "").replace(".png", "").replace(".jpg", "")
+        else:
+            doc_number = f"INV-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    return doc_number
+
+
+def _build_po_invoice_body(qb_client: Any, po_details: Dict[str, Any], customer_ref: Dict[str, str],
+                           doc_number: str, item_index: Tuple[Dict[str, Any], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the QuickBooks invoice body for a PO.
+    
+    Args:
+        qb_client: QuickBooksClient or AsyncQuickBooksClient instance
+        po_details: PO data dictionary
+        customer_ref: QuickBooks customer reference ({"value", "name"})
+        doc_number: Invoice document number
+        item_index: Result of _index_qb_items for the item catalog
+        
+    Returns:
+        Invoice body ready for create_invoice
+        
+    Raises:
+        ValueError: If the PO has no valid line items
+    """
+    invoice_date = _format_date_for_qb(po_details.get("order_date"))
+    if not invoice_date:
+        invoice_date = datetime.now().strftime("%Y-%m-%d")
+    
+    due_date = _format_date_for_qb(po_details.get("delivery_date"))
+    
+    po_items = po_details.get("items", [])
+    line_objects = _map_po_items_to_qb_lines(po_items, None, item_index=item_index)
+    
+    if not line_objects:
+        raise ValueError("No valid line items found in PO data")
+    
+    return qb_client.build_invoice_body(
+        customer_ref=customer_ref,
+        doc_number=doc_number,
+        invoice_date=invoice_date,
+        due_date=due_date,
+        term_ref=None,  # No terms from PO
+        line_objects=line_objects
+    )
+
+
 def convert_po_to_qb_invoice(po_details: Dict[str, Any], customer_id: str) -> Dict[str, Any]:
     """
     Convert PO data to QuickBooks invoice and create it.
@@ -202,15 +286,7 @@ def convert_po_to_qb_invoice(po_details: Dict[str, Any], customer_id: str) -> Di
     except Exception as e:
         raise ValueError(f"Invalid customer ID: {e}")
     
-    # Get invoice number from PO (use invoice_number if provided, otherwise po_number)
-    doc_number = po_details.get("invoice_number") or po_details.get("po_number", "Unknown")
-    if doc_number == "Unknown":
-        # Generate from source file if available
-        source_file = po_details.get("source_file", "")
-        if source_file:
-            doc_number = source_file.replace(".pdf", "").replace(".png", "").replace(".jpg", "")
-        else:
-            doc_number = f"INV-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    doc_number = _resolve_doc_number(po_details)
     
     # Check if invoice already exists
     existing = qb_client.find_invoice_by_docnumber(doc_number)
@@ -221,33 +297,88 @@ def convert_po_to_qb_invoice(po_details: Dict[str, Any], customer_id: str) -> Di
             "error": None
         }
     
-    # Format dates
-    invoice_date = _format_date_for_qb(po_details.get("order_date"))
-    if not invoice_date:
-        invoice_date = datetime.now().strftime("%Y-%m-%d")
+    # Build invoice body (same helpers as the async and bulk paths)
+    item_index = _index_qb_items(qb_client.get_all_items(raise_errors=True))
+    invoice_body = _build_po_invoice_body(qb_client, po_details, customer_ref, doc_number, item_index)
     
-    due_date = _format_date_for_qb(po_details.get("delivery_date"))
+    # Create invoice
+    try:
+        created = qb_client.create_invoice(invoice_body)
+        return {
+            "status": "created",
+            "invoice": created,
+            "error": None
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "invoice": None,
+            "error": str(e)
+        }
+
+
+async def convert_po_to_qb_invoice_async(po_details: Dict[str, Any], customer_id: str) -> Dict[str, Any]:
+    """
+    Async variant of convert_po_to_qb_invoice.
     
-    # Convert line items
-    po_items = po_details.get("items", [])
-    line_objects = _map_po_items_to_qb_lines(po_items, qb_client)
+    Customer verification, the DocNumber existence check and the item catalog
+    fetch are independent, so they run concurrently.
     
-    if not line_objects:
-        raise ValueError("No valid line items found in PO data")
+    Args:
+        po_details: PO data dictionary with customer, po_number, order_date, items, etc.
+        customer_id: QuickBooks customer ID (must be valid)
+        
+    Returns:
+        Dictionary with status and invoice data (same shape as convert_po_to_qb_invoice)
+        
+    Raises:
+        RuntimeError: If credentials not configured or API fails
+        ValueError: If customer_id is invalid
+    """
+    credentials = get_qb_credentials()
+    if not credentials:
+        raise RuntimeError("QuickBooks credentials not configured")
     
-    # Build invoice body
-    invoice_body = qb_client.build_invoice_body(
-        customer_ref=customer_ref,
-        doc_number=doc_number,
-        invoice_date=invoice_date,
-        due_date=due_date,
-        term_ref=None,  # No terms from PO
-        line_objects=line_objects
+    qb_client = AsyncQuickBooksClient(
+        client_id=credentials["client_id"],
+        client_secret=credentials["client_secret"],
+        refresh_token=credentials["refresh_token"],
+        realm_id=credentials["realm_id"],
+        environment=credentials["environment"]
     )
     
-    # Create invoice
+    doc_number = _resolve_doc_number(po_details)
+    
+    customer, existing, all_items = await asyncio.gather(
+        qb_client.get_customer_by_id(customer_id),
+        qb_client.find_invoice_by_docnumber(doc_number),
+        qb_client.get_all_items(raise_errors=True),
+        return_exceptions=True
+    )
+    
+    if isinstance(customer, Exception):
+        raise ValueError(f"Invalid customer ID: {customer}")
+    if not customer:
+        raise ValueError(f"Invalid customer ID: Customer with ID {customer_id} not found in QuickBooks")
+    if isinstance(existing, Exception):
+        raise existing
+    if isinstance(all_items, Exception):
+        raise all_items
+    
+    customer_ref = {"value": customer["Id"], "name": customer.get("DisplayName", "")}
+    
+    if existing:
+        return {
+            "status": "exists",
+            "invoice": existing,
+            "error": None
+        }
+    
+    invoice_body = _build_po_invoice_body(qb_client, po_details, customer_ref, doc_number,
+                                          _index_qb_items(all_items))
+    
     try:
-        created = qb_client.create_invoice(invoice_body)
+        created = await qb_client.create_invoice(invoice_body)
         return {
             "status": "created",
             "invoice": created,
@@ -259,4 +390,3 @@ def convert_po_to_qb_invoice(po_details: Dict[str, Any], customer_id: str) -> Di
             "invoice": None,
             "error": str(e)
         }
-
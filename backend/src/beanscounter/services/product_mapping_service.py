@@ -4,63 +4,44 @@ Stores and retrieves mappings between ProductString (from PO Line Items) and SKU
 This is a many:1 mapping - multiple ProductStrings can map to the same SKU.
 """
 
-import json
 from pathlib import Path
 from typing import Dict, Any, Optional, List
+from beanscounter.core.json_store import file_lock, read_json, write_json
 
 # Get backend root directory
 BACKEND_ROOT = Path(__file__).parent.parent.parent.parent
 STORAGE_FILE = BACKEND_ROOT / "data" / "product_mappings.json"
 
 
-def _ensure_data_dir():
-    """Ensure the data directory exists."""
-    STORAGE_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-
 def _load_mappings() -> Dict[str, Any]:
     """Load product mappings from storage file."""
-    _ensure_data_dir()
-    if not STORAGE_FILE.exists():
-        return {
-            "mappings": {},  # product_string -> sku
-            "skus": {}  # sku -> {name, id, product_strings: []}
-        }
-    
-    try:
-        with open(STORAGE_FILE, 'r') as f:
-            data = json.load(f)
-            # Ensure backward compatibility
-            if "mappings" not in data:
-                # Old format: just a dict of product_string -> sku
-                old_mappings = data if isinstance(data, dict) else {}
-                data = {
-                    "mappings": old_mappings,
-                    "skus": {}
-                }
-                # Rebuild skus dict from mappings
-                for product_string, sku in old_mappings.items():
-                    if sku not in data["skus"]:
-                        data["skus"][sku] = {
-                            "product_strings": []
-                        }
-                    if product_string not in data["skus"][sku]["product_strings"]:
-                        data["skus"][sku]["product_strings"].append(product_string)
-            return data
-    except Exception as e:
-        print(f"Error loading product mappings: {e}")
-        return {
-            "mappings": {},
+    data = read_json(STORAGE_FILE, {
+        "mappings": {},  # product_string -> sku
+        "skus": {}  # sku -> {name, id, product_strings: []}
+    })
+    # Ensure backward compatibility
+    if "mappings" not in data:
+        # Old format: just a dict of product_string -> sku
+        old_mappings = data if isinstance(data, dict) else {}
+        data = {
+            "mappings": old_mappings,
             "skus": {}
         }
+        # Rebuild skus dict from mappings
+        for product_string, sku in old_mappings.items():
+            if sku not in data["skus"]:
+                data["skus"][sku] = {
+                    "product_strings": []
+                }
+            if product_string not in data["skus"][sku]["product_strings"]:
+                data["skus"][sku]["product_strings"].append(product_string)
+    return data
 
 
 def _save_mappings(data: Dict[str, Any]):
     """Save product mappings to storage file."""
-    _ensure_data_dir()
     try:
-        with open(STORAGE_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json(STORAGE_FILE, data)
     except Exception as e:
         print(f"Error saving product mappings: {e}")
         raise
@@ -183,56 +164,58 @@ def set_product_mapping(product_string: str, sku: str, sku_name: Optional[str] =
     if not product_string or not sku:
         return
     
-    data = _load_mappings()
-    
-    # Normalize the product_string key (trim whitespace)
-    normalized_key = product_string.strip()
-    
-    # Check if there's an existing mapping with a different key (whitespace variant)
-    # Remove old mappings with different whitespace
-    keys_to_remove = []
-    for key in data["mappings"].keys():
-        if key.strip() == normalized_key and key != normalized_key:
-            keys_to_remove.append(key)
-            old_sku = data["mappings"][key]
+    # Hold the file lock so concurrent updates are not lost
+    with file_lock(STORAGE_FILE):
+        data = _load_mappings()
+        
+        # Normalize the product_string key (trim whitespace)
+        normalized_key = product_string.strip()
+        
+        # Check if there's an existing mapping with a different key (whitespace variant)
+        # Remove old mappings with different whitespace
+        keys_to_remove = []
+        for key in data["mappings"].keys():
+            if key.strip() == normalized_key and key != normalized_key:
+                keys_to_remove.append(key)
+                old_sku = data["mappings"][key]
+                # Remove from old SKU's product_strings list
+                if old_sku in data["skus"]:
+                    if key in data["skus"][old_sku].get("product_strings", []):
+                        data["skus"][old_sku]["product_strings"].remove(key)
+        
+        for key in keys_to_remove:
+            del data["mappings"][key]
+        
+        # Remove old mapping if product_string was mapped to a different SKU
+        old_sku = data["mappings"].get(normalized_key)
+        if old_sku and old_sku != sku:
             # Remove from old SKU's product_strings list
             if old_sku in data["skus"]:
-                if key in data["skus"][old_sku].get("product_strings", []):
-                    data["skus"][old_sku]["product_strings"].remove(key)
-    
-    for key in keys_to_remove:
-        del data["mappings"][key]
-    
-    # Remove old mapping if product_string was mapped to a different SKU
-    old_sku = data["mappings"].get(normalized_key)
-    if old_sku and old_sku != sku:
-        # Remove from old SKU's product_strings list
-        if old_sku in data["skus"]:
-            if normalized_key in data["skus"][old_sku].get("product_strings", []):
-                data["skus"][old_sku]["product_strings"].remove(normalized_key)
-    
-    # Set new mapping with normalized key
-    data["mappings"][normalized_key] = sku
-    
-    # Update SKU info
-    if sku not in data["skus"]:
-        data["skus"][sku] = {
-            "product_strings": [],
-            "name": sku_name,
-            "id": sku_id
-        }
-    
-    # Add normalized product_string to SKU's list if not already there
-    if normalized_key not in data["skus"][sku]["product_strings"]:
-        data["skus"][sku]["product_strings"].append(normalized_key)
-    
-    # Update SKU metadata if provided
-    if sku_name:
-        data["skus"][sku]["name"] = sku_name
-    if sku_id:
-        data["skus"][sku]["id"] = sku_id
-    
-    _save_mappings(data)
+                if normalized_key in data["skus"][old_sku].get("product_strings", []):
+                    data["skus"][old_sku]["product_strings"].remove(normalized_key)
+        
+        # Set new mapping with normalized key
+        data["mappings"][normalized_key] = sku
+        
+        # Update SKU info
+        if sku not in data["skus"]:
+            data["skus"][sku] = {
+                "product_strings": [],
+                "name": sku_name,
+                "id": sku_id
+            }
+        
+        # Add normalized product_string to SKU's list if not already there
+        if normalized_key not in data["skus"][sku]["product_strings"]:
+            data["skus"][sku]["product_strings"].append(normalized_key)
+        
+        # Update SKU metadata if provided
+        if sku_name:
+            data["skus"][sku]["name"] = sku_name
+        if sku_id:
+            data["skus"][sku]["id"] = sku_id
+        
+        _save_mappings(data)
 
 
 def remove_product_mapping(product_string: str):
@@ -242,18 +225,20 @@ def remove_product_mapping(product_string: str):
     Args:
         product_string: ProductString to remove mapping for
     """
-    data = _load_mappings()
-    
-    if product_string in data["mappings"]:
-        sku = data["mappings"][product_string]
-        del data["mappings"][product_string]
+    # Hold the file lock so concurrent updates are not lost
+    with file_lock(STORAGE_FILE):
+        data = _load_mappings()
         
-        # Remove from SKU's product_strings list
-        if sku in data["skus"]:
-            if product_string in data["skus"][sku].get("product_strings", []):
-                data["skus"][sku]["product_strings"].remove(product_string)
+        if product_string in data["mappings"]:
+            sku = data["mappings"][product_string]
+            del data["mappings"][product_string]
         
-        _save_mappings(data)
+            # Remove from SKU's product_strings list
+            if sku in data["skus"]:
+                if product_string in data["skus"][sku].get("product_strings", []):
+                    data["skus"][sku]["product_strings"].remove(product_string)
+        
+            _save_mappings(data)
 
 
 def get_all_mappings() -> Dict[str, str]:
@@ -286,36 +271,23 @@ def bulk_set_mappings(mappings: Dict[str, str], sku_metadata: Optional[Dict[str,
         mappings: Dictionary of product_string -> sku
         sku_metadata: Optional dictionary of sku -> {name, id}
     """
-    data = _load_mappings()
-    
-    # Update mappings
-    for product_string, sku in mappings.items():
-        # Remove old mapping if exists
-        old_sku = data["mappings"].get(product_string)
-        if old_sku and old_sku != sku:
-            if old_sku in data["skus"]:
-                if product_string in data["skus"][old_sku].get("product_strings", []):
-                    data["skus"][old_sku]["product_strings"].remove(product_string)
+    # Hold the file lock so concurrent updates are not lost
+    with file_lock(STORAGE_FILE):
+        data = _load_mappings()
         
-        # Set new mapping
-        data["mappings"][product_string] = sku
+        # Update mappings
+        for product_string, sku in mappings.items():
+            # Remove old mapping if exists
+            old_sku = data["mappings"].get(product_string)
+            if old_sku and old_sku != sku:
+                if old_sku in data["skus"]:
+                    if product_string in data["skus"][old_sku].get("product_strings", []):
+                        data["skus"][old_sku]["product_strings"].remove(product_string)
         
-        # Update SKU info
-        if sku not in data["skus"]:
-            data["skus"][sku] = {
-                "product_strings": [],
-                "name": None,
-                "id": None,
-                "description": None
-            }
+            # Set new mapping
+            data["mappings"][product_string] = sku
         
-        if product_string not in data["skus"][sku]["product_strings"]:
-            data["skus"][sku]["product_strings"].append(product_string)
-    
-    # Update SKU metadata if provided
-    if sku_metadata:
-        for sku, metadata in sku_metadata.items():
-            # Ensure SKU entry exists before updating metadata
+            # Update SKU info
             if sku not in data["skus"]:
                 data["skus"][sku] = {
                     "product_strings": [],
@@ -323,16 +295,31 @@ def bulk_set_mappings(mappings: Dict[str, str], sku_metadata: Optional[Dict[str,
                     "id": None,
                     "description": None
                 }
+        
+            if product_string not in data["skus"][sku]["product_strings"]:
+                data["skus"][sku]["product_strings"].append(product_string)
+        
+        # Update SKU metadata if provided
+        if sku_metadata:
+            for sku, metadata in sku_metadata.items():
+                # Ensure SKU entry exists before updating metadata
+                if sku not in data["skus"]:
+                    data["skus"][sku] = {
+                        "product_strings": [],
+                        "name": None,
+                        "id": None,
+                        "description": None
+                    }
             
-            # Update metadata fields if provided and not None
-            if "name" in metadata and metadata["name"] is not None:
-                data["skus"][sku]["name"] = metadata["name"]
-            if "id" in metadata and metadata["id"] is not None:
-                data["skus"][sku]["id"] = metadata["id"]
-            if "description" in metadata and metadata["description"] is not None:
-                data["skus"][sku]["description"] = metadata["description"]
-    
-    _save_mappings(data)
+                # Update metadata fields if provided and not None
+                if "name" in metadata and metadata["name"] is not None:
+                    data["skus"][sku]["name"] = metadata["name"]
+                if "id" in metadata and metadata["id"] is not None:
+                    data["skus"][sku]["id"] = metadata["id"]
+                if "description" in metadata and metadata["description"] is not None:
+                    data["skus"][sku]["description"] = metadata["description"]
+        
+        _save_mappings(data)
 
 
 def clear_all_mappings() -> None:
@@ -358,43 +345,45 @@ def refresh_skus_from_qb(qb_items: List[Dict[str, Any]]) -> None:
     Args:
         qb_items: List of QuickBooks items with Id, Name, Sku, Description, Type
     """
-    # Get current mappings to preserve them
-    current_data = _load_mappings()
-    current_mappings = current_data.get("mappings", {}).copy()
-    
-    # Build new SKU data from QuickBooks
-    new_skus = {}
-    new_mappings = {}
-    
-    # Import all items from QuickBooks
-    # Use SKU as the key, or fall back to Name if no SKU
-    for item in qb_items:
-        # Try multiple possible field names for SKU
-        sku = item.get("Sku") or item.get("SKU") or item.get("sku")
+    # Hold the file lock so concurrent updates are not lost
+    with file_lock(STORAGE_FILE):
+        # Get current mappings to preserve them
+        current_data = _load_mappings()
+        current_mappings = current_data.get("mappings", {}).copy()
         
-        # If no SKU, use Name as the identifier
-        if not sku:
-            sku = item.get("Name")
+        # Build new SKU data from QuickBooks
+        new_skus = {}
+        new_mappings = {}
         
-        if sku:  # Process items with SKU or Name
-            new_skus[sku] = {
-                "product_strings": [],
-                "name": item.get("Name"),
-                "id": item.get("Id"),
-                "description": item.get("Description"),
-                "type": item.get("Type")
-            }
+        # Import all items from QuickBooks
+        # Use SKU as the key, or fall back to Name if no SKU
+        for item in qb_items:
+            # Try multiple possible field names for SKU
+            sku = item.get("Sku") or item.get("SKU") or item.get("sku")
+        
+            # If no SKU, use Name as the identifier
+            if not sku:
+                sku = item.get("Name")
+        
+            if sku:  # Process items with SKU or Name
+                new_skus[sku] = {
+                    "product_strings": [],
+                    "name": item.get("Name"),
+                    "id": item.get("Id"),
+                    "description": item.get("Description"),
+                    "type": item.get("Type")
+                }
             
-            # Preserve existing ProductString mappings if SKU/Name still exists
-            for product_string, mapped_sku in current_mappings.items():
-                if mapped_sku == sku:
-                    new_mappings[product_string] = sku
-                    new_skus[sku]["product_strings"].append(product_string)
-    
-    # Save new data
-    data = {
-        "mappings": new_mappings,
-        "skus": new_skus
-    }
-    _save_mappings(data)
+                # Preserve existing ProductString mappings if SKU/Name still exists
+                for product_string, mapped_sku in current_mappings.items():
+                    if mapped_sku == sku:
+                        new_mappings[product_string] = sku
+                        new_skus[sku]["product_strings"].append(product_string)
+        
+        # Save new data
+        data = {
+            "mappings": new_mappings,
+            "skus": new_skus
+        }
+        _save_mappings(data)
 
@@ -209,35 +209,15 @@ def search_customers_by_domain(domain: str) -> List[Dict[str, Any]]:
         
         # QuickBooks doesn't support direct email domain queries in WHERE clause
         # We need to fetch customers and filter by email domain
-        # Use a broad query to get customers with email addresses and web addresses
-        # Handle pagination to get all customers
-        all_customers = []
-        max_results = 1000
-        start_position = 1
-        
-        while True:
-            query = f"select Id, DisplayName, CompanyName, GivenName, FamilyName, PrimaryEmailAddr, WebAddr from Customer maxresults {max_results} startposition {start_position}"
-            
-            try:
-                result = qb_client.query(query)
-                query_response = result.get("QueryResponse", {})
-                customers_raw = query_response.get("Customer", [])
-                
-                # Handle single dict vs list
-                if isinstance(customers_raw, dict):
-                    all_customers.append(customers_raw)
-                elif isinstance(customers_raw, list):
-                    all_customers.extend(customers_raw)
-                
-                # Check if there are more results
-                max_results_returned = query_response.get("maxResults", 0)
-                if not customers_raw or len(customers_raw) < max_results_returned:
-                    break
-                
-                start_position += max_results_returned
-            except Exception as e:
-                print(f"Error querying customers (page {start_position}): {e}")
-                break
+        # Fetch only the columns needed for matching; pages are fetched concurrently
+        try:
+            all_customers = qb_client.query_all(
+                "Customer",
+                columns=["Id", "DisplayName", "CompanyName", "GivenName", "FamilyName", "PrimaryEmailAddr", "WebAddr"]
+            )
+        except Exception as e:
+            print(f"Error querying customers: {e}")
+            all_customers = []
         
         # Filter customers by email domain (after collecting all customers)
         from beanscounter.core.domain_utils import extract_domain
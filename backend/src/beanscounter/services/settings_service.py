@@ -3,11 +3,12 @@ Settings service for managing QuickBooks credentials.
 Stores encrypted credentials in a JSON file.
 """
 
-import json
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional
+from beanscounter.core.credentials_cache import CredentialsCache
 from beanscounter.core.encryption import encrypt_value, decrypt_value, get_encryption_key
+from beanscounter.core.json_store import delete_json, read_json, update_json, write_json
 
 
 # Get backend root directory (backend/src/beanscounter/services/settings_service.py -> backend/)
@@ -16,55 +17,23 @@ BACKEND_ROOT = Path(__file__).parent.parent.parent.parent
 SETTINGS_FILE = BACKEND_ROOT / "data" / "settings.json"
 QB_PREFS_FILE = BACKEND_ROOT / "data" / "prefs" / "quickbooks.json"
 
-
-def _ensure_data_dir():
-    """Ensure the data directory exists."""
-    SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-
-def _ensure_prefs_dir():
-    """Ensure the prefs directory exists."""
-    QB_PREFS_FILE.parent.mkdir(parents=True, exist_ok=True)
+# Decrypted QuickBooks credentials, reloaded only when the prefs file changes
+_qb_credentials_cache = CredentialsCache(QB_PREFS_FILE)
 
 
 def _load_settings() -> Dict[str, Any]:
     """Load settings from file."""
-    _ensure_data_dir()
-    if not SETTINGS_FILE.exists():
-        return {}
-    
-    try:
-        with open(SETTINGS_FILE, "r") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-
-def _save_settings(settings: Dict[str, Any]):
-    """Save settings to file."""
-    _ensure_data_dir()
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(settings, f, indent=2)
+    return read_json(SETTINGS_FILE, {})
 
 
 def _load_qb_prefs() -> Dict[str, Any]:
     """Load QuickBooks preferences from prefs folder."""
-    _ensure_prefs_dir()
-    if not QB_PREFS_FILE.exists():
-        return {}
-    
-    try:
-        with open(QB_PREFS_FILE, "r") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    return read_json(QB_PREFS_FILE, {})
 
 
 def _save_qb_prefs(prefs: Dict[str, Any]):
     """Save QuickBooks preferences to prefs folder."""
-    _ensure_prefs_dir()
-    with open(QB_PREFS_FILE, "w") as f:
-        json.dump(prefs, f, indent=2)
+    write_json(QB_PREFS_FILE, prefs)
 
 
 def save_qb_credentials(
@@ -94,16 +63,27 @@ def save_qb_credentials(
         "environment": environment  # Not sensitive, store as-is
     }
     _save_qb_prefs(prefs)
+    _qb_credentials_cache.invalidate()
+    _clear_domain_decisions()
 
 
 def get_qb_credentials() -> Optional[Dict[str, str]]:
     """
     Retrieve and decrypt QuickBooks credentials from prefs folder.
     
+    Decrypted credentials are cached in memory until the prefs file is saved,
+    deleted or modified.
+    
     Returns:
         Dictionary with credentials or None if not configured
         Keys: client_id, client_secret, refresh_token, realm_id, environment
     """
+    credentials = _qb_credentials_cache.get(_load_qb_credentials)
+    return dict(credentials) if credentials else None
+
+
+def _load_qb_credentials() -> Optional[Dict[str, str]]:
+    """Read and decrypt QuickBooks credentials from the prefs file."""
     prefs = _load_qb_prefs()
     
     if not prefs:
@@ -135,8 +115,18 @@ def has_qb_credentials() -> bool:
 
 def delete_qb_credentials() -> None:
     """Remove QuickBooks configuration from prefs folder."""
-    if QB_PREFS_FILE.exists():
-        QB_PREFS_FILE.unlink()
+    delete_json(QB_PREFS_FILE)
+    _qb_credentials_cache.invalidate()
+    _clear_domain_decisions()
+
+
+def _clear_domain_decisions() -> None:
+    """Drop sender domain -> customer decisions, which belong to the previous company."""
+    from beanscounter.services.email_domain_matching_service import clear_domain_decisions
+    try:
+        clear_domain_decisions()
+    except Exception as e:
+        print(f"Error clearing domain decisions: {e}")
 
 
 def test_qb_connection() -> Dict[str, Any]:
@@ -214,7 +204,5 @@ def save_max_invoice_number_attempts(max_attempts: int) -> None:
     if max_attempts <= 0:
         raise ValueError("max_attempts must be greater than 0")
     
-    settings = _load_settings()
-    settings["max_invoice_number_attempts"] = max_attempts
-    _save_settings(settings)
+    update_json(SETTINGS_FILE, lambda settings: settings.update({"max_invoice_number_attempts": max_attempts}), {})
 
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+# What importing the API app may add on top of fastapi/starlette/pydantic. By default
+# it is measured against fastapi's own import time in the same process (the app added
+# ~2x fastapi before heavy libraries moved to first use, ~0.4x after), so the check
+# holds on slow machines too; BEANSCOUNTER_IMPORT_BUDGET_MS sets an absolute budget instead
+IMPORT_BUDGET_MS = os.getenv("BEANSCOUNTER_IMPORT_BUDGET_MS")
+IMPORT_BUDGET_FASTAPI_RATIO = 1.0
+
+HEAVY_MODULES = ("pdfplumber", "pytesseract", "PIL", "rich", "googleapiclient", "google.oauth2",
+                 "google_auth_oauthlib", "requests", "httpx")
+
+
+def _import_app() -> subprocess.CompletedProcess:
+    code = (
+        "import fastapi, starlette, pydantic; import beanscounter.api.app, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.getenv("PYTHONPATH")]))}
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          env=env, check=True)
+
+
+def _cumulative_ms(importtime_output: str, module: str) -> float:
+    line = next(line for line in importtime_output.splitlines() if line.endswith(f"| {module}"))
+    return int(line.split("|")[1]) / 1000
+
+
+def test_api_app_import_skips_heavy_libraries():
+    assert _import_app().stdout.strip() == ""
+
+
+def test_api_app_import_stays_within_budget():
+    result = _import_app()
+    app_ms = _cumulative_ms(result.stderr, "beanscounter.api.app")
+    if IMPORT_BUDGET_MS:
+        budget_ms = float(IMPORT_BUDGET_MS)
+    else:
+        budget_ms = IMPORT_BUDGET_FASTAPI_RATIO * _cumulative_ms(result.stderr, "fastapi")
+    assert app_ms < budget_ms, f"beanscounter.api.app import took {app_ms:.0f} ms (budget {budget_ms:.0f} ms)"
@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from beanscounter.api.app import app, record_request_timing
+from beanscounter.core.metrics import timed
+
+
+def test_server_timing_header_and_prometheus_metrics():
+    test_app = FastAPI()
+    test_app.middleware("http")(record_request_timing)
+
+    @test_app.get("/items/{item_id}")
+    def get_item(item_id: str):
+        with timed("quickbooks", call="query_item"):
+            pass
+        with timed("quickbooks", call="query_item"):
+            pass
+        return {"id": item_id}
+
+    response = TestClient(test_app).get("/items/42")
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("total;dur=")
+    assert 'quickbooks_query_item;dur=' in timing and 'desc="2 calls"' in timing
+
+    metrics = TestClient(app).get("/metrics").text
+    assert ('beanscounter_http_request_duration_seconds_count'
+            '{method="GET",route="/items/{item_id}",status="200"} 1') in metrics
+    assert 'beanscounter_phase_seconds_bucket{call="query_item",phase="quickbooks",le="+Inf"} 2' in metrics
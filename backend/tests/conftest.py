@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# convert.py lives at the repository root; the synthetic PDF corpora (po_corpus,
+# paypal_corpus) are shared with the benchmarks
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+for path in (BACKEND_DIR.parent, BACKEND_DIR / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
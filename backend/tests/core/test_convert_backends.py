@@ -0,0 +1,29 @@
+import contextlib
+import io
+
+import pytest
+
+import convert
+from paypal_corpus import generate_paypal_corpus
+
+
+def _parse(text):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return convert.parse_invoice_data(text)
+
+
+def test_parse_invoice_data_is_identical_across_text_backends(tmp_path):
+    backends = convert.available_backends()
+    assert convert.DEFAULT_BACKEND in backends, "PyPDF2 is in requirements-dev.txt"
+    if len(backends) < 2:
+        pytest.skip("needs a second text backend installed")
+    paths = generate_paypal_corpus(tmp_path, count=4, seed=1)
+
+    parsed = {name: [_parse(convert.extract_text_from_pdf(path, name)) for path in paths] for name in backends}
+
+    reference = parsed[convert.DEFAULT_BACKEND]
+    assert all(invoice["invoice_number"] and invoice["line_items"] for invoice in reference)
+    for name in backends:
+        assert parsed[name] == reference, name
+    with pytest.raises(ValueError):
+        convert.extract_text_from_pdf(paths[0], "unknown")
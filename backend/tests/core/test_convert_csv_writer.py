@@ -0,0 +1,48 @@
+import csv
+
+import convert
+
+
+def _invoice(number, lines):
+    return {"invoice_number": f"INV-{number}", "customer_name": "Acme Foods Inc", "total": "10.00",
+            "line_items": [{"item_number": str(i), "description": f"Item {i}", "quantity": "1", "rate": "10.00",
+                            "amount": "10.00"} for i in range(1, lines + 1)]}
+
+
+def _read(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == convert.QUICKBOOKS_HEADERS
+    return rows[1:]
+
+
+def _invoice_numbers(path):
+    return [row[0] for row in _read(path)]
+
+
+def test_rotation_by_max_rows_keeps_invoices_whole(tmp_path):
+    invoices = (_invoice(n, lines) for n, lines in enumerate([2, 2, 1, 7, 1, 3]))  # generator input
+    with convert.QuickBooksCSVWriter(tmp_path / "out.csv", max_rows=4, verbose=False) as writer:
+        writer.write_invoices(invoices)
+
+    assert [p.name for p in writer.paths] == ["out_001.csv", "out_002.csv", "out_003.csv", "out_004.csv"]
+    parts = [_invoice_numbers(p) for p in writer.paths]
+    assert parts == [["INV-0"] * 2 + ["INV-1"] * 2,
+                     ["INV-2"],
+                     ["INV-3"] * 7,  # larger than max_rows, so it gets a part of its own
+                     ["INV-4"] + ["INV-5"] * 3]
+    assert writer.row_count == 16 and writer.invoice_count == 6
+
+
+def test_rotation_by_max_invoices(tmp_path):
+    paths = convert.create_quickbooks_csv((_invoice(n, n % 3 + 1) for n in range(5)), tmp_path / "out.csv",
+                                          max_invoices=2)
+
+    assert [sorted(set(_invoice_numbers(p))) for p in paths] == [["INV-0", "INV-1"], ["INV-2", "INV-3"], ["INV-4"]]
+
+
+def test_empty_run_writes_a_header_only_file(tmp_path):
+    paths = convert.create_quickbooks_csv(iter([]), tmp_path / "out.csv")
+
+    assert paths == [tmp_path / "out.csv"]
+    assert _read(paths[0]) == []
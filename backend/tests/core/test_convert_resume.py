@@ -0,0 +1,37 @@
+import csv
+import shutil
+
+import convert
+from paypal_corpus import generate_paypal_corpus
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return sorted(list(csv.reader(f))[1:])
+
+
+def test_resume_replaces_changed_and_interrupted_invoices(tmp_path, monkeypatch):
+    pdf_dir = tmp_path / "pdfs"
+    paths = generate_paypal_corpus(pdf_dir, count=3, seed=1)
+    output = tmp_path / "out" / "combined.csv"
+    convert.main([str(pdf_dir), "--output", str(output), "--resume"])
+
+    # paypal_0001.pdf is edited, and paypal_0003.pdf was written but the run died before recording it
+    edited = generate_paypal_corpus(tmp_path / "other", count=8, seed=2)[7]
+    shutil.copy(edited, paths[1])
+    interrupted = generate_paypal_corpus(tmp_path / "more", count=4, seed=3)[3]
+    shutil.copy(interrupted, pdf_dir / interrupted.name)
+    with convert.QuickBooksCSVWriter(output, verbose=False, append=True) as writer:
+        writer.write_invoice(convert.parse_invoice_data(convert.extract_text_from_pdf(interrupted)))
+
+    extracted = []
+    extract = convert.extract_text_from_pdf
+    monkeypatch.setattr(convert, "extract_text_from_pdf", lambda path, backend: extracted.append(path.name)
+                        or extract(path, backend))
+    convert.main([str(pdf_dir), "--output", str(output), "--resume"])
+
+    assert extracted == ["paypal_0001.pdf", "paypal_0003.pdf"]
+    fresh = tmp_path / "fresh" / "combined.csv"
+    convert.main([str(pdf_dir), "--output", str(fresh)])
+    assert _rows(output) == _rows(fresh)
+    assert {row[0] for row in _rows(output)} == {"INV-1000", "INV-1007", "INV-1002", "INV-1003"}
@@ -0,0 +1,30 @@
+import pytest
+from beanscounter.core.csv_reader import CSVRow, iter_rows, parse_csv
+
+
+def test_headers_resolved_once_and_rows_typed(tmp_path):
+    path = tmp_path / "invoice.csv"
+    path.write_text(
+        "﻿ rate ,QTY,item,Notes,invoicenumber,Customer,Taxable,InvoiceDate\n"
+        "26.00,35,Tikka Bento,x,INV-1,Acme,Yes,01/02/2025\n"
+        "\n"
+        "3,,Samosa,,INV-1,Acme\n"
+    )
+
+    rows = list(iter_rows(str(path)))
+    assert [type(r) for r in rows] == [CSVRow, CSVRow]
+    first = rows[0]
+    assert (first.line, first.item, first.qty, first.rate, first.taxable) == (2, "Tikka Bento", 35.0, 26.0, True)
+    assert (rows[1].line, rows[1].qty, rows[1].taxable, rows[1].terms) == (4, 1.0, False, "")
+    assert not hasattr(rows[0], "__dict__")
+
+    payload = parse_csv(str(path))
+    assert payload["invoice_date"] == "2025-01-02"
+    assert [ln["name"] for ln in payload["lines"]] == ["Tikka Bento", "Samosa"]
+
+    path.write_text("Customer,InvoiceNumber,Item,Qty,Rate\nAcme,INV-1,X,two,1\n")
+    with pytest.raises(ValueError, match="Bad Qty/Rate in row 2"):
+        parse_csv(str(path))
+    path.write_text("Customer,Item,Qty,Rate\n")
+    with pytest.raises(ValueError, match="missing required columns: InvoiceNumber"):
+        parse_csv(str(path))
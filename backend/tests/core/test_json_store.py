@@ -0,0 +1,38 @@
+import json
+import os
+import threading
+from beanscounter.core import json_store
+
+
+def test_write_read_update_and_external_change(tmp_path):
+    path = tmp_path / "nested" / "store.json"
+    assert json_store.read_json(path, {}) == {}
+
+    json_store.write_json(path, {"a": {"n": 1}})
+    assert list(path.parent.iterdir()) == [path]
+    first = json_store.read_json(path)
+    first["a"]["n"] = 99
+    assert json_store.read_json(path) == {"a": {"n": 1}}
+
+    def increment(data):
+        data["a"]["n"] += 1
+
+    threads = [threading.Thread(target=json_store.update_json, args=(path, increment, {})) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert json_store.read_json(path)["a"]["n"] == 21
+
+    # A write from outside the process is seen through the mtime change
+    path.write_text(json.dumps({"b": 2}))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert json_store.read_json(path) == {"b": 2}
+
+    path.write_text("{truncated")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2))
+    assert json_store.read_json(path, {"default": True}) == {"default": True}
+
+    json_store.delete_json(path)
+    assert json_store.read_json(path) is None
@@ -0,0 +1,26 @@
+import json
+
+from beanscounter.core.po_reader import POReader
+from beanscounter.core.profiling import StageTimer, write_speedscope
+
+
+def test_parse_sections_are_timed_under_the_enclosing_stage(tmp_path):
+    timer = StageTimer(record_events=True)
+    reader = POReader(timer)
+    text = "Acme Foods\nPO #: PO-12345\nOrder Date: 11/03/2025\nWidget 2 10.00 20.00\nTotal $ 20.00\n"
+
+    with timer.stage("parse"):
+        data = reader._parse_text(text, [], "po.pdf")
+
+    assert data["po_number"] == "PO-12345"
+    stages = [row["stage"] for row in timer.breakdown()]
+    assert stages[0] == "parse"
+    assert stages[1:] == [f"parse/{name}" for name in (
+        "customer", "po_number", "dates", "ordered_by", "addresses", "items", "invoice_amount", "emails",
+        "domain_match")]
+
+    out = tmp_path / "profile.speedscope.json"
+    write_speedscope(out, [("po.pdf", timer.take_events())])
+    events = json.loads(out.read_text())["profiles"][0]["events"]
+    assert [e["type"] for e in events[:1] + events[-1:]] == ["O", "C"]
+    assert [e["at"] for e in events] == sorted(e["at"] for e in events)
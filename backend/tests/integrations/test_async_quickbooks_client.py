@@ -0,0 +1,98 @@
+import asyncio
+import json
+import httpx
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
+from beanscounter.integrations.qb_rate_limiter import RetryPolicy
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if "oauth2" in request.url.path:
+        return httpx.Response(200, json={"access_token": "token-123"})
+    assert request.headers["Authorization"] == "Bearer token-123"
+    if request.url.path.endswith("/query"):
+        q = request.content.decode()
+        if "from Invoice" in q:
+            return httpx.Response(200, json={"QueryResponse": {"Invoice": [
+                {"Id": "7", "EmailStatus": "EmailSent", "Balance": "0", "TotalAmt": "12.5"}
+            ]}})
+        return httpx.Response(200, json={"QueryResponse": {}})
+    if request.url.path.endswith("/invoice"):
+        body = json.loads(request.content)
+        return httpx.Response(200, json={"Invoice": {"Id": "99", "DocNumber": body["DocNumber"]}})
+    return httpx.Response(404, text="not found")
+
+
+def _client() -> AsyncQuickBooksClient:
+    return AsyncQuickBooksClient(
+        client_id="id", client_secret="secret", refresh_token="refresh", realm_id="123",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    )
+
+
+def test_get_invoice_status_and_create_invoice():
+    async def run():
+        async with _client() as qb:
+            status, created = await asyncio.gather(
+                qb.get_invoice_status("7"),
+                qb.create_invoice(qb.build_invoice_body(
+                    customer_ref={"value": "1", "name": "Acme"}, doc_number="PO-1",
+                    invoice_date="2025-01-01", due_date=None, term_ref=None, line_objects=[]
+                )),
+            )
+            assert await qb.invoice_number_exists("PO-1")
+            return status, created
+
+    status, created = asyncio.run(run())
+    assert status == {"email_status": "EmailSent", "balance": 0.0, "total_amount": 12.5}
+    assert created == {"Id": "99", "DocNumber": "PO-1"}
+
+
+def test_create_invoice_is_not_resent_after_a_503():
+    posts = []
+    created_anyway = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "oauth2" in request.url.path:
+            return httpx.Response(200, json={"access_token": "token-123"})
+        if request.url.path.endswith("/invoice"):
+            posts.append(json.loads(request.content)["DocNumber"])
+            return httpx.Response(503, text="gateway timeout")
+        invoices = [{"Id": "5", "DocNumber": "PO-2"}] if created_anyway else []
+        return httpx.Response(200, json={"QueryResponse": {"Invoice": invoices}})
+
+    async def run(qb):
+        body = qb.build_invoice_body(customer_ref={"value": "1"}, doc_number="PO-2", invoice_date="2025-01-01",
+                                     due_date=None, term_ref=None, line_objects=[])
+        try:
+            await qb.create_invoice(body)
+        except RuntimeError as e:
+            assert "503" in str(e)
+        else:
+            raise AssertionError("create should fail when no invoice exists")
+        created_anyway.append(True)
+        return await qb.create_invoice(body)
+
+    qb = AsyncQuickBooksClient(client_id="id", client_secret="secret", refresh_token="refresh", realm_id="503-realm",
+                               http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                               retry_policy=RetryPolicy(base_delay=0.0))
+    assert asyncio.run(run(qb)) == {"Id": "5", "DocNumber": "PO-2"}
+    assert posts == ["PO-2", "PO-2"]  # one POST per create call, never re-sent
+
+
+def test_get_all_items_can_raise_instead_of_returning_empty():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "oauth2" in request.url.path:
+            return httpx.Response(200, json={"access_token": "token-123"})
+        return httpx.Response(400, text="bad request")
+
+    async def run():
+        async with AsyncQuickBooksClient(client_id="id", client_secret="secret", refresh_token="refresh",
+                                         realm_id="123",
+                                         http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))) as qb:
+            assert await qb.get_all_items() == []
+            try:
+                await qb.get_all_items(raise_errors=True)
+            except RuntimeError as e:
+                return str(e)
+
+    assert "400" in asyncio.run(run())
@@ -0,0 +1,132 @@
+import base64
+from types import SimpleNamespace
+from beanscounter.integrations.gmail_client import GmailClient
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append(request_id)
+
+    def execute(self):
+        self.service.batches.append(list(self.requests))
+        for request_id in self.requests:
+            if request_id == "throttled" and self.service.throttle:
+                self.service.throttle -= 1
+                self.callback(request_id, None, SimpleNamespace(resp=SimpleNamespace(status=429)))
+            elif request_id == "missing":
+                self.callback(request_id, None, SimpleNamespace(resp=SimpleNamespace(status=404)))
+            else:
+                self.callback(request_id, {"id": request_id}, None)
+
+
+class _FakeService:
+    def __init__(self):
+        self.batches = []
+        self.throttle = 1
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+    def users(self):
+        messages = SimpleNamespace(get=lambda **kwargs: kwargs)
+        return SimpleNamespace(messages=lambda: messages)
+
+
+def test_get_emails_details_batch_chunks_and_retries(monkeypatch):
+    monkeypatch.setattr("beanscounter.integrations.gmail_client.time.sleep", lambda seconds: None)
+    client = GmailClient(client_id="id", client_secret="secret")
+    client._service = _FakeService()
+
+    ids = [f"m{i}" for i in range(5)] + ["throttled", "missing"]
+    details = client.get_emails_details_batch(ids, batch_size=3)
+
+    assert details["m4"] == {"id": "m4"}
+    assert details["throttled"] == {"id": "throttled"}
+    assert details["missing"] is None
+    assert [len(b) for b in client._service.batches] == [3, 3, 1, 1]
+
+
+def test_iter_email_ids_follows_page_tokens():
+    pages = {
+        None: {"messages": [{"id": "a"}, {"id": "b"}], "nextPageToken": "p2"},
+        "p2": {"messages": [{"id": "c"}]},
+    }
+    calls = []
+
+    def list_messages(**kwargs):
+        calls.append(kwargs["pageToken"])
+        return SimpleNamespace(execute=lambda: pages[kwargs["pageToken"]])
+
+    messages = SimpleNamespace(list=list_messages)
+    client = GmailClient(client_id="id", client_secret="secret")
+    client._service = SimpleNamespace(users=lambda: SimpleNamespace(messages=lambda: messages))
+
+    from datetime import datetime
+    ids = client.iter_email_ids(datetime(2025, 1, 1), query="in:inbox")
+    assert next(ids) == "a"
+    assert calls == [None]
+    assert list(ids) == ["b", "c"]
+    assert calls == [None, "p2"]
+
+
+def test_extract_sender_from_headers_matches_full_extraction():
+    client = GmailClient(client_id="id", client_secret="secret")
+    summary = {"payload": {"headers": [
+        {"name": "From", "value": "Orders <orders@forwarder.com>"},
+        {"name": "X-Original-From", "value": "Buyer <buyer@customer.com>"},
+    ]}}
+    assert client.extract_sender_from_headers(summary) == "buyer@customer.com"
+    assert client.extract_original_sender(summary) == "buyer@customer.com"
+    assert client.extract_sender_from_headers({"payload": {"headers": [
+        {"name": "From", "value": "orders@forwarder.com"}
+    ]}}) is None
+
+
+def test_extract_original_sender_scans_plain_text_in_priority_order():
+    def part(mime_type, text):
+        return {"mimeType": mime_type, "body": {"data": base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")}}
+
+    client = GmailClient(client_id="id", client_secret="secret")
+    body = ("Please see below.\nFrom: Other <other@vendor.com>\n\n"
+            "---------- Forwarded message ---------\nFrom: Buyer Name <buyer@customer.com>\nSubject: PO 12\n")
+    email = {"payload": {
+        "headers": [{"name": "From", "value": "orders@forwarder.com"}],
+        "mimeType": "multipart/alternative",
+        "parts": [part("text/html", "<p>From: html@ignored.com</p>"), part("text/plain", body)],
+    }}
+    assert client.extract_original_sender(email) == "buyer@customer.com"
+    assert client.get_email_body_text(email) == body
+    assert client.get_email_body_text(email, max_chars=17) == "Please see below."
+
+
+def test_list_added_message_ids_pages_and_detects_expiry():
+    import pytest
+    from googleapiclient.errors import HttpError
+    from beanscounter.integrations.gmail_client import HistoryExpiredError
+
+    pages = {
+        None: {"history": [{"messagesAdded": [{"message": {"id": "a"}}, {"message": {"id": "b"}}]}],
+               "historyId": "20", "nextPageToken": "p2"},
+        "p2": {"history": [{"messagesAdded": [{"message": {"id": "b"}}, {"message": {"id": "c"}}]}],
+               "historyId": "25"},
+    }
+
+    def list_history(**kwargs):
+        if kwargs["startHistoryId"] == "old":
+            def expired():
+                raise HttpError(SimpleNamespace(status=404, reason="Not Found"), b"{}")
+            return SimpleNamespace(execute=expired)
+        return SimpleNamespace(execute=lambda: pages[kwargs["pageToken"]])
+
+    history = SimpleNamespace(list=list_history)
+    client = GmailClient(client_id="id", client_secret="secret")
+    client._service = SimpleNamespace(users=lambda: SimpleNamespace(history=lambda: history))
+
+    assert client.list_added_message_ids("10") == (["a", "b", "c"], "25")
+    with pytest.raises(HistoryExpiredError):
+        client.list_added_message_ids("old")
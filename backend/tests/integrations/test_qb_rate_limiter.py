@@ -0,0 +1,77 @@
+import time
+from beanscounter.integrations.qb_rate_limiter import RealmRateLimiter, RetryPolicy, parse_retry_after
+
+
+def test_retry_policy_honours_retry_after_and_caps_attempts():
+    policy = RetryPolicy(max_retries=2, base_delay=1.0, max_delay=10.0)
+    assert policy.delay(0, "3") == 3.0
+    assert policy.delay(0, "120") == 10.0
+    assert 0 <= policy.delay(3) <= 8.0
+    assert policy.should_retry(429, 0)
+    assert policy.should_retry(500, 1, idempotent=True)
+    assert not policy.should_retry(500, 1, idempotent=False)
+    assert policy.should_retry(503, 0, idempotent=True)
+    assert not policy.should_retry(503, 0, idempotent=False)
+    assert not policy.should_retry(429, 2)
+    assert not policy.should_retry(400, 0)
+
+
+def test_parse_retry_after_http_date():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("garbage") is None
+
+
+def test_limiter_throttles_beyond_burst_and_backs_off_on_429():
+    limiter = RealmRateLimiter(requests_per_minute=600, max_concurrent=2)
+    start = time.monotonic()
+    for _ in range(3):
+        with limiter.slot():
+            pass
+    # Two requests fit the burst; the third waits for a token (10/s)
+    assert time.monotonic() - start >= 0.08
+    metrics = limiter.metrics()
+    assert metrics["requests"] == 3
+    assert metrics["throttled_requests"] >= 1
+
+    limiter.on_response(429)
+    assert limiter.metrics()["current_requests_per_minute"] == 300.0
+    assert limiter.metrics()["responses_429"] == 1
+
+
+def test_async_slot_waits_for_a_thread_held_slot_without_blocking_the_loop():
+    import asyncio
+    import threading
+
+    limiter = RealmRateLimiter(requests_per_minute=600, max_concurrent=1)
+    held = threading.Event()
+
+    def hold_slot():
+        with limiter.slot():
+            held.set()
+            time.sleep(0.2)
+
+    async def run():
+        thread = threading.Thread(target=hold_slot)
+        thread.start()
+        held.wait()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        async with limiter.async_slot():
+            pass
+        ticking.cancel()
+        thread.join()
+        return ticks
+
+    assert asyncio.run(run()) >= 5
+    # The token was taken when the slot came free, so the next send still waits for one
+    start = time.monotonic()
+    with limiter.slot():
+        pass
+    assert time.monotonic() - start >= 0.08
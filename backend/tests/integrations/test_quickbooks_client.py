@@ -0,0 +1,78 @@
+import re
+from beanscounter.integrations.quickbooks_client import TOKEN_URL, QuickBooksClient, token_url
+
+
+def _fake_client(rows, calls):
+    client = QuickBooksClient("id", "secret", "refresh", "realm-paging")
+
+    def query(q):
+        calls.append(q)
+        if "count(*)" in q:
+            return {"QueryResponse": {"totalCount": len(rows)}}
+        start = int(re.search(r"startposition (\d+)", q).group(1))
+        size = int(re.search(r"maxresults (\d+)", q).group(1))
+        page = rows[start - 1:start - 1 + size]
+        return {"QueryResponse": {"Item": page} if page else {}}
+
+    client.query = query
+    return client
+
+
+def test_query_all_fetches_pages_in_order_with_selected_columns():
+    rows = [{"Id": str(i)} for i in range(1, 2501)]
+    calls = []
+    client = _fake_client(rows, calls)
+
+    result = client.query_all("Item", columns=["Name", "Sku"], page_size=1000)
+
+    assert result == rows
+    assert calls[0] == "select count(*) from Item"
+    page_queries = calls[1:]
+    assert len(page_queries) == 3
+    assert all(q.startswith("select Name, Sku, Id from Item orderby Id") for q in page_queries)
+
+
+def test_query_all_picks_up_rows_added_after_count():
+    rows = [{"Id": str(i)} for i in range(1, 5)]
+    calls = []
+    client = _fake_client(rows, calls)
+    original_query = client.query
+
+    def query(q):
+        res = original_query(q)
+        if "count(*)" in q:
+            rows.extend({"Id": str(i)} for i in range(5, 8))
+        return res
+
+    client.query = query
+    assert [r["Id"] for r in client.query_all("Item", page_size=2)] == [str(i) for i in range(1, 8)]
+
+
+def test_base_and_token_urls_can_point_at_a_local_stub(monkeypatch):
+    client = QuickBooksClient("id", "secret", "refresh", "realm-urls", environment="sandbox")
+    assert client.base_url == "https://sandbox-quickbooks.api.intuit.com"
+    assert token_url() == TOKEN_URL
+
+    monkeypatch.setenv("QBO_BASE_URL", "http://127.0.0.1:8765/")
+    monkeypatch.setenv("QBO_TOKEN_URL", "http://127.0.0.1:8765/oauth2/v1/tokens/bearer")
+
+    assert client.base_url == "http://127.0.0.1:8765"
+    assert token_url() == "http://127.0.0.1:8765/oauth2/v1/tokens/bearer"
+
+
+def test_query_all_page_fetches_count_toward_the_request_timing():
+    from beanscounter.core.metrics import finish_request_timing, start_request_timing, timed
+
+    client = _fake_client([{"Id": str(i)} for i in range(1, 8)], [])
+    page_query = client.query
+
+    def timed_query(q):
+        with timed("quickbooks", call="query_item"):
+            return page_query(q)
+
+    client.query = timed_query
+    token = start_request_timing()
+    client.query_all("Item", page_size=2)
+    phases = finish_request_timing(token)
+
+    assert phases["quickbooks_query_item"][1] == 1 + 4  # count(*) plus four pages fetched on worker threads
@@ -0,0 +1,31 @@
+from beanscounter.services.attachment_download_service import AttachmentDownloader
+
+
+class _FakeGmail:
+    def __init__(self, attachments):
+        self.attachments = attachments
+
+    def download_attachment(self, email_id, attachment_id):
+        return self.attachments.get(attachment_id)
+
+
+def test_downloader_saves_atomically_and_skips_duplicate_content(tmp_path):
+    folder = tmp_path / "pos"
+    folder.mkdir()
+    (folder / "existing.pdf").write_bytes(b"%PDF-old")
+    index_file = tmp_path / "index.json"
+
+    gmail = _FakeGmail({"a": b"%PDF-new", "b": b"%PDF-new", "c": b"%PDF-old", "d": b"%PDF-other"})
+    with AttachmentDownloader(gmail, folder, index_file, max_workers=4) as downloader:
+        outcomes = [downloader.submit("m1", attachment_id, "PO_Acme_1").result()
+                    for attachment_id in ["a", "b", "c", "d", "missing"]]
+
+    assert [o["status"] for o in outcomes] == ["saved", "duplicate", "duplicate", "saved", "failed"]
+    assert outcomes[1]["filename"] == outcomes[0]["filename"] == "PO_Acme_1.pdf"
+    assert outcomes[2]["filename"] == "existing.pdf"
+    assert outcomes[3]["filename"] == "PO_Acme_1_1.pdf"
+    assert sorted(p.name for p in folder.iterdir()) == ["PO_Acme_1.pdf", "PO_Acme_1_1.pdf", "existing.pdf"]
+
+    # The persisted index is reused on the next run
+    with AttachmentDownloader(_FakeGmail({"e": b"%PDF-other"}), folder, index_file) as downloader:
+        assert downloader.submit("m2", "e", "PO_Acme_2").result()["status"] == "duplicate"
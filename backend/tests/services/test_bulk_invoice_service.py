@@ -0,0 +1,55 @@
+import asyncio
+import json
+import httpx
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
+from beanscounter.services import bulk_invoice_service
+
+
+def test_bulk_convert_batches_lookups_and_saves_once(monkeypatch):
+    queries = []
+    created = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "oauth2" in request.url.path:
+            return httpx.Response(200, json={"access_token": "token"})
+        if request.url.path.endswith("/query"):
+            q = request.content.decode()
+            queries.append(q)
+            if "count(*)" in q:
+                return httpx.Response(200, json={"QueryResponse": {"totalCount": 1}})
+            if "from Item" in q:
+                return httpx.Response(200, json={"QueryResponse": {"Item": [{"Id": "5", "Name": "Widget", "Sku": "W-1"}]}})
+            if "from Customer" in q:
+                return httpx.Response(200, json={"QueryResponse": {"Customer": [{"Id": "1", "DisplayName": "Acme"}]}})
+            if "from Invoice" in q:
+                return httpx.Response(200, json={"QueryResponse": {"Invoice": [{"Id": "70", "DocNumber": "PO-OLD"}]}})
+        if request.url.path.endswith("/invoice"):
+            body = json.loads(request.content)
+            created.append(body["DocNumber"])
+            return httpx.Response(200, json={"Invoice": {"Id": str(100 + len(created)), "DocNumber": body["DocNumber"]}})
+        return httpx.Response(404)
+
+    saved = []
+    monkeypatch.setattr(bulk_invoice_service, "save_invoice_records", saved.append)
+
+    item = {"product_name": "Widget", "sku": "W-1", "quantity": 2, "rate": 3, "price": 6}
+    entries = [
+        {"customer_id": "1", "po_filename": "a.pdf", "invoice_data": {"po_number": "PO-A", "items": [item]}},
+        {"customer_id": "1", "po_filename": "b.pdf", "invoice_data": {"po_number": "PO-B", "items": [item]}},
+        {"customer_id": "1", "po_filename": "old.pdf", "invoice_data": {"po_number": "PO-OLD", "items": [item]}},
+        {"customer_id": "9", "po_filename": "bad.pdf", "invoice_data": {"po_number": "PO-C", "items": [item]}},
+        {"customer_id": "1", "po_filename": "dup.pdf", "invoice_data": {"po_number": "PO-A", "items": [item]}},
+    ]
+
+    qb = AsyncQuickBooksClient(
+        client_id="id", client_secret="secret", refresh_token="refresh", realm_id="bulk-test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    result = asyncio.run(bulk_invoice_service.bulk_convert_pos_to_qb_invoices(entries, qb_client=qb))
+
+    assert [r["status"] for r in result["results"]] == ["created", "created", "exists", "error", "error"]
+    assert result["summary"] == {"created": 2, "exists": 1, "error": 2}
+    assert sorted(created) == ["PO-A", "PO-B"]
+    assert sum("from Customer" in q for q in queries) == 1
+    assert sum("from Invoice" in q for q in queries) == 1
+    assert len(saved) == 1 and set(saved[0]) == {"a.pdf", "b.pdf", "old.pdf"}
@@ -0,0 +1,35 @@
+import pytest
+from beanscounter.core.checkpoint import CheckpointManifest, MANIFEST_NAME
+from beanscounter.services import converter_service
+from beanscounter.services.converter_service import convert_directory
+
+
+def test_resume_skips_completed_and_retries_changed_or_failed(tmp_path, monkeypatch):
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    input_dir.mkdir()
+    for name in ("a", "b", "c"):
+        (input_dir / f"{name}.pdf").write_bytes(name.encode())
+
+    real_parse = converter_service.parse_pdf
+
+    def parse_failing_on_c(pdf):
+        if pdf.name == "c.pdf":
+            raise ValueError("corrupt PDF")
+        return real_parse(pdf)
+
+    monkeypatch.setattr(converter_service, "parse_pdf", parse_failing_on_c)
+    with pytest.raises(ValueError):
+        convert_directory(input_dir, output_dir)
+    manifest = CheckpointManifest(output_dir / MANIFEST_NAME)
+    assert [manifest.status(name) for name in ("a.pdf", "b.pdf", "c.pdf")] == ["done", "done", "failed"]
+
+    monkeypatch.setattr(converter_service, "parse_pdf", real_parse)
+    (input_dir / "b.pdf").write_bytes(b"b, edited")
+    assert convert_directory(input_dir, output_dir, resume=True) == 2  # b changed, c failed
+    assert convert_directory(input_dir, output_dir, resume=True) == 0
+    assert convert_directory(input_dir, output_dir) == 3
+
+    with (output_dir / MANIFEST_NAME).open("a") as f:
+        f.write('{"input": "torn')
+    assert CheckpointManifest(output_dir / MANIFEST_NAME).status("c.pdf") == "done"
+    assert len((output_dir / MANIFEST_NAME).read_text().splitlines()) == 3
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import re
+from collections import Counter
+
+import httpx
+import pytest
+
+from beanscounter.core.csv_reader import iter_csv_invoices
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
+from beanscounter.services.csv_invoice_importer import import_invoices_from_csv
+
+HEADER = "Customer,InvoiceNumber,InvoiceDate,DueDate,Terms,Item,Description,Qty,Rate,Taxable\n"
+
+
+class FakeQBO:
+    """In-memory QuickBooks company answering the queries, batches and invoice posts of a bulk import."""
+
+    NAME_FIELDS = {"Customer": "DisplayName", "Item": "Name", "Term": "Name", "Invoice": "DocNumber"}
+
+    def __init__(self, customers, items):
+        self.rows = {"Customer": [], "Item": [], "Term": [], "Invoice": []}
+        for name in customers:
+            self._add("Customer", {"DisplayName": name})
+        for name in items:
+            self._add("Item", {"Name": name})
+        self.calls = Counter()
+
+    def _add(self, entity, row):
+        row = {**row, "Id": str(sum(len(rows) for rows in self.rows.values()) + 1)}
+        self.rows[entity].append(row)
+        return row
+
+    def _query(self, q):
+        entity = re.search(r"\bfrom (\w+)", q).group(1)
+        if entity == "Account":
+            return {"Account": [{"Id": "79", "Name": "Sales", "AccountType": "Income"}]}
+        column, values = re.search(r"where (\w+) in \((.*)\)", q).groups()
+        wanted = {v.replace("''", "'").lower() for v in re.findall(r"'((?:[^']|'')*)'", values)}
+        return {entity: [row for row in self.rows[entity] if row.get(column, "").lower() in wanted]}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if "oauth2" in path:
+            return httpx.Response(200, json={"access_token": "token-123"})
+        endpoint = path.rsplit("/", 1)[-1]
+        self.calls[f"{request.method} {endpoint}"] += 1
+        if endpoint == "query":
+            return httpx.Response(200, json={"QueryResponse": self._query(request.content.decode())})
+        body = json.loads(request.content)
+        if endpoint == "batch":
+            responses = []
+            for item in body["BatchItemRequest"]:
+                entity = next(key for key in item if key not in ("bId", "operation"))
+                responses.append({"bId": item["bId"], entity: self._add(entity, item[entity])})
+            return httpx.Response(200, json={"BatchItemResponse": responses})
+        if endpoint == "invoice":
+            total = round(sum(line["Amount"] for line in body["Line"]), 2)
+            return httpx.Response(200, json={"Invoice": self._add("Invoice", {**body, "TotalAmt": total})})
+        return httpx.Response(404, text="not found")
+
+
+def test_bulk_import_batches_lookups_and_creates(tmp_path, monkeypatch):
+    monkeypatch.setenv("QBO_REQUESTS_PER_MINUTE", "60000")
+    csv_path = tmp_path / "export.csv"
+    rows = []
+    for n in range(40):
+        customer = f"Cafe {n % 7}"
+        rows.append(f"{customer},INV-{n},2025-01-{n % 28 + 1:02d},,Net 15,Bento {n % 35},,2,12.5,N\n")
+        rows.append(f"{customer.upper()},INV-{n},2025-01-{n % 28 + 1:02d},,Net 15,Samosa,,1,3,Y\n")
+    csv_path.write_text(HEADER + "".join(rows))
+    qbo = FakeQBO(customers=["Cafe 0", "Cafe 1"], items=[f"Bento {n}" for n in range(5)])
+
+    async def run():
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(qbo.handler))
+        async with AsyncQuickBooksClient("id", "secret", "refresh", "csv-bulk-realm", http_client=http_client) as qb:
+            first = await import_invoices_from_csv(str(csv_path), qb, chunk_size=25)
+            again = await import_invoices_from_csv(str(csv_path), qb, chunk_size=25)
+        return first, again
+
+    first, again = asyncio.run(run())
+
+    assert first["summary"] == {"created": 40, "exists": 0, "error": 0}
+    assert [r["invoice_number"] for r in first["results"]] == [f"INV-{n}" for n in range(40)]
+    assert first["results"][0]["invoice"]["TotalAmt"] == 28.0
+    assert again["summary"] == {"created": 0, "exists": 40, "error": 0}
+    # 5 customers (case-insensitive) and 31 items created through the Batch API, not one POST each
+    assert len(qbo.rows["Customer"]) == 2 + 5 and len(qbo.rows["Item"]) == 5 + 31
+    assert qbo.calls["POST invoice"] == 40
+    assert not qbo.calls["POST customer"] and not qbo.calls["POST item"]
+
+
+def test_bulk_import_validates_the_whole_file_before_writing(tmp_path, monkeypatch):
+    monkeypatch.setenv("QBO_REQUESTS_PER_MINUTE", "60000")
+    csv_path = tmp_path / "export.csv"
+    rows = [f"Cafe,INV-{n},2025-01-02,,,Bento,,1,12.5,N\n" for n in range(30)]
+    csv_path.write_text(HEADER + "".join(rows) + "Cafe,INV-30,2025-01-02,,,Bento,,lots,12.5,N\n")
+    qbo = FakeQBO(customers=["Cafe"], items=["Bento"])
+
+    async def run():
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(qbo.handler))
+        async with AsyncQuickBooksClient("id", "secret", "refresh", "csv-invalid-realm", http_client=http_client) as qb:
+            await import_invoices_from_csv(str(csv_path), qb, chunk_size=10)
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+    assert not qbo.calls
+
+
+def test_iter_csv_invoices_rejects_ungrouped_rows(tmp_path):
+    csv_path = tmp_path / "export.csv"
+    csv_path.write_text(HEADER + "A,1,,,,X,,1,1,\nA,2,,,,X,,1,1,\nA,1,,,,X,,1,1,\n")
+    with pytest.raises(ValueError, match="group the CSV"):
+        list(iter_csv_invoices(str(csv_path)))
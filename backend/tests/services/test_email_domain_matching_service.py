@@ -0,0 +1,65 @@
+import pytest
+
+from beanscounter.services import email_domain_matching_service as matching
+from beanscounter.services import settings_service
+
+
+@pytest.fixture
+def decisions_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(matching, "DOMAIN_DECISIONS_FILE", tmp_path / "decisions.json")
+    monkeypatch.setattr(matching, "_decisions", None)
+    return tmp_path / "decisions.json"
+
+
+def test_resolve_customer_domain_caches_per_sync_and_across_syncs(decisions_file, monkeypatch):
+    scans = []
+    now = [1_000_000.0]
+
+    def clock():
+        return now[0]
+
+    def fake_index(raise_errors=False):
+        scans.append(raise_errors)
+        return {"acme.com": "Acme Foods"}
+
+    monkeypatch.setattr(matching, "get_qb_customer_domain_index", fake_index)
+
+    # A sync resolves every domain against the index it built once
+    index = {"acme.com": "Acme Foods"}
+    session = {}
+    for _ in range(3):
+        assert matching.resolve_customer_domain("ACME.com", session, clock, index)["customer_name"] == "Acme Foods"
+        assert not matching.resolve_customer_domain("other.com", session, clock, index)["matched"]
+    assert scans == []
+
+    # Without an index (and a new process), fresh decisions are reused from disk
+    monkeypatch.setattr(matching, "_decisions", None)
+    assert matching.resolve_customer_domain("acme.com", {}, clock)["matched"]
+    assert scans == []
+
+    # Misses expire after NO_MATCH_TTL_SECONDS, matches only after MATCH_TTL_SECONDS
+    now[0] += matching.NO_MATCH_TTL_SECONDS
+    matching.resolve_customer_domain("other.com", {}, clock)
+    matching.resolve_customer_domain("acme.com", {}, clock)
+    assert scans == [True]
+
+    # Changing QuickBooks credentials forgets every decision
+    monkeypatch.setattr(settings_service, "QB_PREFS_FILE", decisions_file.parent / "quickbooks.json")
+    settings_service.delete_qb_credentials()
+    assert not decisions_file.exists()
+    matching.resolve_customer_domain("acme.com", {}, clock)
+    assert scans == [True, True]
+
+
+def test_failed_customer_lookup_is_not_persisted(decisions_file, monkeypatch):
+    def failing_index(raise_errors=False):
+        raise RuntimeError("QBO 503")
+
+    monkeypatch.setattr(matching, "get_qb_customer_domain_index", failing_index)
+    session = {}
+
+    decision = matching.resolve_customer_domain("acme.com", session)
+
+    assert decision == {"matched": False, "customer_name": None, "lookup_failed": True}
+    assert session["acme.com"]["lookup_failed"]
+    assert not decisions_file.exists()
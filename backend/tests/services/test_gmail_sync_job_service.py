@@ -0,0 +1,52 @@
+import threading
+from beanscounter.services import gmail_sync_job_service
+
+
+def test_concurrent_sync_requests_share_one_job(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def fake_run(start_date, full=False, progress=None):
+        calls.append(full)
+        progress["emails_scanned"] = 7
+        release.wait(5)
+        return {"success": True, "emails_processed": 7, "pdfs_downloaded": 1, "errors": []}
+
+    monkeypatch.setattr(gmail_sync_job_service, "run_gmail_sync", fake_run)
+    monkeypatch.setattr(gmail_sync_job_service, "_current_job", None)
+
+    first, started_first = gmail_sync_job_service.start_sync_job()
+    second, started_second = gmail_sync_job_service.start_sync_job(full=True)
+    assert started_first and not started_second
+    assert first["job_id"] == second["job_id"]
+
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "gmail-sync":
+            thread.join(5)
+
+    job = gmail_sync_job_service.get_sync_job()
+    assert job["status"] == "completed"
+    assert job["progress"]["emails_scanned"] == 7
+    assert job["result"]["pdfs_downloaded"] == 1
+    assert calls == [False]
+    assert job["finished_at"] is not None
+
+
+def test_failed_sync_records_error_and_finish_time_with_status(monkeypatch):
+    def failing_run(start_date, full=False, progress=None):
+        raise RuntimeError("token expired")
+
+    monkeypatch.setattr(gmail_sync_job_service, "run_gmail_sync", failing_run)
+    monkeypatch.setattr(gmail_sync_job_service, "_current_job", None)
+
+    gmail_sync_job_service.start_sync_job()
+    for thread in threading.enumerate():
+        if thread.name == "gmail-sync":
+            thread.join(5)
+
+    job = gmail_sync_job_service.get_sync_job()
+    assert job["status"] == "failed"
+    assert job["error"] == "token expired"
+    assert job["result"] is None
+    assert job["finished_at"] is not None
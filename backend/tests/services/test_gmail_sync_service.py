@@ -0,0 +1,26 @@
+from beanscounter.services import gmail_sync_service
+
+
+def test_failed_emails_are_retried_by_later_incremental_syncs(tmp_path, monkeypatch):
+    monkeypatch.setattr(gmail_sync_service, "SYNC_HISTORY_FILE", tmp_path / "history.json")
+    monkeypatch.setattr(gmail_sync_service, "MAX_EMAIL_RETRIES", 2)
+    calls = []
+    outcomes = iter([["m1", "m2"], ["m2"], [], ["m2"]])
+
+    def fake_sync(start_date=None, history_id=None, last_sync=None, progress=None, retry_email_ids=None):
+        calls.append((history_id, retry_email_ids))
+        return {"success": True, "emails_processed": 1, "pdfs_downloaded": 0, "errors": [],
+                "history_id": f"h{len(calls)}", "failed_email_ids": next(outcomes)}
+
+    monkeypatch.setattr(gmail_sync_service, "sync_emails_from_gmail", fake_sync)
+
+    gmail_sync_service.run_gmail_sync(full=True)
+    gmail_sync_service.run_gmail_sync()
+    gmail_sync_service.run_gmail_sync(full=True)  # a full sync keeps the queue
+    assert gmail_sync_service.load_sync_history()["retry_email_ids"] == {"m2": 2}
+    gave_up = gmail_sync_service.run_gmail_sync()
+
+    assert calls == [(None, None), ("h1", ["m1", "m2"]), (None, None), ("h3", ["m2"])]
+    assert gave_up["errors"] == ["Giving up on email m2 after 2 retries"]
+    history = gmail_sync_service.load_sync_history()
+    assert history["history_id"] == "h4" and history["retry_email_ids"] == {}
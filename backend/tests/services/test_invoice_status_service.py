@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime
+import httpx
+from beanscounter.integrations.async_quickbooks_client import AsyncQuickBooksClient
+from beanscounter.services import invoice_status_service
+
+
+def test_refresh_invoice_statuses_batches_ids_and_writes_once(monkeypatch):
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "oauth2" in request.url.path:
+            return httpx.Response(200, json={"access_token": "token"})
+        queries.append(request.content.decode())
+        return httpx.Response(200, json={"QueryResponse": {"Invoice": [
+            {"Id": "1", "EmailStatus": "EmailSent", "Balance": "10", "TotalAmt": "10"},
+            {"Id": "2", "EmailStatus": "NotSet", "Balance": "0", "TotalAmt": "5"},
+        ]}})
+
+    records = {
+        "a.pdf": {"qb_invoice_id": "1", "email_status": "NotSet", "balance": 10.0},
+        "b.pdf": {"qb_invoice_id": "2", "email_status": "NotSet", "balance": 0.0},
+        "c.pdf": {"qb_invoice_id": "3"},
+        "fresh.pdf": {"qb_invoice_id": "4", "last_status_check": datetime.now().isoformat()},
+        "not-po.pdf": {"po_status": "Not a PO"},
+    }
+    writes = []
+    monkeypatch.setattr(invoice_status_service, "get_all_invoice_records", lambda: records)
+    monkeypatch.setattr(invoice_status_service, "update_invoice_statuses",
+                        lambda statuses, checked=None: writes.append((statuses, checked)))
+
+    qb = AsyncQuickBooksClient(
+        client_id="id", client_secret="secret", refresh_token="refresh", realm_id="status-test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    result = asyncio.run(invoice_status_service.refresh_invoice_statuses(max_age_seconds=300, qb_client=qb))
+
+    assert result == {"checked": 3, "updated": 1, "missing": ["c.pdf"]}
+    assert len(queries) == 1 and "Id in ('1', '2', '3')" in queries[0]
+    assert len(writes) == 1
+    statuses, checked = writes[0]
+    assert statuses["a.pdf"]["email_status"] == "EmailSent"
+    assert sorted(checked) == ["a.pdf", "b.pdf", "c.pdf"]
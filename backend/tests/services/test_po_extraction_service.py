@@ -0,0 +1,86 @@
+import json
+from beanscounter.services import po_extraction_service
+
+
+class _CountingReader:
+    def __init__(self):
+        self.calls = 0
+
+    def extract_data(self, file_path):
+        self.calls += 1
+        return {"po_number": file_path.stem, "items": [{"product_name": "Widget"}]}
+
+
+def test_extraction_cache_hits_until_file_changes(tmp_path, monkeypatch):
+    cache_file = tmp_path / "cache.json"
+    monkeypatch.setattr(po_extraction_service, "CACHE_FILE", cache_file)
+    monkeypatch.setattr(po_extraction_service, "_cache", None)
+    reader = _CountingReader()
+    monkeypatch.setattr(po_extraction_service, "_get_reader", lambda: reader)
+
+    po = tmp_path / "PO1.pdf"
+    po.write_bytes(b"%PDF-1")
+
+    first = po_extraction_service.get_extracted_data(po)
+    first["items"].append({"product_name": "mutated"})
+    assert po_extraction_service.get_extracted_data(po)["items"] == [{"product_name": "Widget"}]
+    assert reader.calls == 1
+
+    po_extraction_service.flush_extraction_cache()
+    assert json.loads(cache_file.read_text())["PO1.pdf"]["data"]["po_number"] == "PO1"
+
+    po.write_bytes(b"%PDF-changed")
+    po_extraction_service.get_extracted_data(po)
+    assert reader.calls == 2
+
+
+def test_queue_extraction_fills_cache_in_background(tmp_path, monkeypatch):
+    cache_file = tmp_path / "cache.json"
+    monkeypatch.setattr(po_extraction_service, "CACHE_FILE", cache_file)
+    monkeypatch.setattr(po_extraction_service, "_cache", None)
+    monkeypatch.setattr(po_extraction_service, "_get_reader", lambda: _CountingReader())
+
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"PO{i}.pdf"
+        path.write_bytes(b"%PDF" + bytes([i]))
+        paths.append(path)
+
+    for future in po_extraction_service.queue_extraction(paths):
+        future.result()
+
+    assert all(po_extraction_service.get_cached_extraction(p) for p in paths)
+    assert set(json.loads(cache_file.read_text())) == {"PO0.pdf", "PO1.pdf", "PO2.pdf"}
+
+
+def test_lookup_waits_for_queued_extraction_and_flush_prunes_deleted_files(tmp_path, monkeypatch):
+    import threading
+
+    cache_file = tmp_path / "cache.json"
+    monkeypatch.setattr(po_extraction_service, "CACHE_FILE", cache_file)
+    monkeypatch.setattr(po_extraction_service, "_cache", None)
+    started, release = threading.Event(), threading.Event()
+    background = _CountingReader()
+
+    class _BlockingReader:
+        def extract_data(self, file_path):
+            started.set()
+            release.wait(5)
+            return background.extract_data(file_path)
+
+    monkeypatch.setattr(po_extraction_service, "_get_reader", lambda: _BlockingReader())
+    po = tmp_path / "PO7.pdf"
+    po.write_bytes(b"%PDF-7")
+    futures = po_extraction_service.queue_extraction([po])
+    assert po_extraction_service.queue_extraction([po]) == futures
+    started.wait(5)
+
+    list_reader = _CountingReader()
+    threading.Timer(0.05, release.set).start()
+    assert po_extraction_service.get_extracted_data(po, list_reader)["po_number"] == "PO7"
+    assert (background.calls, list_reader.calls) == (1, 0)
+
+    futures[0].result()
+    po.unlink()
+    po_extraction_service.flush_extraction_cache()
+    assert json.loads(cache_file.read_text()) == {}
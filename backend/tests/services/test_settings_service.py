@@ -0,0 +1,36 @@
+import json
+import os
+from cryptography.fernet import Fernet
+from beanscounter.core.credentials_cache import CredentialsCache
+from beanscounter.services import settings_service
+
+
+def test_qb_credentials_are_cached_until_prefs_change(tmp_path, monkeypatch):
+    prefs_file = tmp_path / "prefs" / "quickbooks.json"
+    monkeypatch.setenv("ENCRYPTION_KEY", Fernet.generate_key().decode())
+    monkeypatch.setattr(settings_service, "QB_PREFS_FILE", prefs_file)
+    monkeypatch.setattr(settings_service, "_qb_credentials_cache", CredentialsCache(prefs_file))
+
+    decrypts = []
+    decrypt_value = settings_service.decrypt_value
+    monkeypatch.setattr(settings_service, "decrypt_value",
+                        lambda value, key=None: decrypts.append(value) or decrypt_value(value, key))
+
+    assert settings_service.get_qb_credentials() is None
+    settings_service.save_qb_credentials("id", "secret", "refresh", "realm")
+    assert settings_service.get_qb_credentials()["realm_id"] == "realm"
+    settings_service.get_qb_credentials()["realm_id"] = "mutated"
+    assert settings_service.get_qb_credentials()["realm_id"] == "realm"
+    assert len(decrypts) == 4
+
+    # An edit from outside the process is picked up through the file mtime
+    prefs = json.loads(prefs_file.read_text())
+    prefs["environment"] = "sandbox"
+    prefs_file.write_text(json.dumps(prefs))
+    stat = prefs_file.stat()
+    os.utime(prefs_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert settings_service.get_qb_credentials()["environment"] == "sandbox"
+    assert len(decrypts) == 8
+
+    settings_service.delete_qb_credentials()
+    assert settings_service.get_qb_credentials() is None
@@ -1,11 +1,19 @@
-import PyPDF2
 import re
 import csv
+import os
 from datetime import datetime
+from importlib.util import find_spec
 from pathlib import Path
+from beanscounter.core.checkpoint import CheckpointManifest, file_sha256
 
-# --------- PDF TEXT EXTRACTION (PyPDF2 only, per your request) ---------
-def extract_text_from_pdf(pdf_path):
+# --------- PDF TEXT EXTRACTION BACKENDS ---------
+# Each backend returns the text of every page followed by "\n", with "\n" line
+# endings. PyPDF2 stays the default so existing output is unchanged; pdfplumber and
+# pypdfium2 (much faster on our single-column PayPal invoices) are chosen with
+# --backend. Libraries are imported on first use so only the chosen one is needed.
+
+def _extract_text_pypdf2(pdf_path):
+    import PyPDF2
     with open(pdf_path, 'rb') as file:
         reader = PyPDF2.PdfReader(file)
         text = ''
@@ -14,6 +22,42 @@ def extract_text_from_pdf(pdf_path):
             text += t + "\n"
     return text
 
+def _extract_text_pdfplumber(pdf_path):
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return ''.join((page.extract_text() or '') + "\n" for page in pdf.pages)
+
+def _extract_text_pypdfium2(pdf_path):
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument(pdf_path)
+    try:
+        pages = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range().replace('\r\n', '\n').replace('\r', '\n') + "\n")
+            textpage.close()
+            page.close()
+        return ''.join(pages)
+    finally:
+        pdf.close()
+
+# backend name -> (module that must be installed, extractor)
+TEXT_BACKENDS = {
+    'pypdf2': ('PyPDF2', _extract_text_pypdf2),
+    'pdfplumber': ('pdfplumber', _extract_text_pdfplumber),
+    'pypdfium2': ('pypdfium2', _extract_text_pypdfium2),
+}
+DEFAULT_BACKEND = 'pypdf2'
+
+def available_backends():
+    """Names of the text backends whose library is installed."""
+    return [name for name, (module, _) in TEXT_BACKENDS.items() if find_spec(module) is not None]
+
+def extract_text_from_pdf(pdf_path, backend=DEFAULT_BACKEND):
+    if backend not in TEXT_BACKENDS:
+        raise ValueError(f"Unknown text backend {backend!r}; choose from {', '.join(TEXT_BACKENDS)}")
+    return TEXT_BACKENDS[backend][1](pdf_path)
+
 # --------- ITEM PARSER (matches your provided layout) ---------
 # Input after header looks like sequence of blocks, e.g.:
 # 1
@@ -270,49 +314,178 @@ def parse_invoice_data(text: str):
     return data
 
 # --------- CSV WRITER (unchanged output columns) ---------
-def create_quickbooks_csv(invoice_data_list, output_file='quickbooks_import.csv'):
-    headers = ['Invoice Number','Customer','Contact Person','Address Line 1','Address Line 2','Customer Email',
-               'Ship To Name','Ship To Contact','Ship To Address 1','Ship To Address 2','Ship To Email','Invoice Date',
-               'Due Date','Item Number','Item Description','Quantity','Item Rate','Item Amount','Tax Amount',
-               'Tip Amount','Total Amount','Amount Paid','Balance Due']
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(headers)
-        for data in invoice_data_list:
-            line_items = data.get('line_items', [])
-            print("\n" + "="*80)
-            print("EXTRACTED LINE ITEMS (mapped to PDF columns):")
-            print("="*80)
-            print(f"{'#':<5} {'ITEMS & DESCRIPTION':<40} {'QTY/HRS':<10} {'PRICE':<12} {'AMOUNT($)':<12}")
-            print("-"*80)
-
-            for i, item in enumerate(line_items):
-                print(f"{item.get('item_number',''):<5} {item.get('description','')[:40]:<40} {item.get('quantity',''):<10} ${item.get('rate','')} ${item.get('amount','')}")
-                writer.writerow([
-                    data.get('invoice_number',''), data.get('customer_name',''), data.get('contact_person',''),
-                    data.get('address_line1',''), data.get('address_line2',''), data.get('customer_email',''),
-                    data.get('ship_to_name',''), data.get('ship_to_contact',''), data.get('ship_to_address1',''),
-                    data.get('ship_to_address2',''), data.get('ship_to_email',''), data.get('invoice_date',''), data.get('due_date',''), item.get('item_number',''), item.get('description',''),
-                    item.get('quantity',''), item.get('rate',''), item.get('amount',''), item.get('tax_amount',''),
-                    data.get('tip','0.00') if i==len(line_items)-1 else '',
-                    data.get('total','0.00') if i==len(line_items)-1 else '',
-                    data.get('amount_paid','0.00') if i==len(line_items)-1 else '',
-                    data.get('amount_due','0.00') if i==len(line_items)-1 else ''
-                ])
-
-            print("-"*80)
-            print(f"Total items extracted: {len(line_items)}")
-            print(f"Subtotal: ${data.get('subtotal','0.00')}")
-            print(f"Tax: ${data.get('tax','0.00')}")
-            print(f"Tip: ${data.get('tip','0.00')}")
-            print(f"Total: ${data.get('total','0.00')}")
-            print("="*80)
-    print(f"\n✓ QuickBooks CSV created: {output_file}")
+QUICKBOOKS_HEADERS = ['Invoice Number','Customer','Contact Person','Address Line 1','Address Line 2','Customer Email',
+                      'Ship To Name','Ship To Contact','Ship To Address 1','Ship To Address 2','Ship To Email','Invoice Date',
+                      'Due Date','Item Number','Item Description','Quantity','Item Rate','Item Amount','Tax Amount',
+                      'Tip Amount','Total Amount','Amount Paid','Balance Due']
+
+def _invoice_rows(data):
+    """Build the CSV rows for one parsed invoice (totals go on its last line item)."""
+    line_items = data.get('line_items', [])
+    rows = []
+    for i, item in enumerate(line_items):
+        rows.append([
+            data.get('invoice_number',''), data.get('customer_name',''), data.get('contact_person',''),
+            data.get('address_line1',''), data.get('address_line2',''), data.get('customer_email',''),
+            data.get('ship_to_name',''), data.get('ship_to_contact',''), data.get('ship_to_address1',''),
+            data.get('ship_to_address2',''), data.get('ship_to_email',''), data.get('invoice_date',''), data.get('due_date',''), item.get('item_number',''), item.get('description',''),
+            item.get('quantity',''), item.get('rate',''), item.get('amount',''), item.get('tax_amount',''),
+            data.get('tip','0.00') if i==len(line_items)-1 else '',
+            data.get('total','0.00') if i==len(line_items)-1 else '',
+            data.get('amount_paid','0.00') if i==len(line_items)-1 else '',
+            data.get('amount_due','0.00') if i==len(line_items)-1 else ''
+        ])
+    return rows
+
+def _print_invoice_summary(data):
+    line_items = data.get('line_items', [])
+    print("\n" + "="*80)
+    print("EXTRACTED LINE ITEMS (mapped to PDF columns):")
+    print("="*80)
+    print(f"{'#':<5} {'ITEMS & DESCRIPTION':<40} {'QTY/HRS':<10} {'PRICE':<12} {'AMOUNT($)':<12}")
+    print("-"*80)
+    for item in line_items:
+        print(f"{item.get('item_number',''):<5} {item.get('description','')[:40]:<40} {item.get('quantity',''):<10} ${item.get('rate','')} ${item.get('amount','')}")
+    print("-"*80)
+    print(f"Total items extracted: {len(line_items)}")
+    print(f"Subtotal: ${data.get('subtotal','0.00')}")
+    print(f"Tax: ${data.get('tax','0.00')}")
+    print(f"Tip: ${data.get('tip','0.00')}")
+    print(f"Total: ${data.get('total','0.00')}")
+    print("="*80)
+
+def _existing_parts(output_file):
+    """Rotated parts already written for output_file, as {part number: path} (stem_001.csv -> 1)."""
+    output_file = Path(output_file)
+    parts = {}
+    for path in output_file.parent.glob(f"{output_file.stem}_*{output_file.suffix}"):
+        number = path.stem[len(output_file.stem) + 1:]
+        if number.isdigit():
+            parts[int(number)] = path
+    return parts
+
+class QuickBooksCSVWriter:
+    """Streams parsed invoices into QuickBooks import CSVs.
+
+    Rows are fsynced after every invoice, so only the invoice being written is
+    held in memory and an interrupted run leaves every completed invoice on disk.
+    With max_rows or max_invoices set, output rotates into numbered parts
+    (quickbooks_import_001.csv, quickbooks_import_002.csv, ...). Rotation happens
+    between invoices, so an invoice's line items always share one file; a single
+    invoice with more than max_rows lines gets a part of its own.
+
+    With append=True (used by resumed runs) an existing output file is extended
+    without a second header, and rotated output continues after the last part.
+
+    Usage:
+        with QuickBooksCSVWriter('out.csv', max_invoices=500) as writer:
+            for data in invoices:
+                writer.write_invoice(data)
+        print(writer.paths)
+    """
+
+    def __init__(self, output_file='quickbooks_import.csv', max_rows=None, max_invoices=None, verbose=True,
+                 append=False):
+        self.output_file = Path(output_file)
+        self.max_rows = max_rows
+        self.max_invoices = max_invoices
+        self.verbose = verbose
+        self.append = append
+        self._first_part = 1
+        if append and self._rotating():
+            self._first_part = max(_existing_parts(self.output_file), default=0) + 1
+        self.paths = []
+        self.row_count = 0       # rows written across all parts
+        self.invoice_count = 0   # invoices written across all parts
+        self._file = None
+        self._writer = None
+        self._part_rows = 0
+        self._part_invoices = 0
+
+    def _rotating(self):
+        return self.max_rows is not None or self.max_invoices is not None
+
+    def _part_path(self):
+        if not self._rotating():
+            return self.output_file
+        part = self._first_part + len(self.paths)
+        return self.output_file.with_name(f"{self.output_file.stem}_{part:03d}{self.output_file.suffix}")
+
+    def _open_part(self):
+        self._close_part()
+        path = self._part_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        extend = self.append and not self._rotating() and path.exists() and path.stat().st_size > 0
+        self._file = open(path, 'a' if extend else 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        if not extend:
+            self._writer.writerow(QUICKBOOKS_HEADERS)
+        self._part_rows = 0
+        self._part_invoices = 0
+        self.paths.append(path)
+
+    def _close_part(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def _part_full(self, incoming_rows):
+        if self._part_invoices == 0:
+            return False
+        if self.max_invoices is not None and self._part_invoices >= self.max_invoices:
+            return True
+        return self.max_rows is not None and self._part_rows + incoming_rows > self.max_rows
+
+    def write_invoice(self, data):
+        """Write one parsed invoice and fsync it, so it is on disk before the caller records it."""
+        rows = _invoice_rows(data)
+        if self._file is None or self._part_full(len(rows)):
+            self._open_part()
+        if self.verbose:
+            _print_invoice_summary(data)
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._part_rows += len(rows)
+        self._part_invoices += 1
+        self.row_count += len(rows)
+        self.invoice_count += 1
+
+    def write_invoices(self, invoices):
+        """Write invoices from any iterable (e.g. a generator), one at a time."""
+        for data in invoices:
+            self.write_invoice(data)
+
+    def close(self):
+        # An empty run still produces a header-only file, as create_quickbooks_csv always did
+        if not self.paths and not self.append:
+            self._open_part()
+        self._close_part()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def create_quickbooks_csv(invoice_data_list, output_file='quickbooks_import.csv', max_rows=None, max_invoices=None):
+    """Write parsed invoices to QuickBooks import CSV(s).
+
+    invoice_data_list may be any iterable, including a generator; invoices are
+    written and flushed one at a time. Returns the list of files written.
+    """
+    with QuickBooksCSVWriter(output_file, max_rows=max_rows, max_invoices=max_invoices) as writer:
+        writer.write_invoices(invoice_data_list)
+    for path in writer.paths:
+        print(f"\n✓ QuickBooks CSV created: {path}")
+    return writer.paths
 
 # --------- RUNNERS ---------
-def process_single_pdf(pdf_path):
+def process_single_pdf(pdf_path, backend=DEFAULT_BACKEND):
     print(f"Processing: {pdf_path}")
-    text = extract_text_from_pdf(pdf_path)
+    text = extract_text_from_pdf(pdf_path, backend)
     invoice_data = parse_invoice_data(text)
     output_csv = Path(pdf_path).stem + '.csv'
     create_quickbooks_csv([invoice_data], output_csv)
@@ -320,18 +493,117 @@ def process_single_pdf(pdf_path):
     print(f"  ✓ Created: {output_csv}")
     return True
 
-def process_pdf_directory(directory_path):
-    pdf_files = list(Path(directory_path).glob('*.pdf'))
+# --------- RESUMABLE RUNS ---------
+# Progress is kept in a beanscounter.core.checkpoint manifest next to the output; each
+# done entry also records the invoice number its PDF produced.
+MANIFEST_NAME = '.convert-manifest.jsonl'
+
+def _drop_superseded_rows(paths, keep):
+    """Rewrite combined CSVs keeping only rows of invoices in keep.
+
+    Rows of PDFs that changed or failed since they were converted, and of a PDF
+    interrupted between its write and its manifest entry, are dropped so a
+    resumed run does not leave them next to the rows it writes again.
+    Each file is replaced atomically.
+    """
+    for path in paths:
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        kept = [row for row in rows[1:] if row and row[0] in keep]
+        if len(kept) == len(rows) - 1:
+            continue
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(QUICKBOOKS_HEADERS)
+            writer.writerows(kept)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        print(f"Dropped {len(rows) - 1 - len(kept)} superseded row(s) from {path}")
+
+def process_pdf_directory(directory_path, output_file=None, max_rows=None, max_invoices=None, resume=False,
+                          backend=DEFAULT_BACKEND):
+    """Convert every PDF in a directory.
+
+    Without output_file each PDF gets its own CSV in the working directory.
+    With output_file, invoices are streamed into one combined CSV (rotated into
+    parts by max_rows / max_invoices) as each PDF is parsed.
+
+    Progress is recorded in a manifest (MANIFEST_NAME, next to the output) as soon
+    as each invoice is on disk. With resume=True, PDFs recorded as done whose
+    contents and output are unchanged are skipped. A combined output is first
+    stripped of every invoice not recorded as done and unchanged (PDFs that were
+    edited, failed or interrupted), then appended to.
+
+    backend selects the text extractor (see TEXT_BACKENDS).
+    """
+    pdf_files = sorted(Path(directory_path).glob('*.pdf'))
     if not pdf_files:
         print(f"No PDF files found in {directory_path}")
         return
-    print(f"Processing {len(pdf_files)} PDF file(s)...\n")
-    success_count = 0
+    manifest_path = (Path(output_file).parent if output_file else Path('.')) / MANIFEST_NAME
+    manifest = CheckpointManifest(manifest_path)
+    pending = []
+    complete = []
     for pdf_file in pdf_files:
-        if process_single_pdf(pdf_file):
+        sha256 = file_sha256(pdf_file)
+        if resume and manifest.is_complete(pdf_file.name, sha256):
+            complete.append(manifest.entries[pdf_file.name])
+        else:
+            pending.append((pdf_file, sha256))
+    if resume and output_file:
+        outputs = list(_existing_parts(output_file).values()) if max_rows or max_invoices else [Path(output_file)]
+        _drop_superseded_rows([p for p in outputs if p.exists()],
+                              {entry.get('invoice_number', '') for entry in complete})
+    if len(pending) < len(pdf_files):
+        print(f"Skipping {len(pdf_files) - len(pending)} PDF file(s) already converted ({manifest_path})")
+    print(f"Processing {len(pending)} PDF file(s)...\n")
+
+    success_count = 0
+    writer = QuickBooksCSVWriter(output_file, max_rows, max_invoices, append=resume) if output_file else None
+    try:
+        for pdf_file, sha256 in pending:
+            try:
+                if writer is None:
+                    process_single_pdf(pdf_file, backend)
+                    manifest.mark_done(pdf_file.name, sha256, Path(pdf_file.stem + '.csv').resolve())
+                else:
+                    print(f"Processing: {pdf_file}")
+                    invoice_data = parse_invoice_data(extract_text_from_pdf(pdf_file, backend))
+                    writer.write_invoice(invoice_data)
+                    manifest.mark_done(pdf_file.name, sha256, writer.paths[-1],
+                                       invoice_number=invoice_data.get('invoice_number', ''))
+                    print(f"  ✓ Extracted invoice #{invoice_data.get('invoice_number','N/A')}")
+            except Exception as e:
+                manifest.mark_failed(pdf_file.name, sha256, str(e))
+                raise
             success_count += 1
-        print()
-    print(f"Successfully processed {success_count} of {len(pdf_files)} invoice(s)")
+            print()
+    finally:
+        if writer is not None:
+            writer.close()
+            for path in writer.paths:
+                print(f"✓ QuickBooks CSV written: {path}")
+    print(f"Successfully processed {success_count} of {len(pending)} invoice(s)")
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert PayPal invoice PDFs to QuickBooks import CSVs")
+    parser.add_argument('directory', nargs='?', default='.', help="Directory containing PDF invoices")
+    parser.add_argument('--output', help="Stream all invoices into this CSV instead of one CSV per PDF")
+    parser.add_argument('--max-rows', type=int, help="Rotate --output into a new part after this many rows")
+    parser.add_argument('--max-invoices', type=int, help="Rotate --output into a new part after this many invoices")
+    parser.add_argument('--backend', choices=list(TEXT_BACKENDS), default=DEFAULT_BACKEND,
+                        help="PDF text extraction library (default: %(default)s); "
+                             "pypdfium2 needs the pdf-fast extra: pip install 'beanscounter[pdf-fast]'")
+    parser.add_argument('--resume', action='store_true',
+                        help=f"Skip PDFs that {MANIFEST_NAME} records as converted and unchanged")
+    args = parser.parse_args(argv)
+    if (args.max_rows or args.max_invoices) and not args.output:
+        parser.error("--max-rows/--max-invoices require --output")
+    process_pdf_directory(args.directory, args.output, args.max_rows, args.max_invoices, args.resume,
+                          args.backend)
 
 if __name__ == '__main__':
-    process_pdf_directory('.')
+    main()
@@ -70,7 +70,7 @@ export async function testGmailConnection() {
     return await response.json();
 }
 
-export async function syncGmailEmails(startDate = null) {
+export async function startGmailSync(startDate = null) {
     const url = startDate 
         ? `${API_BASE}/gmail/sync?start_date=${startDate}`
         : `${API_BASE}/gmail/sync`;
@@ -85,6 +85,29 @@ export async function syncGmailEmails(startDate = null) {
     return await response.json();
 }
 
+/**
+ * Start a Gmail sync (or join the one already running) and wait for it to finish.
+ * onProgress, if given, receives the job's live progress counters while polling.
+ */
+export async function syncGmailEmails(startDate = null, onProgress = null, pollIntervalMs = 1000) {
+    let { job } = await startGmailSync(startDate);
+    while (job && job.status === 'running') {
+        if (onProgress) {
+            onProgress(job.progress);
+        }
+        await new Promise(resolve => setTimeout(resolve, pollIntervalMs));
+        const status = await getGmailSyncStatus();
+        job = status.job;
+    }
+    if (!job) {
+        throw new Error('Gmail sync job not found');
+    }
+    if (job.result) {
+        return job.result;
+    }
+    throw new Error(job.error || 'Failed to sync Gmail emails');
+}
+
 export async function getGmailSyncStatus() {
     const response = await fetch(`${API_BASE}/gmail/sync/status`);
     if (!response.ok) {